@@ -11,10 +11,26 @@ DB_DIR.mkdir(exist_ok=True)  # Crea la carpeta 'db' si no existe
 # Ruta completa hacia la base de datos SQLite
 DB_PATH = DB_DIR / "database.db"
 
+# Carpeta de cachés derivadas de los modelos (índices espaciales, etc.).
+# Se crea al guardar el primer archivo.
+CACHE_DIR = BASE_DIR.parent / "cache"
+
 # Otras configuraciones de la aplicación
 SECRET_KEY = config('SECRET_KEY', default="tu_clave_secreta_aqui")
 DEBUG = config('DEBUG', default=True, cast=bool)
 APP_PORT = config('APP_PORT', default=5000, cast=int)
 
 # Configuración específica para STL Tools
-DEFAULT_SCALE_FACTOR = config('DEFAULT_SCALE_FACTOR', default=1.0, cast=float)
\ No newline at end of file
+DEFAULT_SCALE_FACTOR = config('DEFAULT_SCALE_FACTOR', default=1.0, cast=float)
+
+# Logging (src/utils/logger_config.py)
+# Escribir los logs desde un hilo aparte (QueueHandler/QueueListener).
+LOG_QUEUE = config('LOG_QUEUE', default=True, cast=bool)
+# Nivel por subsistema, por ejemplo "scale_db=WARNING,stl_watcher=DEBUG".
+LOG_LEVELS = config('LOG_LEVELS', default="")
+# Rotación de los archivos de log.
+LOG_MAX_BYTES = config('LOG_MAX_BYTES', default=5 * 1024 * 1024, cast=int)
+LOG_BACKUP_COUNT = config('LOG_BACKUP_COUNT', default=3, cast=int)
+# Mensajes DEBUG/INFO por segundo con la misma plantilla (0 = sin límite) y ráfaga permitida.
+LOG_RATE_LIMIT = config('LOG_RATE_LIMIT', default=20.0, cast=float)
+LOG_RATE_BURST = config('LOG_RATE_BURST', default=50, cast=int)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Módulo: build_cache.py
+
+Este módulo mantiene una caché de construcción (build cache) en la misma base
+de datos SQLite que la tabla 'scales'. Cada registro describe un archivo de
+salida generado por las herramientas por lotes:
+  - input_path / input_hash: archivo de origen y hash SHA-256 de su contenido.
+  - input_size / input_mtime_ns: permiten reutilizar el hash sin releer el
+    archivo si no ha cambiado.
+  - scale_id / conversion_factor: factor aplicado (y su registro, si lo hay).
+  - transform: descripción de la transformación y el formato de salida.
+  - output_path / output_hash: archivo generado y hash de su contenido.
+
+Antes de reconstruir una salida, las herramientas consultan is_up_to_date();
+si el origen, el factor vigente en 'scales' o la transformación cambiaron
+(por ejemplo, tras reimportar el Excel con otro conversion_factor), la salida
+se vuelve a generar.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from sqlite3 import Connection, Cursor, Error
+from typing import Any, Dict, List, Optional, Union
+
+from logger_config import setup_logger
+from settings import DB_PATH
+from utils import file_sha256
+
+logger = setup_logger(name=__name__, level=logging.DEBUG, log_file="logs/scale_db.log")
+
+# Tolerancia relativa al comparar factores almacenados como REAL.
+_FACTOR_RTOL = 1e-12
+
+
+class BuildCache:
+    """
+    Clase para consultar y actualizar la tabla 'build_cache'.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH) -> None:
+        self.db_path = db_path
+        try:
+            self.conn: Connection = sqlite3.connect(str(self.db_path))
+            self._create_table()
+        except Error as e:
+            logger.exception("Error al conectar con la base de datos: %s", e)
+            raise
+
+    def _create_table(self) -> None:
+        """
+        Crea la tabla 'build_cache' si no existe.
+        """
+        create_table_sql = """
+        CREATE TABLE IF NOT EXISTS build_cache (
+            output_path TEXT PRIMARY KEY,
+            input_path TEXT NOT NULL,
+            input_hash TEXT NOT NULL,
+            input_size INTEGER NOT NULL,
+            input_mtime_ns INTEGER NOT NULL,
+            scale_id INTEGER,
+            conversion_factor REAL NOT NULL,
+            transform TEXT NOT NULL,
+            output_hash TEXT NOT NULL,
+            built_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        """
+        try:
+            with self.conn:
+                self.conn.execute(create_table_sql)
+                logger.debug("Tabla 'build_cache' verificada/creada correctamente.")
+        except Error as e:
+            logger.exception("Error al crear la tabla 'build_cache': %s", e)
+            raise
+
+    def get_entry(self, output_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """
+        Recupera el registro de un archivo de salida.
+
+        Returns:
+            Optional[Dict[str, Any]]: Registro como diccionario, o None.
+        """
+        query_sql = "SELECT * FROM build_cache WHERE output_path = ?;"
+        cur: Cursor = self.conn.cursor()
+        cur.execute(query_sql, (str(Path(output_path).resolve()),))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cur.description]
+        return dict(zip(columns, row))
+
+    def outputs_for(self, input_path: Union[str, Path], transform: str) -> List[Path]:
+        """
+        Lista las salidas registradas para un origen y una transformación.
+
+        Se usa cuando el número de salidas no se conoce antes de leer el
+        origen (por ejemplo, al separar un modelo en piezas).
+
+        Returns:
+            List[Path]: Archivos de salida registrados, ordenados por nombre.
+        """
+        query_sql = "SELECT output_path FROM build_cache WHERE input_path = ? AND transform = ? ORDER BY output_path;"
+        cur: Cursor = self.conn.cursor()
+        cur.execute(query_sql, (str(Path(input_path).resolve()), transform))
+        return [Path(row[0]) for row in cur.fetchall()]
+
+    def input_hash(self, input_path: Union[str, Path], output_path: Optional[Union[str, Path]] = None) -> str:
+        """
+        Obtiene el hash del archivo de origen.
+
+        Si existe un registro para 'output_path' con el mismo origen, tamaño y
+        fecha de modificación, se reutiliza su hash sin releer el archivo.
+        """
+        source = Path(input_path).resolve()
+        if output_path is not None:
+            entry = self.get_entry(output_path)
+            stat = source.stat()
+            if (
+                entry is not None
+                and entry["input_path"] == str(source)
+                and entry["input_size"] == stat.st_size
+                and entry["input_mtime_ns"] == stat.st_mtime_ns
+            ):
+                return entry["input_hash"]
+        return file_sha256(source)
+
+    def is_up_to_date(
+        self,
+        input_path: Union[str, Path],
+        output_path: Union[str, Path],
+        conversion_factor: float,
+        transform: str,
+        input_hash: Optional[str] = None,
+        verify_output: bool = False,
+    ) -> bool:
+        """
+        Indica si una salida puede reutilizarse sin reconstruirla.
+
+        Args:
+            input_path (Union[str, Path]): Archivo de origen.
+            output_path (Union[str, Path]): Archivo de salida esperado.
+            conversion_factor (float): Factor vigente (consultado en 'scales' si procede).
+            transform (str): Descripción de la transformación y el formato.
+            input_hash (Optional[str]): Hash ya calculado del origen.
+            verify_output (bool): Si True, también se comprueba el hash de la salida.
+
+        Returns:
+            bool: True si el registro coincide y la salida existe.
+        """
+        target = Path(output_path).resolve()
+        entry = self.get_entry(target)
+        if entry is None or not target.exists():
+            return False
+        if entry["transform"] != transform:
+            return False
+        stored = entry["conversion_factor"]
+        if abs(stored - conversion_factor) > _FACTOR_RTOL * max(abs(stored), abs(conversion_factor)):
+            return False
+        current_hash = input_hash or self.input_hash(input_path, target)
+        if entry["input_hash"] != current_hash:
+            return False
+        if verify_output and file_sha256(target) != entry["output_hash"]:
+            return False
+        return True
+
+    def record(
+        self,
+        input_path: Union[str, Path],
+        output_path: Union[str, Path],
+        conversion_factor: float,
+        transform: str,
+        input_hash: str,
+        scale_id: Optional[int] = None,
+    ) -> None:
+        """
+        Guarda (o reemplaza) el registro de una salida recién generada.
+        """
+        source = Path(input_path).resolve()
+        target = Path(output_path).resolve()
+        stat = source.stat()
+        upsert_sql = """
+        INSERT OR REPLACE INTO build_cache (
+            output_path, input_path, input_hash, input_size, input_mtime_ns,
+            scale_id, conversion_factor, transform, output_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """
+        try:
+            with self.conn:
+                self.conn.execute(
+                    upsert_sql,
+                    (
+                        str(target), str(source), input_hash, stat.st_size, stat.st_mtime_ns,
+                        scale_id, conversion_factor, transform, file_sha256(target),
+                    ),
+                )
+        except Error as e:
+            logger.exception("Error al registrar '%s' en la caché: %s", target, e)
+            raise
+
+    def forget(self, output_path: Union[str, Path]) -> None:
+        """
+        Elimina el registro de una salida (por ejemplo, una pieza que ya no se genera).
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM build_cache WHERE output_path = ?;", (str(Path(output_path).resolve()),))
+
+    def clear(self) -> None:
+        """
+        Elimina todos los registros de la caché.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM build_cache;")
+            logger.info("Caché de construcción vaciada.")
+
+    def close(self) -> None:
+        """
+        Cierra la conexión con la base de datos.
+        """
+        try:
+            self.conn.close()
+        except Error as e:
+            logger.exception("Error al cerrar la conexión a la base de datos: %s", e)
+            raise
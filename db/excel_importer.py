@@ -3,25 +3,319 @@
 Módulo: excel_importer.py
 
 Este módulo proporciona funciones para importar registros de escalas estándar
-desde archivos Excel ubicados en la carpeta "Excel_files" y cargarlos en la 
+desde archivos Excel ubicados en la carpeta "Excel_files" y cargarlos en la
 base de datos mediante el módulo scale_db.
+
+Los catálogos grandes se importan en streaming, sin cargar el libro completo:
+  - Los .xlsx se leen con openpyxl en modo de solo lectura (read_only), que
+    recorre las filas de cada hoja sin construir el modelo del libro.
+  - Los .csv se leen con el módulo csv de la biblioteca estándar (ruta rápida,
+    sin dependencias).
+  - Las columnas requeridas se validan una sola vez, en la fila de
+    encabezado; después cada fila solo se convierte a una tupla.
+  - Las filas se envían a la base de datos en lotes (ScaleDB.upsert_scales),
+    una transacción por lote, mientras se sigue leyendo el archivo.
+
+Con all_sheets=True se importan todas las hojas del libro en una sola pasada;
+las hojas vacías o sin las columnas requeridas se omiten y se informan.
+
+Las hojas sin esas columnas que son una tabla de escalas (una columna con
+valores "1:N" y otras columnas descriptivas, como "MEDIDA EN MM." en
+'ESCALAS FIGURAS HUMANAS.xlsx') se adaptan: cada fila "1:N" se importa con
+object_name = nombre de la hoja, original_scale = "1:1", desired_scale =
+"1:N", conversion_factor = 1/N y, como notas, el resto de celdas de la fila
+con su encabezado.
 """
 
+import csv
+import itertools
 import os
+import re
+import time
 from pathlib import Path
-from typing import Optional
-
-import pandas as pd
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 # Importamos la clase ScaleDB que maneja la base de datos.
 # Como scale_db.py se encuentra en el mismo directorio que excel_importer.py,
 # usamos una importación directa.
 from scale_db import ScaleDB
 
+# Columnas obligatorias y opcionales del encabezado.
+REQUIRED_COLUMNS = ("object_name", "original_scale", "desired_scale", "conversion_factor")
+OPTIONAL_COLUMNS = ("notes",)
+
+# Filas que se envían a la base de datos en cada transacción.
+DEFAULT_BATCH_SIZE = 1000
+
+# Filas iniciales en las que se busca el encabezado (títulos, filas en blanco...).
+HEADER_SCAN_ROWS = 20
+
+# Extensiones que se leen con el módulo csv.
+CSV_SUFFIXES = (".csv", ".txt")
+
+# Celdas de escala en las tablas sin encabezado estándar ("1:72", "1/72").
+SCALE_PATTERN = re.compile(r"^1\s*[:/]\s*(\d+(?:[.,]\d+)?)$")
+
+# Celdas "1:N" que debe tener una columna para considerarla una tabla de escalas.
+SCALE_TABLE_MIN_ROWS = 2
+
+
+def _cell_text(value: Any) -> Optional[str]:
+    """Convierte una celda a texto sin espacios; None si está vacía."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def find_header(
+    rows: Iterator[Sequence[Any]],
+    scan_rows: int = HEADER_SCAN_ROWS,
+) -> Tuple[Optional[Dict[str, int]], List[str], int]:
+    """
+    Busca la fila de encabezado y valida las columnas requeridas.
+
+    Consume filas de 'rows' hasta encontrar el encabezado; el iterador queda
+    posicionado en la primera fila de datos.
+
+    Args:
+        rows (Iterator[Sequence[Any]]): Filas de la hoja.
+        scan_rows (int): Número máximo de filas que se examinan.
+
+    Returns:
+        Tuple[Optional[Dict[str, int]], List[str], int]: (posición de cada
+            columna conocida, columnas requeridas que faltan, número de la fila
+            de encabezado desde 1). Si no se encuentra ningún encabezado
+            completo, la posición es None y se informan las columnas que faltan
+            en la fila que más se le parecía.
+    """
+    best_missing = list(REQUIRED_COLUMNS)
+    for number, row in zip(range(1, scan_rows + 1), rows):
+        names = [(_cell_text(value) or "").lower() for value in row]
+        positions = {name: index for index, name in enumerate(names) if name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+        missing = [column for column in REQUIRED_COLUMNS if column not in positions]
+        if not missing:
+            return positions, [], number
+        if len(missing) < len(best_missing):
+            best_missing = missing
+    return None, best_missing, 0
+
+
+def iter_records(
+    rows: Iterator[Sequence[Any]],
+    positions: Dict[str, int],
+    source: str = "",
+    first_row: int = 2,
+) -> Iterator[Tuple[str, str, str, float, Optional[str]]]:
+    """
+    Convierte las filas de datos en tuplas listas para ScaleDB.upsert_scales.
+
+    Las filas completamente vacías se ignoran.
+
+    Args:
+        rows (Iterator[Sequence[Any]]): Filas de datos (tras el encabezado).
+        positions (Dict[str, int]): Resultado de find_header().
+        source (str): Nombre de la hoja o del archivo, para los mensajes de error.
+        first_row (int): Número de la primera fila de datos, para los mensajes de error.
+
+    Yields:
+        Tuple[str, str, str, float, Optional[str]]: (object_name, original_scale,
+            desired_scale, conversion_factor, notes).
+
+    Raises:
+        ValueError: Si una fila no vacía carece de un valor requerido o el
+                    factor no es numérico.
+    """
+    indices = [positions[column] for column in REQUIRED_COLUMNS]
+    notes_index = positions.get("notes")
+    width = max(indices + ([notes_index] if notes_index is not None else [])) + 1
+    for number, row in enumerate(rows, start=first_row):
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        object_name, original_scale, desired_scale, factor = (row[index] for index in indices)
+        notes = _cell_text(row[notes_index]) if notes_index is not None else None
+        values = (_cell_text(object_name), _cell_text(original_scale), _cell_text(desired_scale), _cell_text(factor))
+        if not any(values) and notes is None:
+            continue
+        if not all(values):
+            missing = [column for column, value in zip(REQUIRED_COLUMNS, values) if not value]
+            raise ValueError(f"{source}, fila {number}: faltan valores en {', '.join(missing)}.")
+        try:
+            # En CSV exportados con configuración regional española el decimal es ','.
+            conversion_factor = float(factor) if not isinstance(factor, str) else float(values[3].replace(",", "."))
+        except ValueError:
+            raise ValueError(f"{source}, fila {number}: factor de conversión no numérico ({factor!r}).")
+        yield values[0], values[1], values[2], conversion_factor, notes
+
+
+def _scale_denominator(value: Any) -> Optional[float]:
+    """Denominador N de una celda "1:N" (o "1/N"); None si la celda no es una escala."""
+    match = SCALE_PATTERN.match(_cell_text(value) or "")
+    if match is None:
+        return None
+    denominator = float(match.group(1).replace(",", "."))
+    return denominator if denominator > 0 else None
+
+
+def find_scale_table(head: Sequence[Sequence[Any]]) -> Optional[Tuple[int, int]]:
+    """
+    Busca, en las primeras filas de una hoja, una columna de escalas "1:N".
+
+    Args:
+        head (Sequence[Sequence[Any]]): Primeras filas de la hoja.
+
+    Returns:
+        Optional[Tuple[int, int]]: (columna de las escalas, índice de la primera
+            fila con una escala), o None si ninguna columna tiene al menos
+            SCALE_TABLE_MIN_ROWS escalas.
+    """
+    found: Dict[int, List[int]] = {}
+    for row_index, row in enumerate(head):
+        for column, value in enumerate(row):
+            if _scale_denominator(value) is not None:
+                found.setdefault(column, []).append(row_index)
+    for column, row_indices in sorted(found.items(), key=lambda item: item[1][0]):
+        if len(row_indices) >= SCALE_TABLE_MIN_ROWS:
+            return column, row_indices[0]
+    return None
+
+
+def iter_scale_table_records(
+    rows: Iterator[Sequence[Any]],
+    column: int,
+    headers: Sequence[Any],
+    object_name: str,
+) -> Iterator[Tuple[str, str, str, float, Optional[str]]]:
+    """
+    Convierte una tabla de escalas "1:N" en tuplas para ScaleDB.upsert_scales.
+
+    Las filas sin una escala en 'column' (vacías, notas al pie) se ignoran.
+
+    Args:
+        rows (Iterator[Sequence[Any]]): Filas de datos, desde la primera escala.
+        column (int): Columna de las escalas (find_scale_table).
+        headers (Sequence[Any]): Fila anterior a la primera escala, con los
+                                 encabezados del resto de columnas.
+        object_name (str): Nombre que se da a todos los registros (el de la hoja).
+
+    Yields:
+        Tuple[str, str, str, float, Optional[str]]: (object_name, "1:1", "1:N", 1/N, notas).
+    """
+    for row in rows:
+        denominator = _scale_denominator(row[column]) if len(row) > column else None
+        if denominator is None:
+            continue
+        notes = []
+        for index, value in enumerate(row):
+            text = _cell_text(value)
+            if index == column or text is None:
+                continue
+            header = _cell_text(headers[index]) if index < len(headers) else None
+            notes.append(f"{header}: {text}" if header else text)
+        yield object_name, "1:1", f"1:{denominator:g}", 1.0 / denominator, "; ".join(notes) or None
+
 
-def import_scales_from_excel(file_path: str) -> None:
+def iter_csv_sheets(file_path: Path, delimiter: Optional[str] = None) -> Iterator[Tuple[str, Iterator[Sequence[Any]]]]:
     """
-    Importa registros de escalas desde un archivo Excel a la base de datos.
+    Ruta rápida para CSV: una única "hoja" leída con el módulo csv.
+
+    Args:
+        file_path (Path): Archivo CSV.
+        delimiter (Optional[str]): Separador; si es None se detecta (',', ';' o tabulador).
+
+    Yields:
+        Tuple[str, Iterator[Sequence[Any]]]: (nombre del archivo, filas).
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as handle:
+        if delimiter is None:
+            sample = handle.read(64 * 1024)
+            handle.seek(0)
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+            except csv.Error:
+                delimiter = ","
+        yield file_path.name, csv.reader(handle, delimiter=delimiter)
+
+
+def iter_workbook_sheets(
+    file_path: Path,
+    all_sheets: bool = False,
+    sheets: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[str, Iterator[Sequence[Any]]]]:
+    """
+    Recorre las hojas de un libro .xlsx en modo de solo lectura.
+
+    Args:
+        file_path (Path): Libro de Excel.
+        all_sheets (bool): Recorrer todas las hojas (por defecto, solo la primera).
+        sheets (Optional[Sequence[str]]): Hojas concretas, por nombre.
+
+    Yields:
+        Tuple[str, Iterator[Sequence[Any]]]: (nombre de la hoja, filas como tuplas de valores).
+
+    Raises:
+        ValueError: Si alguna hoja pedida no existe.
+    """
+    # openpyxl solo se carga al importar (el resto de la aplicación no lo necesita).
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if sheets:
+            unknown = [name for name in sheets if name not in workbook.sheetnames]
+            if unknown:
+                raise ValueError(f"El libro no contiene las hojas: {', '.join(unknown)}")
+            names = list(sheets)
+        else:
+            names = workbook.sheetnames if all_sheets else workbook.sheetnames[:1]
+        for name in names:
+            yield name, workbook[name].iter_rows(values_only=True)
+    finally:
+        # En modo de solo lectura el archivo queda abierto hasta cerrar el libro.
+        workbook.close()
+
+
+def iter_legacy_sheets(
+    file_path: Path,
+    all_sheets: bool = False,
+    sheets: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[str, Iterator[Sequence[Any]]]]:
+    """
+    Libros .xls antiguos (que openpyxl no lee): se cargan con pandas, hoja a hoja.
+    """
+    import pandas as pd
+
+    selection = list(sheets) if sheets else (None if all_sheets else 0)
+    frames = pd.read_excel(file_path, sheet_name=selection, header=None, dtype=object)
+    if not isinstance(frames, dict):
+        frames = {file_path.name: frames}
+    for name, frame in frames.items():
+        yield str(name), (tuple(None if pd.isna(value) else value for value in row)
+                          for row in frame.itertuples(index=False, name=None))
+
+
+def _batches(records: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    """Agrupa 'records' en listas de como máximo 'size' elementos."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_scales_from_excel(
+    file_path: str,
+    all_sheets: bool = False,
+    sheets: Optional[Sequence[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    db: Optional[ScaleDB] = None,
+    delimiter: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Importa registros de escalas desde un archivo Excel (o CSV) a la base de datos.
 
     El archivo debe contener las siguientes columnas:
       - object_name: nombre del objeto o modelo.
@@ -30,55 +324,108 @@ def import_scales_from_excel(file_path: str) -> None:
       - conversion_factor: factor de conversión numérico (ejemplo, 0.0278 para 1:36).
       - notes: notas adicionales (opcional).
 
+    Las hojas sin esas columnas que contienen una tabla de escalas "1:N" se
+    importan con find_scale_table / iter_scale_table_records, y las hojas
+    vacías se omiten.
+
+    Las filas se leen en streaming y se insertan (o actualizan, si ya se
+    importaron antes) en lotes de 'batch_size'. Los lotes ya escritos se
+    conservan aunque una fila posterior sea inválida.
+
     Args:
-        file_path (str): Ruta del archivo Excel a importar.
-    
+        file_path (str): Ruta del archivo (.xlsx, .xlsm, .xls o .csv).
+        all_sheets (bool): Importar todas las hojas del libro en una sola pasada.
+        sheets (Optional[Sequence[str]]): Importar solo estas hojas.
+        batch_size (int): Filas por transacción.
+        db (Optional[ScaleDB]): Conexión a reutilizar; si es None se abre y se cierra una.
+        delimiter (Optional[str]): Separador del CSV (se detecta si es None).
+
+    Returns:
+        Dict[str, Any]: {
+            'rows': filas importadas, 'inserted': registros nuevos,
+            'updated': registros actualizados, 'sheets': hojas importadas,
+            'skipped': {hoja: motivo} de las hojas omitidas,
+            'seconds': duración, 'rows_per_second': velocidad
+        }
+
     Raises:
         FileNotFoundError: Si el archivo Excel no se encuentra.
-        ValueError: Si el Excel no contiene las columnas requeridas.
+        ValueError: Si el Excel no contiene las columnas requeridas o una fila es inválida.
         Exception: Para errores en la lectura del archivo.
     """
     excel_file = Path(file_path)
     if not excel_file.exists():
         raise FileNotFoundError(f"El archivo Excel '{file_path}' no existe.")
 
-    try:
-        # Leer el archivo Excel. Se recomienda que la codificación y el motor sean adecuados.
-        df = pd.read_excel(file_path)
-    except Exception as e:
-        raise Exception(f"Error al leer el archivo Excel: {e}")
-    
-    # Verificar que existen las columnas requeridas
-    required_columns = ["object_name", "original_scale", "desired_scale", "conversion_factor"]
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        raise ValueError(f"Las siguientes columnas requeridas faltan en el Excel: {', '.join(missing_columns)}")
-
-    # Crear una instancia de la base de datos
-    db = ScaleDB()
+    suffix = excel_file.suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        workbook = iter_csv_sheets(excel_file, delimiter=delimiter)
+    elif suffix == ".xls":
+        workbook = iter_legacy_sheets(excel_file, all_sheets=all_sheets, sheets=sheets)
+    else:
+        workbook = iter_workbook_sheets(excel_file, all_sheets=all_sheets, sheets=sheets)
+
+    report: Dict[str, Any] = {"rows": 0, "inserted": 0, "updated": 0, "sheets": [], "skipped": {}}
+    own_db = db is None
+    if own_db:
+        db = ScaleDB()
     print("Iniciando la importación de registros desde Excel...")
+    start = time.perf_counter()
     try:
-        # Iteramos sobre cada fila del DataFrame y agregamos el registro a la base de datos.
-        for index, row in df.iterrows():
-            object_name: str = row["object_name"]
-            original_scale: str = row["original_scale"]
-            desired_scale: str = row["desired_scale"]
-            conversion_factor: float = row["conversion_factor"]
-            # La columna 'notes' es opcional
-            notes: Optional[str] = row.get("notes") if "notes" in row.index else None
-
-            # Insertar el registro en la base de datos utilizando el método add_scale
-            record_id = db.add_scale(
-                object_name=object_name,
-                original_scale=original_scale,
-                desired_scale=desired_scale,
-                conversion_factor=conversion_factor,
-                notes=notes
-            )
-            print(f"Registro importado con ID: {record_id}")
+        for sheet_name, rows in workbook:
+            rows = iter(rows)
+            # Las primeras filas se guardan para probar otra disposición si no hay encabezado.
+            head = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+            positions, missing, header_row = find_header(iter(head))
+            if positions is not None:
+                records = iter_records(
+                    itertools.chain(head[header_row:], rows), positions,
+                    source=sheet_name, first_row=header_row + 1,
+                )
+            elif not any(_cell_text(value) for row in head for value in row):
+                report["skipped"][sheet_name] = "hoja vacía"
+                continue
+            else:
+                table = find_scale_table(head)
+                if table is None:
+                    # Al importar varias hojas, las que no son tablas de escalas se omiten.
+                    if all_sheets:
+                        report["skipped"][sheet_name] = "faltan columnas: " + ", ".join(missing)
+                        continue
+                    raise ValueError(f"Las siguientes columnas requeridas faltan en el Excel: {', '.join(missing)}")
+                column, first = table
+                headers = head[first - 1] if first > 0 else ()
+                records = iter_scale_table_records(itertools.chain(head[first:], rows), column, headers, sheet_name)
+            sheet_rows = 0
+            for batch in _batches(records, max(1, batch_size)):
+                counts = db.upsert_scales(batch)
+                report["inserted"] += counts["inserted"]
+                report["updated"] += counts["updated"]
+                sheet_rows += len(batch)
+            report["rows"] += sheet_rows
+            report["sheets"].append(sheet_name)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise Exception(f"Error al leer el archivo Excel: {e}") from e
     finally:
-        db.close()
-    print("Importación completada exitosamente.")
+        # Cierra el libro aunque la importación se interrumpa a mitad de una hoja.
+        workbook.close()
+        if own_db:
+            db.close()
+
+    if not report["sheets"]:
+        raise ValueError(
+            "Ninguna hoja contiene las columnas requeridas: "
+            + "; ".join(f"{name} ({reason})" for name, reason in report["skipped"].items())
+        )
+    report["seconds"] = time.perf_counter() - start
+    report["rows_per_second"] = report["rows"] / report["seconds"] if report["seconds"] > 0 else 0.0
+    print(
+        f"Importación completada: {report['rows']} filas de {len(report['sheets'])} hoja(s) "
+        f"en {report['seconds']:.2f} s ({report['rows_per_second']:.0f} filas/s)."
+    )
+    return report
 
 
 if __name__ == "__main__":
@@ -86,6 +433,6 @@ if __name__ == "__main__":
     # Se asume que en la carpeta 'Excel_files' existe un archivo llamado 'medidas.xlsx'
     excel_path = os.path.join("Excel_files", "medidas.xlsx")
     try:
-        import_scales_from_excel(excel_path)
+        import_scales_from_excel(excel_path, all_sheets=True)
     except Exception as err:
-        print("Error durante la importación de escalas desde Excel:", err)
\ No newline at end of file
+        print("Error durante la importación de escalas desde Excel:", err)
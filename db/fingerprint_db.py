@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Módulo: fingerprint_db.py
+
+Este módulo guarda las huellas geométricas (src/modules/stl_fingerprint.py)
+en la misma base de datos SQLite que las tablas 'scales' y 'build_cache'.
+Cada registro de la tabla 'fingerprints' contiene:
+  - path: archivo del modelo (ruta absoluta).
+  - file_size / file_mtime_ns: permiten reutilizar la huella sin releer el
+    archivo si no ha cambiado.
+  - version: versión del cálculo (SIGNATURE_VERSION).
+  - triangles: número de facetas (indexado: las copias escaladas tienen las mismas).
+  - size: tamaño característico (raíz del área) para obtener la escala relativa.
+  - bbox / signature: caja envolvente y firma como float64 binario.
+
+La búsqueda del vecino más cercano no recorre la tabla con SQL: la primera
+consulta carga todas las firmas en una matriz NumPy y cada consulta es un
+cálculo vectorizado de distancias. Las huellas guardadas después se añaden a
+la matriz sin releer la tabla.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from sqlite3 import Connection, Error
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from logger_config import setup_logger
+from settings import DB_PATH
+from stl_fingerprint import DUPLICATE_DISTANCE, SIGNATURE_SIZE, SIGNATURE_VERSION
+
+logger = setup_logger(name=__name__, level=logging.INFO, log_file="logs/scale_db.log")
+
+
+class FingerprintDB:
+    """
+    Clase para guardar y consultar las huellas geométricas de los modelos.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH) -> None:
+        self.db_path = db_path
+        # Matriz de firmas cargada en la primera consulta (None = por cargar).
+        self._index: Optional[Dict[str, Any]] = None
+        try:
+            self.conn: Connection = sqlite3.connect(str(self.db_path))
+            self._create_table()
+        except Error as e:
+            logger.exception("Error al conectar con la base de datos: %s", e)
+            raise
+
+    def _create_table(self) -> None:
+        """
+        Crea la tabla 'fingerprints' y su índice por número de facetas si no existen.
+        """
+        create_table_sql = """
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            path TEXT PRIMARY KEY,
+            file_size INTEGER NOT NULL,
+            file_mtime_ns INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            triangles INTEGER NOT NULL,
+            size REAL NOT NULL,
+            bbox BLOB NOT NULL,
+            signature BLOB NOT NULL,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        """
+        create_index_sql = "CREATE INDEX IF NOT EXISTS idx_fingerprints_triangles ON fingerprints (triangles);"
+        try:
+            with self.conn:
+                self.conn.execute(create_table_sql)
+                self.conn.execute(create_index_sql)
+                logger.debug("Tabla 'fingerprints' verificada/creada correctamente.")
+        except Error as e:
+            logger.exception("Error al crear la tabla 'fingerprints': %s", e)
+            raise
+
+    @staticmethod
+    def _row_to_fingerprint(row: tuple) -> Dict[str, Any]:
+        """Convierte (path, triangles, size, bbox, signature) en una huella."""
+        path, triangles, size, bbox, signature = row
+        box = np.frombuffer(bbox, dtype=np.float64)
+        return {
+            "path": Path(path),
+            "triangles": triangles,
+            "size": size,
+            "min": box[:3],
+            "max": box[3:],
+            "signature": np.frombuffer(signature, dtype=np.float64),
+        }
+
+    def lookup(self, path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """
+        Recupera la huella de un archivo si sigue al día (mismo tamaño, fecha y versión).
+
+        Returns:
+            Optional[Dict[str, Any]]: Huella como la de compute_fingerprint() más 'path', o None.
+        """
+        source = Path(path).resolve()
+        stat = source.stat()
+        row = self.conn.execute(
+            "SELECT path, triangles, size, bbox, signature FROM fingerprints "
+            "WHERE path = ? AND file_size = ? AND file_mtime_ns = ? AND version = ?;",
+            (str(source), stat.st_size, stat.st_mtime_ns, SIGNATURE_VERSION),
+        ).fetchone()
+        return None if row is None else self._row_to_fingerprint(row)
+
+    def store(self, path: Union[str, Path], fingerprint: Dict[str, Any]) -> None:
+        """
+        Guarda (o reemplaza) la huella de un archivo.
+        """
+        source = Path(path).resolve()
+        stat = source.stat()
+        bbox = np.concatenate((fingerprint["min"], fingerprint["max"])).astype(np.float64)
+        upsert_sql = """
+        INSERT OR REPLACE INTO fingerprints (
+            path, file_size, file_mtime_ns, version, triangles, size, bbox, signature
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+        """
+        try:
+            with self.conn:
+                self.conn.execute(
+                    upsert_sql,
+                    (
+                        str(source), stat.st_size, stat.st_mtime_ns, SIGNATURE_VERSION,
+                        fingerprint["triangles"], fingerprint["size"], bbox.tobytes(),
+                        np.asarray(fingerprint["signature"], dtype=np.float64).tobytes(),
+                    ),
+                )
+        except Error as e:
+            logger.exception("Error al guardar la huella de '%s': %s", source, e)
+            raise
+        if self._index is not None:
+            self._update_index(source, fingerprint)
+
+    def _update_index(self, source: Path, fingerprint: Dict[str, Any]) -> None:
+        """Añade o reemplaza una huella en la matriz ya cargada (sin releer la tabla)."""
+        index = self._index
+        item = dict(fingerprint, path=source, signature=np.asarray(fingerprint["signature"], dtype=np.float64))
+        key = str(source)
+        if key in index["positions"]:
+            position = index["positions"][key]
+            index["fingerprints"][position] = item
+            index["triangles"][position] = item["triangles"]
+            index["signatures"][position] = item["signature"]
+            return
+        index["positions"][key] = len(index["paths"])
+        index["paths"].append(key)
+        index["fingerprints"].append(item)
+        index["triangles"] = np.append(index["triangles"], item["triangles"])
+        index["signatures"] = np.vstack((index["signatures"], item["signature"]))
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Carga todas las firmas vigentes en una matriz (una sola consulta)."""
+        if self._index is None:
+            rows = self.conn.execute(
+                "SELECT path, triangles, size, bbox, signature FROM fingerprints WHERE version = ?;",
+                (SIGNATURE_VERSION,),
+            ).fetchall()
+            fingerprints = [self._row_to_fingerprint(row) for row in rows]
+            self._index = {
+                "fingerprints": fingerprints,
+                "paths": [str(item["path"]) for item in fingerprints],
+                "positions": {str(item["path"]): i for i, item in enumerate(fingerprints)},
+                "triangles": np.array([item["triangles"] for item in fingerprints], dtype=np.int64),
+                "signatures": (
+                    np.stack([item["signature"] for item in fingerprints])
+                    if fingerprints else np.zeros((0, SIGNATURE_SIZE), dtype=np.float64)
+                ),
+            }
+            logger.debug("Índice de huellas cargado: %d modelos.", len(fingerprints))
+        return self._index
+
+    def nearest(
+        self,
+        signature: np.ndarray,
+        k: int = 1,
+        max_distance: Optional[float] = DUPLICATE_DISTANCE,
+        exclude: Optional[Union[str, Path]] = None,
+        triangles: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca los modelos cuya firma está más cerca de 'signature'.
+
+        Args:
+            signature (np.ndarray): Firma de compute_fingerprint().
+            k (int): Número máximo de resultados.
+            max_distance (Optional[float]): Descarta los más lejanos (None = sin límite).
+            exclude (Optional[Union[str, Path]]): Archivo que no debe devolverse (el propio modelo).
+            triangles (Optional[int]): Exige el mismo número de facetas (copias exactas salvo la escala).
+
+        Returns:
+            List[Dict[str, Any]]: Huellas con 'distance', de la más cercana a la más lejana.
+        """
+        index = self._load_index()
+        if not index["paths"]:
+            return []
+        distances = np.linalg.norm(index["signatures"] - np.asarray(signature, dtype=np.float64), axis=1)
+        if triangles is not None:
+            distances[index["triangles"] != triangles] = np.inf
+        if exclude is not None:
+            position = index["positions"].get(str(Path(exclude).resolve()))
+            if position is not None:
+                distances[position] = np.inf
+        limit = np.inf if max_distance is None else max_distance
+        k = min(k, len(distances))
+        candidates = np.argpartition(distances, k - 1)[:k]
+        candidates = candidates[np.argsort(distances[candidates])]
+        return [
+            dict(index["fingerprints"][i], distance=float(distances[i]))
+            for i in candidates if distances[i] <= limit
+        ]
+
+    def forget(self, path: Union[str, Path]) -> None:
+        """
+        Elimina la huella de un archivo.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM fingerprints WHERE path = ?;", (str(Path(path).resolve()),))
+        self._index = None
+
+    def clear(self) -> None:
+        """
+        Elimina todas las huellas.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM fingerprints;")
+            logger.info("Tabla de huellas vaciada.")
+        self._index = None
+
+    def close(self) -> None:
+        """
+        Cierra la conexión con la base de datos.
+        """
+        try:
+            self.conn.close()
+        except Error as e:
+            logger.exception("Error al cerrar la conexión a la base de datos: %s", e)
+            raise
@@ -16,7 +16,7 @@ import sqlite3
 import logging
 from sqlite3 import Connection, Cursor, Error
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 # Importar la configuración de logging desde logger_config.py
 from logger_config import setup_logger
@@ -24,8 +24,9 @@ from logger_config import setup_logger
 # Importar la configuración para obtener la ruta de la base de datos
 from settings import DB_PATH
 
-# Obtener un logger para este módulo.
-logger = setup_logger(name=__name__, level=logging.DEBUG, log_file="logs/scale_db.log")
+# Obtener un logger para este módulo. Los mensajes por registro son DEBUG: para
+# verlos, LOG_LEVELS="scale_db=DEBUG" (ver logger_config.py).
+logger = setup_logger(name=__name__, level=logging.INFO, log_file="logs/scale_db.log")
 
 class ScaleDB:
     """
@@ -59,10 +60,16 @@ class ScaleDB:
             notes TEXT
         );
         """
+        # Índice para que upsert_scale / upsert_scales localicen el registro sin recorrer la tabla.
+        create_index_sql = """
+        CREATE INDEX IF NOT EXISTS idx_scales_key
+        ON scales (object_name, original_scale, desired_scale);
+        """
         try:
             with self.conn:
                 cur: Cursor = self.conn.cursor()
                 cur.execute(create_table_sql)
+                cur.execute(create_index_sql)
                 logger.info("Tabla 'scales' verificada/creada correctamente.")
         except Error as e:
             logger.exception("Error al crear la tabla 'scales': %s", e)
@@ -101,12 +108,107 @@ class ScaleDB:
                     (object_name, original_scale, desired_scale, conversion_factor, notes),
                 )
                 new_id = cur.lastrowid
-                logger.info("Registro insertado con ID: %d", new_id)
+                logger.debug("Registro insertado con ID: %d", new_id)
                 return new_id
         except Error as e:
             logger.exception("Error al insertar la escala: %s", e)
             raise Exception(f"Error al insertar la escala: {e}")
 
+    def upsert_scale(
+        self,
+        object_name: str,
+        original_scale: str,
+        desired_scale: str,
+        conversion_factor: float,
+        notes: Optional[str] = None,
+    ) -> int:
+        """
+        Inserta un registro o, si ya existe uno con el mismo objeto, escala
+        original y escala deseada, actualiza su factor y sus notas.
+
+        Así, reimportar un Excel corregido conserva los IDs existentes y las
+        herramientas que dependen de ellos detectan el cambio de factor.
+
+        Args:
+            object_name (str): Nombre del objeto.
+            original_scale (str): Escala original, por ejemplo "1:1".
+            desired_scale (str): Escala deseada, por ejemplo "1:36".
+            conversion_factor (float): Factor de conversión.
+            notes (Optional[str]): Notas adicionales.
+
+        Returns:
+            int: El ID del registro insertado o actualizado.
+        """
+        query_sql = """
+        SELECT id FROM scales
+        WHERE object_name = ? AND original_scale = ? AND desired_scale = ?
+        ORDER BY id LIMIT 1;
+        """
+        try:
+            cur: Cursor = self.conn.cursor()
+            cur.execute(query_sql, (object_name, original_scale, desired_scale))
+            row = cur.fetchone()
+        except Error as e:
+            logger.exception("Error al buscar la escala: %s", e)
+            raise
+        if row is None:
+            return self.add_scale(object_name, original_scale, desired_scale, conversion_factor, notes)
+        self.update_scale(row[0], conversion_factor=conversion_factor, notes=notes)
+        return row[0]
+
+    def upsert_scales(self, records: Iterable[Sequence[Any]]) -> Dict[str, int]:
+        """
+        Versión por lotes de upsert_scale: inserta o actualiza muchos registros
+        en una sola transacción.
+
+        Los registros nuevos se insertan con executemany y los existentes se
+        actualizan con otro executemany; no se registra cada fila en el log.
+        Si una clave aparece varias veces en el lote, prevalece la última
+        (igual que al llamar a upsert_scale fila a fila).
+
+        Args:
+            records (Iterable[Sequence[Any]]): Tuplas (object_name, original_scale,
+                desired_scale, conversion_factor, notes).
+
+        Returns:
+            Dict[str, int]: {'inserted': registros nuevos, 'updated': registros actualizados}.
+        """
+        latest: Dict[Tuple[str, str, str], Tuple[float, Optional[str]]] = {}
+        for object_name, original_scale, desired_scale, conversion_factor, notes in records:
+            latest[(object_name, original_scale, desired_scale)] = (conversion_factor, notes)
+        if not latest:
+            return {"inserted": 0, "updated": 0}
+
+        query_sql = """
+        SELECT id FROM scales
+        WHERE object_name = ? AND original_scale = ? AND desired_scale = ?
+        ORDER BY id LIMIT 1;
+        """
+        insert_sql = """
+        INSERT INTO scales (object_name, original_scale, desired_scale, conversion_factor, notes)
+        VALUES (?, ?, ?, ?, ?);
+        """
+        # Como en update_scale, unas notas vacías no borran las existentes.
+        update_sql = "UPDATE scales SET conversion_factor = ?, notes = COALESCE(?, notes) WHERE id = ?;"
+        try:
+            with self.conn:
+                cur: Cursor = self.conn.cursor()
+                inserts = []
+                updates = []
+                for key, (conversion_factor, notes) in latest.items():
+                    row = cur.execute(query_sql, key).fetchone()
+                    if row is None:
+                        inserts.append((*key, conversion_factor, notes))
+                    else:
+                        updates.append((conversion_factor, notes, row[0]))
+                cur.executemany(insert_sql, inserts)
+                cur.executemany(update_sql, updates)
+        except Error as e:
+            logger.exception("Error al importar el lote de escalas: %s", e)
+            raise
+        logger.debug("Lote de escalas: %d insertadas, %d actualizadas.", len(inserts), len(updates))
+        return {"inserted": len(inserts), "updated": len(updates)}
+
     def get_scale_by_id(self, scale_id: int) -> Optional[Dict[str, Any]]:
         """
         Recupera un registro de escala por su ID.
@@ -124,7 +226,7 @@ class ScaleDB:
             cur.execute(query_sql, (scale_id,))
             row = cur.fetchone()
             if row:
-                logger.info("Registro con ID %d recuperado.", scale_id)
+                logger.debug("Registro con ID %d recuperado.", scale_id)
                 return {
                     "id": row[0],
                     "object_name": row[1],
@@ -206,7 +308,7 @@ class ScaleDB:
             values.append(notes)
 
         if not updates:
-            logger.info("No se realizaron cambios para el registro con ID %d.", scale_id)
+            logger.debug("No se realizaron cambios para el registro con ID %d.", scale_id)
             return  # No hay cambios a actualizar
 
         update_sql = f"UPDATE scales SET {', '.join(updates)} WHERE id = ?;"
@@ -215,7 +317,7 @@ class ScaleDB:
             with self.conn:
                 cur: Cursor = self.conn.cursor()
                 cur.execute(update_sql, tuple(values))
-                logger.info("Registro con ID %d actualizado.", scale_id)
+                logger.debug("Registro con ID %d actualizado.", scale_id)
         except Error as e:
             logger.exception("Error al actualizar el registro con ID %d: %s", scale_id, e)
             raise
@@ -1,8 +1,24 @@
+import sys
+from pathlib import Path
+
 import wx
 from stl import mesh
-import pyvista as pv
 import numpy as np
-import pyperclip  # Necesario para copiar al portapapeles de manera sencilla (asegúrate de instalarlo)
+# PyVista (VTK) y pyperclip se importan al usarse por primera vez: así la
+# ventana aparece sin esperar a que se carguen.
+
+# Carpetas de los módulos de negocio y la configuración (igual que .vscode/launch.json).
+_raiz = Path(__file__).resolve().parent
+for _carpeta in (_raiz / "src" / "modules", _raiz / "config"):
+    if str(_carpeta) not in sys.path:
+        sys.path.append(str(_carpeta))
+
+from settings import CACHE_DIR
+from spatial_index import SpatialIndex, cached_index
+from stl_viewer import ModelViewer
+
+# Intervalo (ms) con el que se atienden los eventos del visor 3D.
+INTERVALO_VISOR_MS = 30
 
 
 class STLApp(wx.App):
@@ -72,8 +88,13 @@ class STLApp(wx.App):
         # Checkbox para activar/desactivar la transparencia
         self.transparent_checkbox = wx.CheckBox(self.panel, label="Mostrar Transparencias", pos=(20, 260))
         self.transparent_checkbox.Bind(wx.EVT_CHECKBOX, self.toggle_transparency)
-        
-        
+
+        # Visor 3D persistente: se crea en el primer "Visualizar" y se reutiliza.
+        self.visor = None
+        self.visor_cargado = False
+        self.timer_visor = wx.Timer(self.frame)
+        self.frame.Bind(wx.EVT_TIMER, self.atender_visor, self.timer_visor)
+
         self.frame.Show()
         return True
         
@@ -97,6 +118,8 @@ class STLApp(wx.App):
         
         # Copiar el correo al portapapeles
         try:
+            import pyperclip  # Necesario para copiar al portapapeles de manera sencilla (asegúrate de instalarlo)
+
             pyperclip.copy(correo)
             aviso = "El correo del desarrollador ha sido copiado al portapapeles."
         except Exception as e:
@@ -112,6 +135,8 @@ class STLApp(wx.App):
         Activa o desactiva la transparencia para el modelo.
         """
         self.transparent = self.transparent_checkbox.IsChecked()
+        if self.visor is not None:
+            self.visor.set_opacity(0.5 if self.transparent else 1.0)
         
     def seleccionar_archivo(self, event):
         """Permite seleccionar un archivo STL."""
@@ -119,6 +144,10 @@ class STLApp(wx.App):
             if dlg.ShowModal() == wx.ID_OK:
                 self.file_path = dlg.GetPath()
                 self.modelo = mesh.Mesh.from_file(self.file_path)
+                self.factor_total = 1.0
+                self.indice = None
+                # El visor cargará el nuevo modelo la próxima vez que se muestre.
+                self.visor_cargado = False
                 self.file_path_label.SetLabel(f"Ruta: {self.file_path}")
             else:
                 wx.MessageBox("No se seleccionó ningún archivo.", "Información", wx.OK | wx.ICON_INFORMATION)
@@ -134,10 +163,45 @@ class STLApp(wx.App):
             if factor_escala <= 0:
                 raise ValueError("El factor debe ser mayor a 0.")
             self.modelo.points *= factor_escala
+            self.factor_total *= factor_escala
+            # El índice espacial se escala en el sitio, sin reconstruirlo.
+            if self.indice is not None:
+                self.indice.scale(factor_escala)
+            # El visor solo actualiza la matriz del modelo, sin reconstruir la malla.
+            if self.visor is not None and self.visor_cargado:
+                self.visor.scale_by(factor_escala)
             wx.MessageBox(f"Reescalado exitoso por un factor de {factor_escala}.", "Éxito", wx.OK | wx.ICON_INFORMATION)
         except ValueError:
             wx.MessageBox("Introduce un número válido para el factor de escala.", "Error", wx.OK | wx.ICON_ERROR)
 
+    def obtener_indice(self):
+        """
+        Retorna el índice espacial (BVH) del modelo cargado.
+
+        El índice del archivo original se guarda en la caché (clave: hash del
+        contenido) y se escala con el factor acumulado del modelo.
+        """
+        if self.indice is None:
+            try:
+                self.indice = cached_index(self.file_path, CACHE_DIR, vectors=self.modelo.vectors / self.factor_total)
+                if self.factor_total != 1.0:
+                    self.indice.scale(self.factor_total)
+            except OSError:
+                # Sin acceso a la caché: se construye solo en memoria.
+                self.indice = SpatialIndex(self.modelo.vectors)
+        return self.indice
+
+    @staticmethod
+    def rayo_desde_pantalla(renderer, x, y):
+        """Convierte una posición de la ventana en un rayo (origen, dirección) del mundo."""
+        extremos = []
+        for profundidad in (0.0, 1.0):
+            renderer.SetDisplayPoint(x, y, profundidad)
+            renderer.DisplayToWorld()
+            punto = np.array(renderer.GetWorldPoint(), dtype=float)
+            extremos.append(punto[:3] / punto[3])
+        return extremos[0], extremos[1] - extremos[0]
+
     def calcular_volumen(self, modelo):
         """Calcula el volumen del modelo STL."""
         volumen = 0.0
@@ -173,77 +237,68 @@ class STLApp(wx.App):
         except Exception as e:
             wx.MessageBox(f"Error al guardar el archivo: {e}", "Error", wx.OK | wx.ICON_ERROR)
 
+    def crear_visor(self):
+        """Crea el visor 3D persistente y registra sus atajos de teclado."""
+        self.visor = ModelViewer(title="Reescalador STL Moderno")
+        self.visor.add_key_event("p", self.seleccionar_punto)
+
+    def atender_visor(self, event):
+        """Atiende los eventos de la ventana 3D mientras está abierta."""
+        if not self.visor.process_events():
+            self.timer_visor.Stop()
+
+    def seleccionar_punto(self):
+        """Selecciona la faceta bajo el cursor con el índice espacial."""
+        import pyvista as pv
+
+        plotter = self.visor.plotter
+        indice = self.obtener_indice()
+        x, y = plotter.iren.get_event_position()
+        origen, direccion = self.rayo_desde_pantalla(plotter.renderer, x, y)
+        impacto = indice.ray_cast(origen, direccion)
+        if not impacto["hit"][0]:
+            plotter.add_text("Sin intersección", position="lower_left", font_size=10, name="seleccion")
+            plotter.remove_actor("punto_seleccionado")
+            return
+        px, py, pz = impacto["point"][0]
+        radio_marcador = 0.01 * max(*self.visor.model_properties()["dimensions"], 1e-6)
+        plotter.add_mesh(
+            pv.Sphere(radius=radio_marcador, center=(px, py, pz)),
+            color="red",
+            name="punto_seleccionado",
+            reset_camera=False,
+        )
+        plotter.add_text(
+            f"🎯 Faceta {impacto['triangle'][0]}\n"
+            f"    • Punto: ({px:.2f}, {py:.2f}, {pz:.2f}) mm\n"
+            f"    • Distancia a la cámara: {impacto['distance'][0]:.2f} mm",
+            position="lower_left",
+            font_size=10,
+            name="seleccion",
+        )
+
     def visualizar_archivo(self, event):
-        """Representa el modelo STL en 3D con PyVista, mostrando información completa del objeto y reflejando cambios."""
+        """
+        Muestra el modelo STL en el visor 3D persistente, con su información completa.
+
+        La ventana y la malla se crean una sola vez; los cambios de escala y de
+        transparencia se aplican sobre el visor ya abierto.
+        """
         if not hasattr(self, 'modelo'):
             wx.MessageBox("Por favor, selecciona un archivo STL primero.", "Error", wx.OK | wx.ICON_ERROR)
             return
-    
+
         try:
-            volumen = self.calcular_volumen(self.modelo)
-            area_total = self.calcular_area_total(self.modelo)
-            num_triangles = self.modelo.vectors.shape[0]
-    
-            x_min, x_max = self.modelo.x.min(), self.modelo.x.max()
-            y_min, y_max = self.modelo.y.min(), self.modelo.y.max()
-            z_min, z_max = self.modelo.z.min(), self.modelo.z.max()
-    
-            ancho = x_max - x_min
-            alto = y_max - y_min
-            profundidad = z_max - z_min
-    
-            points = self.modelo.points.reshape(-1, 3)
-            faces = []
-            for i in range(len(self.modelo.vectors)):
-                faces.extend([3, i * 3, i * 3 + 1, i * 3 + 2])
-            faces = np.array(faces)
-    
-            num_vertices = len(points)
-    
-            mesh_data = pv.PolyData(points, faces)
-            plotter = pv.Plotter()
-            plotter.set_background("#333333")
-    
-            # Definir opacidad según el estado del checkbox
+            if self.visor is None:
+                self.crear_visor()
             is_transparent = hasattr(self, 'transparent') and self.transparent
-            opacity_value = 0.5 if is_transparent else 1.0
-    
-            plotter.add_mesh(mesh_data, color="green", opacity=opacity_value, show_edges=True)
-            plotter.add_axes()
-            plotter.add_floor("z")
-    
-            light = pv.Light(position=(5, 5, 5), focal_point=(0, 0, 0), intensity=1.5)
-            plotter.add_light(light)
-    
-            info_panel = (
-                f"📂 Información del modelo:\n"
-                f"  - Dimensiones (mm):\n"
-                f"    • Ancho: {ancho:.2f} mm\n"
-                f"    • Alto: {alto:.2f} mm\n"
-                f"    • Profundidad: {profundidad:.2f} mm\n\n"
-                f"  - Dimensiones (cm):\n"
-                f"    • Ancho: {ancho / 10:.2f} cm\n"
-                f"    • Alto: {alto / 10:.2f} cm\n"
-                f"    • Profundidad: {profundidad / 10:.2f} cm\n\n"
-                f"📏 Longitudes Totales:\n"
-                f"    • Eje X: {x_max - x_min:.2f} mm / {(x_max - x_min) / 10:.2f} cm\n"
-                f"    • Eje Y: {y_max - y_min:.2f} mm / {(y_max - y_min) / 10:.2f} cm\n"
-                f"    • Eje Z: {z_max - z_min:.2f} mm / {(z_max - z_min) / 10:.2f} cm\n\n"
-                f"📦 Volumen: {volumen:.2f} mm³ / {volumen / 1000:.2f} cm³\n"
-                f"🖋️ Área Total: {area_total:.2f} mm² / {area_total / 100:.2f} cm²\n"
-                f"🔺 Triángulos: {num_triangles}\n"
-                f"🔷 Vértices: {num_vertices}\n"
-            )
-            plotter.add_text(info_panel, position="upper_left", font_size=10)
-    
-            def reset_camera():
-                plotter.camera_position = "iso"
-    
-            plotter.add_key_event("r", reset_camera)
-            plotter.add_key_event("+", lambda: plotter.camera.zoom(1.2))
-            plotter.add_key_event("-", lambda: plotter.camera.zoom(0.8))
-            plotter.show()
-    
+            self.visor.set_opacity(0.5 if is_transparent else 1.0)
+            if not self.visor_cargado:
+                self.visor.set_model(self.modelo.vectors)
+                self.visor_cargado = True
+            self.visor.show()
+            if not self.timer_visor.IsRunning():
+                self.timer_visor.Start(INTERVALO_VISOR_MS)
         except Exception as e:
             wx.MessageBox(f"Error al visualizar el archivo: {e}", "Error", wx.OK | wx.ICON_ERROR)
 
@@ -0,0 +1,694 @@
+#!/usr/bin/env python3
+"""
+Archivo: cli.py
+Punto de entrada de línea de comandos para STL_Tools.
+
+Permite ejecutar las operaciones de los módulos de negocio sin abrir la
+interfaz gráfica. Cada operación es un subcomando:
+
+    python src/cli.py variants modelo.stl --desired 1:6 1:12 1:72 -o salida/
+    python src/cli.py variants modelo.stl --factors 0.5 0.25 -o salida/
+    python src/cli.py check escaneos/ --strict
+    python src/cli.py probe biblioteca/ -r --sample 256
+    python src/cli.py batch escaneos/ --scale-id 3 --require-watertight -o salida/
+    python src/cli.py batch biblioteca/ -r --factor 0.5 --dedupe -o salida/
+    python src/cli.py batch escaneos/ --scale-id 3 --repair --require-watertight -o salida/
+    python src/cli.py dupes biblioteca/ -r
+    python src/cli.py watch /compartido/escaneos -o /compartido/reescalados
+    python src/cli.py slice modelo.stl --scale-id 3 --layer-height 0.05 --csv areas.csv
+    python src/cli.py split placa.stl -o piezas/ --min-facets 20
+    python src/cli.py merge pieza1.stl pieza2.stl -o conjunto.stl --factor 0.5
+    python src/cli.py convert escaneos/ --to 3mf --factor 0.5 -o envio/
+    python src/cli.py fit figuras/ --height 75 -o salida/
+    python src/cli.py fit figuras/ --volume 200 200 250 --mode obb -o salida/
+    python src/cli.py thumbs biblioteca/ -r --size 256 -o miniaturas/
+    python src/cli.py imports --budget-ms 500
+    python src/cli.py bench-normals --facets 2000000 --factor 0.0139
+    python src/cli.py bench-compact modelo.stl --scales 1 12 72
+    python src/cli.py import-scales "excel_files/ESCALAS FIGURAS HUMANAS.xlsx" --all-sheets
+
+Al igual que main.py, este script prepara el sys.path para que los módulos
+de 'src/modules', 'src/utils', 'config' y 'db' puedan importarse directamente.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Código de salida cuando algún archivo no supera la validación (útil en scripts).
+EXIT_GATE_FAILED = 3
+
+# Agregamos las mismas carpetas que configura .vscode/launch.json en PYTHONPATH.
+_root = Path(__file__).resolve().parent.parent
+for _folder in (_root / "src" / "modules", _root / "src" / "utils", _root / "config", _root / "db"):
+    if str(_folder) not in sys.path:
+        sys.path.append(str(_folder))
+
+
+def _cmd_variants(args: argparse.Namespace) -> int:
+    """Genera varias escalas de un modelo leyendo el archivo una sola vez."""
+    from stl_variants import generate_variants, variants_from_db
+
+    variants = list(args.factors or [])
+    if args.scale_ids or args.desired:
+        variants.extend(variants_from_db(scale_ids=args.scale_ids, desired_scales=args.desired))
+    if not variants:
+        print("Indica al menos un factor (--factors), un ID (--scale-ids) o una escala (--desired).")
+        return 2
+
+    cache = _open_cache(args)
+    try:
+        results = generate_variants(
+            args.input,
+            variants,
+            args.output_dir,
+            binary=not args.ascii,
+            max_workers=args.workers,
+            cache=cache,
+            force=args.force,
+            compact=args.compact,
+            max_error=args.max_error,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    for item in results:
+        line = f"{item['label']}: factor {item['factor']:.6g} -> {item['output']}"
+        if item["properties"]:
+            ancho, alto, profundidad = item["properties"]["dimensions"]
+            line += f" ({ancho:.2f} x {alto:.2f} x {profundidad:.2f} mm)"
+        if item["skipped"]:
+            line += " [sin cambios]"
+        print(line)
+    return 0
+
+
+def _open_cache(args: argparse.Namespace):
+    """Abre la caché de construcción salvo que se haya pedido --no-cache."""
+    if args.no_cache:
+        return None
+    from build_cache import BuildCache
+
+    return BuildCache()
+
+
+def _open_fingerprints(args: argparse.Namespace):
+    """Abre la tabla de huellas geométricas si se pidió --dedupe."""
+    if not args.dedupe:
+        return None
+    from fingerprint_db import FingerprintDB
+
+    return FingerprintDB()
+
+
+def _resolve_factor(args: argparse.Namespace):
+    """Obtiene (factor, etiqueta) de --factor o de un registro de ScaleDB (--scale-id)."""
+    if args.scale_id is not None:
+        from stl_variants import variants_from_db
+
+        label, factor = variants_from_db(scale_ids=[args.scale_id])[0]
+        return factor, label
+    return args.factor, None
+
+
+def _cmd_check(args: argparse.Namespace) -> int:
+    """Valida la integridad de uno o varios archivos STL."""
+    from stl_batch import collect_stl_files, passes_gate
+    from stl_parallel_reader import ParallelSTLReader
+    from stl_validation import check_mesh, format_report
+
+    failed = 0
+    for path in collect_stl_files(args.inputs, recursive=args.recursive):
+        model = ParallelSTLReader(str(path)).read_mesh()
+        report = check_mesh(model.vectors, model.normals, tolerance=args.tolerance)
+        ok = passes_gate(report, require_watertight=True, require_valid=args.strict)
+        failed += not ok
+        print(f"{'OK ' if ok else 'ERR'} {path}")
+        if args.verbose or not ok:
+            print(format_report(report))
+    return EXIT_GATE_FAILED if failed else 0
+
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    """Reescala un lote de archivos STL con un factor común."""
+    from stl_batch import batch_rescale
+    from stl_repair import format_repair_report
+
+    factor, label = _resolve_factor(args)
+    cache = _open_cache(args)
+    fingerprints = _open_fingerprints(args)
+    try:
+        results = batch_rescale(
+            args.inputs,
+            factor,
+            args.output_dir,
+            label=label,
+            recursive=args.recursive,
+            binary=not args.ascii,
+            validate=args.check,
+            require_watertight=args.require_watertight,
+            require_valid=args.require_valid,
+            cache=cache,
+            scale_id=args.scale_id,
+            force=args.force,
+            split=args.split,
+            tolerance=args.tolerance,
+            min_facets=args.min_facets,
+            output_format=args.format,
+            fingerprints=fingerprints,
+            max_distance=args.max_distance,
+            normals_precision=args.normals_precision,
+            repair=args.repair,
+            max_hole_edges=args.max_hole_edges,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+        if fingerprints is not None:
+            fingerprints.close()
+    rejected = 0
+    for item in results:
+        output = item["output"]
+        if item["parts"] is not None:
+            output = f"{len(item['parts'])} pieza(s) en {args.output_dir}"
+        copy_of = f" (copia de {item['duplicate_of']})" if item.get("duplicate_of") else ""
+        if item["status"] == "ok":
+            print(f"OK       {item['input']} -> {output}{copy_of}")
+            if item["repair"]:
+                print(format_repair_report(item["repair"]))
+        elif item["status"] == "skipped":
+            print(f"SIN CAMBIOS {item['input']} -> {output}")
+        elif item["status"] == "duplicate":
+            print(f"DUPLICADO {item['input']} -> {output}{copy_of}")
+        elif item["status"] == "rejected":
+            rejected += 1
+            print(f"RECHAZADO {item['input']}")
+        else:
+            rejected += 1
+            print(f"ERROR    {item['input']}: {item['error']}")
+    print(f"{len(results) - rejected}/{len(results)} archivos procesados.")
+    return EXIT_GATE_FAILED if rejected else 0
+
+
+def _cmd_convert(args: argparse.Namespace) -> int:
+    """Convierte archivos STL/OBJ/PLY a otro formato, reescalándolos en la misma pasada."""
+    from stl_batch import batch_rescale
+
+    results = batch_rescale(
+        args.inputs,
+        args.factor,
+        args.output_dir,
+        # Sin factor, los archivos convertidos conservan el nombre de origen.
+        label="" if args.factor == 1.0 else None,
+        recursive=args.recursive,
+        binary=not args.ascii,
+        output_format=args.to,
+        overwrite=args.overwrite,
+    )
+    failed = 0
+    for item in results:
+        if item["status"] == "ok":
+            print(f"OK       {item['input']} -> {item['output']}")
+        else:
+            failed += 1
+            print(f"ERROR    {item['input']}: {item['error']}")
+    print(f"{len(results) - failed}/{len(results)} archivos convertidos.")
+    return 1 if failed else 0
+
+
+def _cmd_dupes(args: argparse.Namespace) -> int:
+    """Busca copias del mismo modelo (otro nombre, cabecera o escala) entre muchos archivos."""
+    from mesh_formats import READERS
+    from stl_batch import collect_stl_files
+    from stl_fingerprint import find_duplicates
+
+    paths = collect_stl_files(args.inputs, recursive=args.recursive, suffixes=tuple(READERS))
+    db = None
+    if not args.no_cache:
+        from fingerprint_db import FingerprintDB
+
+        db = FingerprintDB()
+    try:
+        groups = find_duplicates(paths, db=db, max_distance=args.max_distance)
+    finally:
+        if db is not None:
+            db.close()
+    for number, group in enumerate(groups, start=1):
+        print(f"Grupo {number}:")
+        for item in group:
+            print(f"  {item['path']}\tescala x{item['scale']:.6g}")
+    copies = sum(len(group) - 1 for group in groups)
+    print(f"{len(paths)} archivo(s); {len(groups)} grupo(s) de copias; {copies} copia(s) prescindibles.")
+    return 0
+
+
+def _cmd_probe(args: argparse.Namespace) -> int:
+    """Lista formato, facetas y nombre de muchos archivos sin leerlos completos."""
+    from stl_batch import collect_stl_files
+    from stl_reader import probe_files
+
+    paths = collect_stl_files(args.inputs, recursive=args.recursive)
+    inconsistent = 0
+    for info in probe_files(paths, sample=args.sample, max_workers=args.workers):
+        if "error" in info:
+            inconsistent += 1
+            print(f"{info['path']}\tERROR: {info['error']}")
+            continue
+        inconsistent += not info["size_consistent"]
+        triangles = f"{info['triangles']}" if info["triangles_exact"] else f"~{info['triangles']}"
+        line = (
+            f"{info['path']}\t{info['format']}\t{triangles}\t"
+            f"{'ok' if info['size_consistent'] else 'INCONSISTENTE'}\t{info['name']}"
+        )
+        if info["bbox"]:
+            low, high = info["bbox"]
+            line += "\t" + " x ".join(f"{h - l:.2f}" for l, h in zip(low, high)) + " mm"
+        print(line)
+    return EXIT_GATE_FAILED if inconsistent else 0
+
+
+def _cmd_slice(args: argparse.Namespace) -> int:
+    """Corta un modelo (opcionalmente escalado) por capas y mide el área de cada sección."""
+    import csv
+
+    from stl_parallel_reader import ParallelSTLReader
+    from stl_scaler import scale_model
+    from stl_slicer import layers_to_svg, slice_model
+
+    model = ParallelSTLReader(args.input).read_mesh()
+    if args.factor is not None or args.scale_id is not None:
+        factor, _ = _resolve_factor(args)
+        scale_model(model, factor, inplace=True)
+    layers = slice_model(model, layer_height=args.layer_height, heights=args.heights, workers=args.workers)
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["z_mm", "area_mm2", "contornos", "abiertos", "segmentos"])
+            for layer in layers:
+                writer.writerow([
+                    f"{layer['z']:.4f}", f"{layer['area']:.4f}", len(layer["polylines"]),
+                    layer["closed"].count(False), layer["segments"],
+                ])
+    if args.svg_dir:
+        svg_dir = Path(args.svg_dir)
+        svg_dir.mkdir(parents=True, exist_ok=True)
+        for number, layer in enumerate(layers):
+            (svg_dir / f"capa_{number:05d}.svg").write_text(layers_to_svg(layer), encoding="utf-8")
+
+    if args.heights or len(layers) <= 20:
+        for layer in layers:
+            print(f"z = {layer['z']:.3f} mm\tárea {layer['area']:.2f} mm²\t{len(layer['polylines'])} contorno(s)")
+    open_layers = sum(1 for layer in layers if not all(layer["closed"]))
+    areas = [layer["area"] for layer in layers] or [0.0]
+    print(f"{len(layers)} capas; área máxima {max(areas):.2f} mm²; capas con contornos abiertos: {open_layers}")
+    return 0
+
+
+def _cmd_split(args: argparse.Namespace) -> int:
+    """Separa un modelo en sus piezas y guarda un archivo por pieza."""
+    from stl_components import export_parts, split_components
+    from stl_parallel_reader import ParallelSTLReader
+
+    model = ParallelSTLReader(args.input).read_mesh()
+    parts = split_components(model, tolerance=args.tolerance, min_facets=args.min_facets)
+    written = export_parts(parts, args.input, args.output_dir, binary=not args.ascii)
+    for part, path in zip(parts, written):
+        print(f"{path}\t{len(part.vectors)} facetas")
+    print(f"{len(written)} pieza(s) guardadas en {args.output_dir}")
+    return 0
+
+
+def _cmd_merge(args: argparse.Namespace) -> int:
+    """Combina varios archivos STL en uno (opcionalmente escalado)."""
+    from stl_batch import collect_stl_files
+    from stl_components import merge_files
+    from stl_export import export_mesh
+    from stl_scaler import scale_model
+
+    paths = collect_stl_files(args.inputs, recursive=args.recursive)
+    model = merge_files(paths, name=Path(args.output).stem)
+    if args.factor is not None or args.scale_id is not None:
+        factor, _ = _resolve_factor(args)
+        scale_model(model, factor, inplace=True)
+    export_mesh(model, args.output, binary=not args.ascii)
+    print(f"{len(paths)} archivo(s), {len(model.vectors)} facetas -> {args.output}")
+    return 0
+
+
+def _cmd_fit(args: argparse.Namespace) -> int:
+    """Escala cada archivo a una altura objetivo o al mayor tamaño que cabe en la impresora."""
+    from stl_fit import fit_batch
+
+    if args.height is None and args.volume is None:
+        print("Indica una altura objetivo (--height) o un volumen de impresión (--volume).")
+        return 2
+    cache = _open_cache(args)
+    try:
+        results = fit_batch(
+            args.inputs,
+            args.output_dir,
+            target_height=args.height,
+            build_volume=args.volume,
+            mode=args.mode,
+            margin=args.margin,
+            recursive=args.recursive,
+            max_workers=args.workers,
+            binary=not args.ascii,
+            cache=cache,
+            force=args.force,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    failed = 0
+    for item in results:
+        if item["status"] in ("ok", "skipped"):
+            ancho, alto, profundidad = item["extents"] * item["factor"]
+            state = "OK      " if item["status"] == "ok" else "SIN CAMBIOS"
+            print(
+                f"{state} {item['input']} -> {item['output']} "
+                f"(factor {item['factor']:.6g}; {ancho:.2f} x {alto:.2f} x {profundidad:.2f} mm)"
+            )
+        else:
+            failed += 1
+            print(f"ERROR    {item['input']}: {item['error']}")
+    print(f"{len(results) - failed}/{len(results)} archivos procesados.")
+    return EXIT_GATE_FAILED if failed else 0
+
+
+def _cmd_thumbs(args: argparse.Namespace) -> int:
+    """Genera miniaturas PNG de muchos archivos sin abrir ninguna ventana."""
+    from stl_batch import collect_stl_files
+    from stl_thumbnails import render_thumbnails
+
+    results = render_thumbnails(
+        collect_stl_files(args.inputs, recursive=args.recursive),
+        output_dir=args.output_dir,
+        max_workers=args.workers,
+        force=args.force,
+        size=args.size,
+        supersample=args.supersample,
+        backend=args.backend,
+    )
+    failed = 0
+    for item in results:
+        if item["error"]:
+            failed += 1
+            print(f"ERROR    {item['input']}: {item['error']}")
+        else:
+            state = "CACHÉ   " if item["cached"] else "OK      "
+            print(f"{state} {item['input']} -> {item['output']}")
+    print(f"{len(results) - failed}/{len(results)} miniaturas generadas.")
+    return 1 if failed else 0
+
+
+def _cmd_imports(args: argparse.Namespace) -> int:
+    """Mide la importación del núcleo y falla si supera el presupuesto o carga dependencias pesadas."""
+    from import_benchmark import CORE_MODULES, check_import_budget
+
+    report = check_import_budget(args.budget_ms, modules=args.modules or CORE_MODULES, runs=args.runs)
+    print(f"Importación: {report['total_ms']:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    for milliseconds, name in report["slowest"][:args.top]:
+        print(f"  {milliseconds:8.1f} ms  {name}")
+    if report["heavy"]:
+        print("Dependencias pesadas cargadas al importar: " + ", ".join(report["heavy"]))
+    if not report["ok"]:
+        print("FALLO: la importación no cumple el presupuesto.")
+        return EXIT_GATE_FAILED
+    return 0
+
+
+def _cmd_bench_normals(args: argparse.Namespace) -> int:
+    """Compara velocidad y error angular del cálculo de normales (numpy-stl, float32 y float64)."""
+    from stl_normals import benchmark_normals
+
+    model = None
+    if args.input:
+        from mesh_formats import read_model
+
+        model = read_model(args.input)
+    results = benchmark_normals(model, facets=args.facets, factor=args.factor, runs=args.runs)
+    for method, result in results.items():
+        print(
+            f"{method:10s} {result['seconds'] * 1000:9.1f} ms  "
+            f"error máx. {result['max_error_deg']:.3g}°  medio {result['mean_error_deg']:.3g}°"
+        )
+    return 0
+
+
+def _cmd_bench_compact(args: argparse.Namespace) -> int:
+    """Mide la memoria ahorrada y el error de posición de cada codificación compacta."""
+    from stl_compact import benchmark_compact
+
+    model = None
+    if args.input:
+        from mesh_formats import read_model
+
+        model = read_model(args.input)
+    factors = [1.0 / denominator for denominator in args.scales]
+    for row in benchmark_compact(model, factors=factors, modes=args.modes):
+        print(
+            f"{row['mode']:8s} 1:{1 / row['factor']:<5.4g} {row['bytes'] / 1e6:8.1f} MB "
+            f"(ahorro {row['saved']:.0%})  error máx. {row['max_error']:.3g} mm  cota {row['error_bound']:.3g} mm"
+        )
+    return 0
+
+
+def _cmd_import_scales(args: argparse.Namespace) -> int:
+    """Importa un catálogo de escalas (Excel o CSV) en streaming y por lotes."""
+    from excel_importer import import_scales_from_excel
+
+    report = import_scales_from_excel(
+        args.file,
+        all_sheets=args.all_sheets,
+        sheets=args.sheets,
+        batch_size=args.batch_size,
+        delimiter=args.delimiter,
+    )
+    print(f"{report['inserted']} registros nuevos, {report['updated']} actualizados.")
+    for name, reason in report["skipped"].items():
+        print(f"OMITIDA  {name}: {reason}")
+    return 0
+
+
+def _cmd_watch(args: argparse.Namespace) -> int:
+    """Vigila una carpeta y reescala automáticamente los archivos nuevos."""
+    from stl_watcher import STLWatcher
+
+    watcher = STLWatcher(
+        args.folder,
+        args.output_dir,
+        factor=args.factor,
+        scale_id=args.scale_id,
+        settle_seconds=args.settle,
+        poll_interval=args.interval,
+        use_inotify=not args.polling,
+        binary=not args.ascii,
+        require_watertight=args.require_watertight,
+    )
+    watcher.run()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el analizador de argumentos con todos los subcomandos."""
+    parser = argparse.ArgumentParser(prog="stl_tools", description="Herramientas STL por línea de comandos.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    variants = subparsers.add_parser("variants", help="Genera varias escalas de un modelo en una sola lectura.")
+    variants.add_argument("input", help="Archivo STL de origen.")
+    variants.add_argument("-o", "--output-dir", default=".", help="Carpeta de salida.")
+    variants.add_argument("--factors", type=float, nargs="+", help="Factores de escala directos.")
+    variants.add_argument("--scale-ids", type=int, nargs="+", help="IDs de la tabla 'scales'.")
+    variants.add_argument("--desired", nargs="+", help="Escalas deseadas registradas en 'scales' (ej. 1:72).")
+    variants.add_argument("--ascii", action="store_true", help="Guardar en formato ASCII.")
+    variants.add_argument("--workers", type=int, help="Hilos de escritura.")
+    variants.add_argument("--force", action="store_true", help="Regenera todas las variantes aunque estén al día.")
+    variants.add_argument("--no-cache", action="store_true", help="No consultar ni actualizar la caché de construcción.")
+    variants.add_argument(
+        "--compact", choices=("int16", "int32", "float16", "float32", "auto"),
+        help="Mantiene el modelo base cuantizado en memoria (ver bench-compact).",
+    )
+    variants.add_argument("--max-error", type=float, help="Error de posición máximo con --compact (mm).")
+    variants.set_defaults(func=_cmd_variants)
+
+    check = subparsers.add_parser("check", help="Valida que las mallas sean cerradas y coherentes.")
+    check.add_argument("inputs", nargs="+", help="Archivos STL o carpetas.")
+    check.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    check.add_argument("--tolerance", type=float, default=0.0, help="Tolerancia para soldar vértices.")
+    check.add_argument("--strict", action="store_true", help="Falla también con degenerados, duplicados o normales invertidas.")
+    check.add_argument("-v", "--verbose", action="store_true", help="Muestra el informe de todos los archivos.")
+    check.set_defaults(func=_cmd_check)
+
+    probe = subparsers.add_parser("probe", help="Inventario rápido: formato, facetas y nombre sin leer todo el archivo.")
+    probe.add_argument("inputs", nargs="+", help="Archivos STL o carpetas.")
+    probe.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    probe.add_argument("--sample", type=int, default=0, help="Facetas a muestrear para estimar la caja envolvente.")
+    probe.add_argument("--workers", type=int, help="Hilos de E/S.")
+    probe.set_defaults(func=_cmd_probe)
+
+    batch = subparsers.add_parser("batch", help="Reescala un lote de archivos con un factor común.")
+    batch.add_argument("inputs", nargs="+", help="Archivos STL, OBJ o PLY, o carpetas.")
+    batch.add_argument("-o", "--output-dir", default=".", help="Carpeta de salida.")
+    scale_group = batch.add_mutually_exclusive_group(required=True)
+    scale_group.add_argument("--factor", type=float, help="Factor de escala.")
+    scale_group.add_argument("--scale-id", type=int, help="ID de la tabla 'scales'.")
+    batch.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    batch.add_argument("--ascii", action="store_true", help="Guardar en formato ASCII.")
+    batch.add_argument("--check", action="store_true", help="Valida cada malla e incluye el informe.")
+    batch.add_argument("--require-watertight", action="store_true", help="Rechaza mallas abiertas o mal orientadas.")
+    batch.add_argument("--require-valid", action="store_true", help="Rechaza mallas con cualquier defecto.")
+    batch.add_argument("--force", action="store_true", help="Reconstruye todos los archivos aunque estén al día.")
+    batch.add_argument("--no-cache", action="store_true", help="No consultar ni actualizar la caché de construcción.")
+    batch.add_argument("--split", action="store_true", help="Guarda un archivo por pieza (componente conexa).")
+    batch.add_argument("--tolerance", type=float, default=0.0, help="Tolerancia para soldar vértices al separar piezas.")
+    batch.add_argument("--min-facets", type=int, default=1, help="Descarta piezas con menos facetas al separar.")
+    batch.add_argument("--format", choices=("stl", "3mf"), default="stl", help="Formato de los archivos de salida.")
+    batch.add_argument("--dedupe", action="store_true",
+                       help="Detecta copias del mismo modelo y reutiliza sus salidas escaladas.")
+    batch.add_argument("--max-distance", type=float, default=1e-4, help="Distancia máxima entre huellas de copias.")
+    batch.add_argument("--normals-precision", choices=("float32", "float64"), default="float32",
+                       help="Precisión de las normales escritas (float64 para piezas muy pequeñas).")
+    batch.add_argument("--repair", action="store_true",
+                       help="Elimina facetas degeneradas y duplicadas, corrige la orientación y rellena agujeros pequeños.")
+    batch.add_argument("--max-hole-edges", type=int, default=64, help="Aristas máximas de un agujero que se rellena.")
+    batch.set_defaults(func=_cmd_batch)
+
+    dupes = subparsers.add_parser("dupes", help="Busca copias del mismo modelo (salvo nombre, cabecera o escala).")
+    dupes.add_argument("inputs", nargs="+", help="Archivos STL, OBJ o PLY, o carpetas.")
+    dupes.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    dupes.add_argument("--max-distance", type=float, default=1e-4, help="Distancia máxima entre huellas.")
+    dupes.add_argument("--no-cache", action="store_true", help="No consultar ni guardar las huellas en la base de datos.")
+    dupes.set_defaults(func=_cmd_dupes)
+
+    convert = subparsers.add_parser("convert", help="Convierte STL/OBJ/PLY a STL o 3MF (opcionalmente reescalando).")
+    convert.add_argument("inputs", nargs="+", help="Archivos STL, OBJ o PLY, o carpetas.")
+    convert.add_argument("-o", "--output-dir", default=".", help="Carpeta de salida.")
+    convert.add_argument("--to", choices=("stl", "3mf"), default="stl", help="Formato de salida.")
+    convert.add_argument("--factor", type=float, default=1.0, help="Factor de escala aplicado al convertir.")
+    convert.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    convert.add_argument("--ascii", action="store_true", help="Guardar los STL en formato ASCII.")
+    convert.add_argument("--overwrite", action="store_true", help="Reemplazar los archivos de salida que ya existen.")
+    convert.set_defaults(func=_cmd_convert)
+
+    split = subparsers.add_parser("split", help="Separa un modelo en sus piezas (componentes conexas).")
+    split.add_argument("input", help="Archivo STL.")
+    split.add_argument("-o", "--output-dir", default=".", help="Carpeta de salida.")
+    split.add_argument("--tolerance", type=float, default=0.0, help="Tolerancia para soldar vértices.")
+    split.add_argument("--min-facets", type=int, default=1, help="Descarta piezas con menos facetas.")
+    split.add_argument("--ascii", action="store_true", help="Guardar en formato ASCII.")
+    split.set_defaults(func=_cmd_split)
+
+    merge = subparsers.add_parser("merge", help="Combina varios archivos STL en uno solo.")
+    merge.add_argument("inputs", nargs="+", help="Archivos STL o carpetas.")
+    merge.add_argument("-o", "--output", required=True, help="Archivo STL de salida.")
+    merge.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    merge_scale = merge.add_mutually_exclusive_group()
+    merge_scale.add_argument("--factor", type=float, help="Escala el resultado.")
+    merge_scale.add_argument("--scale-id", type=int, help="Escala el resultado con un registro de 'scales'.")
+    merge.add_argument("--ascii", action="store_true", help="Guardar en formato ASCII.")
+    merge.set_defaults(func=_cmd_merge)
+
+    slicer = subparsers.add_parser("slice", help="Corta un modelo por capas y mide el área de cada sección.")
+    slicer.add_argument("input", help="Archivo STL.")
+    slice_scale = slicer.add_mutually_exclusive_group()
+    slice_scale.add_argument("--factor", type=float, help="Escala el modelo antes de cortarlo.")
+    slice_scale.add_argument("--scale-id", type=int, help="Escala el modelo con un registro de 'scales'.")
+    slicer.add_argument("--layer-height", type=float, default=0.2, help="Altura de capa en mm.")
+    slicer.add_argument("--heights", type=float, nargs="+", help="Alturas concretas de corte (mm).")
+    slicer.add_argument("--csv", help="Guarda el área de cada capa en un CSV.")
+    slicer.add_argument("--svg-dir", help="Guarda los contornos de cada capa como SVG.")
+    slicer.add_argument("--workers", type=int, help="Procesos a usar.")
+    slicer.set_defaults(func=_cmd_slice)
+
+    fit = subparsers.add_parser("fit", help="Escala a una altura objetivo o al volumen de impresión.")
+    fit.add_argument("inputs", nargs="+", help="Archivos STL o carpetas.")
+    fit.add_argument("-o", "--output-dir", default=".", help="Carpeta de salida.")
+    fit.add_argument("--height", type=float, help="Altura objetivo en Z (mm).")
+    fit.add_argument("--volume", type=float, nargs=3, metavar=("X", "Y", "Z"), help="Volumen de impresión (mm).")
+    fit.add_argument("--mode", choices=("aabb", "obb"), default="aabb",
+                     help="Caja alineada con los ejes (aabb) u orientada según los ejes principales (obb).")
+    fit.add_argument("--margin", type=float, default=0.0, help="Holgura por lado dentro del volumen (mm).")
+    fit.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    fit.add_argument("--workers", type=int, help="Hilos de la pasada de medición.")
+    fit.add_argument("--ascii", action="store_true", help="Guardar en formato ASCII.")
+    fit.add_argument("--force", action="store_true", help="Reconstruye todos los archivos aunque estén al día.")
+    fit.add_argument("--no-cache", action="store_true", help="No consultar ni actualizar la caché de construcción.")
+    fit.set_defaults(func=_cmd_fit)
+
+    thumbs = subparsers.add_parser("thumbs", help="Genera miniaturas PNG sin pantalla (en paralelo y con caché).")
+    thumbs.add_argument("inputs", nargs="+", help="Archivos STL o carpetas.")
+    thumbs.add_argument("-o", "--output-dir", default=".", help="Carpeta donde se copian las miniaturas.")
+    thumbs.add_argument("-r", "--recursive", action="store_true", help="Recorrer subcarpetas.")
+    thumbs.add_argument("--size", type=int, default=256, help="Tamaño de las miniaturas en píxeles.")
+    thumbs.add_argument("--supersample", type=int, default=2, help="Sobremuestreo para suavizar los bordes.")
+    thumbs.add_argument("--backend", choices=("numpy", "pyvista"), default="numpy",
+                        help="Rasterizador por software (numpy) o VTK fuera de pantalla (pyvista).")
+    thumbs.add_argument("--workers", type=int, help="Procesos a usar.")
+    thumbs.add_argument("--force", action="store_true", help="Regenera las miniaturas aunque estén en la caché.")
+    thumbs.set_defaults(func=_cmd_thumbs)
+
+    imports = subparsers.add_parser("imports", help="Mide el tiempo de importación del núcleo (-X importtime).")
+    imports.add_argument("--budget-ms", type=float, default=500.0, help="Presupuesto en milisegundos.")
+    imports.add_argument("--runs", type=int, default=3, help="Repeticiones (se toma la más rápida).")
+    imports.add_argument("--top", type=int, default=10, help="Módulos más lentos que se muestran.")
+    imports.add_argument("--modules", nargs="+", help="Módulos a medir (por defecto, todo el núcleo).")
+    imports.set_defaults(func=_cmd_imports)
+
+    bench_normals = subparsers.add_parser("bench-normals", help="Mide velocidad y error angular del cálculo de normales.")
+    bench_normals.add_argument("input", nargs="?", help="Modelo a usar (por defecto, una malla sintética).")
+    bench_normals.add_argument("--facets", type=int, default=1_000_000, help="Facetas de la malla sintética.")
+    bench_normals.add_argument("--factor", type=float, default=1.0 / 72.0, help="Escala aplicada antes de medir.")
+    bench_normals.add_argument("--runs", type=int, default=3, help="Repeticiones (se toma la más rápida).")
+    bench_normals.set_defaults(func=_cmd_bench_normals)
+
+    bench_compact = subparsers.add_parser(
+        "bench-compact", help="Mide memoria y error de posición de las codificaciones compactas."
+    )
+    bench_compact.add_argument("input", nargs="?", help="Modelo a usar (por defecto, un toro sintético).")
+    bench_compact.add_argument(
+        "--scales", type=float, nargs="+", default=[1, 6, 12, 35, 72], help="Denominadores de escala (1:N)."
+    )
+    bench_compact.add_argument(
+        "--modes", nargs="+", choices=("float32", "float16", "int16", "int32"),
+        default=["float32", "float16", "int16", "int32"], help="Codificaciones a medir.",
+    )
+    bench_compact.set_defaults(func=_cmd_bench_compact)
+
+    import_scales = subparsers.add_parser("import-scales", help="Importa escalas desde Excel o CSV a la base de datos.")
+    import_scales.add_argument("file", help="Libro .xlsx/.xls o archivo .csv.")
+    import_scales.add_argument("--all-sheets", action="store_true", help="Importa todas las hojas del libro en una pasada.")
+    import_scales.add_argument("--sheets", nargs="+", help="Hojas concretas a importar.")
+    import_scales.add_argument("--batch-size", type=int, default=1000, help="Filas por transacción.")
+    import_scales.add_argument("--delimiter", help="Separador del CSV (se detecta si no se indica).")
+    import_scales.set_defaults(func=_cmd_import_scales)
+
+    watch = subparsers.add_parser("watch", help="Vigila una carpeta y reescala los archivos nuevos o modificados.")
+    watch.add_argument("folder", help="Carpeta vigilada.")
+    watch.add_argument("-o", "--output-dir", required=True, help="Carpeta de salida (distinta de la vigilada).")
+    watch_scale = watch.add_mutually_exclusive_group()
+    watch_scale.add_argument("--factor", type=float, help="Factor fijo para todos los archivos.")
+    watch_scale.add_argument("--scale-id", type=int, help="Registro de 'scales' usado si el nombre no coincide con ningún object_name.")
+    watch.add_argument("--settle", type=float, default=2.0, help="Segundos sin cambios antes de procesar un archivo.")
+    watch.add_argument("--interval", type=float, default=1.0, help="Intervalo de comprobación en segundos.")
+    watch.add_argument("--polling", action="store_true", help="No usar inotify aunque esté disponible.")
+    watch.add_argument("--ascii", action="store_true", help="Guardar en formato ASCII.")
+    watch.add_argument("--require-watertight", action="store_true", help="Rechaza mallas abiertas o mal orientadas.")
+    watch.set_defaults(func=_cmd_watch)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,7 @@ Punto de entrada para la aplicación STL_Tools.
 Este script prepara el entorno añadiendo la carpeta "src" al sys.path y lanza la interfaz gráfica.
 """
 
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -25,4 +26,7 @@ def main():
     app.MainLoop()
 
 if __name__ == '__main__':
+    # En el ejecutable (.exe) de Windows, los procesos de ParallelSTLReader
+    # vuelven a lanzar este script: freeze_support() los atiende sin abrir otra ventana.
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
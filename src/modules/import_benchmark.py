@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Módulo: import_benchmark.py
+
+Este módulo mide cuánto tarda en importarse el núcleo de STL_Tools (los
+módulos de negocio, sin interfaz gráfica) y comprueba que no arrastra
+dependencias pesadas.
+
+El núcleo (CORE_MODULES) solo puede importar al cargarse la biblioteca
+estándar, NumPy, numpy-stl y python-decouple. Las dependencias pesadas
+(HEAVY_MODULES: wxPython, pandas, PyVista/VTK, ...) deben importarse dentro
+de las funciones que las usan, la primera vez que se necesitan.
+
+La medición se hace en un intérprete nuevo con 'python -X importtime', que
+informa del tiempo acumulado de cada importación; se repite varias veces y
+se toma la mejor (la primera suele pagar el arranque en frío del disco).
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Módulos del núcleo: lo que importan la línea de comandos y los procesos por lotes.
+CORE_MODULES = (
+    "utils",
+    "stl_reader",
+    "stl_parallel_reader",
+    "stl_normals",
+    "stl_compact",
+    "stl_repair",
+    "stl_transform",
+    "stl_scaler",
+    "stl_export",
+    "mesh_formats",
+    "stl_validation",
+    "stl_components",
+    "stl_variants",
+    "stl_batch",
+    "stl_fingerprint",
+    "stl_history",
+    "stl_fit",
+    "stl_slicer",
+    "shared_mesh",
+    "spatial_index",
+    "stl_thumbnails",
+    "stl_viewer",
+    "stl_watcher",
+    "scale_db",
+    "build_cache",
+    "fingerprint_db",
+)
+
+# Paquetes que el núcleo no debe cargar al importarse.
+HEAVY_MODULES = ("wx", "pandas", "openpyxl", "pyvista", "vtk", "vtkmodules", "matplotlib", "pyperclip")
+
+# Presupuesto por defecto para importar todo el núcleo (milisegundos).
+DEFAULT_BUDGET_MS = 500.0
+
+# Carpetas del proyecto que se añaden al PYTHONPATH (igual que .vscode/launch.json).
+_ROOT = Path(__file__).resolve().parent.parent.parent
+PROJECT_PATHS = (_ROOT / "src" / "modules", _ROOT / "src" / "utils", _ROOT / "config", _ROOT / "db")
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Interpreta la salida de 'python -X importtime'.
+
+    Args:
+        output (str): Texto escrito en stderr por el intérprete.
+
+    Returns:
+        List[Dict[str, Any]]: Una entrada por módulo importado con
+            {'module', 'self_us', 'cumulative_us', 'depth'} (depth 0 = importado
+            directamente por el código medido).
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            stripped = name.lstrip(" ")
+            entries.append({
+                "module": stripped.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(stripped) - 1) // 2,
+            })
+        except ValueError:
+            continue
+    return entries
+
+
+def measure_imports(
+    modules: Sequence[str] = CORE_MODULES,
+    runs: int = 3,
+    python: str = sys.executable,
+) -> Dict[str, Any]:
+    """
+    Mide el tiempo de importación de 'modules' en un intérprete nuevo.
+
+    Args:
+        modules (Sequence[str]): Módulos a importar (en una sola sentencia).
+        runs (int): Repeticiones; se conserva la más rápida.
+        python (str): Intérprete a usar.
+
+    Returns:
+        Dict[str, Any]: {
+            'total_ms': float (suma de las importaciones de nivel superior),
+            'modules': {nombre: ms} de los módulos pedidos y lo que cargan directamente,
+            'loaded': set con todos los módulos cargados,
+            'heavy': lista de dependencias pesadas cargadas,
+            'slowest': lista [(ms propios, módulo)] de mayor a menor
+        }
+
+    Raises:
+        RuntimeError: Si la importación falla.
+    """
+    env = dict(os.environ)
+    extra = os.pathsep.join(str(path) for path in PROJECT_PATHS)
+    env["PYTHONPATH"] = extra + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+    code = "import " + ", ".join(modules)
+
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(max(1, runs)):
+        completed = subprocess.run(
+            [python, "-X", "importtime", "-c", code],
+            env=env, capture_output=True, text=True, check=False,
+        )
+        if completed.returncode != 0:
+            # Las líneas de importtime van también a stderr: se muestra solo el error.
+            message = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+            raise RuntimeError("\n".join(message) or "La importación falló.")
+        entries = parse_importtime(completed.stderr)
+        top_level = [entry for entry in entries if entry["depth"] == 0]
+        total_ms = sum(entry["cumulative_us"] for entry in top_level) / 1000.0
+        if best is None or total_ms < best["total_ms"]:
+            loaded = {entry["module"] for entry in entries}
+            best = {
+                "total_ms": total_ms,
+                "modules": {entry["module"]: entry["cumulative_us"] / 1000.0 for entry in top_level},
+                "loaded": loaded,
+                "heavy": sorted(name for name in loaded if name in HEAVY_MODULES),
+                "slowest": sorted(((entry["self_us"] / 1000.0, entry["module"]) for entry in entries), reverse=True),
+            }
+    return best
+
+
+def check_import_budget(
+    budget_ms: float = DEFAULT_BUDGET_MS,
+    modules: Iterable[str] = CORE_MODULES,
+    runs: int = 3,
+) -> Dict[str, Any]:
+    """
+    Comprueba que el núcleo se importa dentro del presupuesto y sin dependencias pesadas.
+
+    Returns:
+        Dict[str, Any]: Resultado de measure_imports() con 'budget_ms' y 'ok'.
+    """
+    result = measure_imports(tuple(modules), runs=runs)
+    result["budget_ms"] = budget_ms
+    result["ok"] = result["total_ms"] <= budget_ms and not result["heavy"]
+    return result
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    report = check_import_budget()
+    print(f"Importación del núcleo: {report['total_ms']:.1f} ms (presupuesto {report['budget_ms']:.0f} ms)")
+    for milliseconds, name in report["slowest"][:10]:
+        print(f"  {milliseconds:8.1f} ms  {name}")
+    if report["heavy"]:
+        print("Dependencias pesadas cargadas:", ", ".join(report["heavy"]))
+    sys.exit(0 if report["ok"] else 1)
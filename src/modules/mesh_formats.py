@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Módulo: mesh_formats.py
+
+Este módulo reúne los formatos de malla que entiende STL_Tools en un
+registro de lectores y escritores por extensión:
+
+  - .stl (lectura y escritura): ParallelSTLReader y stl_export.
+  - .obj (lectura): el archivo se tokeniza en bloque; las líneas 'v' y 'f'
+    se clasifican con NumPy sobre los bytes del archivo (sin recorrerlas en
+    Python) y sus números se convierten de una vez. Los polígonos se triangulan en abanico de forma vectorizada y
+    se admiten índices negativos y 'v/vt/vn'.
+  - .ply (lectura): binario (little/big endian) y ASCII. Los elementos se
+    interpretan con np.frombuffer sobre el contenido del archivo, sin
+    copias; si todas las caras tienen el mismo número de vértices se leen
+    como un único bloque.
+  - .3mf (escritura): malla indexada (vértices soldados y triángulos) en el
+    paquete ZIP del formato, escrita por bloques.
+
+Todos los lectores devuelven un mesh.Mesh con el mismo arreglo estructurado
+(normals, vectors, attr) que usan el escalador y el resto de módulos, de
+modo que los lotes pueden convertir y reescalar en una sola pasada.
+
+Se pueden añadir formatos con register_reader() y register_writer().
+"""
+
+import re
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from stl import mesh
+
+from stl_normals import update_normals
+
+# Tipos escalares de PLY y su equivalente en NumPy.
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+# Fin del encabezado PLY.
+_PLY_END_HEADER = re.compile(rb"end_header[ \t]*\r?\n")
+
+# Vértices por bloque al escribir el XML de 3MF.
+_3MF_CHUNK = 100_000
+
+_3MF_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    ' <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
+    ' <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
+    '</Types>\n'
+)
+_3MF_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+    ' <Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
+    '</Relationships>\n'
+)
+
+
+def _parse_numbers(blob: bytes, dtype: Any, expected: Optional[int] = None, source: str = "") -> np.ndarray:
+    """
+    Convierte un bloque de texto con números separados por espacios en un arreglo.
+
+    Raises:
+        ValueError: Si el bloque contiene algo que no es un número.
+    """
+    with warnings.catch_warnings():
+        # NumPy avisa (y se detiene) si encuentra un token inválido; se comprueba el total.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        values = np.fromstring(blob, dtype=dtype, sep=" ") if blob.strip() else np.zeros(0, dtype=dtype)
+    if expected is not None and len(values) != expected:
+        raise ValueError(f"{source}: valores numéricos no válidos o incompletos.")
+    return values
+
+
+def mesh_from_indexed(points: np.ndarray, faces: np.ndarray, name: str = "") -> mesh.Mesh:
+    """
+    Construye un mesh.Mesh a partir de una malla indexada.
+
+    Args:
+        points (np.ndarray): Vértices (V, 3).
+        faces (np.ndarray): Triángulos (N, 3) con índices a 'points'.
+        name (str): Nombre del modelo.
+
+    Returns:
+        mesh.Mesh: Modelo con el arreglo estructurado de numpy-stl y las normales unitarias.
+    """
+    data = np.zeros(len(faces), dtype=mesh.Mesh.dtype)
+    data["vectors"] = np.asarray(points, dtype=np.float32)[faces]
+    return update_normals(mesh.Mesh(data, calculate_normals=False, name=name))
+
+
+def fan_triangulate(indices: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Triangula en abanico una lista de polígonos.
+
+    Args:
+        indices (np.ndarray): Índices de vértice de todos los polígonos, seguidos.
+        counts (np.ndarray): Número de vértices de cada polígono (>= 3).
+
+    Returns:
+        np.ndarray: Triángulos (T, 3); un polígono de k vértices aporta k - 2.
+
+    Raises:
+        ValueError: Si algún polígono tiene menos de 3 vértices.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    if len(counts) and counts.min() < 3:
+        raise ValueError("Hay caras con menos de 3 vértices.")
+    if len(counts) and (counts == counts[0]).all():
+        # Todos los polígonos iguales: basta con reorganizar el arreglo.
+        polygons = indices.reshape(len(counts), counts[0])
+        fan = np.arange(1, counts[0] - 1)
+        return np.stack([np.repeat(polygons[:, :1], len(fan), axis=1), polygons[:, fan], polygons[:, fan + 1]],
+                        axis=-1).reshape(-1, 3)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    per_polygon = counts - 2
+    polygon = np.repeat(np.arange(len(counts)), per_polygon)
+    # Posición del triángulo dentro de su polígono (1 .. k-2).
+    step = np.arange(len(polygon)) - np.repeat(np.cumsum(per_polygon) - per_polygon, per_polygon) + 1
+    first = starts[polygon]
+    return np.stack([indices[first], indices[first + step], indices[first + step + 1]], axis=-1)
+
+
+# ----------------------------------------------------------------------
+# OBJ
+# ----------------------------------------------------------------------
+def parse_obj(data: bytes, source: str = "OBJ") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpreta el contenido de un archivo OBJ.
+
+    Solo se usan los vértices ('v') y las caras ('f'), aunque estén sangrados
+    o lleven un comentario ('# ...') al final; grupos, materiales, normales y
+    coordenadas de textura se ignoran.
+
+    Args:
+        data (bytes): Contenido del archivo.
+        source (str): Nombre para los mensajes de error.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (vértices (V, 3) float64, triángulos (N, 3) int64).
+
+    Raises:
+        ValueError: Si el archivo está mal formado o una cara apunta a un vértice inexistente.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    # Clasificación de las líneas con NumPy: comienzo, longitud y dos primeros bytes
+    # tras la sangría (se avanza a la vez en todas las líneas que empiezan en blanco).
+    starts = np.concatenate([[0], np.flatnonzero(buf == ord("\n")) + 1])
+    lengths = np.diff(np.append(starts, len(buf)))
+    padded = np.concatenate([buf, np.zeros(2, dtype=np.uint8)])
+    first = starts.copy()
+    indented = (padded[first] == ord(" ")) | (padded[first] == ord("\t"))
+    while indented.any():
+        first[indented] += 1
+        indented &= (padded[first] == ord(" ")) | (padded[first] == ord("\t"))
+    blank_after = (padded[first + 1] == ord(" ")) | (padded[first + 1] == ord("\t"))
+    is_vertex = (padded[first] == ord("v")) & blank_after
+    is_face = (padded[first] == ord("f")) & blank_after
+
+    # Comentarios al final de una línea 'v' o 'f': se blanquea desde '#' hasta el salto de línea.
+    hashes = np.flatnonzero(buf == ord("#")) if b"#" in data else np.zeros(0, dtype=np.int64)
+    line_of = np.searchsorted(starts, hashes, side="right") - 1
+    hashes, line_of = hashes[(is_vertex | is_face)[line_of]], line_of[(is_vertex | is_face)[line_of]]
+    if len(hashes):
+        line_of, first_hash = np.unique(line_of, return_index=True)
+        begin = hashes[first_hash]
+        end = starts[line_of] + lengths[line_of]
+        end -= padded[end - 1] == ord("\n")
+        spans = end - begin
+        buf = buf.copy()
+        buf[np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans) + np.repeat(begin, spans)] = ord(" ")
+    indent = first - starts
+
+    def select(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Bytes de las líneas marcadas, seguidos, con la letra inicial en blanco."""
+        segment = buf[np.repeat(mask, lengths)]
+        offsets = np.cumsum(lengths[mask]) - lengths[mask]
+        segment[offsets + indent[mask]] = ord(" ")
+        return segment, offsets
+
+    # Vértices: normalmente 3 coordenadas (4 con 'w', 6 con color por vértice).
+    vertex_count = int(is_vertex.sum())
+    segment, _ = select(is_vertex)
+    coordinates = _parse_numbers(segment.tobytes(), np.float64, source=source)
+    if vertex_count and len(coordinates) % vertex_count == 0 and len(coordinates) >= 3 * vertex_count:
+        points = coordinates.reshape(vertex_count, -1)[:, :3]
+    else:
+        points = np.array([line.split()[:3] for line in segment.tobytes().splitlines()],
+                          dtype=np.float64).reshape(-1, 3)
+
+    # Caras: 'a', 'a/b', 'a//c' o 'a/b/c'. Se separan los números por '/' y se toma
+    # el primero de cada grupo, suponiendo que todo el archivo usa la misma forma.
+    face_count = int(is_face.sum())
+    segment, offsets = select(is_face)
+    first_group = (segment[:lengths[is_face][0]].tobytes().split() or [b""])[0] if face_count else b""
+    width = first_group.count(b"/") + 1 - first_group.count(b"//")
+    # Grupos por cara: comienzos de palabra dentro de cada línea.
+    blank = (segment == ord(" ")) | (segment == ord("\t")) | (segment == ord("\r")) | (segment == ord("\n"))
+    word_start = ~blank
+    word_start[1:] &= blank[:-1]
+    counts = np.add.reduceat(word_start, offsets).astype(np.int64) if face_count else np.zeros(0, dtype=np.int64)
+    numbers = _parse_numbers(np.where(segment == ord("/"), np.uint8(ord(" ")), segment).tobytes(), np.int64, source=source)
+    if len(numbers) == width * counts.sum():
+        indices = numbers[::width]
+    else:
+        # Formas mezcladas en el mismo archivo: se quita lo que sigue a cada '/'.
+        indices = _parse_numbers(re.sub(rb"/\S*", b"", segment.tobytes()), np.int64,
+                                 expected=int(counts.sum()), source=source)
+
+    if len(indices) and indices.min() < 0:
+        # Los índices negativos son relativos a los vértices definidos antes de la cara.
+        before = np.cumsum(is_vertex)[is_face]
+        indices = np.where(indices < 0, indices + np.repeat(before, counts), indices - 1)
+    else:
+        indices = indices - 1
+    if len(indices) and (indices.min() < 0 or indices.max() >= len(points)):
+        raise ValueError(f"{source}: hay caras que apuntan a vértices inexistentes.")
+    return points, fan_triangulate(indices, counts)
+
+
+def read_obj(path: Union[str, Path]) -> mesh.Mesh:
+    """Lee un archivo OBJ como mesh.Mesh."""
+    path = Path(path)
+    points, faces = parse_obj(path.read_bytes(), source=path.name)
+    return mesh_from_indexed(points, faces, name=path.stem)
+
+
+# ----------------------------------------------------------------------
+# PLY
+# ----------------------------------------------------------------------
+def parse_ply_header(data: bytes) -> Tuple[str, List[Dict[str, Any]], int]:
+    """
+    Interpreta el encabezado de un archivo PLY.
+
+    Returns:
+        Tuple[str, List[Dict[str, Any]], int]: (formato, elementos, posición del
+            primer byte de datos). Cada elemento es {'name', 'count',
+            'properties': [(nombre, tipo) o (nombre, tipo_contador, tipo_item)]}.
+
+    Raises:
+        ValueError: Si el archivo no es un PLY válido.
+    """
+    if not data.startswith(b"ply"):
+        raise ValueError("El archivo no es un PLY.")
+    match = _PLY_END_HEADER.search(data, 0, 64 * 1024)
+    if match is None:
+        raise ValueError("Encabezado PLY incompleto.")
+    fmt = None
+    elements: List[Dict[str, Any]] = []
+    for line in data[:match.start()].decode("ascii", errors="replace").splitlines()[1:]:
+        words = line.split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append({"name": words[1], "count": int(words[2]), "properties": []})
+        elif words[0] == "property":
+            if not elements:
+                raise ValueError("Propiedad PLY fuera de un elemento.")
+            if words[1] == "list":
+                elements[-1]["properties"].append((words[4], _PLY_TYPES[words[2]], _PLY_TYPES[words[3]]))
+            else:
+                elements[-1]["properties"].append((words[2], _PLY_TYPES[words[1]]))
+    if fmt not in ("ascii", "binary_little_endian", "binary_big_endian"):
+        raise ValueError(f"Formato PLY no soportado: {fmt}")
+    return fmt, elements, match.end()
+
+
+def _ply_binary_list_element(
+    data: bytes, offset: int, element: Dict[str, Any], endian: str
+) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Lee un elemento binario con propiedades de lista (normalmente 'face').
+
+    Si todas las listas tienen la misma longitud (la del primer registro) se
+    leen como un bloque con np.frombuffer; si no, se recorre registro a registro.
+    """
+    properties = element["properties"]
+    count = element["count"]
+    if not count:
+        return {}, offset
+
+    def fields(lengths: Dict[str, int]) -> List[Tuple]:
+        spec = []
+        for prop in properties:
+            if len(prop) == 3:
+                spec.append((prop[0] + "__n", endian + prop[1]))
+                spec.append((prop[0], endian + prop[2], (lengths[prop[0]],)))
+            else:
+                spec.append((prop[0], endian + prop[1]))
+        return spec
+
+    # Longitud de cada lista en el primer registro.
+    lengths: Dict[str, int] = {}
+    position = offset
+    for prop in properties:
+        if len(prop) == 3:
+            n = int(np.frombuffer(data, dtype=endian + prop[1], count=1, offset=position)[0])
+            lengths[prop[0]] = n
+            position += np.dtype(prop[1]).itemsize + n * np.dtype(prop[2]).itemsize
+        else:
+            position += np.dtype(prop[1]).itemsize
+    dtype = np.dtype(fields(lengths))
+    if offset + count * dtype.itemsize <= len(data):
+        block = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        if all((block[name + "__n"] == n).all() for name, n in lengths.items()):
+            return {name: block[name] for name in lengths}, offset + count * dtype.itemsize
+
+    # Listas de longitud variable: lectura secuencial.
+    values: Dict[str, List[np.ndarray]] = {name: [] for name in lengths}
+    position = offset
+    for _ in range(count):
+        for prop in properties:
+            if len(prop) == 3:
+                n = int(np.frombuffer(data, dtype=endian + prop[1], count=1, offset=position)[0])
+                position += np.dtype(prop[1]).itemsize
+                values[prop[0]].append(np.frombuffer(data, dtype=endian + prop[2], count=n, offset=position))
+                position += n * np.dtype(prop[2]).itemsize
+            else:
+                position += np.dtype(prop[1]).itemsize
+    return {name: np.array(items, dtype=object) for name, items in values.items()}, position
+
+
+def _ply_faces(lists: Dict[str, np.ndarray], source: str) -> np.ndarray:
+    """Triangula la lista de índices de las caras PLY."""
+    key = "vertex_indices" if "vertex_indices" in lists else "vertex_index"
+    if key not in lists:
+        raise ValueError(f"{source}: el elemento 'face' no tiene 'vertex_indices'.")
+    polygons = lists[key]
+    if polygons.dtype != object:
+        return fan_triangulate(polygons.reshape(-1).astype(np.int64), np.full(len(polygons), polygons.shape[1]))
+    counts = np.fromiter((len(polygon) for polygon in polygons), dtype=np.int64, count=len(polygons))
+    indices = np.concatenate([np.asarray(polygon, dtype=np.int64) for polygon in polygons]) if len(polygons) else \
+        np.zeros(0, dtype=np.int64)
+    return fan_triangulate(indices, counts)
+
+
+def parse_ply(data: bytes, source: str = "PLY") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpreta el contenido de un archivo PLY (binario o ASCII).
+
+    Args:
+        data (bytes): Contenido del archivo.
+        source (str): Nombre para los mensajes de error.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (vértices (V, 3), triángulos (N, 3) int64).
+            En binario, los vértices son una vista sobre 'data' cuando el
+            elemento 'vertex' solo contiene x, y, z.
+
+    Raises:
+        ValueError: Si el archivo no es un PLY válido o no tiene vértices y caras.
+    """
+    fmt, elements, offset = parse_ply_header(data)
+    points = None
+    faces = None
+    if fmt == "ascii":
+        numbers = _parse_numbers(data[offset:], np.float64, source=source)
+        position = 0
+        for element in elements:
+            properties = element["properties"]
+            count = element["count"]
+            if not any(len(prop) == 3 for prop in properties):
+                block = numbers[position:position + count * len(properties)].reshape(count, len(properties))
+                position += count * len(properties)
+                if element["name"] == "vertex":
+                    names = [prop[0] for prop in properties]
+                    points = block[:, [names.index(axis) for axis in ("x", "y", "z")]]
+                continue
+            if len(properties) != 1:
+                raise ValueError(f"{source}: elemento '{element['name']}' no soportado en PLY ASCII.")
+            n = int(numbers[position]) if count else 0
+            size = count * (n + 1)
+            if count and position + size <= len(numbers) and (numbers[position:position + size:n + 1] == n).all():
+                # Todas las listas con la misma longitud: un único bloque.
+                lists = {properties[0][0]: numbers[position:position + size].reshape(count, n + 1)[:, 1:].astype(np.int64)}
+                position += size
+            else:
+                polygons = []
+                for _ in range(count):
+                    n = int(numbers[position])
+                    polygons.append(numbers[position + 1:position + 1 + n].astype(np.int64))
+                    position += n + 1
+                lists = {properties[0][0]: np.array(polygons, dtype=object)}
+            if element["name"] == "face":
+                faces = _ply_faces(lists, source)
+    else:
+        endian = "<" if fmt == "binary_little_endian" else ">"
+        for element in elements:
+            properties = element["properties"]
+            if any(len(prop) == 3 for prop in properties):
+                lists, offset = _ply_binary_list_element(data, offset, element, endian)
+                if element["name"] == "face":
+                    faces = _ply_faces(lists, source)
+                continue
+            dtype = np.dtype([(prop[0], endian + prop[1]) for prop in properties])
+            # Vista directa sobre el contenido del archivo, sin copia.
+            block = np.frombuffer(data, dtype=dtype, count=element["count"], offset=offset)
+            offset += element["count"] * dtype.itemsize
+            if element["name"] == "vertex":
+                names = [prop[0] for prop in properties]
+                if names == ["x", "y", "z"] and len({prop[1] for prop in properties}) == 1:
+                    points = block.view((endian + properties[0][1], 3)).reshape(-1, 3)
+                else:
+                    points = np.stack([block["x"], block["y"], block["z"]], axis=-1)
+    if points is None or faces is None:
+        raise ValueError(f"{source}: el PLY no contiene vértices y caras.")
+    if len(faces) and (faces.min() < 0 or faces.max() >= len(points)):
+        raise ValueError(f"{source}: hay caras que apuntan a vértices inexistentes.")
+    return points, faces
+
+
+def read_ply(path: Union[str, Path]) -> mesh.Mesh:
+    """Lee un archivo PLY como mesh.Mesh."""
+    path = Path(path)
+    points, faces = parse_ply(path.read_bytes(), source=path.name)
+    return mesh_from_indexed(points, faces, name=path.stem)
+
+
+# ----------------------------------------------------------------------
+# 3MF
+# ----------------------------------------------------------------------
+def write_3mf(stl_model: mesh.Mesh, file_path: Union[str, Path], binary: bool = True) -> None:
+    """
+    Guarda el modelo como 3MF (malla indexada, unidades en milímetros).
+
+    Los vértices idénticos se sueldan y se descartan los triángulos que
+    quedan degenerados (el formato exige tres vértices distintos). El XML se
+    genera por bloques y se escribe directamente en el ZIP.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo a guardar.
+        file_path (Union[str, Path]): Archivo de destino (.3mf).
+        binary (bool): Sin efecto (3MF siempre es un paquete ZIP); se acepta
+                       por compatibilidad con los escritores de STL.
+    """
+    import zipfile
+
+    from stl_validation import weld_vertices
+
+    points, faces = weld_vertices(stl_model.vectors)
+    keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    faces = faces[keep]
+
+    vertex_fmt = '<vertex x="%.9g" y="%.9g" z="%.9g"/>\n'
+    triangle_fmt = '<triangle v1="%d" v2="%d" v3="%d"/>\n'
+    # Nivel 1: comprimir con el nivel por defecto tarda varias veces más y apenas reduce el tamaño.
+    with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as package:
+        package.writestr("[Content_Types].xml", _3MF_CONTENT_TYPES)
+        package.writestr("_rels/.rels", _3MF_RELS)
+        with package.open("3D/3dmodel.model", "w", force_zip64=True) as model:
+            model.write(
+                b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                b'<model unit="millimeter" xml:lang="en-US" '
+                b'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+                b'<resources>\n<object id="1" type="model">\n<mesh>\n<vertices>\n'
+            )
+            # Un único '%' por bloque: el formateo se hace en C, no fila a fila.
+            for start in range(0, len(points), _3MF_CHUNK):
+                chunk = points[start:start + _3MF_CHUNK].astype(np.float64)
+                model.write(((vertex_fmt * len(chunk)) % tuple(chunk.ravel().tolist())).encode("ascii"))
+            model.write(b"</vertices>\n<triangles>\n")
+            for start in range(0, len(faces), _3MF_CHUNK):
+                chunk = faces[start:start + _3MF_CHUNK]
+                model.write(((triangle_fmt * len(chunk)) % tuple(chunk.ravel().tolist())).encode("ascii"))
+            model.write(b'</triangles>\n</mesh>\n</object>\n</resources>\n<build>\n<item objectid="1"/>\n</build>\n</model>\n')
+
+
+# ----------------------------------------------------------------------
+# Registro
+# ----------------------------------------------------------------------
+def _read_stl(path: Union[str, Path]) -> mesh.Mesh:
+    from stl_parallel_reader import ParallelSTLReader
+
+    return ParallelSTLReader(str(path)).read_mesh()
+
+
+def _write_stl(stl_model: mesh.Mesh, file_path: Union[str, Path], binary: bool = True) -> None:
+    from stl_export import export_mesh
+
+    export_mesh(stl_model, file_path, binary=binary)
+
+
+# Extensión -> función que lee el archivo y retorna un mesh.Mesh.
+READERS: Dict[str, Callable[[Union[str, Path]], mesh.Mesh]] = {
+    ".stl": _read_stl,
+    ".obj": read_obj,
+    ".ply": read_ply,
+}
+
+# Extensión -> función (modelo, ruta, binary) que guarda el modelo.
+WRITERS: Dict[str, Callable[[mesh.Mesh, Union[str, Path], bool], None]] = {
+    ".stl": _write_stl,
+    ".3mf": write_3mf,
+}
+
+
+def register_reader(suffix: str, reader: Callable[[Union[str, Path]], mesh.Mesh]) -> None:
+    """Registra (o reemplaza) el lector de una extensión, por ejemplo '.off'."""
+    READERS[suffix.lower()] = reader
+
+
+def register_writer(suffix: str, writer: Callable[[mesh.Mesh, Union[str, Path], bool], None]) -> None:
+    """Registra (o reemplaza) el escritor de una extensión."""
+    WRITERS[suffix.lower()] = writer
+
+
+def read_model(path: Union[str, Path]) -> mesh.Mesh:
+    """
+    Lee un modelo en cualquiera de los formatos registrados.
+
+    Args:
+        path (Union[str, Path]): Archivo de entrada.
+
+    Returns:
+        mesh.Mesh: Modelo leído.
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe.
+        ValueError: Si la extensión no tiene lector registrado.
+    """
+    path = Path(path)
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Formato de entrada no soportado: '{path.suffix}' (soportados: {', '.join(READERS)})")
+    if not path.exists():
+        raise FileNotFoundError(f"El archivo '{path}' no existe.")
+    return reader(path)
+
+
+def write_model(stl_model: mesh.Mesh, file_path: Union[str, Path], binary: bool = True) -> None:
+    """
+    Guarda un modelo en el formato que indica la extensión de 'file_path'.
+
+    Raises:
+        ValueError: Si la extensión no tiene escritor registrado.
+    """
+    writer = WRITERS.get(Path(file_path).suffix.lower())
+    if writer is None:
+        raise ValueError(
+            f"Formato de salida no soportado: '{Path(file_path).suffix}' (soportados: {', '.join(WRITERS)})"
+        )
+    writer(stl_model, file_path, binary)
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Actualiza 'escaneo.obj' con la ruta real de tu archivo OBJ o PLY.
+    source_file = "escaneo.obj"
+    try:
+        model = read_model(source_file)
+        print(f"{source_file}: {len(model.vectors)} triángulos")
+        write_model(model, Path(source_file).with_suffix(".3mf"))
+        write_model(model, Path(source_file).with_suffix(".stl"))
+    except Exception as e:
+        print("Error al convertir el modelo:", e)
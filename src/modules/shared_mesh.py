@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Módulo: shared_mesh.py
+
+Contenedor de mallas STL sobre memoria compartida (multiprocessing.shared_memory).
+
+Al enviar un modelo a un proceso de un ProcessPoolExecutor, Python serializa
+(pickle) el arreglo completo y el proceso receptor lo vuelve a copiar; con
+mesh.Mesh de numpy-stl esto es especialmente lento. SharedMesh guarda los
+registros de 50 bytes de cada faceta (mismo dtype que mesh.Mesh) en un bloque
+de memoria compartida, de modo que los procesos de lectura, transformación y
+escritura trabajan sobre el mismo búfer y solo intercambian un descriptor
+pequeño (SharedMeshHandle: nombre del bloque, número de facetas y encabezado).
+
+Ciclo de vida:
+  - El proceso que crea el bloque (SharedMesh.create / from_array / from_file)
+    es su propietario y es el único que debe liberarlo con unlink().
+  - Los procesos que se conectan con SharedMesh.attach(handle) solo cierran
+    su proyección con close().
+  - Usado como gestor de contexto ('with'), el bloque se cierra al salir y,
+    si el objeto es el propietario, también se libera. Si el propietario se
+    destruye sin llamar a unlink(), el bloque se libera igualmente.
+  - attach() no registra el bloque en el resource_tracker del proceso
+    trabajador, que de lo contrario lo liberaría al terminar.
+  - close() falla con BufferError mientras existan arreglos que apunten al
+    búfer; to_mesh(copy=True) entrega una copia independiente si el modelo
+    debe sobrevivir al bloque.
+"""
+
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+import numpy as np
+
+from stl_parallel_reader import STL_DTYPE, ParallelSTLReader, split_ranges
+from stl_transform import transform_arrays
+
+# Por debajo de este número de facetas por proceso no compensa repartir una transformación.
+MIN_FACETS_PER_PROCESS = 262_144
+
+# Serializa la desactivación temporal del registro en resource_tracker (Python < 3.13).
+_TRACKER_LOCK = threading.Lock()
+
+
+class SharedMeshHandle(NamedTuple):
+    """Descriptor serializable de un SharedMesh (lo que viaja entre procesos)."""
+
+    name: str
+    count: int
+    header: str = ""
+
+
+def _view(shm: shared_memory.SharedMemory, count: int) -> np.ndarray:
+    """
+    Arreglo estructurado sobre el bloque.
+
+    Se construye sobre el mmap subyacente (y no sobre shm.buf) para que el
+    cierre falle con BufferError mientras existan arreglos vivos, en lugar de
+    desproyectar la memoria bajo ellos.
+    """
+    return np.frombuffer(shm._mmap, dtype=STL_DTYPE, count=count)
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Se conecta a un bloque existente sin registrarlo en resource_tracker.
+
+    En Python < 3.13 conectarse a un bloque también lo registra, y el
+    resource_tracker del proceso trabajador lo liberaría (o avisaría de una
+    fuga) al terminar aunque el propietario siga usándolo.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    with _TRACKER_LOCK:
+        register = resource_tracker.register
+
+        def skip_shared_memory(resource_name: str, rtype: str) -> None:
+            if rtype != "shared_memory":
+                register(resource_name, rtype)
+
+        resource_tracker.register = skip_shared_memory
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _release(shm: shared_memory.SharedMemory, unlink: bool) -> None:
+    """Cierra (y opcionalmente libera) un bloque al destruir un SharedMesh."""
+    try:
+        shm.close()
+    except BufferError:
+        # Aún hay arreglos apuntando al búfer; la proyección se libera con el proceso.
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedMesh:
+    """
+    Malla STL almacenada en un bloque de memoria compartida.
+
+    No se instancia directamente: se usan create(), from_array(), from_mesh(),
+    from_file() (propietario) o attach() (otros procesos).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, count: int, header: str, owner: bool) -> None:
+        self._shm: Optional[shared_memory.SharedMemory] = shm
+        self.count = count
+        self.header = header
+        self.owner = owner
+        self._data: Optional[np.ndarray] = _view(shm, count)
+
+    # --- Construcción -----------------------------------------------------
+
+    @classmethod
+    def create(cls, count: int, header: str = "") -> "SharedMesh":
+        """
+        Reserva un bloque para 'count' facetas (contenido sin inicializar).
+
+        Raises:
+            ValueError: Si el número de facetas es negativo.
+        """
+        if count < 0:
+            raise ValueError("El número de facetas no puede ser negativo.")
+        # SharedMemory no admite bloques de tamaño cero.
+        shm = shared_memory.SharedMemory(create=True, size=max(1, count * STL_DTYPE.itemsize))
+        return cls(shm, count, header, owner=True)
+
+    @classmethod
+    def from_array(cls, data: np.ndarray, header: str = "") -> "SharedMesh":
+        """Copia un arreglo estructurado (dtype de mesh.Mesh) a un bloque nuevo."""
+        data = np.asarray(data)
+        if data.dtype != STL_DTYPE:
+            raise ValueError("El arreglo debe tener el dtype de mesh.Mesh (normals, vectors, attr).")
+        shared = cls.create(len(data), header)
+        shared.data[...] = data
+        return shared
+
+    @classmethod
+    def from_mesh(cls, stl_model: Any) -> "SharedMesh":
+        """Copia un modelo mesh.Mesh a un bloque nuevo."""
+        name = stl_model.name
+        if isinstance(name, bytes):
+            name = name.decode("utf-8", errors="ignore")
+        return cls.from_array(stl_model.data, header=str(name or ""))
+
+    @classmethod
+    def from_file(cls, file_path: Union[str, Path], workers: Optional[int] = None) -> "SharedMesh":
+        """
+        Lee un archivo STL directamente sobre memoria compartida.
+
+        En archivos binarios los hilos de ParallelSTLReader escriben en el
+        bloque sin arreglo intermedio; en ASCII se copia el resultado una vez.
+        """
+        created = []
+
+        def allocate(count: int) -> np.ndarray:
+            created.append(cls.create(count))
+            return created[-1].data
+
+        try:
+            header, _ = ParallelSTLReader(str(file_path), workers=workers).read_array(allocate=allocate)
+        except BaseException:
+            for shared in created:
+                shared.unlink()
+            raise
+        shared = created[0]
+        shared.header = header
+        return shared
+
+    @classmethod
+    def attach(cls, handle: SharedMeshHandle) -> "SharedMesh":
+        """Se conecta a un bloque existente a partir de su descriptor."""
+        shm = _attach_untracked(handle.name)
+        return cls(shm, handle.count, handle.header, owner=False)
+
+    # --- Acceso -----------------------------------------------------------
+
+    @property
+    def data(self) -> np.ndarray:
+        """Arreglo estructurado sobre el búfer compartido (sin copia)."""
+        if self._data is None:
+            raise ValueError("El bloque de memoria compartida ya está cerrado.")
+        return self._data
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.data["vectors"]
+
+    @property
+    def normals(self) -> np.ndarray:
+        return self.data["normals"]
+
+    @property
+    def handle(self) -> SharedMeshHandle:
+        """Descriptor que se envía a otros procesos."""
+        if self._shm is None:
+            raise ValueError("El bloque de memoria compartida ya está cerrado.")
+        return SharedMeshHandle(self._shm.name, self.count, self.header)
+
+    def to_mesh(self, copy: bool = False):
+        """
+        Retorna un mesh.Mesh sobre el bloque.
+
+        Args:
+            copy (bool): Si True, el modelo usa una copia y puede sobrevivir al bloque.
+        """
+        from stl import mesh
+
+        data = self.data.copy() if copy else self.data
+        return mesh.Mesh(data, calculate_normals=False, name=self.header)
+
+    # --- Ciclo de vida ----------------------------------------------------
+
+    def close(self) -> None:
+        """
+        Cierra la proyección del bloque en este proceso.
+
+        Raises:
+            BufferError: Si aún existen arreglos que apuntan al búfer.
+        """
+        if self._shm is None:
+            return
+        self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            self._data = _view(self._shm, self.count)
+            raise BufferError(
+                "No se puede cerrar el bloque: aún hay arreglos que lo referencian "
+                "(usa to_mesh(copy=True) si el modelo debe conservarse)."
+            ) from None
+        self._shm = None
+
+    def unlink(self) -> None:
+        """
+        Cierra y libera el bloque. Solo debe llamarlo el propietario.
+
+        Raises:
+            PermissionError: Si el objeto no es el propietario del bloque.
+        """
+        if not self.owner:
+            raise PermissionError("Solo el proceso propietario puede liberar el bloque compartido.")
+        shm = self._shm
+        try:
+            self.close()
+        finally:
+            if shm is not None:
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def __enter__(self) -> "SharedMesh":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __del__(self) -> None:
+        # Red de seguridad: el propietario que no llamó a unlink() libera el bloque.
+        shm = getattr(self, "_shm", None)
+        if shm is not None:
+            self._data = None
+            _release(shm, self.owner)
+
+
+def _transform_block(handle: SharedMeshHandle, matrix: np.ndarray, start: int, end: int) -> None:
+    """Trabajo de un proceso: transforma en el sitio las facetas [start, end)."""
+    shared = SharedMesh.attach(handle)
+    try:
+        block = shared.data[start:end]
+        transform_arrays(block["vectors"], block["normals"], matrix)
+        del block
+    finally:
+        shared.close()
+
+
+def transform_shared(
+    shared: SharedMesh,
+    matrix: np.ndarray,
+    executor: Optional[ProcessPoolExecutor] = None,
+    workers: Optional[int] = None,
+) -> None:
+    """
+    Aplica una matriz 4x4 en el sitio sobre un SharedMesh repartiendo las
+    facetas entre procesos. Solo viaja el descriptor, nunca los vértices.
+
+    Args:
+        shared (SharedMesh): Malla compartida.
+        matrix (np.ndarray): Matriz homogénea 4x4 (ver stl_transform.compose()).
+        executor (Optional[ProcessPoolExecutor]): Conjunto de procesos existente.
+        workers (Optional[int]): Procesos a usar. Por defecto, os.cpu_count().
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    ranges = split_ranges(shared.count, workers or os.cpu_count() or 1, MIN_FACETS_PER_PROCESS)
+    if len(ranges) <= 1 and executor is None:
+        transform_arrays(shared.vectors, shared.normals, matrix)
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=len(ranges))
+    try:
+        handle = shared.handle
+        futures = [executor.submit(_transform_block, handle, matrix, start, end) for start, end in ranges]
+        for future in futures:
+            future.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def _write_block(handle: SharedMeshHandle, file_path: str, binary: bool) -> str:
+    """Trabajo de un proceso: exporta la malla compartida a disco."""
+    from stl_export import export_mesh
+
+    shared = SharedMesh.attach(handle)
+    try:
+        model = shared.to_mesh()
+        export_mesh(model, file_path, binary=binary)
+        del model
+    finally:
+        shared.close()
+    return file_path
+
+
+def write_shared(
+    shared: SharedMesh,
+    file_path: Union[str, Path],
+    binary: bool = True,
+    executor: Optional[ProcessPoolExecutor] = None,
+):
+    """
+    Exporta un SharedMesh; con 'executor', la escritura ocurre en otro proceso
+    y se retorna el Future correspondiente.
+    """
+    if executor is None:
+        return _write_block(shared.handle, str(file_path), binary)
+    return executor.submit(_write_block, shared.handle, str(file_path), binary)
+
+
+# --- Comparación con pickle ------------------------------------------------
+
+def _scale_pickled(stl_model: Any, factor: float) -> Any:
+    """Trabajo de referencia: recibe el modelo serializado y lo retorna escalado."""
+    stl_model.vectors *= factor
+    return stl_model
+
+
+def _scale_shared(handle: SharedMeshHandle, factor: float) -> None:
+    """Trabajo equivalente sobre memoria compartida: escala en el sitio."""
+    shared = SharedMesh.attach(handle)
+    try:
+        shared.vectors[...] *= factor
+    finally:
+        shared.close()
+
+
+def benchmark(facets: int = 1_000_000, repeats: int = 3) -> Dict[str, float]:
+    """
+    Compara enviar un mesh.Mesh a un proceso (pickle de ida y vuelta) con
+    enviar solo el descriptor de un SharedMesh.
+
+    Returns:
+        Dict[str, float]: Tiempos medios en segundos y tamaño serializado en MB.
+    """
+    from stl import mesh
+
+    rng = np.random.default_rng(0)
+    data = np.zeros(facets, dtype=STL_DTYPE)
+    data["vectors"] = rng.random((facets, 3, 3), dtype=np.float32)
+    model = mesh.Mesh(data, calculate_normals=False)
+
+    results: Dict[str, float] = {}
+    start = time.perf_counter()
+    payload = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    results["pickle_dumps_s"] = time.perf_counter() - start
+    results["pickle_mb"] = len(payload) / 1e6
+    start = time.perf_counter()
+    pickle.loads(payload)
+    results["pickle_loads_s"] = time.perf_counter() - start
+    del payload
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(int).result()  # Arranque del proceso fuera de la medición.
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model = pool.submit(_scale_pickled, model, 1.0).result()
+        results["pickle_roundtrip_s"] = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        shared = SharedMesh.from_mesh(model)
+        results["shared_create_s"] = time.perf_counter() - start
+        with shared:
+            handle = shared.handle
+            start = time.perf_counter()
+            for _ in range(repeats):
+                pool.submit(_scale_shared, handle, 1.0).result()
+            results["shared_roundtrip_s"] = (time.perf_counter() - start) / repeats
+    return results
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    timings = benchmark(n)
+    print(f"Facetas: {n:,}")
+    print(f"pickle.dumps: {timings['pickle_dumps_s']:.3f} s ({timings['pickle_mb']:.1f} MB)")
+    print(f"pickle.loads: {timings['pickle_loads_s']:.3f} s")
+    print(f"Ida y vuelta con pickle:   {timings['pickle_roundtrip_s']:.3f} s")
+    print(f"Copia a memoria compartida: {timings['shared_create_s']:.3f} s (una sola vez)")
+    print(f"Ida y vuelta compartida:   {timings['shared_roundtrip_s']:.3f} s")
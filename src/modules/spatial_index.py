@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+"""
+Módulo: spatial_index.py
+
+Índice espacial (BVH) sobre los triángulos de un modelo STL para consultas
+rápidas sin recorrer todas las facetas:
+
+  - ray_cast(): intersección de lotes de rayos con la superficie (selección
+    en el visor, medidas de grosor, etc.).
+  - closest_point(): punto de la superficie más cercano a cada punto de un
+    lote (distancias punto-superficie).
+  - query_aabb() / overlaps(): triángulos cuyas cajas envolventes se solapan
+    con cajas dadas o con los triángulos de otro índice (detección de
+    choques entre una figura escalada y su base).
+
+Construcción (vectorizada, sin bucles por triángulo):
+  1. Los triángulos se ordenan por el código de Morton de su centroide, de
+     modo que triángulos cercanos quedan contiguos.
+  2. Se agrupan en hojas de 'leaf_size' triángulos consecutivos.
+  3. Las cajas de las hojas se combinan por pares, nivel a nivel, formando un
+     árbol binario completo guardado como montículo (heap): el nodo i tiene
+     como hijos 2i+1 y 2i+2.
+
+Las consultas recorren el árbol nivel a nivel para todo el lote a la vez:
+cada nivel es una única operación NumPy sobre los pares (consulta, nodo)
+que siguen activos. En closest_point() cada punto desciende primero por el
+hijo más cercano hasta una hoja para obtener una cota superior ajustada, y
+después se descartan los nodos cuya distancia mínima supera esa cota.
+
+Los índices devueltos corresponden siempre al orden original de las facetas
+(modelo.vectors). El índice puede guardarse junto al modelo (save / load /
+cached_index) y escalarse en el sitio cuando el modelo se reescala.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Triángulos por hoja del árbol.
+DEFAULT_LEAF_SIZE = 8
+
+# Consultas procesadas a la vez; limita la memoria de los pares (consulta, nodo).
+DEFAULT_BATCH_SIZE = 4096
+
+# Bits por eje del código de Morton (3 x 21 = 63 bits).
+_MORTON_BITS = 21
+
+# Versión del formato guardado por save().
+_FORMAT_VERSION = 1
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Intercala dos ceros entre los 21 bits bajos de cada valor (Morton 3D)."""
+    x = values.astype(np.uint64) & np.uint64(0x1FFFFF)
+    x = (x | (x << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return x
+
+
+def morton_codes(points: np.ndarray) -> np.ndarray:
+    """
+    Calcula el código de Morton de cada punto dentro de la caja del conjunto.
+
+    Args:
+        points (np.ndarray): Arreglo (N, 3).
+
+    Returns:
+        np.ndarray: Códigos uint64 (N,).
+    """
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    low = points.min(axis=0)
+    extent = points.max(axis=0) - low
+    extent[extent == 0] = 1.0
+    cells = (1 << _MORTON_BITS) - 1
+    grid = ((points - low) / extent * cells).astype(np.int64)
+    return (
+        _spread_bits(grid[:, 0])
+        | (_spread_bits(grid[:, 1]) << np.uint64(1))
+        | (_spread_bits(grid[:, 2]) << np.uint64(2))
+    )
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.einsum("ij,ij->i", a, b)
+
+
+def closest_points_on_triangles(
+    points: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    c: np.ndarray,
+) -> np.ndarray:
+    """
+    Punto más cercano de cada triángulo (a, b, c) a cada punto (por filas).
+
+    Implementa la clasificación por regiones de Voronoi (vértices, aristas e
+    interior) de forma vectorizada.
+
+    Args:
+        points, a, b, c (np.ndarray): Arreglos (M, 3).
+
+    Returns:
+        np.ndarray: Arreglo (M, 3) con los puntos más cercanos.
+    """
+    ab, ac = b - a, c - a
+    ap, bp, cp = points - a, points - b, points - c
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    d3, d4 = _dot(ab, bp), _dot(ac, bp)
+    d5, d6 = _dot(ab, cp), _dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Interior de la cara.
+        denom = va + vb + vc
+        v = vb / denom
+        w = vc / denom
+        result = a + ab * v[:, None] + ac * w[:, None]
+
+        # Las regiones se aplican de menor a mayor prioridad.
+        region = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        t = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        result[region] = (b + (c - b) * t[:, None])[region]
+
+        region = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        t = d2 / (d2 - d6)
+        result[region] = (a + ac * t[:, None])[region]
+
+        region = (d6 >= 0) & (d5 <= d6)
+        result[region] = c[region]
+
+        region = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        t = d1 / (d1 - d3)
+        result[region] = (a + ab * t[:, None])[region]
+
+        region = (d3 >= 0) & (d4 <= d3)
+        result[region] = b[region]
+
+        region = (d1 <= 0) & (d2 <= 0)
+        result[region] = a[region]
+
+    # Triángulos degenerados sin región válida: se usa el vértice más cercano.
+    bad = ~np.isfinite(result).all(axis=1)
+    if bad.any():
+        corners = np.stack([a[bad], b[bad], c[bad]], axis=1)
+        nearest = np.argmin(((corners - points[bad][:, None]) ** 2).sum(axis=2), axis=1)
+        result[bad] = corners[np.arange(len(nearest)), nearest]
+    return result
+
+
+def _first_per_group(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Posiciones del menor 'values' de cada grupo (grupos en cualquier orden)."""
+    order = np.lexsort((values, groups))
+    sorted_groups = groups[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    return order[first]
+
+
+def _group_starts(groups: np.ndarray) -> np.ndarray:
+    """Inicio de cada tramo de valores iguales en un arreglo ordenado."""
+    starts = np.ones(len(groups), dtype=bool)
+    starts[1:] = groups[1:] != groups[:-1]
+    return np.flatnonzero(starts)
+
+
+class SpatialIndex:
+    """
+    Jerarquía de cajas envolventes (BVH) sobre los triángulos de un modelo.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta
+                              (por ejemplo, modelo.vectors).
+        leaf_size (int): Triángulos por hoja.
+    """
+
+    def __init__(self, vectors: np.ndarray, leaf_size: int = DEFAULT_LEAF_SIZE) -> None:
+        if leaf_size <= 0:
+            raise ValueError("El tamaño de hoja debe ser mayor que cero.")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 3 or vectors.shape[1:] != (3, 3):
+            raise ValueError("Se esperaba un arreglo (N, 3, 3) de facetas.")
+
+        self.leaf_size = int(leaf_size)
+        self.order = np.argsort(morton_codes(vectors.mean(axis=1)), kind="stable")
+        self.triangles = np.ascontiguousarray(vectors[self.order])
+        self._build_boxes()
+
+    # --- Construcción -----------------------------------------------------
+
+    def _build_boxes(self) -> None:
+        """Calcula las cajas de triángulos, hojas y niveles superiores."""
+        self.tri_lo = self.triangles.min(axis=1)
+        self.tri_hi = self.triangles.max(axis=1)
+
+        count = len(self.triangles)
+        self.leaf_count = -(-count // self.leaf_size)
+        self.depth = int(np.ceil(np.log2(self.leaf_count))) if self.leaf_count > 1 else 0
+        width = 1 << self.depth
+
+        # Las hojas de relleno tienen cajas vacías (lo = +inf, hi = -inf).
+        leaf_lo = np.full((width, 3), np.inf, dtype=np.float32)
+        leaf_hi = np.full((width, 3), -np.inf, dtype=np.float32)
+        if count:
+            starts = np.arange(0, count, self.leaf_size)
+            leaf_lo[:self.leaf_count] = np.minimum.reduceat(self.tri_lo, starts, axis=0)
+            leaf_hi[:self.leaf_count] = np.maximum.reduceat(self.tri_hi, starts, axis=0)
+
+        self.box_lo = np.empty((2 * width - 1, 3), dtype=np.float32)
+        self.box_hi = np.empty((2 * width - 1, 3), dtype=np.float32)
+        self.box_lo[width - 1:] = leaf_lo
+        self.box_hi[width - 1:] = leaf_hi
+        for level in range(self.depth - 1, -1, -1):
+            first, size = (1 << level) - 1, 1 << level
+            children = slice(2 * first + 1, 2 * first + 1 + 2 * size)
+            self.box_lo[first:first + size] = self.box_lo[children].reshape(size, 2, 3).min(axis=1)
+            self.box_hi[first:first + size] = self.box_hi[children].reshape(size, 2, 3).max(axis=1)
+
+    def _real_nodes(self, level: int) -> int:
+        """Número de nodos con triángulos en un nivel (el resto es relleno)."""
+        return -(-self.leaf_count // (1 << (self.depth - level)))
+
+    # --- Recorrido --------------------------------------------------------
+
+    def _traverse(self, count: int, test, prune=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recorre el árbol nivel a nivel para 'count' consultas.
+
+        Args:
+            count (int): Número de consultas del lote.
+            test: Función (consultas, lo, hi) -> máscara de cajas aceptadas.
+            prune: Función opcional (consultas, nodos, nivel, lo, hi) -> máscara
+                   adicional, con las consultas ordenadas (para cotas por consulta).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Pares (consulta, triángulo reordenado)
+            candidatos, con las consultas en orden ascendente.
+        """
+        if count == 0 or self.leaf_count == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        queries = np.arange(count)
+        nodes = np.zeros(count, dtype=np.int64)
+        for level in range(self.depth + 1):
+            first = (1 << level) - 1
+            lo, hi = self.box_lo[first + nodes], self.box_hi[first + nodes]
+            keep = (nodes < self._real_nodes(level)) & test(queries, lo, hi)
+            queries, nodes = queries[keep], nodes[keep]
+            if prune is not None and len(queries):
+                keep = prune(queries, nodes, level, lo[keep], hi[keep])
+                queries, nodes = queries[keep], nodes[keep]
+            if level < self.depth:
+                queries = np.repeat(queries, 2)
+                nodes = (nodes[:, None] * 2 + np.array([0, 1])).ravel()
+
+        # Expandir cada hoja a sus triángulos.
+        triangles = (nodes[:, None] * self.leaf_size + np.arange(self.leaf_size)).ravel()
+        queries = np.repeat(queries, self.leaf_size)
+        valid = triangles < len(self.triangles)
+        return queries[valid], triangles[valid]
+
+    def _descend(self, points: np.ndarray) -> np.ndarray:
+        """
+        Desciende por el hijo más cercano hasta una hoja para cada punto y
+        retorna la distancia al cuadrado al triángulo más cercano de esa hoja:
+        una cota superior ajustada para podar closest_point().
+        """
+        nodes = np.zeros(len(points), dtype=np.int64)
+        for level in range(1, self.depth + 1):
+            first = (1 << level) - 1
+            children = nodes[:, None] * 2 + np.array([0, 1])
+            lo, hi = self.box_lo[first + children], self.box_hi[first + children]
+            gap = np.maximum(np.maximum(lo - points[:, None], points[:, None] - hi), 0.0)
+            near = (gap ** 2).sum(axis=2)
+            near[children >= self._real_nodes(level)] = np.inf
+            nodes = children[np.arange(len(points)), np.argmin(near, axis=1)]
+
+        triangles = nodes[:, None] * self.leaf_size + np.arange(self.leaf_size)
+        triangles = np.minimum(triangles, len(self.triangles) - 1).ravel()
+        repeated = np.repeat(points, self.leaf_size, axis=0)
+        v = self.triangles[triangles].astype(np.float64)
+        closest = closest_points_on_triangles(repeated, v[:, 0], v[:, 1], v[:, 2])
+        return ((closest - repeated) ** 2).sum(axis=1).reshape(-1, self.leaf_size).min(axis=1)
+
+    @staticmethod
+    def _batches(count: int, batch_size: int):
+        for start in range(0, count, batch_size):
+            yield start, min(start + batch_size, count)
+
+    # --- Consultas --------------------------------------------------------
+
+    def ray_cast(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        max_distance: float = np.inf,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Intersecta un lote de rayos con la superficie (primer impacto).
+
+        Args:
+            origins (np.ndarray): Orígenes (M, 3) o (3,).
+            directions (np.ndarray): Direcciones (M, 3) o (3,); no es necesario
+                                     normalizarlas.
+            max_distance (float): Distancia máxima a lo largo de cada rayo, en
+                                  unidades de la dirección normalizada.
+            batch_size (int): Rayos procesados a la vez.
+
+        Returns:
+            Dict[str, np.ndarray]: {
+                'hit': bool (M,),
+                'distance': float (M,) (inf si no hay impacto),
+                'triangle': int (M,) índice original de la faceta (-1 sin impacto),
+                'point': float (M, 3) punto de impacto (nan sin impacto)
+            }
+        """
+        origins = np.atleast_2d(np.asarray(origins, dtype=np.float64))
+        directions = np.atleast_2d(np.asarray(directions, dtype=np.float64))
+        origins, directions = np.broadcast_arrays(origins, directions)
+        lengths = np.linalg.norm(directions, axis=1, keepdims=True)
+        if np.any(lengths == 0):
+            raise ValueError("Las direcciones de los rayos no pueden ser nulas.")
+        directions = directions / lengths
+
+        count = len(origins)
+        distance = np.full(count, np.inf)
+        triangle = np.full(count, -1, dtype=np.int64)
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / directions
+
+        for start, end in self._batches(count, batch_size):
+            o, d, inv = origins[start:end], directions[start:end], inverse[start:end]
+
+            def test(q, lo, hi):
+                with np.errstate(invalid="ignore"):
+                    t1 = (lo - o[q]) * inv[q]
+                    t2 = (hi - o[q]) * inv[q]
+                # fmin/fmax ignoran los NaN de 0 * inf (rayo paralelo en el borde).
+                t_near = np.fmax.reduce(np.fmin(t1, t2), axis=1)
+                t_far = np.fmin.reduce(np.fmax(t1, t2), axis=1)
+                return (t_far >= np.maximum(t_near, 0.0)) & (t_near <= max_distance)
+
+            q, tri = self._traverse(end - start, test)
+            if not len(q):
+                continue
+
+            # Möller-Trumbore sobre los pares candidatos.
+            v0 = self.triangles[tri, 0].astype(np.float64)
+            e1 = self.triangles[tri, 1] - v0
+            e2 = self.triangles[tri, 2] - v0
+            dq = d[q]
+            p = np.cross(dq, e2)
+            det = _dot(e1, p)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                inv_det = 1.0 / det
+                s = o[q] - v0
+                u = _dot(s, p) * inv_det
+                qv = np.cross(s, e1)
+                v = _dot(dq, qv) * inv_det
+                t = _dot(e2, qv) * inv_det
+            eps = 1e-12 * max(1.0, float(np.abs(v0).max()))
+            with np.errstate(invalid="ignore"):
+                hit = (np.abs(det) > 1e-18) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > eps) & (t <= max_distance)
+            if not hit.any():
+                continue
+
+            q, tri, t = q[hit], tri[hit], t[hit]
+            best = _first_per_group(q, t)
+            distance[start + q[best]] = t[best]
+            triangle[start + q[best]] = self.order[tri[best]]
+
+        hit = triangle >= 0
+        point = np.full((count, 3), np.nan)
+        point[hit] = origins[hit] + directions[hit] * distance[hit, None]
+        return {"hit": hit, "distance": distance, "triangle": triangle, "point": point}
+
+    def closest_point(
+        self,
+        points: np.ndarray,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Punto de la superficie más cercano a cada punto de un lote.
+
+        Args:
+            points (np.ndarray): Puntos (M, 3) o (3,).
+            batch_size (int): Puntos procesados a la vez.
+
+        Returns:
+            Dict[str, np.ndarray]: {
+                'distance': float (M,),
+                'triangle': int (M,) índice original de la faceta,
+                'point': float (M, 3) punto más cercano sobre la superficie
+            }
+
+        Raises:
+            ValueError: Si el índice no contiene triángulos.
+        """
+        if not len(self.triangles):
+            raise ValueError("El índice no contiene triángulos.")
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        count = len(points)
+        distance = np.full(count, np.inf)
+        triangle = np.full(count, -1, dtype=np.int64)
+        closest = np.full((count, 3), np.nan)
+
+        for start, end in self._batches(count, batch_size):
+            p = points[start:end]
+            initial = self._descend(p)
+
+            def prune(q, nodes, level, lo, hi):
+                pq = p[q]
+                near = (np.maximum(np.maximum(lo - pq, pq - hi), 0.0) ** 2).sum(axis=1)
+                # El primer vértice de cada nodo está sobre la superficie, así que
+                # su distancia es una cota superior de la distancia buscada.
+                first = np.minimum((nodes << (self.depth - level)) * self.leaf_size, len(self.triangles) - 1)
+                far = ((self.triangles[first, 0] - pq) ** 2).sum(axis=1)
+                starts = _group_starts(q)
+                bound = np.minimum(np.minimum.reduceat(far, starts), initial[q[starts]])
+                return near <= np.repeat(bound, np.diff(np.append(starts, len(q))))
+
+            q, tri = self._traverse(end - start, lambda q, lo, hi: np.ones(len(q), dtype=bool), prune)
+            v = self.triangles[tri].astype(np.float64)
+            candidates = closest_points_on_triangles(p[q], v[:, 0], v[:, 1], v[:, 2])
+            d2 = ((candidates - p[q]) ** 2).sum(axis=1)
+            best = _first_per_group(q, d2)
+            rows = start + q[best]
+            distance[rows] = np.sqrt(d2[best])
+            triangle[rows] = self.order[tri[best]]
+            closest[rows] = candidates[best]
+
+        return {"distance": distance, "triangle": triangle, "point": closest}
+
+    def _query_boxes(self, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pares (caja, triángulo reordenado) cuyas cajas se solapan."""
+
+        def test(q, node_lo, node_hi):
+            return np.all((node_lo <= hi[q]) & (node_hi >= lo[q]), axis=1)
+
+        q, tri = self._traverse(len(lo), test)
+        keep = np.all((self.tri_lo[tri] <= hi[q]) & (self.tri_hi[tri] >= lo[q]), axis=1)
+        return q[keep], tri[keep]
+
+    def query_aabb(
+        self,
+        lows: np.ndarray,
+        highs: np.ndarray,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Triángulos cuya caja envolvente se solapa con cada caja consultada.
+
+        Args:
+            lows (np.ndarray): Esquinas mínimas (M, 3) o (3,).
+            highs (np.ndarray): Esquinas máximas (M, 3) o (3,).
+            batch_size (int): Cajas procesadas a la vez.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (índice de caja, índice original de
+                                           faceta) por cada solapamiento.
+        """
+        lows = np.atleast_2d(np.asarray(lows, dtype=np.float32))
+        highs = np.atleast_2d(np.asarray(highs, dtype=np.float32))
+        boxes: List[np.ndarray] = []
+        triangles: List[np.ndarray] = []
+        for start, end in self._batches(len(lows), batch_size):
+            q, tri = self._query_boxes(lows[start:end], highs[start:end])
+            boxes.append(q + start)
+            triangles.append(self.order[tri])
+        if not boxes:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(boxes), np.concatenate(triangles)
+
+    def overlaps(
+        self,
+        other: "SpatialIndex",
+        tolerance: float = 0.0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares de facetas de este índice y de 'other' cuyas cajas se solapan.
+
+        Es la fase amplia de una detección de choques: las hojas de 'other' se
+        consultan contra este árbol y solo los pares supervivientes se
+        comparan triángulo a triángulo.
+
+        Args:
+            other (SpatialIndex): Índice del segundo modelo.
+            tolerance (float): Holgura añadida a las cajas (separación mínima).
+            batch_size (int): Hojas de 'other' procesadas a la vez.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (facetas de este índice, facetas de
+                                           'other'), en índices originales.
+        """
+        width = 1 << other.depth
+        leaf_lo = other.box_lo[width - 1:width - 1 + other.leaf_count] - tolerance
+        leaf_hi = other.box_hi[width - 1:width - 1 + other.leaf_count] + tolerance
+        mine: List[np.ndarray] = []
+        theirs: List[np.ndarray] = []
+        for start, end in self._batches(other.leaf_count, batch_size):
+            leaf, tri = self._query_boxes(leaf_lo[start:end], leaf_hi[start:end])
+            # Expandir cada hoja de 'other' a sus triángulos y comparar cajas.
+            other_tri = ((leaf + start)[:, None] * other.leaf_size + np.arange(other.leaf_size)).ravel()
+            tri = np.repeat(tri, other.leaf_size)
+            valid = other_tri < len(other.triangles)
+            other_tri, tri = other_tri[valid], tri[valid]
+            keep = np.all(
+                (self.tri_lo[tri] <= other.tri_hi[other_tri] + tolerance)
+                & (self.tri_hi[tri] >= other.tri_lo[other_tri] - tolerance),
+                axis=1,
+            )
+            mine.append(self.order[tri[keep]])
+            theirs.append(other.order[other_tri[keep]])
+        if not mine:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(mine), np.concatenate(theirs)
+
+    # --- Mantenimiento ----------------------------------------------------
+
+    @property
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Caja envolvente de todo el modelo (mínimo, máximo)."""
+        return self.box_lo[0].copy(), self.box_hi[0].copy()
+
+    def scale(self, fx: float, fy: Optional[float] = None, fz: Optional[float] = None) -> None:
+        """
+        Escala el índice en el sitio (mismo convenio que stl_transform.scale_matrix).
+
+        Un escalado positivo por ejes conserva el orden de las coordenadas, por
+        lo que basta con escalar vértices y cajas sin reconstruir el árbol.
+
+        Raises:
+            ValueError: Si algún factor no es positivo.
+        """
+        factors = np.array([fx, fx if fy is None else fy, fx if fz is None else fz], dtype=np.float32)
+        if np.any(factors <= 0):
+            raise ValueError("Los factores de escala deben ser mayores que cero.")
+        self.triangles *= factors
+        for boxes in (self.tri_lo, self.tri_hi, self.box_lo, self.box_hi):
+            boxes *= factors
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+    # --- Persistencia -----------------------------------------------------
+
+    def save(self, path: Union[str, Path], **metadata: Any) -> Path:
+        """
+        Guarda el índice en un archivo .npz (sin compresión, carga inmediata).
+
+        Args:
+            path (Union[str, Path]): Archivo de destino.
+            **metadata: Valores escalares adicionales (por ejemplo, el hash del STL).
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                version=_FORMAT_VERSION,
+                leaf_size=self.leaf_size,
+                order=self.order,
+                triangles=self.triangles,
+                box_lo=self.box_lo,
+                box_hi=self.box_hi,
+                **{f"meta_{key}": value for key, value in metadata.items()},
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SpatialIndex":
+        """
+        Carga un índice guardado con save().
+
+        Raises:
+            ValueError: Si el archivo tiene un formato distinto.
+        """
+        with np.load(str(path)) as data:
+            if int(data["version"]) != _FORMAT_VERSION:
+                raise ValueError(f"Formato de índice no compatible: {path}")
+            index = cls.__new__(cls)
+            index.leaf_size = int(data["leaf_size"])
+            index.order = data["order"]
+            index.triangles = data["triangles"]
+            index.tri_lo = index.triangles.min(axis=1)
+            index.tri_hi = index.triangles.max(axis=1)
+            index.leaf_count = -(-len(index.triangles) // index.leaf_size)
+            index.depth = int(np.ceil(np.log2(index.leaf_count))) if index.leaf_count > 1 else 0
+            index.box_lo = data["box_lo"]
+            index.box_hi = data["box_hi"]
+            index.metadata = {key[5:]: data[key].item() for key in data.files if key.startswith("meta_")}
+        return index
+
+
+def cached_index(
+    stl_path: Union[str, Path],
+    cache_dir: Union[str, Path],
+    vectors: Optional[np.ndarray] = None,
+    leaf_size: int = DEFAULT_LEAF_SIZE,
+) -> SpatialIndex:
+    """
+    Obtiene el índice de un archivo STL desde la caché o lo construye.
+
+    La clave de la caché es el hash SHA-256 del contenido del archivo, así que
+    un archivo modificado (o renombrado) nunca reutiliza un índice obsoleto.
+
+    Args:
+        stl_path (Union[str, Path]): Archivo STL de origen.
+        cache_dir (Union[str, Path]): Carpeta de la caché.
+        vectors (Optional[np.ndarray]): Facetas ya leídas del archivo; si es
+                                        None y no hay caché, se lee el archivo.
+        leaf_size (int): Triángulos por hoja.
+
+    Returns:
+        SpatialIndex: Índice del modelo tal como está en disco.
+    """
+    from utils import file_sha256
+
+    digest = file_sha256(stl_path)
+    target = Path(cache_dir) / f"{digest}_L{leaf_size}.bvh.npz"
+    if target.exists():
+        try:
+            return SpatialIndex.load(target)
+        except (OSError, ValueError, KeyError):
+            pass  # Caché dañada o de otra versión: se reconstruye.
+
+    if vectors is None:
+        from stl_parallel_reader import ParallelSTLReader
+
+        vectors = ParallelSTLReader(str(stl_path)).read_mesh().vectors
+    index = SpatialIndex(vectors, leaf_size=leaf_size)
+    index.save(target, sha256=digest)
+    return index
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import time
+
+    # Esfera teselada de ~200k triángulos como modelo de prueba.
+    from stl import mesh
+
+    n = 320
+    theta, phi = np.meshgrid(np.linspace(0, np.pi, n), np.linspace(0, 2 * np.pi, n), indexing="ij")
+    grid = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1) * 50
+    a, b, c, d = grid[:-1, :-1], grid[1:, :-1], grid[1:, 1:], grid[:-1, 1:]
+    facets = np.concatenate([np.stack([a, b, c], axis=2), np.stack([a, c, d], axis=2)]).reshape(-1, 3, 3)
+    model = mesh.Mesh(np.zeros(len(facets), dtype=mesh.Mesh.dtype))
+    model.vectors[:] = facets
+
+    start = time.perf_counter()
+    index = SpatialIndex(model.vectors)
+    print(f"Índice de {len(index):,} triángulos en {time.perf_counter() - start:.2f} s")
+
+    rng = np.random.default_rng(0)
+    origins = rng.normal(size=(10_000, 3)) * 200
+    start = time.perf_counter()
+    rays = index.ray_cast(origins, -origins)
+    print(f"10.000 rayos en {time.perf_counter() - start:.2f} s, impactos: {rays['hit'].sum()}")
+
+    # Puntos a menos de 5 mm de la superficie (comprobación de holguras).
+    directions = rng.normal(size=(10_000, 3))
+    probes = directions / np.linalg.norm(directions, axis=1, keepdims=True) * rng.uniform(45, 55, size=(10_000, 1))
+    start = time.perf_counter()
+    nearest = index.closest_point(probes)
+    print(f"10.000 puntos más cercanos en {time.perf_counter() - start:.2f} s")
+    radial = np.abs(np.linalg.norm(probes, axis=1) - 50)
+    print(f"Error máximo frente al radio: {np.abs(nearest['distance'] - radial).max():.3f} mm")
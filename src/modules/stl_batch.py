@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_batch.py
+
+Este módulo reescala lotes de archivos STL sin intervención del usuario.
+
+Para cada archivo:
+  1. Se lee con ParallelSTLReader (directamente como mesh.Mesh), o con el
+     lector de mesh_formats.py si es OBJ o PLY.
+  2. Opcionalmente se repara con stl_repair.repair_model (facetas
+     degeneradas y duplicadas, orientación y agujeros pequeños) y se valida
+     con stl_validation.check_mesh; si se exige una malla cerrada y
+     orientada, los archivos que no cumplan se rechazan y no se escriben.
+  3. Se escala con scale_model y se exporta con export_mesh, en STL o en
+     otro formato registrado (output_format, por ejemplo '3mf'): convertir y
+     reescalar es una sola pasada.
+
+Si se indica una caché de construcción (db/build_cache.py), los archivos
+cuya salida ya existe con el mismo contenido de origen, factor y
+transformación se omiten con el estado 'skipped'.
+
+Con split=True cada archivo se separa además en sus piezas (componentes
+conexas, ver stl_components.py) y se escribe un archivo por pieza con el
+sufijo '_partNN'; el resultado incluye la lista 'parts'.
+
+Si se indica además una tabla de huellas (db/fingerprint_db.py), cada
+archivo se compara con los modelos ya vistos (stl_fingerprint.py). Las
+copias del mismo modelo (otro nombre, otra cabecera o una escala uniforme)
+se anotan en 'duplicate_of'. La huella es aproximada y solo sirve para
+encontrar candidatas: si la caché tiene una salida de la copia con el
+factor equivalente, se compara faceta a faceta con el modelo escalado y
+solo si coinciden (salvo el redondeo de float32) se copia el archivo en
+lugar de escalar y exportar el modelo (estado 'duplicate').
+
+El resultado es una lista de diccionarios (uno por archivo) con el estado
+'ok', 'skipped', 'duplicate', 'rejected' o 'error', de modo que la línea de
+comandos pueda decidir el código de salida.
+"""
+
+import math
+import shutil
+
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from stl_components import export_parts, split_components
+from mesh_formats import READERS, read_model
+from stl_export import export_mesh
+from stl_fingerprint import DUPLICATE_DISTANCE, fingerprint_file, is_scaled_copy
+from stl_repair import DEFAULT_MAX_HOLE_EDGES, repair_model
+from stl_scaler import scale_model
+from stl_validation import check_mesh
+from utils import output_path_for, scale_label
+
+# Extensiones que se recogen al recorrer carpetas.
+STL_SUFFIXES = (".stl",)
+
+# Tolerancia relativa entre factores para reutilizar la salida de una copia.
+_REUSE_RTOL = 1e-6
+
+# Diferencia máxima entre una salida reutilizable y el modelo escalado,
+# relativa a la mayor coordenada (cubre el redondeo de float32 y del STL ASCII).
+_IDENTITY_RTOL = 1e-5
+
+
+def collect_stl_files(
+    paths: Iterable[Union[str, Path]],
+    recursive: bool = False,
+    suffixes: Iterable[str] = STL_SUFFIXES,
+) -> List[Path]:
+    """
+    Expande una lista de archivos y carpetas en la lista de archivos STL.
+
+    Args:
+        paths (Iterable[Union[str, Path]]): Archivos o carpetas.
+        recursive (bool): Si True, también se recorren las subcarpetas.
+        suffixes (Iterable[str]): Extensiones que se recogen de las carpetas
+                                  (tuple(mesh_formats.READERS) para incluir OBJ y PLY).
+
+    Returns:
+        List[Path]: Archivos encontrados, sin repetir y en orden estable.
+    """
+    suffixes = tuple(suffixes)
+    found: List[Path] = []
+    seen = set()
+    for entry in paths:
+        path = Path(entry)
+        if path.is_dir():
+            pattern = "**/*" if recursive else "*"
+            candidates = sorted(p for p in path.glob(pattern) if p.suffix.lower() in suffixes and p.is_file())
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            key = candidate.resolve()
+            if key not in seen:
+                seen.add(key)
+                found.append(candidate)
+    return found
+
+
+def passes_gate(report: Dict[str, Any], require_watertight: bool = False, require_valid: bool = False) -> bool:
+    """
+    Indica si el resumen de check_mesh() cumple los requisitos exigidos.
+
+    Args:
+        report (Dict[str, Any]): Resumen de check_mesh().
+        require_watertight (bool): Exige malla cerrada y orientada coherentemente.
+        require_valid (bool): Exige además que no haya degenerados, duplicados
+                              ni normales invertidas.
+    """
+    if require_valid and not report["is_valid"]:
+        return False
+    if require_watertight and not (report["is_watertight"] and report["is_oriented"]):
+        return False
+    return True
+
+
+def describe_transform(transform: str, binary: bool, output_format: str = "stl") -> str:
+    """Texto que identifica la transformación y el formato en la caché de construcción."""
+    if output_format != "stl":
+        return f"{transform};{output_format}"
+    return f"{transform};{'binary' if binary else 'ascii'}"
+
+
+def matches_output(vectors: np.ndarray, factor: float, output: Union[str, Path]) -> bool:
+    """
+    Comprueba que una salida existente sea exactamente el modelo escalado por 'factor'.
+
+    Se comparan las facetas una a una (mismo número, mismo orden y mismos
+    vértices salvo el redondeo de float32), de modo que cualquier edición de
+    la geometría, por pequeña que sea, impide reutilizar la salida.
+
+    Args:
+        vectors (np.ndarray): Facetas (N, 3, 3) del modelo sin escalar.
+        factor (float): Factor pedido para el modelo.
+        output (Union[str, Path]): Salida candidata (un formato de READERS).
+
+    Returns:
+        bool: True si la salida coincide con el modelo escalado.
+    """
+    output = Path(output)
+    if output.suffix.lower() not in READERS:
+        return False
+    try:
+        other = read_model(output).vectors
+    except (OSError, ValueError):
+        return False
+    if other.shape != vectors.shape:
+        return False
+    expected = vectors.astype(np.float64) * factor
+    if not expected.size:
+        return True
+    tolerance = _IDENTITY_RTOL * float(np.abs(expected).max())
+    return float(np.abs(other - expected).max()) <= tolerance
+
+
+def find_reusable_output(
+    fingerprint: Dict[str, Any],
+    matches: Iterable[Dict[str, Any]],
+    cache: Any,
+    factor: float,
+    transform: str,
+    vectors: np.ndarray,
+) -> Optional[Tuple[Path, Path]]:
+    """
+    Busca, entre las copias de un modelo, una salida ya generada que sirva tal cual.
+
+    Si el modelo A es la copia B escalada por r (A = r·B), escalar A por
+    'factor' da lo mismo que escalar B por factor·r: sirve cualquier salida
+    de B registrada con ese factor y la misma transformación. La huella solo
+    propone candidatas; cada salida se acepta únicamente si matches_output
+    confirma que su geometría es la del modelo escalado.
+
+    Args:
+        fingerprint (Dict[str, Any]): Huella del modelo que se va a escalar.
+        matches (Iterable[Dict[str, Any]]): Huellas cercanas (FingerprintDB.nearest).
+        cache (BuildCache): Caché de construcción.
+        factor (float): Factor pedido para el modelo.
+        transform (str): Transformación y formato (describe_transform).
+        vectors (np.ndarray): Facetas (N, 3, 3) del modelo sin escalar.
+
+    Returns:
+        Optional[Tuple[Path, Path]]: (copia de origen, salida reutilizable), o None.
+    """
+    for match in matches:
+        same, ratio = is_scaled_copy(fingerprint, match)
+        if not same or not Path(match["path"]).exists():
+            continue
+        wanted = factor * ratio
+        for output in cache.outputs_for(match["path"], transform):
+            entry = cache.get_entry(output)
+            if entry is None or not math.isclose(entry["conversion_factor"], wanted, rel_tol=_REUSE_RTOL):
+                continue
+            if not cache.is_up_to_date(match["path"], output, entry["conversion_factor"], transform, verify_output=True):
+                continue
+            if matches_output(vectors, factor, output):
+                return Path(match["path"]), output
+    return None
+
+
+def rescale_file(
+    source: Union[str, Path],
+    factor: float,
+    output_dir: Union[str, Path],
+    label: Optional[str] = None,
+    binary: bool = True,
+    validate: bool = False,
+    require_watertight: bool = False,
+    require_valid: bool = False,
+    cache: Optional[Any] = None,
+    scale_id: Optional[int] = None,
+    force: bool = False,
+    split: bool = False,
+    tolerance: float = 0.0,
+    min_facets: int = 1,
+    output_format: str = "stl",
+    fingerprints: Optional[Any] = None,
+    max_distance: float = DUPLICATE_DISTANCE,
+    normals_precision: str = "float32",
+    repair: bool = False,
+    max_hole_edges: int = DEFAULT_MAX_HOLE_EDGES,
+    overwrite: bool = True,
+) -> Dict[str, Any]:
+    """
+    Reescala un único archivo STL (u OBJ/PLY) y lo exporta en 'output_dir'.
+
+    La salida nunca puede ser el propio archivo de origen (por ejemplo, al
+    convertir sin factor a la misma carpeta y formato): ese caso se marca
+    con el estado 'error' sin tocar el archivo.
+
+    Args:
+        source (Union[str, Path]): Archivo de origen (cualquier formato de mesh_formats.READERS).
+        factor (float): Factor de escala (> 0).
+        output_dir (Union[str, Path]): Carpeta de salida.
+        label (Optional[str]): Sufijo del archivo de salida. Por defecto 'x<factor>';
+                               '' = sin sufijo (conversión de formato).
+        binary (bool): Guardar en binario (True) o ASCII (False).
+        validate (bool): Ejecutar check_mesh antes de escalar.
+        require_watertight (bool): Rechazar mallas abiertas o mal orientadas.
+        require_valid (bool): Rechazar mallas con cualquier defecto.
+        cache (Optional[BuildCache]): Caché de construcción; si se indica, las
+                                      salidas al día se omiten.
+        scale_id (Optional[int]): Registro de 'scales' del que procede el factor.
+        force (bool): Reconstruir aunque la caché indique que la salida está al día.
+        split (bool): Escribir un archivo por pieza en lugar de uno por modelo.
+        tolerance (float): Tolerancia para soldar vértices al separar piezas.
+        min_facets (int): Piezas con menos facetas se descartan al separar.
+        output_format (str): Formato de salida ('stl' o un formato de mesh_formats.WRITERS, como '3mf').
+        fingerprints (Optional[FingerprintDB]): Tabla de huellas para detectar copias.
+        max_distance (float): Distancia máxima entre firmas para considerar una copia.
+        normals_precision (str): Precisión de las normales que se escriben ('float32'
+                                 o 'float64', ver stl_normals.py). El escalado no las
+                                 recalcula: se calculan una sola vez al exportar.
+        repair (bool): Reparar la malla (stl_repair.py) antes de validarla y escalarla.
+        max_hole_edges (int): Aristas máximas de los agujeros que se rellenan al reparar.
+        overwrite (bool): Sobrescribir una salida que ya existe; con False se marca como 'error'.
+
+    Returns:
+        Dict[str, Any]: {'input', 'output', 'parts', 'status', 'report', 'repair', 'error',
+            'duplicate_of'}; 'repair' es el resumen de repair_mesh() si se reparó.
+            Con split=True, 'output' es la primera pieza y 'parts' la lista completa.
+    """
+    result: Dict[str, Any] = {
+        "input": Path(source), "output": None, "parts": None, "status": "ok", "report": None, "repair": None,
+        "error": None, "duplicate_of": None,
+    }
+    try:
+        out_dir = Path(output_dir)
+        output_format = output_format.lower().lstrip(".")
+        extension = f".{output_format}"
+        suffix = "" if label == "" else scale_label(label or f"x{factor:g}")
+        target = output_path_for(Path(source), out_dir, suffix, extension)
+        if not split and target.resolve() == Path(source).resolve():
+            raise ValueError(f"La salida '{target}' es el propio archivo de origen; indica otra carpeta o un factor.")
+        if not split and not overwrite and target.exists():
+            raise FileExistsError(f"'{target}' ya existe y no se sobrescribe.")
+        operation = "scale" if normals_precision == "float32" else f"scale;normals:{normals_precision}"
+        if repair:
+            operation = f"repair:{max_hole_edges};{operation}"
+        if split:
+            transform = describe_transform(f"{operation};split:{tolerance:g}:{min_facets}", binary, output_format)
+            # Las piezas solo se conocen tras leer el modelo: se consultan las registradas.
+            prefix = f"{Path(source).stem}_{suffix + '_' if suffix else ''}part"
+            previous = [] if cache is None else [
+                path for path in cache.outputs_for(source, transform)
+                if path.parent == out_dir.resolve() and path.name.startswith(prefix)
+            ]
+        else:
+            transform = describe_transform(operation, binary, output_format)
+            previous = [target]
+        input_hash = None
+        if cache is not None:
+            input_hash = cache.input_hash(source, previous[0] if previous else None)
+            if not force and previous and all(
+                cache.is_up_to_date(source, path, factor, transform, input_hash=input_hash) for path in previous
+            ):
+                result["status"] = "skipped"
+                result["output"] = previous[0]
+                result["parts"] = previous if split else None
+                return result
+
+        model = None
+        if fingerprints is not None:
+            fingerprint, model = fingerprint_file(source, fingerprints)
+            matches = fingerprints.nearest(
+                fingerprint["signature"], k=5, max_distance=max_distance,
+                exclude=source, triangles=fingerprint["triangles"],
+            )
+            if matches:
+                result["duplicate_of"] = matches[0]["path"]
+            reusable = None
+            if cache is not None and matches and not split and not force and not repair:
+                if model is None:
+                    model = read_model(source)
+                reusable = find_reusable_output(fingerprint, matches, cache, factor, transform, model.vectors)
+            if reusable is not None:
+                result["duplicate_of"], reused = reusable
+                out_dir.mkdir(parents=True, exist_ok=True)
+                if reused.resolve() != target.resolve():
+                    shutil.copyfile(reused, target)
+                cache.record(source, target, factor, transform, input_hash, scale_id=scale_id)
+                result["status"] = "duplicate"
+                result["output"] = target
+                return result
+
+        if model is None:
+            model = read_model(source)
+        if repair:
+            model, result["repair"] = repair_model(model, max_hole_edges=max_hole_edges)
+        if validate or require_watertight or require_valid:
+            result["report"] = check_mesh(model.vectors, model.normals)
+            if not passes_gate(result["report"], require_watertight, require_valid):
+                result["status"] = "rejected"
+                return result
+
+        scale_model(model, factor, inplace=True)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if split:
+            parts = split_components(model, tolerance=tolerance, min_facets=min_facets)
+            outputs = export_parts(
+                parts, source, out_dir, label=suffix, binary=binary, extension=extension, precision=normals_precision,
+            )
+        else:
+            export_mesh(model, target, binary=binary, precision=normals_precision)
+            outputs = [target]
+        result["output"] = outputs[0] if outputs else None
+        result["parts"] = outputs if split else None
+        if cache is not None:
+            for path in outputs:
+                cache.record(source, path, factor, transform, input_hash, scale_id=scale_id)
+            written = {path.resolve() for path in outputs}
+            for path in previous:
+                if path.resolve() not in written:
+                    cache.forget(path)
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    return result
+
+
+def batch_rescale(
+    inputs: Iterable[Union[str, Path]],
+    factor: float,
+    output_dir: Union[str, Path],
+    label: Optional[str] = None,
+    recursive: bool = False,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Reescala todos los archivos STL, OBJ y PLY indicados (o contenidos en carpetas).
+
+    Args:
+        inputs (Iterable[Union[str, Path]]): Archivos o carpetas de entrada.
+        factor (float): Factor de escala común.
+        output_dir (Union[str, Path]): Carpeta de salida.
+        label (Optional[str]): Sufijo de los archivos de salida.
+        recursive (bool): Recorrer subcarpetas.
+        **options: Opciones adicionales de rescale_file (binary, validate,
+                   require_watertight, require_valid, cache, scale_id, force,
+                   split, tolerance, min_facets, output_format,
+                   fingerprints, max_distance, normals_precision, repair,
+                   max_hole_edges).
+
+    Returns:
+        List[Dict[str, Any]]: Resultado de cada archivo, en orden.
+    """
+    return [
+        rescale_file(path, factor, output_dir, label=label, **options)
+        for path in collect_stl_files(inputs, recursive=recursive, suffixes=tuple(READERS))
+    ]
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_compact.py
+
+Este módulo ofrece una representación compacta de un modelo para mantener
+muchas mallas en memoria a la vez (variantes de escala, lotes).
+
+Un mesh.Mesh ocupa 50 bytes por faceta: nueve float32 de vértices (cada
+vértice repetido en todas sus facetas), tres de normal y dos bytes de
+atributo. CompactMesh guarda en cambio:
+  - Los vértices únicos (soldados con stl_validation.weld_vertices) con una
+    de estas codificaciones (MODES):
+      * 'int16' / 'int32': enteros sin signo relativos a la caja envolvente
+        de la malla, p = origen + q · paso, con paso = tamaño / (2^bits - 1)
+        en cada eje. Error máximo por eje: paso / 2.
+      * 'float16': coordenadas relativas al centro de la caja divididas por
+        la mitad del tamaño (en [-1, 1]). Error máximo por eje: 2^-12 · mitad
+        del tamaño.
+      * 'float32': las coordenadas originales (solo se ahorra la repetición).
+  - Las caras como índices enteros (uint16/uint32 según el número de vértices).
+  - Las normales no se guardan: se recalculan al exportar (stl_normals.py).
+
+Las coordenadas se decodifican al vuelo, por bloques, al exportar y al
+calcular las propiedades. Escalar (scaled) solo cambia el origen y el paso,
+así que las variantes de un mismo modelo comparten los arreglos y el error
+relativo no cambia.
+
+benchmark_compact() informa de la memoria ahorrada y del error máximo de
+posición de cada codificación a varias escalas.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+from stl import mesh
+
+from stl_normals import compute_normals
+from stl_validation import weld_vertices
+
+# Codificación -> tipo de los vértices almacenados.
+MODES = {"int16": np.uint16, "int32": np.uint32, "float16": np.float16, "float32": np.float32}
+
+# Orden en que mode="auto" prueba las codificaciones (de menor a mayor tamaño).
+AUTO_MODES = ("int16", "int32", "float32")
+
+# Facetas decodificadas por bloque.
+DEFAULT_CHUNK_SIZE = 262_144
+
+# Tamaño de la cabecera y del registro de cada faceta en un STL binario.
+_STL_HEADER_SIZE = 80
+
+
+def _encode(points: np.ndarray, mode: str):
+    """Codifica vértices float (V, 3). Retorna (almacenados, origen, paso, cota de error por eje)."""
+    points = np.asarray(points, dtype=np.float64)
+    low = points.min(axis=0) if len(points) else np.zeros(3)
+    high = points.max(axis=0) if len(points) else np.zeros(3)
+    extent = high - low
+    if mode == "float32":
+        return points.astype(np.float32), np.zeros(3), np.ones(3), np.zeros(3)
+    if mode == "float16":
+        origin = 0.5 * (low + high)
+        step = np.where(extent > 0, 0.5 * extent, 1.0)
+        stored = ((points - origin) / step).astype(np.float16)
+        return stored, origin, step, step * 2.0 ** -12
+    levels = float(np.iinfo(MODES[mode]).max)
+    step = np.where(extent > 0, extent / levels, 1.0)
+    stored = np.rint((points - low) / step)
+    np.clip(stored, 0, levels, out=stored)
+    return stored.astype(MODES[mode]), low, step, np.where(extent > 0, 0.5 * step, 0.0)
+
+
+class CompactMesh:
+    """
+    Malla indexada con vértices cuantizados; se decodifica al vuelo.
+    """
+
+    __slots__ = ("points", "faces", "origin", "step", "mode", "name", "error_bound", "max_error")
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        faces: np.ndarray,
+        origin: np.ndarray,
+        step: np.ndarray,
+        mode: str,
+        name: str = "",
+        error_bound: float = 0.0,
+        max_error: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            points (np.ndarray): Vértices únicos codificados (V, 3).
+            faces (np.ndarray): Caras (N, 3) con índices a 'points'.
+            origin (np.ndarray): Origen de la codificación (3,).
+            step (np.ndarray): Paso de la codificación en cada eje (3,).
+            mode (str): Codificación (una clave de MODES).
+            name (str): Nombre del modelo.
+            error_bound (float): Cota teórica del error de posición (mm).
+            max_error (float): Error de posición medido al codificar (mm).
+        """
+        self.points = points
+        self.faces = faces
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.step = np.asarray(step, dtype=np.float64)
+        self.mode = mode
+        self.name = name
+        self.error_bound = error_bound
+        self.max_error = max_error
+
+    @classmethod
+    def from_mesh(
+        cls,
+        stl_model: Union[mesh.Mesh, np.ndarray],
+        mode: str = "int16",
+        max_error: Optional[float] = None,
+    ) -> "CompactMesh":
+        """
+        Crea la representación compacta de un modelo.
+
+        Args:
+            stl_model (Union[mesh.Mesh, np.ndarray]): Modelo o arreglo de facetas (N, 3, 3).
+            mode (str): Codificación de MODES, o 'auto' para la más pequeña que
+                        cumpla 'max_error' (por defecto, 'int16').
+            max_error (Optional[float]): Error de posición máximo admitido (mm).
+
+        Returns:
+            CompactMesh: La malla compacta.
+
+        Raises:
+            ValueError: Si la codificación no existe o no cumple 'max_error'.
+        """
+        if mode != "auto" and mode not in MODES:
+            raise ValueError(f"Codificación no válida: {mode!r}. Usa {', '.join(MODES)} o 'auto'.")
+        vectors = stl_model.vectors if isinstance(stl_model, mesh.Mesh) else np.asarray(stl_model)
+        name = getattr(stl_model, "name", "") or ""
+        if isinstance(name, bytes):
+            name = name.decode("ascii", "replace")
+        points, faces = weld_vertices(vectors)
+        index_type = np.uint16 if len(points) <= np.iinfo(np.uint16).max else np.uint32
+        faces = faces.astype(index_type)
+
+        original = points.astype(np.float64)
+        for candidate in (AUTO_MODES if mode == "auto" else (mode,)):
+            stored, origin, step, bound = _encode(points, candidate)
+            decoded = origin + stored.astype(np.float64) * step
+            measured = float(np.linalg.norm(decoded - original, axis=1).max()) if len(points) else 0.0
+            if max_error is None or measured <= max_error:
+                return cls(
+                    stored, faces, origin, step, candidate, name,
+                    error_bound=float(np.linalg.norm(bound)), max_error=measured,
+                )
+        raise ValueError(
+            f"La codificación {candidate} tiene un error de {measured:.3g} mm, mayor que el admitido ({max_error:.3g} mm)."
+        )
+
+    def __len__(self) -> int:
+        return len(self.faces)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arreglos."""
+        return int(self.points.nbytes + self.faces.nbytes + self.origin.nbytes + self.step.nbytes)
+
+    def scaled(self, factor: float) -> "CompactMesh":
+        """
+        Retorna la malla escalada desde el origen sin copiar los arreglos.
+
+        Args:
+            factor (float): Factor de escala (> 0).
+        """
+        if factor <= 0:
+            raise ValueError("El factor de escala debe ser mayor que cero.")
+        return CompactMesh(
+            self.points, self.faces, self.origin * factor, self.step * factor, self.mode, self.name,
+            error_bound=self.error_bound * factor, max_error=self.max_error * factor,
+        )
+
+    def vertices(self, faces: Optional[np.ndarray] = None, dtype: Any = np.float32) -> np.ndarray:
+        """
+        Decodifica vértices.
+
+        Args:
+            faces (Optional[np.ndarray]): Índices a decodificar (cualquier forma);
+                                          None = todos los vértices únicos.
+            dtype (Any): Tipo del resultado (float32, como mesh.Mesh, o float64).
+        """
+        stored = self.points if faces is None else self.points[faces]
+        decoded = stored.astype(np.float64)
+        decoded *= self.step
+        decoded += self.origin
+        return decoded.astype(dtype, copy=False)
+
+    def iter_vectors(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+        """Genera las facetas decodificadas (n, 3, 3) en float32, por bloques."""
+        for start in range(0, len(self.faces), chunk_size):
+            yield self.vertices(self.faces[start:start + chunk_size])
+
+    def to_mesh(self) -> mesh.Mesh:
+        """Decodifica la malla completa en un mesh.Mesh con normales unitarias."""
+        data = np.zeros(len(self.faces), dtype=mesh.Mesh.dtype)
+        start = 0
+        for block in self.iter_vectors():
+            data["vectors"][start:start + len(block)] = block
+            start += len(block)
+        model = mesh.Mesh(data, calculate_normals=False, name=self.name)
+        compute_normals(model.vectors, out=model.normals)
+        return model
+
+    def properties(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Calcula las mismas propiedades que utils.mesh_properties decodificando por bloques.
+        """
+        volume = 0.0
+        area = 0.0
+        for block in self.iter_vectors(chunk_size):
+            v = block.astype(np.float64)
+            v0, v1, v2 = v[:, 0], v[:, 1], v[:, 2]
+            area += 0.5 * float(np.linalg.norm(np.cross(v1 - v0, v2 - v0), axis=1).sum())
+            volume += float(np.einsum("ij,ij->", v0, np.cross(v1, v2)))
+        if len(self.faces):
+            used = self.vertices(np.unique(self.faces))
+            low, high = used.min(axis=0).astype(np.float64), used.max(axis=0).astype(np.float64)
+        else:
+            low = high = np.zeros(3)
+        return {
+            "triangles": len(self.faces),
+            "volume": abs(volume) / 6.0,
+            "area": area,
+            "min": tuple(float(c) for c in low),
+            "max": tuple(float(c) for c in high),
+            "dimensions": tuple(float(c) for c in (high - low)),
+        }
+
+    def export(
+        self,
+        file_path: Union[str, Path],
+        binary: bool = True,
+        precision: str = "float32",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        Exporta la malla decodificándola al vuelo.
+
+        Los STL binarios se escriben bloque a bloque (sin reconstruir el modelo
+        completo); el resto de formatos se exporta con export_mesh.
+
+        Args:
+            file_path (Union[str, Path]): Archivo de destino.
+            binary (bool): STL binario (True) o ASCII (False).
+            precision (str): Precisión de las normales ('float32' o 'float64').
+            chunk_size (int): Facetas por bloque.
+        """
+        target = Path(file_path)
+        if not binary or target.suffix.lower() != ".stl":
+            from stl_export import export_mesh
+
+            export_mesh(self.to_mesh(), target, binary=binary, precision=precision)
+            return
+        header = f"STL_Tools {self.name}".encode("ascii", "replace")[:_STL_HEADER_SIZE]
+        with open(target, "wb") as f:
+            f.write(header.ljust(_STL_HEADER_SIZE, b" "))
+            f.write(np.uint32(len(self.faces)).tobytes())
+            for block in self.iter_vectors(chunk_size):
+                records = np.zeros(len(block), dtype=mesh.Mesh.dtype)
+                records["vectors"] = block
+                compute_normals(block, out=records["normals"], precision=precision)
+                f.write(records.tobytes())
+
+
+def benchmark_compact(
+    stl_model: Optional[mesh.Mesh] = None,
+    factors: Sequence[float] = (1.0, 1.0 / 6.0, 1.0 / 12.0, 1.0 / 35.0, 1.0 / 72.0),
+    modes: Sequence[str] = ("float32", "float16", "int16", "int32"),
+    resolution: int = 700,
+) -> List[Dict[str, Any]]:
+    """
+    Mide la memoria ahorrada y el error máximo de posición de cada codificación.
+
+    Sin modelo se usa un toro de resolution x resolution vértices (2·resolution²
+    facetas, ~1M con el valor por defecto) de unos 180 mm. El error a cada
+    escala se mide contra los vértices originales escalados en float64,
+    decodificando también en float64 (sin el redondeo a float32 que tiene
+    cualquier malla, compacta o no).
+
+    Returns:
+        List[Dict[str, Any]]: Una fila por codificación y escala con 'mode',
+            'factor', 'bytes', 'mesh_bytes', 'saved' (fracción), 'max_error' y
+            'error_bound' (mm).
+    """
+    if stl_model is None:
+        u, v = np.meshgrid(
+            np.linspace(0.0, 2.0 * np.pi, resolution, endpoint=False),
+            np.linspace(0.0, 2.0 * np.pi, resolution, endpoint=False),
+            indexing="ij",
+        )
+        grid = np.stack([(60.0 + 30.0 * np.cos(v)) * np.cos(u), (60.0 + 30.0 * np.cos(v)) * np.sin(u), 30.0 * np.sin(v)], -1)
+        i, j = np.meshgrid(np.arange(resolution), np.arange(resolution), indexing="ij")
+        a = i * resolution + j
+        b = ((i + 1) % resolution) * resolution + j
+        c = ((i + 1) % resolution) * resolution + (j + 1) % resolution
+        d = i * resolution + (j + 1) % resolution
+        triangles = np.concatenate([np.stack([a, b, c], -1).reshape(-1, 3), np.stack([a, c, d], -1).reshape(-1, 3)])
+        data = np.zeros(len(triangles), dtype=mesh.Mesh.dtype)
+        data["vectors"] = grid.reshape(-1, 3)[triangles]
+        stl_model = mesh.Mesh(data, calculate_normals=False)
+
+    original_points, _ = weld_vertices(stl_model.vectors)
+    original_points = original_points.astype(np.float64)
+    rows = []
+    for mode in modes:
+        compact = CompactMesh.from_mesh(stl_model, mode=mode)
+        for factor in factors:
+            scaled = compact.scaled(factor)
+            error = np.linalg.norm(scaled.vertices(dtype=np.float64) - original_points * factor, axis=1)
+            rows.append({
+                "mode": mode,
+                "factor": factor,
+                "bytes": scaled.nbytes,
+                "mesh_bytes": int(stl_model.data.nbytes),
+                "saved": 1.0 - scaled.nbytes / stl_model.data.nbytes,
+                "max_error": float(error.max()) if len(error) else 0.0,
+                "error_bound": scaled.error_bound,
+            })
+    return rows
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    for row in benchmark_compact():
+        print(
+            f"{row['mode']:8s} escala 1:{1 / row['factor']:<5.4g} {row['bytes'] / 1e6:7.1f} MB "
+            f"(ahorro {row['saved']:.0%})  error máx. {row['max_error']:.3g} mm (cota {row['error_bound']:.3g} mm)"
+        )
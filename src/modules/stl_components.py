@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_components.py
+
+Este módulo separa un modelo STL en sus piezas (componentes conexas) y
+combina varios modelos en uno solo.
+
+Separación:
+  - Los vértices se sueldan (stl_validation.weld_vertices) y cada faceta
+    aporta dos uniones entre sus vértices.
+  - Las uniones se resuelven con un union-find vectorizado: en cada ronda
+    cada raíz se engancha a la menor raíz vecina (np.minimum.at) y después
+    se comprimen los caminos por saltos de punteros, hasta que ninguna
+    unión cambia. El número de rondas crece de forma logarítmica, no con el
+    número de facetas.
+  - La etiqueta de cada faceta es la raíz de su primer vértice.
+
+Combinación:
+  - Se reserva un único arreglo con el número total de facetas y cada
+    modelo se copia en su tramo, sin concatenaciones sucesivas. Si se
+    combinan archivos binarios, cada uno se lee directamente sobre su tramo.
+"""
+
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+from stl import mesh
+
+from stl_export import export_mesh
+from stl_validation import weld_vertices
+from utils import output_path_for
+
+
+def union_find(pairs_a: np.ndarray, pairs_b: np.ndarray, count: int) -> np.ndarray:
+    """
+    Resuelve las uniones (a, b) entre 'count' elementos.
+
+    Args:
+        pairs_a (np.ndarray): Primer elemento de cada unión.
+        pairs_b (np.ndarray): Segundo elemento de cada unión.
+        count (int): Número de elementos.
+
+    Returns:
+        np.ndarray: Raíz de cada elemento (el menor índice de su componente).
+    """
+    parent = np.arange(count, dtype=np.int64)
+    a = np.asarray(pairs_a, dtype=np.int64)
+    b = np.asarray(pairs_b, dtype=np.int64)
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        pending = root_a != root_b
+        if not pending.any():
+            return parent
+        # Solo siguen activas las uniones que aún no están resueltas.
+        a, b = a[pending], b[pending]
+        low = np.minimum(root_a[pending], root_b[pending])
+        high = np.maximum(root_a[pending], root_b[pending])
+        # Enganchar la raíz mayor a la menor: siempre hacia índices menores,
+        # por lo que no pueden formarse ciclos.
+        np.minimum.at(parent, high, low)
+        # Compresión de caminos: cada elemento apunta a su raíz.
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+def label_components(vectors: np.ndarray, tolerance: float = 0.0) -> Tuple[np.ndarray, int]:
+    """
+    Asigna a cada faceta el número de la pieza (componente conexa) a la que pertenece.
+
+    Dos facetas pertenecen a la misma pieza si comparten algún vértice
+    (tras soldar con 'tolerance').
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        tolerance (float): Tolerancia para soldar vértices (0 = idénticos).
+
+    Returns:
+        Tuple[np.ndarray, int]: (etiqueta 0..K-1 de cada faceta, número de piezas K).
+            Las piezas se numeran por orden de aparición en el archivo.
+    """
+    if not len(vectors):
+        return np.zeros(0, dtype=np.int64), 0
+    points, faces = weld_vertices(vectors, tolerance=tolerance)
+    roots = union_find(
+        np.concatenate([faces[:, 0], faces[:, 0]]),
+        np.concatenate([faces[:, 1], faces[:, 2]]),
+        len(points),
+    )
+    facet_roots = roots[faces[:, 0]]
+    unique_roots, first, inverse = np.unique(facet_roots, return_index=True, return_inverse=True)
+    # Renumerar por la primera faceta de cada pieza (orden del archivo).
+    rank = np.empty(len(unique_roots), dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(unique_roots))
+    return rank[inverse.reshape(-1)], len(unique_roots)
+
+
+def split_components(
+    stl_model: mesh.Mesh,
+    tolerance: float = 0.0,
+    min_facets: int = 1,
+) -> List[mesh.Mesh]:
+    """
+    Separa un modelo en una malla por pieza.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo de origen.
+        tolerance (float): Tolerancia para soldar vértices.
+        min_facets (int): Las piezas con menos facetas se descartan (restos de
+                          escaneo, facetas sueltas).
+
+    Returns:
+        List[mesh.Mesh]: Piezas en el orden en que aparecen en el archivo.
+
+    Raises:
+        TypeError: Si el modelo no es una instancia de mesh.Mesh.
+    """
+    if not isinstance(stl_model, mesh.Mesh):
+        raise TypeError("El modelo STL debe ser una instancia de mesh.Mesh.")
+
+    labels, count = label_components(stl_model.vectors, tolerance=tolerance)
+    order = np.argsort(labels, kind="stable")
+    bounds = np.searchsorted(labels[order], np.arange(count + 1))
+    data = stl_model.data[order]
+    return [
+        mesh.Mesh(data[start:end].copy(), calculate_normals=False, name=stl_model.name)
+        for start, end in zip(bounds[:-1], bounds[1:])
+        if end - start >= min_facets
+    ]
+
+
+def merge_meshes(models: Sequence[Union[mesh.Mesh, np.ndarray]], name: str = "") -> mesh.Mesh:
+    """
+    Combina varios modelos en uno solo con una única reserva de memoria.
+
+    Args:
+        models (Sequence[Union[mesh.Mesh, np.ndarray]]): Modelos o arreglos
+            estructurados con el dtype de mesh.Mesh.
+        name (str): Nombre del modelo resultante.
+
+    Returns:
+        mesh.Mesh: Modelo con las facetas de todos, en el orden dado.
+    """
+    arrays = [model.data if isinstance(model, mesh.Mesh) else np.asarray(model) for model in models]
+    merged = np.empty(sum(len(array) for array in arrays), dtype=mesh.Mesh.dtype)
+    offset = 0
+    for array in arrays:
+        merged[offset:offset + len(array)] = array
+        offset += len(array)
+    return mesh.Mesh(merged, calculate_normals=False, name=name)
+
+
+def merge_files(paths: Sequence[Union[str, Path]], name: str = "") -> mesh.Mesh:
+    """
+    Lee y combina varios archivos STL en un único modelo.
+
+    Si todos los archivos son binarios se conoce de antemano el número exacto
+    de facetas: se reserva el arreglo final y cada archivo se lee directamente
+    sobre su tramo. Con archivos ASCII se leen primero y se copian una vez.
+
+    Args:
+        paths (Sequence[Union[str, Path]]): Archivos STL.
+        name (str): Nombre del modelo resultante.
+
+    Returns:
+        mesh.Mesh: Modelo combinado.
+    """
+    from stl_parallel_reader import ParallelSTLReader
+
+    readers = [ParallelSTLReader(str(path)) for path in paths]
+    infos = [reader.probe() for reader in readers]
+    if not all(info["format"] == "binary" and info["triangles_exact"] for info in infos):
+        return merge_meshes([reader.read_array()[1] for reader in readers], name=name)
+
+    merged = np.empty(sum(info["triangles"] for info in infos), dtype=mesh.Mesh.dtype)
+    offset = 0
+    for reader, info in zip(readers, infos):
+        span = merged[offset:offset + info["triangles"]]
+        reader.read_array(allocate=lambda count, span=span: span[:count])
+        offset += info["triangles"]
+    return mesh.Mesh(merged, calculate_normals=False, name=name)
+
+
+def part_label(label: str, number: int, total: int) -> str:
+    """Sufijo de la pieza 'number' (desde 1) para los nombres de archivo."""
+    width = max(2, len(str(total)))
+    return f"{label}_part{number:0{width}d}" if label else f"part{number:0{width}d}"
+
+
+def export_parts(
+    parts: Sequence[mesh.Mesh],
+    source: Union[str, Path],
+    output_dir: Union[str, Path],
+    label: str = "",
+    binary: bool = True,
+    extension: str = ".stl",
+    precision: str = "float32",
+) -> List[Path]:
+    """
+    Exporta cada pieza como '<output_dir>/<nombre>_<label>_partNN<extension>'.
+
+    'precision' es la de las normales que se recalculan al escribir (ver export_mesh).
+
+    Returns:
+        List[Path]: Archivos escritos, en el orden de las piezas.
+    """
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for number, part in enumerate(parts, start=1):
+        target = output_path_for(Path(source), out_dir, part_label(label, number, len(parts)), extension)
+        export_mesh(part, target, binary=binary, precision=precision)
+        written.append(target)
+    return written
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Actualiza 'ruta_al_archivo.stl' con la ruta real de tu archivo STL.
+    stl_file = "ruta_al_archivo.stl"
+    try:
+        model = mesh.Mesh.from_file(stl_file)
+        pieces = split_components(model)
+        print(f"El modelo contiene {len(pieces)} pieza(s).")
+        for number, piece in enumerate(pieces, start=1):
+            print(f"  Pieza {number}: {len(piece.vectors)} facetas")
+        rebuilt = merge_meshes(pieces)
+        print(f"Modelo recombinado: {len(rebuilt.vectors)} facetas")
+    except Exception as e:
+        print("Error al procesar el modelo:", e)
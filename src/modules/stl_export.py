@@ -5,40 +5,82 @@ Módulo: stl_export.py
 Este módulo proporciona una función para exportar (guardar)
 un objeto STL (instancia de mesh.Mesh de la biblioteca numpy-stl)
 a un archivo en disco. Se puede elegir entre guardar en formato binario o ASCII.
+
+También acepta una lista de modelos: se combinan en un único archivo con
+stl_components.merge_meshes (una sola reserva de memoria).
+
+Si la extensión del destino no es .stl, el modelo se guarda con el
+escritor registrado para ella en mesh_formats.py (por ejemplo, .3mf).
+
+Antes de escribir un STL se recalculan las normales unitarias con
+stl_normals.py (una pasada por bloques, en float32 o float64) y se llama a
+save() con update_normals=False: numpy-stl, por defecto, las recalcularía
+otra vez sin normalizar. Con update_normals=False se escriben tal cual
+(por ejemplo, si ya se calcularon una vez para varias escalas).
 """
 
 from pathlib import Path
 from stl import mesh  # Asegúrate de tener instalada la biblioteca numpy-stl.
-from typing import Union
+from typing import Sequence, Union
 
 # Opcional: Si deseas dar la opción de elegir entre ASCII o binario,
 # puedes importar el enumerado Mode (si está disponible en tu versión).
 # from stl import Mode
 
 def export_mesh(
-    stl_model: mesh.Mesh,
+    stl_model: Union[mesh.Mesh, Sequence[mesh.Mesh]],
     file_path: Union[str, Path],
-    binary: bool = True
+    binary: bool = True,
+    update_normals: bool = True,
+    precision: str = "float32",
 ) -> None:
     """
     Exporta un modelo STL a un archivo en disco.
 
     Args:
-        stl_model (mesh.Mesh): Instancia del modelo STL que se desea exportar.
-        file_path (Union[str, Path]): Ruta del archivo de destino. Debe tener extensión .stl.
+        stl_model (Union[mesh.Mesh, Sequence[mesh.Mesh]]): Modelo STL que se desea
+                                   exportar, o lista de modelos que se guardan
+                                   combinados en un solo archivo.
+        file_path (Union[str, Path]): Ruta del archivo de destino: .stl o una
+                                   extensión registrada en mesh_formats.WRITERS.
         binary (bool, optional): Indica si se debe guardar en formato binario (True) o ASCII (False).
                                    Por defecto es True (binario).
+        update_normals (bool, optional): Recalcular las normales unitarias antes de
+                                   escribir (se actualizan en el propio modelo).
+        precision (str, optional): 'float32' o 'float64' al recalcular las normales.
 
     Raises:
-        ValueError: Si el archivo de destino no tiene extensión .stl.
+        ValueError: Si la extensión del archivo de destino no es .stl ni un formato registrado.
         Exception: Para errores generales durante la exportación.
     """
     target_path = Path(file_path).resolve()
-    
-    # Validar que el archivo tenga extensión .stl
-    if target_path.suffix.lower() != ".stl":
-        raise ValueError("El archivo de destino debe tener extensión .stl")
-    
+    suffix = target_path.suffix.lower()
+
+    writer = None
+    if suffix != ".stl":
+        from mesh_formats import WRITERS
+
+        writer = WRITERS.get(suffix)
+        if writer is None:
+            raise ValueError(f"El archivo de destino debe tener extensión {' o '.join(WRITERS)}")
+
+    if not isinstance(stl_model, mesh.Mesh):
+        from stl_components import merge_meshes
+
+        stl_model = merge_meshes(list(stl_model))
+
+    if writer is not None:
+        try:
+            writer(stl_model, target_path, binary)
+        except Exception as e:
+            raise Exception(f"Error al exportar el archivo {suffix[1:].upper()}: {e}")
+        return
+
+    if update_normals:
+        from stl_normals import update_normals as compute_unit_normals
+
+        compute_unit_normals(stl_model, precision=precision)
+
     try:
         # Si la biblioteca soporta un parámetro para elegir entre binario/ASCII,
         # se puede hacer algo similar a lo siguiente.
@@ -50,12 +92,14 @@ def export_mesh(
         # Como opción por defecto, se utiliza el método save() tal y como lo ofrece
         # numpy-stl, que guarda en binario por defecto.
         if binary:
-            stl_model.save(str(target_path))
+            stl_model.save(str(target_path), update_normals=False)
         else:
             # Muchos modelos permiten guardar en ASCII marcando mode="ascii"
             # dependiendo de la versión de numpy-stl. Si no, se puede utilizar
             # un método específico (ver documentación de la librería).
-            stl_model.save(str(target_path), mode=stl.MODE_ASCII)
+            from stl import Mode
+
+            stl_model.save(str(target_path), mode=Mode.ASCII, update_normals=False)
     except Exception as e:
         raise Exception(f"Error al exportar el archivo STL: {e}")
 
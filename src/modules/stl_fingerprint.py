@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_fingerprint.py
+
+Este módulo calcula una huella geométrica de un modelo que no depende del
+nombre del archivo, de la cabecera STL ni de una escala uniforme, para
+detectar copias del mismo modelo en la biblioteca.
+
+La firma (un vector float64 de SIGNATURE_SIZE componentes) se obtiene con
+estadísticas vectorizadas sobre el arreglo de facetas (N, 3, 3):
+  - Esfericidad 36·π·V²/A³ (relación volumen/área normalizada, sin unidades).
+  - Momentos principales de la superficie (autovalores de su matriz de
+    segundos momentos respecto al centroide) divididos por su suma.
+  - Histograma acumulado de las longitudes de arista ordenadas: las
+    longitudes en EDGE_QUANTILES divididas por la mediana.
+
+Todas las componentes son invariantes a la escala uniforme, la traslación y
+la rotación, por lo que dos copias escaladas tienen firmas prácticamente
+iguales (la distancia euclídea entre ellas es del orden del redondeo en
+float32). Para saber si la salida escalada de una copia puede reutilizarse
+se guardan además el tamaño característico (raíz del área) y la caja
+envolvente: la relación entre tamaños da la escala relativa y la caja
+comprueba que la copia no está girada ni desplazada.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from mesh_formats import read_model
+
+# Versión del cálculo: las firmas guardadas con otra versión se recalculan.
+SIGNATURE_VERSION = 1
+
+# Fracciones de las aristas ordenadas en las que se mide la longitud.
+EDGE_QUANTILES = np.linspace(0.0, 1.0, 16)
+
+# Esfericidad + 3 momentos principales + cuantiles de las aristas.
+SIGNATURE_SIZE = 1 + 3 + len(EDGE_QUANTILES)
+
+# Distancia máxima entre firmas para considerar dos modelos como copias.
+DUPLICATE_DISTANCE = 1e-4
+
+
+def compute_fingerprint(vectors: np.ndarray) -> Dict[str, Any]:
+    """
+    Calcula la huella geométrica de un modelo.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+
+    Returns:
+        Dict[str, Any]: {
+            'signature': np.ndarray (SIGNATURE_SIZE,) invariante a la escala,
+            'triangles': int,
+            'size': float (raíz cuadrada del área, en mm),
+            'min': np.ndarray (3,), 'max': np.ndarray (3,) (caja envolvente)
+        }
+
+    Raises:
+        ValueError: Si el modelo no tiene facetas o su área es nula.
+    """
+    v = np.asarray(vectors, dtype=np.float64)
+    if not len(v):
+        raise ValueError("El modelo no tiene facetas.")
+    v0, v1, v2 = v[:, 0], v[:, 1], v[:, 2]
+    edges = np.stack((v1 - v0, v2 - v1, v0 - v2), axis=1)
+    double_areas = np.linalg.norm(np.cross(edges[:, 0], -edges[:, 2]), axis=1)
+    area = 0.5 * float(double_areas.sum())
+    if area <= 0.0:
+        raise ValueError("El área del modelo es nula.")
+    volume = abs(float(np.einsum("ij,ij->", v0, np.cross(v1, v2)))) / 6.0
+    sphericity = 36.0 * np.pi * volume ** 2 / area ** 3
+
+    # Segundos momentos de cada triángulo: A/12 · (Σ vi viᵀ + s sᵀ), con s = Σ vi.
+    # Se trabaja respecto al centroide de la caja para no perder precisión.
+    low, high = v.min(axis=(0, 1)), v.max(axis=(0, 1))
+    centered = v - 0.5 * (low + high)
+    weights = 0.5 * double_areas
+    sums = centered.sum(axis=1)
+    points = centered.reshape(-1, 3)
+    weighted_sums = sums * weights[:, None]
+    second = (
+        (points * np.repeat(weights, 3)[:, None]).T @ points + weighted_sums.T @ sums
+    ) / (12.0 * area)
+    centroid = weighted_sums.sum(axis=0) / (3.0 * area)
+    moments = np.linalg.eigvalsh(second - np.outer(centroid, centroid))
+    moments = np.clip(moments, 0.0, None)
+    moments = moments / max(float(moments.sum()), np.finfo(np.float64).tiny)
+
+    lengths = np.linalg.norm(edges, axis=2).reshape(-1)
+    quantiles = np.quantile(lengths, EDGE_QUANTILES)
+    median = float(np.median(lengths)) or float(lengths.max()) or 1.0
+
+    return {
+        "signature": np.concatenate(([sphericity], moments, quantiles / median)),
+        "triangles": int(len(v)),
+        "size": float(np.sqrt(area)),
+        "min": low,
+        "max": high,
+    }
+
+
+def fingerprint_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Distancia euclídea entre dos firmas (0 = modelos iguales salvo la escala).
+    """
+    return float(np.linalg.norm(np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)))
+
+
+def is_scaled_copy(fingerprint: Dict[str, Any], other: Dict[str, Any], rtol: float = 1e-5) -> Tuple[bool, float]:
+    """
+    Comprueba si 'fingerprint' es 'other' escalado desde el origen (sin giros
+    ni desplazamientos), como hace scale_model.
+
+    La comparación es aproximada (número de facetas y caja envolvente): sirve
+    para anotar copias, no para garantizar que la geometría sea idéntica.
+
+    Returns:
+        Tuple[bool, float]: (es copia escalada, escala relativa fingerprint/other).
+    """
+    ratio = fingerprint["size"] / other["size"]
+    if fingerprint["triangles"] != other["triangles"]:
+        return False, ratio
+    extent = ratio * float(np.max(np.asarray(other["max"]) - np.asarray(other["min"])))
+    atol = rtol * max(extent, 1e-12)
+    same_box = (
+        np.allclose(fingerprint["min"], ratio * np.asarray(other["min"]), rtol=rtol, atol=atol)
+        and np.allclose(fingerprint["max"], ratio * np.asarray(other["max"]), rtol=rtol, atol=atol)
+    )
+    return bool(same_box), ratio
+
+
+def fingerprint_file(path: Union[str, Path], db: Optional[Any] = None) -> Tuple[Dict[str, Any], Optional[Any]]:
+    """
+    Obtiene la huella de un archivo, reutilizando la guardada si el archivo no cambió.
+
+    Args:
+        path (Union[str, Path]): Archivo STL, OBJ o PLY.
+        db (Optional[FingerprintDB]): Tabla de huellas (db/fingerprint_db.py);
+                                      la huella nueva se guarda en ella.
+
+    Returns:
+        Tuple[Dict[str, Any], Optional[mesh.Mesh]]: (huella, modelo leído), o
+            (huella, None) si se tomó de la base de datos sin leer el archivo.
+    """
+    if db is not None:
+        stored = db.lookup(path)
+        if stored is not None:
+            return stored, None
+    model = read_model(path)
+    fingerprint = compute_fingerprint(model.vectors)
+    if db is not None:
+        db.store(path, fingerprint)
+    return fingerprint, model
+
+
+def group_duplicates(
+    fingerprints: Sequence[Dict[str, Any]],
+    max_distance: float = DUPLICATE_DISTANCE,
+) -> List[List[int]]:
+    """
+    Agrupa las huellas de modelos que son copias (salvo la escala).
+
+    Solo se comparan modelos con el mismo número de facetas, de modo que el
+    coste es cuadrático únicamente dentro de cada grupo.
+
+    Args:
+        fingerprints (Sequence[Dict[str, Any]]): Huellas de compute_fingerprint().
+        max_distance (float): Distancia máxima entre firmas.
+
+    Returns:
+        List[List[int]]: Índices de cada grupo con al menos dos modelos.
+    """
+    by_triangles: Dict[int, List[int]] = {}
+    for index, fingerprint in enumerate(fingerprints):
+        by_triangles.setdefault(fingerprint["triangles"], []).append(index)
+
+    groups = []
+    for members in by_triangles.values():
+        if len(members) < 2:
+            continue
+        signatures = np.stack([fingerprints[i]["signature"] for i in members])
+        close = np.linalg.norm(signatures[:, None, :] - signatures[None, :, :], axis=2) <= max_distance
+        # Componentes conexas de la relación "está cerca de".
+        label = np.arange(len(members))
+        while True:
+            updated = np.where(close, label[None, :], len(members)).min(axis=1)
+            if np.array_equal(updated, label):
+                break
+            label = updated
+        for value in np.unique(label):
+            group = [members[i] for i in np.flatnonzero(label == value)]
+            if len(group) > 1:
+                groups.append(group)
+    return sorted(groups)
+
+
+def find_duplicates(
+    paths: Iterable[Union[str, Path]],
+    db: Optional[Any] = None,
+    max_distance: float = DUPLICATE_DISTANCE,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Busca copias entre varios archivos.
+
+    Args:
+        paths (Iterable[Union[str, Path]]): Archivos a comparar.
+        db (Optional[FingerprintDB]): Tabla de huellas usada como caché.
+        max_distance (float): Distancia máxima entre firmas.
+
+    Returns:
+        List[List[Dict[str, Any]]]: Grupos de copias; cada elemento es
+            {'path', 'scale'} con la escala relativa al primero del grupo.
+    """
+    paths = [Path(path) for path in paths]
+    fingerprints = [fingerprint_file(path, db)[0] for path in paths]
+    result = []
+    for group in group_duplicates(fingerprints, max_distance):
+        reference = fingerprints[group[0]]
+        result.append([
+            {"path": paths[i], "scale": fingerprints[i]["size"] / reference["size"]} for i in group
+        ])
+    return result
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import sys
+
+    for number, group in enumerate(find_duplicates(sys.argv[1:]), start=1):
+        print(f"Grupo {number}:")
+        for item in group:
+            print(f"  {item['path']}  (escala x{item['scale']:.6g})")
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_fit.py
+
+Este módulo calcula el factor de escala a partir de unas medidas objetivo,
+en lugar de un factor fijo de la tabla 'scales':
+  - Altura objetivo: "la figura debe medir exactamente 75 mm de alto".
+  - Volumen de impresión: "el mayor factor con el que cabe en 200x200x250".
+
+Las medidas del modelo se obtienen de:
+  - La caja envolvente alineada con los ejes (AABB): mínimo y máximo por
+    bloques, sin copias del modelo.
+  - La caja envolvente orientada (OBB): ejes principales (PCA) de la
+    superficie y extensión del modelo sobre ellos. Con la OBB el factor supone
+    que la pieza se orienta según sus ejes principales (fit_matrix puede
+    aplicar esa rotación).
+
+Para lotes (fit_batch) el trabajo se divide en dos pasadas:
+  1. Medición: solo se recorren las coordenadas de cada archivo. Los binarios
+     se abren con np.memmap, sin construir el modelo ni recalcular normales,
+     y varios archivos se miden en paralelo.
+  2. Escritura: cada archivo se reescala con su factor (stl_batch.rescale_file,
+     que además respeta la caché de construcción).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from stl import mesh
+
+from stl_parallel_reader import STL_DTYPE, ParallelSTLReader
+from stl_transform import DEFAULT_CHUNK_SIZE, compose, scale_matrix, translation_matrix
+
+# Modos de medición admitidos.
+FIT_MODES = ("aabb", "obb")
+
+
+def _blocks(vectors: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Recorre las facetas en bloques (k, 3, 3) de float64."""
+    for start in range(0, len(vectors), chunk_size):
+        yield np.asarray(vectors[start:start + chunk_size], dtype=np.float64)
+
+
+def aabb(vectors: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula la caja envolvente alineada con los ejes.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices (puede ser un memmap).
+        chunk_size (int): Facetas procesadas por bloque.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Esquinas mínima y máxima (float64).
+
+    Raises:
+        ValueError: Si el modelo no tiene facetas.
+    """
+    if not len(vectors):
+        raise ValueError("El modelo no contiene facetas.")
+    low = np.full(3, np.inf)
+    high = np.full(3, -np.inf)
+    for start in range(0, len(vectors), chunk_size):
+        # Copiar el bloque a memoria contigua y reducir filas de 9 valores es
+        # bastante más rápido que reducir directamente la vista con saltos de
+        # 50 bytes del campo 'vectors'.
+        block = np.ascontiguousarray(vectors[start:start + chunk_size]).reshape(-1, 9)
+        np.minimum(low, block.min(axis=0).reshape(3, 3).min(axis=0), out=low)
+        np.maximum(high, block.max(axis=0).reshape(3, 3).max(axis=0), out=high)
+    return low, high
+
+
+def obb(vectors: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Calcula una caja envolvente orientada según los ejes principales (PCA).
+
+    Los ejes son los vectores propios de la covarianza de la superficie; la
+    caja es la extensión del modelo proyectado sobre ellos. No es la caja
+    de volumen mínimo, pero se obtiene en dos pasadas lineales y es exacta
+    para piezas alargadas o giradas respecto a los ejes.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices.
+        chunk_size (int): Facetas procesadas por bloque.
+
+    Returns:
+        Dict[str, np.ndarray]: {'center': (3,), 'axes': (3, 3) con un eje por
+            fila (de mayor a menor extensión, base directa), 'extents': (3,)}.
+
+    Raises:
+        ValueError: Si el modelo no tiene facetas.
+    """
+    if not len(vectors):
+        raise ValueError("El modelo no contiene facetas.")
+    # Primera pasada: media y covarianza de la superficie, ponderadas por el
+    # área de cada faceta (así no dependen de cómo esté triangulada):
+    #   E[x x^T] sobre un triángulo = (9 m m^T + a a^T + b b^T + c c^T) / 12
+    weight = 0.0
+    total = np.zeros(3)
+    outer = np.zeros((3, 3))
+    for block in _blocks(vectors, chunk_size):
+        a, b, c = block[:, 0], block[:, 1], block[:, 2]
+        area = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+        centroid = block.mean(axis=1)
+        weight += area.sum()
+        total += area @ centroid
+        outer += (9.0 * (centroid * area[:, None]).T @ centroid
+                  + np.einsum("k,kvi,kvj->ij", area, block, block)) / 12.0
+    if weight <= 0:
+        raise ValueError("El modelo no tiene superficie medible.")
+    mean = total / weight
+    covariance = outer / weight - np.outer(mean, mean)
+    _, eigenvectors = np.linalg.eigh(covariance)
+    axes = eigenvectors.T
+
+    # Segunda pasada: extensión sobre cada eje.
+    low = np.full(3, np.inf)
+    high = np.full(3, -np.inf)
+    for block in _blocks(vectors, chunk_size):
+        projected = (block.reshape(-1, 3) - mean) @ axes.T
+        np.minimum(low, projected.min(axis=0), out=low)
+        np.maximum(high, projected.max(axis=0), out=high)
+
+    order = np.argsort(high - low)[::-1]
+    axes, low, high = axes[order], low[order], high[order]
+    if np.linalg.det(axes) < 0:
+        axes[2] = -axes[2]
+        low[2], high[2] = -high[2], -low[2]
+    return {"center": mean + ((low + high) / 2.0) @ axes, "axes": axes, "extents": high - low}
+
+
+def measure_file(path: Union[str, Path], mode: str = "aabb") -> Dict[str, Any]:
+    """
+    Mide un archivo STL leyendo solo sus coordenadas.
+
+    Los binarios se recorren con np.memmap (el sistema operativo lee las
+    páginas bajo demanda y no se crea el modelo); los ASCII se leen como
+    arreglo con ParallelSTLReader.
+
+    Args:
+        path (Union[str, Path]): Archivo STL.
+        mode (str): 'aabb' u 'obb'.
+
+    Returns:
+        Dict[str, Any]: {'path', 'triangles', 'low', 'high', 'extents'} (AABB) y,
+            en modo 'obb', también 'obb' (resultado de obb()).
+
+    Raises:
+        ValueError: Si el modo no es válido.
+    """
+    if mode not in FIT_MODES:
+        raise ValueError(f"Modo de medición no válido: '{mode}'. Usa {', '.join(FIT_MODES)}.")
+    reader = ParallelSTLReader(str(path))
+    info = reader.probe()
+    if info["format"] == "binary" and info["triangles_exact"]:
+        vectors = np.memmap(reader.file_path, dtype=STL_DTYPE, mode="r", offset=84, shape=(info["triangles"],))["vectors"]
+    else:
+        vectors = reader.read_array()[1]["vectors"]
+    low, high = aabb(vectors)
+    result: Dict[str, Any] = {"path": Path(path), "triangles": len(vectors), "low": low, "high": high, "extents": high - low}
+    if mode == "obb":
+        result["obb"] = obb(vectors)
+    return result
+
+
+def measure_files(
+    paths: Iterable[Union[str, Path]],
+    mode: str = "aabb",
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Mide varios archivos en paralelo (hilos: la lectura y las reducciones de
+    NumPy liberan el GIL).
+
+    Returns:
+        List[Dict[str, Any]]: Resultado de measure_file por archivo, en orden;
+            si un archivo falla, {'path', 'error'}.
+    """
+    def safe_measure(path):
+        try:
+            return measure_file(path, mode)
+        except Exception as e:
+            return {"path": Path(path), "error": str(e)}
+
+    paths = list(paths)
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths) or 1))) as executor:
+        return list(executor.map(safe_measure, paths))
+
+
+def fit_factor(
+    extents: Sequence[float],
+    target_height: Optional[float] = None,
+    build_volume: Optional[Sequence[float]] = None,
+    axis: int = 2,
+    margin: float = 0.0,
+    allow_rotation: bool = False,
+) -> float:
+    """
+    Calcula el factor de escala para unas medidas objetivo.
+
+    Args:
+        extents (Sequence[float]): Medidas del modelo (AABB en X, Y, Z u OBB).
+        target_height (Optional[float]): Medida objetivo sobre 'axis' (mm).
+        build_volume (Optional[Sequence[float]]): Volumen de impresión (X, Y, Z) en mm.
+        axis (int): Eje de la altura objetivo (2 = Z).
+        margin (float): Holgura por lado que se descuenta del volumen de impresión (mm).
+        allow_rotation (bool): Permite girar la pieza 90° para que su mayor
+                               medida use el mayor lado del volumen (se
+                               comparan ambas listas ordenadas).
+
+    Returns:
+        float: Factor de escala. Si se indican ambos objetivos se toma el menor.
+
+    Raises:
+        ValueError: Si no se indica ningún objetivo o las medidas no son válidas.
+    """
+    extents = np.asarray(extents, dtype=np.float64)
+    factors = []
+    if target_height is not None:
+        if target_height <= 0:
+            raise ValueError("La altura objetivo debe ser mayor que cero.")
+        if extents[axis] <= 0:
+            raise ValueError("El modelo no tiene altura en el eje indicado.")
+        factors.append(target_height / extents[axis])
+    if build_volume is not None:
+        volume = np.asarray(build_volume, dtype=np.float64) - 2.0 * margin
+        if volume.shape != (3,) or (volume <= 0).any():
+            raise ValueError("El volumen de impresión debe tener tres medidas mayores que la holgura.")
+        if allow_rotation:
+            volume, extents = np.sort(volume), np.sort(extents)
+        with np.errstate(divide="ignore"):
+            ratios = np.where(extents > 0, volume / np.where(extents > 0, extents, 1.0), np.inf)
+        factors.append(float(ratios.min()))
+    if not factors:
+        raise ValueError("Indica una altura objetivo o un volumen de impresión.")
+    factor = float(min(factors))
+    if not np.isfinite(factor):
+        raise ValueError("El modelo no tiene dimensiones medibles.")
+    return factor
+
+
+def _obb_slots(build_volume: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Eje del mundo que ocupa cada eje de la OBB (de mayor a menor extensión).
+
+    Con volumen de impresión, la mayor extensión va al mayor lado; sin él,
+    la mayor extensión queda en Z (la pieza "de pie"), la siguiente en X.
+    """
+    if build_volume is None:
+        return np.array([2, 0, 1])
+    return np.argsort(np.asarray(build_volume, dtype=np.float64), kind="stable")[::-1]
+
+
+def fit_matrix(box: Dict[str, np.ndarray], factor: float, build_volume: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Crea la matriz que orienta una pieza según su OBB y la escala.
+
+    La mayor extensión de la OBB se alinea con el mayor lado del volumen de
+    impresión (o con Z si no se indica), el centro de la caja queda en el
+    origen y después se aplica el factor.
+
+    Args:
+        box (Dict[str, np.ndarray]): Resultado de obb().
+        factor (float): Factor de escala.
+        build_volume (Optional[Sequence[float]]): Volumen de impresión (X, Y, Z).
+
+    Returns:
+        np.ndarray: Matriz 4x4 (ver stl_transform.compose).
+    """
+    slots = _obb_slots(build_volume)
+    rotation = np.zeros((3, 3))
+    rotation[slots] = box["axes"]
+    if np.linalg.det(rotation) < 0:
+        # Mantener una rotación propia: se invierte el eje de menor extensión.
+        rotation[slots[2]] = -rotation[slots[2]]
+    orient = np.eye(4)
+    orient[:3, :3] = rotation
+    return compose(translation_matrix(*(-np.asarray(box["center"]))), orient, scale_matrix(factor))
+
+
+def solve_factor(
+    measure: Dict[str, Any],
+    target_height: Optional[float] = None,
+    build_volume: Optional[Sequence[float]] = None,
+    margin: float = 0.0,
+    oriented: bool = False,
+) -> float:
+    """
+    Calcula el factor de una medición de measure_file().
+
+    Con OBB (clave 'obb'), el volumen de impresión se comprueba con la caja
+    orientada y la pieza puede girarse. La altura objetivo se mide en Z de la
+    pieza tal como está o, si 'oriented', sobre el eje principal que
+    fit_matrix llevará a Z.
+    """
+    box = measure.get("obb")
+    if box is None:
+        return fit_factor(measure["extents"], target_height, build_volume, margin=margin)
+    factors = []
+    if target_height is not None:
+        if oriented:
+            axis = int(_obb_slots(build_volume).tolist().index(2))
+            factors.append(fit_factor(box["extents"], target_height, axis=axis))
+        else:
+            factors.append(fit_factor(measure["extents"], target_height))
+    if build_volume is not None:
+        factors.append(fit_factor(box["extents"], build_volume=build_volume, margin=margin, allow_rotation=True))
+    if not factors:
+        raise ValueError("Indica una altura objetivo o un volumen de impresión.")
+    return min(factors)
+
+
+def fit_model(
+    stl_model: mesh.Mesh,
+    target_height: Optional[float] = None,
+    build_volume: Optional[Sequence[float]] = None,
+    mode: str = "aabb",
+    margin: float = 0.0,
+    orient: bool = False,
+    inplace: bool = True,
+) -> Tuple[mesh.Mesh, float]:
+    """
+    Escala un modelo para que alcance la altura objetivo o quepa en el volumen de impresión.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo STL.
+        target_height (Optional[float]): Altura objetivo en Z (mm).
+        build_volume (Optional[Sequence[float]]): Volumen de impresión (X, Y, Z) en mm.
+        mode (str): 'aabb' (medidas en los ejes actuales) u 'obb' (ejes principales).
+        margin (float): Holgura por lado dentro del volumen de impresión (mm).
+        orient (bool): En modo 'obb', girar la pieza según sus ejes principales
+                       (centrada en el origen). Sin orientar, el factor de la
+                       OBB supone que la pieza se girará después.
+        inplace (bool): Si True, modifica el modelo original.
+
+    Returns:
+        Tuple[mesh.Mesh, float]: (modelo escalado, factor aplicado).
+
+    Raises:
+        TypeError: Si el modelo no es una instancia de mesh.Mesh.
+        ValueError: Si el modo o los objetivos no son válidos.
+    """
+    from stl_scaler import scale_model
+    from stl_transform import apply_transform
+
+    if not isinstance(stl_model, mesh.Mesh):
+        raise TypeError("El modelo STL debe ser una instancia de mesh.Mesh.")
+    if mode not in FIT_MODES:
+        raise ValueError(f"Modo de medición no válido: '{mode}'. Usa {', '.join(FIT_MODES)}.")
+
+    low, high = aabb(stl_model.vectors)
+    measure: Dict[str, Any] = {"extents": high - low}
+    if mode == "obb":
+        measure["obb"] = obb(stl_model.vectors)
+    oriented = orient and mode == "obb"
+    factor = solve_factor(measure, target_height, build_volume, margin=margin, oriented=oriented)
+    if oriented:
+        return apply_transform(stl_model, fit_matrix(measure["obb"], factor, build_volume), inplace=inplace), factor
+    return scale_model(stl_model, factor, inplace=inplace), factor
+
+
+def fit_batch(
+    inputs: Iterable[Union[str, Path]],
+    output_dir: Union[str, Path],
+    target_height: Optional[float] = None,
+    build_volume: Optional[Sequence[float]] = None,
+    mode: str = "aabb",
+    margin: float = 0.0,
+    recursive: bool = False,
+    max_workers: Optional[int] = None,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Ajusta un lote de archivos a una altura o volumen de impresión.
+
+    Primero se miden todos los archivos (solo coordenadas) y después cada uno
+    se reescala con su factor mediante stl_batch.rescale_file. En modo 'obb'
+    el factor supone que la pieza se orientará en el laminador según sus ejes
+    principales; la malla solo se escala.
+
+    Args:
+        inputs (Iterable[Union[str, Path]]): Archivos o carpetas.
+        output_dir (Union[str, Path]): Carpeta de salida.
+        target_height (Optional[float]): Altura objetivo en Z (mm).
+        build_volume (Optional[Sequence[float]]): Volumen de impresión (X, Y, Z) en mm.
+        mode (str): 'aabb' u 'obb'.
+        margin (float): Holgura por lado (mm).
+        recursive (bool): Recorrer subcarpetas.
+        max_workers (Optional[int]): Hilos de la pasada de medición.
+        **options: Opciones de rescale_file (binary, validate, cache, force, ...).
+
+    Returns:
+        List[Dict[str, Any]]: Resultado de rescale_file por archivo, con
+            'factor' y 'extents' (medidas originales usadas: AABB u OBB) añadidos.
+    """
+    from stl_batch import collect_stl_files, rescale_file
+
+    # Se valida antes de medir nada para fallar pronto.
+    fit_factor(np.ones(3), target_height, build_volume, margin=margin)
+
+    results = []
+    for measure in measure_files(collect_stl_files(inputs, recursive=recursive), mode=mode, max_workers=max_workers):
+        if "error" in measure:
+            results.append({"input": measure["path"], "output": None, "parts": None, "status": "error",
+                            "report": None, "error": measure["error"], "factor": None, "extents": None})
+            continue
+        try:
+            factor = solve_factor(measure, target_height, build_volume, margin=margin)
+        except ValueError as e:
+            results.append({"input": measure["path"], "output": None, "parts": None, "status": "error",
+                            "report": None, "error": str(e), "factor": None, "extents": measure["extents"]})
+            continue
+        result = rescale_file(measure["path"], factor, output_dir, label=f"fit{factor:.4g}", **options)
+        extents = measure["obb"]["extents"] if mode == "obb" else measure["extents"]
+        result.update({"factor": factor, "extents": extents})
+        results.append(result)
+    return results
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Actualiza 'ruta_al_archivo.stl' con la ruta real de tu archivo STL.
+    stl_file = "ruta_al_archivo.stl"
+    try:
+        measure = measure_file(stl_file, mode="obb")
+        ancho, alto, profundidad = measure["extents"]
+        print(f"Caja alineada: {ancho:.2f} x {alto:.2f} x {profundidad:.2f} mm")
+        print("Caja orientada: " + " x ".join(f"{e:.2f}" for e in measure["obb"]["extents"]) + " mm")
+        print(f"Factor para 75 mm de alto: {solve_factor(measure, target_height=75):.4f}")
+        factor = solve_factor(measure, build_volume=(200, 200, 250))
+        print(f"Mayor factor que cabe (girando la pieza) en 200x200x250: {factor:.4f}")
+    except Exception as e:
+        print("Error al medir el modelo:", e)
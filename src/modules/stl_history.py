@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_history.py
+
+Este módulo mantiene el historial de operaciones (deshacer/rehacer) de un
+modelo STL sin guardar copias completas de sus vértices.
+
+  - Las transformaciones afines (escalados, giros, espejados...) se guardan
+    como matrices 4x4 (128 bytes por operación). Deshacer o rehacer solo
+    recompone la matriz acumulada: los vértices no se tocan hasta que se
+    necesita el modelo (propiedad 'model' o materialize()), y entonces se
+    aplica de una sola pasada la diferencia entre lo aplicado y lo pedido.
+    Escalar, deshacer y volver a escalar varias veces cuesta, como mucho,
+    una pasada sobre los vértices; si la diferencia es la identidad, ninguna.
+  - Las operaciones que no se pueden invertir con una matriz (reparaciones,
+    simplificaciones, reemplazar el modelo...) se registran con
+    apply_lossy(): antes de aplicarlas se guarda un punto de control
+    comprimido (bytes de cada componente float agrupados y zlib nivel 1).
+    Los puntos de control no superan 'max_checkpoint_bytes'; si el límite se
+    rebasa se descartan las operaciones más antiguas del historial.
+
+Cada pasada acumula un redondeo en float32 (una unidad en el último dígito
+por pasada), igual que aplicar la escala inversa a mano.
+"""
+
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from stl import mesh
+
+from stl_transform import DEFAULT_CHUNK_SIZE, compose, identity_matrix, transform_arrays
+
+# Memoria máxima de los puntos de control comprimidos (bytes).
+DEFAULT_MAX_CHECKPOINT_BYTES = 256 * 1024 * 1024
+
+# Nivel de zlib para los puntos de control (1 = el más rápido).
+CHECKPOINT_COMPRESSION = 1
+
+
+def pack_array(array: np.ndarray) -> Tuple[bytes, np.dtype, Tuple[int, ...]]:
+    """
+    Comprime un arreglo sin pérdida.
+
+    Los bytes se reordenan por posición dentro de cada elemento (primero
+    todos los bytes 0, después los 1...): en coordenadas float los bytes de
+    exponente se repiten mucho y zlib los comprime mejor juntos.
+
+    Returns:
+        Tuple[bytes, np.dtype, Tuple[int, ...]]: (datos comprimidos, tipo, forma).
+    """
+    raw = np.ascontiguousarray(array).view(np.uint8).reshape(len(array), -1)
+    shuffled = np.ascontiguousarray(raw.T)
+    return zlib.compress(shuffled, CHECKPOINT_COMPRESSION), array.dtype, array.shape
+
+
+def unpack_array(packed: Tuple[bytes, np.dtype, Tuple[int, ...]]) -> np.ndarray:
+    """Reconstruye un arreglo comprimido con pack_array()."""
+    data, dtype, shape = packed
+    count = shape[0] if shape else 0
+    shuffled = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(-1, count)
+    return np.ascontiguousarray(shuffled.T).view(dtype).reshape(shape)
+
+
+class _Operation:
+    """
+    Entrada del historial: una matriz o un punto de control comprimido.
+    """
+
+    __slots__ = ("label", "matrix", "before", "after", "segment")
+
+    def __init__(self, label: str, matrix: Optional[np.ndarray] = None) -> None:
+        self.label = label
+        # Transformación afín (None = operación con pérdida).
+        self.matrix = matrix
+        # Puntos de control del modelo antes y después de una operación con pérdida.
+        self.before: Optional[Tuple[bytes, np.dtype, Tuple[int, ...]]] = None
+        self.after: Optional[Tuple[bytes, np.dtype, Tuple[int, ...]]] = None
+        # Matriz acumulada del tramo anterior (para restaurarla al deshacer).
+        self.segment: Optional[np.ndarray] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los puntos de control."""
+        return sum(len(packed[0]) for packed in (self.before, self.after) if packed is not None)
+
+
+class TransformHistory:
+    """
+    Historial de deshacer/rehacer de un modelo STL con aplicación diferida.
+    """
+
+    def __init__(
+        self,
+        model: mesh.Mesh,
+        max_checkpoint_bytes: int = DEFAULT_MAX_CHECKPOINT_BYTES,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        Args:
+            model (mesh.Mesh): Modelo sobre el que se registran las operaciones
+                               (se modifica en el sitio).
+            max_checkpoint_bytes (int): Memoria máxima de los puntos de control comprimidos.
+            chunk_size (int): Facetas por bloque al aplicar las matrices.
+        """
+        self.max_checkpoint_bytes = max_checkpoint_bytes
+        self.chunk_size = chunk_size
+        self.reset(model)
+
+    def reset(self, model: mesh.Mesh) -> None:
+        """
+        Empieza un historial vacío para 'model' (por ejemplo, al cargar otro archivo).
+        """
+        self._model = model
+        self._undo: List[_Operation] = []
+        self._redo: List[_Operation] = []
+        # Matriz ya aplicada a los vértices y matriz pedida, ambas desde la
+        # última operación con pérdida (el inicio del tramo actual).
+        self._applied = identity_matrix()
+        self._current = identity_matrix()
+
+    @property
+    def model(self) -> mesh.Mesh:
+        """Modelo con todas las operaciones pendientes aplicadas."""
+        return self.materialize()
+
+    @property
+    def pending(self) -> bool:
+        """Indica si hay transformaciones registradas que aún no se aplicaron a los vértices."""
+        return not np.array_equal(self._applied, self._current)
+
+    @property
+    def current_matrix(self) -> np.ndarray:
+        """Transformación acumulada desde la última operación con pérdida."""
+        return self._current.copy()
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def undo_label(self) -> Optional[str]:
+        """Descripción de la operación que se desharía."""
+        return self._undo[-1].label if self._undo else None
+
+    @property
+    def redo_label(self) -> Optional[str]:
+        """Descripción de la operación que se reharía."""
+        return self._redo[-1].label if self._redo else None
+
+    def materialize(self) -> mesh.Mesh:
+        """
+        Aplica a los vértices, en una sola pasada, lo pendiente desde la última vez.
+
+        Returns:
+            mesh.Mesh: El modelo actualizado.
+        """
+        if self.pending:
+            delta = self._current @ np.linalg.inv(self._applied)
+            transform_arrays(self._model.vectors, self._model.normals, delta, chunk_size=self.chunk_size)
+            for refresh in ("update_min", "update_max"):
+                if hasattr(self._model, refresh):
+                    getattr(self._model, refresh)()
+            self._applied = self._current.copy()
+        return self._model
+
+    def _segment_matrix(self) -> np.ndarray:
+        """Recompone la matriz del tramo actual a partir del historial (sin acumular redondeos)."""
+        matrices = []
+        for operation in reversed(self._undo):
+            if operation.matrix is None:
+                break
+            matrices.append(operation.matrix)
+        return compose(*reversed(matrices))
+
+    def apply(self, matrix: np.ndarray, label: str = "Transformación") -> None:
+        """
+        Registra una transformación afín invertible. No toca los vértices.
+
+        Args:
+            matrix (np.ndarray): Matriz homogénea 4x4 (ver stl_transform).
+            label (str): Descripción para la interfaz.
+
+        Raises:
+            ValueError: Si la matriz no es 4x4 o no es invertible.
+        """
+        matrix = np.array(matrix, dtype=np.float64)
+        if matrix.shape != (4, 4):
+            raise ValueError("La matriz de transformación debe ser de 4x4.")
+        if abs(np.linalg.det(matrix[:3, :3])) < 1e-12:
+            raise ValueError("La matriz no es invertible: regístrala con apply_lossy().")
+        self._undo.append(_Operation(label, matrix))
+        self._redo.clear()
+        self._current = self._segment_matrix()
+
+    def apply_lossy(self, operation: Callable[[mesh.Mesh], Optional[mesh.Mesh]], label: str = "Operación") -> mesh.Mesh:
+        """
+        Aplica una operación que no puede deshacerse con una matriz, guardando
+        antes un punto de control comprimido.
+
+        Args:
+            operation (Callable[[mesh.Mesh], Optional[mesh.Mesh]]): Recibe el modelo
+                actual; puede modificarlo en el sitio o devolver uno nuevo.
+            label (str): Descripción para la interfaz.
+
+        Returns:
+            mesh.Mesh: El modelo resultante.
+        """
+        model = self.materialize()
+        entry = _Operation(label)
+        entry.before = pack_array(model.data)
+        entry.segment = self._current.copy()
+        result = operation(model)
+        self._model = model if result is None else result
+        self._redo.clear()
+        self._applied = identity_matrix()
+        self._current = identity_matrix()
+        if entry.nbytes > self.max_checkpoint_bytes:
+            # El punto de control no cabe: la operación no podrá deshacerse.
+            self._undo.clear()
+        else:
+            self._undo.append(entry)
+            self._enforce_limit()
+        return self._model
+
+    def _restore(self, packed: Tuple[bytes, np.dtype, Tuple[int, ...]]) -> None:
+        """Sustituye los datos del modelo por un punto de control."""
+        data = unpack_array(packed)
+        if self._model.data.shape == data.shape:
+            self._model.data[...] = data
+            for refresh in ("update_min", "update_max"):
+                if hasattr(self._model, refresh):
+                    getattr(self._model, refresh)()
+        else:
+            self._model = mesh.Mesh(data, calculate_normals=False)
+
+    def undo(self) -> Optional[str]:
+        """
+        Deshace la última operación.
+
+        Returns:
+            Optional[str]: Descripción de la operación deshecha, o None si no había ninguna.
+        """
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        if entry.matrix is not None:
+            self._current = self._segment_matrix()
+        else:
+            model = self.materialize()
+            if entry.after is None:
+                entry.after = pack_array(model.data)
+            self._restore(entry.before)
+            self._applied = entry.segment.copy()
+            self._current = entry.segment.copy()
+        self._redo.append(entry)
+        self._enforce_limit()
+        return entry.label
+
+    def redo(self) -> Optional[str]:
+        """
+        Rehace la última operación deshecha.
+
+        Returns:
+            Optional[str]: Descripción de la operación rehecha, o None si no había ninguna.
+        """
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        if entry.matrix is not None:
+            self._current = self._segment_matrix()
+        else:
+            self.materialize()
+            self._restore(entry.after)
+            self._applied = identity_matrix()
+            self._current = identity_matrix()
+        return entry.label
+
+    def _enforce_limit(self) -> None:
+        """Descarta lo más antiguo del historial hasta que los puntos de control quepan en el límite."""
+        while self.checkpoint_bytes() > self.max_checkpoint_bytes:
+            # Lo más lejano es lo más antiguo de deshacer o lo último que se desharía al rehacer.
+            lossy = [i for i, entry in enumerate(self._undo) if entry.matrix is None]
+            if lossy:
+                # Sin ese punto de control no se puede volver más atrás de él.
+                del self._undo[:lossy[0] + 1]
+            elif self._redo:
+                del self._redo[0]
+            else:
+                break
+
+    def checkpoint_bytes(self) -> int:
+        """Memoria ocupada por los puntos de control comprimidos."""
+        return sum(entry.nbytes for entry in self._undo) + sum(entry.nbytes for entry in self._redo)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Resume la memoria del historial.
+
+        Returns:
+            Dict[str, int]: {'operations', 'matrices', 'checkpoints', 'checkpoint_bytes', 'model_bytes'}.
+        """
+        entries = self._undo + self._redo
+        matrices = sum(1 for entry in entries if entry.matrix is not None)
+        return {
+            "operations": len(entries),
+            "matrices": matrices,
+            "checkpoints": len(entries) - matrices,
+            "checkpoint_bytes": self.checkpoint_bytes(),
+            "model_bytes": int(self._model.data.nbytes),
+        }
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import time
+
+    from stl_transform import rotation_matrix, scale_matrix
+
+    count = 2_000_000
+    data = np.zeros(count, dtype=mesh.Mesh.dtype)
+    data["vectors"] = np.random.default_rng(0).random((count, 3, 3), dtype=np.float32)
+    demo = mesh.Mesh(data, calculate_normals=False)
+    history = TransformHistory(demo)
+
+    history.apply(scale_matrix(25.4), "Escala x25.4")
+    history.apply(rotation_matrix("z", 90), "Giro 90°")
+    start = time.perf_counter()
+    history.undo()
+    history.undo()
+    print(f"Deshacer dos operaciones: {(time.perf_counter() - start) * 1e6:.0f} µs (pendiente: {history.pending})")
+    history.redo()
+    start = time.perf_counter()
+    history.materialize()
+    print(f"Aplicar la escala rehecha: {time.perf_counter() - start:.3f} s")
+    history.apply_lossy(lambda model: mesh.Mesh(model.data[: count // 2].copy()), "Recorte")
+    history.undo()
+    print(f"Facetas tras deshacer el recorte: {len(history.model.vectors)}")
+    print("Memoria del historial:", history.memory_usage())
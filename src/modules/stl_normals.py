@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_normals.py
+
+Este módulo recalcula las normales unitarias de las facetas sin los arreglos
+temporales de tamaño completo que crea update_normals() de numpy-stl (v1-v0,
+v2-v0, el producto vectorial y sus intermedios, además de áreas y centroides).
+
+  - El cálculo se hace por bloques de 'chunk_size' facetas sobre búferes
+    preasignados una sola vez: restas, producto vectorial componente a
+    componente y normalización escriben siempre en el mismo búfer.
+  - Las componentes se guardan como filas contiguas (3, bloque), de modo que
+    cada operación recorre memoria consecutiva.
+  - Con precision="float64" las restas se hacen en float64 (exactas para
+    coordenadas float32) y el producto vectorial también. En piezas muy
+    pequeñas escaladas (figuras 1:72) o alejadas del origen, el float32
+    pierde casi todos los dígitos en la cancelación de las restas y los
+    productos.
+  - normals_preserved() indica si una transformación deja las normales
+    unitarias intactas (escalado uniforme positivo más traslación): en ese
+    caso no hay que recalcular nada.
+
+benchmark_normals() compara velocidad y error angular (respecto a una
+referencia en float64) de update_normals() y de este módulo.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+from stl import mesh
+
+# Facetas procesadas por bloque (los búferes ocupan ~ 9 · chunk_size valores).
+DEFAULT_CHUNK_SIZE = 262_144
+
+# Precisión del cálculo -> tipo de los búferes.
+PRECISIONS = {"float32": np.float32, "float64": np.float64}
+
+
+def normals_preserved(matrix: np.ndarray, rtol: float = 1e-12) -> bool:
+    """
+    Indica si una transformación conserva las normales unitarias.
+
+    Solo ocurre cuando la parte lineal es s·I con s > 0 (escalado uniforme,
+    con o sin traslación): las caras no cambian de orientación ni de sentido.
+
+    Args:
+        matrix (np.ndarray): Matriz homogénea 4x4 (o la parte lineal 3x3).
+        rtol (float): Tolerancia relativa al comparar con s·I.
+    """
+    linear = np.asarray(matrix, dtype=np.float64)[:3, :3]
+    scale = linear[0, 0]
+    return bool(scale > 0 and np.allclose(linear, scale * np.eye(3), rtol=0.0, atol=rtol * scale))
+
+
+def compute_normals(
+    vectors: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    precision: str = "float32",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Calcula las normales unitarias (v1 - v0) × (v2 - v0) de todas las facetas.
+
+    Las facetas degeneradas (área nula) reciben la normal (0, 0, 0).
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        out (Optional[np.ndarray]): Arreglo (N, 3) donde escribir el resultado
+                                    (por ejemplo, model.normals). Si es None se crea uno float32.
+        precision (str): 'float32' o 'float64' (restas y producto en doble precisión).
+        chunk_size (int): Facetas por bloque.
+
+    Returns:
+        np.ndarray: 'out' con las normales unitarias.
+
+    Raises:
+        ValueError: Si la precisión o el tamaño de bloque no son válidos.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisión no válida: {precision!r}. Usa 'float32' o 'float64'.")
+    if chunk_size <= 0:
+        raise ValueError("El tamaño de bloque debe ser mayor que cero.")
+    dtype = PRECISIONS[precision]
+    count = len(vectors)
+    if out is None:
+        out = np.empty((count, 3), dtype=np.float32)
+    if not count:
+        return out
+
+    size = min(chunk_size, count)
+    # Búferes reutilizados en todos los bloques: aristas, producto y longitud.
+    edge_a = np.empty((3, size), dtype=dtype)
+    edge_b = np.empty((3, size), dtype=dtype)
+    cross = np.empty((3, size), dtype=dtype)
+    scratch = np.empty(size, dtype=dtype)
+    length = np.empty(size, dtype=dtype)
+
+    for start in range(0, count, size):
+        stop = min(start + size, count)
+        n = stop - start
+        block = vectors[start:stop]
+        a, b, c, t, norm = edge_a[:, :n], edge_b[:, :n], cross[:, :n], scratch[:n], length[:n]
+        np.subtract(block[:, 1].T, block[:, 0].T, out=a, dtype=dtype)
+        np.subtract(block[:, 2].T, block[:, 0].T, out=b, dtype=dtype)
+
+        # c = a × b, componente a componente y sin temporales.
+        for i, j, k in ((0, 1, 2), (1, 2, 0), (2, 0, 1)):
+            np.multiply(a[j], b[k], out=c[i])
+            np.multiply(a[k], b[j], out=t)
+            np.subtract(c[i], t, out=c[i])
+
+        np.multiply(c[0], c[0], out=norm)
+        for i in (1, 2):
+            np.multiply(c[i], c[i], out=t)
+            np.add(norm, t, out=norm)
+        np.sqrt(norm, out=norm)
+        # Las facetas degeneradas se dividen por 1 y quedan en (0, 0, 0).
+        norm[norm == 0] = 1.0
+        np.divide(c, norm, out=c)
+        out[start:stop] = c.T
+    return out
+
+
+def update_normals(
+    stl_model: mesh.Mesh,
+    precision: str = "float32",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> mesh.Mesh:
+    """
+    Recalcula en el sitio las normales unitarias de un modelo.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo a actualizar.
+        precision (str): 'float32' o 'float64'.
+        chunk_size (int): Facetas por bloque.
+
+    Returns:
+        mesh.Mesh: El mismo modelo.
+    """
+    compute_normals(stl_model.vectors, out=stl_model.normals, precision=precision, chunk_size=chunk_size)
+    return stl_model
+
+
+def angular_error(normals: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Ángulo (en grados) entre cada normal y la de referencia.
+
+    Las normales no tienen por qué ser unitarias. Se usa atan2(|a × b|, a · b),
+    estable también para ángulos muy pequeños. Si solo una de las dos es nula
+    el error es de 90°.
+    """
+    a = np.asarray(normals, dtype=np.float64)
+    b = np.asarray(reference, dtype=np.float64)
+    error = np.degrees(np.arctan2(np.linalg.norm(np.cross(a, b), axis=1), np.einsum("ij,ij->i", a, b)))
+    error[(np.abs(a).max(axis=1) > 0) != (np.abs(b).max(axis=1) > 0)] = 90.0
+    return error
+
+
+def benchmark_normals(
+    stl_model: Optional[mesh.Mesh] = None,
+    facets: int = 1_000_000,
+    factor: float = 1.0 / 72.0,
+    runs: int = 3,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Compara update_normals() de numpy-stl con compute_normals() en float32 y float64.
+
+    Sin modelo se genera una malla sintética de facetas pequeñas y alargadas
+    lejos del origen (detalles de una figura 1:1 de unos 100 mm), que
+    después se escala por 'factor'. La referencia se calcula en float64 con
+    np.cross sobre los vértices ya escalados (en float32).
+
+    Args:
+        stl_model (Optional[mesh.Mesh]): Modelo a usar (no se modifica).
+        facets (int): Facetas de la malla sintética.
+        factor (float): Escala aplicada antes de medir.
+        runs (int): Repeticiones de cada método (se toma la más rápida).
+        seed (int): Semilla de la malla sintética.
+
+    Returns:
+        Dict[str, Any]: {método: {'seconds', 'max_error_deg', 'mean_error_deg'}}
+            para 'numpy-stl', 'float32' y 'float64'.
+    """
+    if stl_model is None:
+        rng = np.random.default_rng(seed)
+        centers = rng.uniform(20.0, 120.0, (facets, 1, 3))
+        offsets = rng.normal(0.0, 0.05, (facets, 3, 3)) * [[1.0], [1.0], [0.01]]
+        data = np.zeros(facets, dtype=mesh.Mesh.dtype)
+        data["vectors"] = centers + offsets
+        stl_model = mesh.Mesh(data, calculate_normals=False)
+    work = mesh.Mesh(stl_model.data.copy(), calculate_normals=False)
+    work.vectors *= np.float32(factor)
+
+    v = work.vectors.astype(np.float64)
+    reference = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+
+    methods = {
+        "numpy-stl": lambda: work.update_normals(),
+        "float32": lambda: compute_normals(work.vectors, out=work.normals, precision="float32"),
+        "float64": lambda: compute_normals(work.vectors, out=work.normals, precision="float64"),
+    }
+    results: Dict[str, Any] = {}
+    for name, method in methods.items():
+        best = float("inf")
+        for _ in range(max(1, runs)):
+            start = time.perf_counter()
+            method()
+            best = min(best, time.perf_counter() - start)
+        error = angular_error(work.normals, reference)
+        results[name] = {
+            "seconds": best,
+            "max_error_deg": float(error.max()) if len(error) else 0.0,
+            "mean_error_deg": float(error.mean()) if len(error) else 0.0,
+        }
+    return results
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    for method, result in benchmark_normals().items():
+        print(
+            f"{method:10s} {result['seconds'] * 1000:8.1f} ms  "
+            f"error máx. {result['max_error_deg']:.3g}°  medio {result['mean_error_deg']:.3g}°"
+        )
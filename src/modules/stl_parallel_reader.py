@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_parallel_reader.py
+
+Lector de archivos STL que reparte el trabajo entre varios núcleos.
+
+En un STL binario cada faceta ocupa exactamente 50 bytes a partir del byte 84,
+por lo que el cuerpo del archivo puede dividirse en rangos independientes.
+Cada hilo lee su rango directamente dentro de un único arreglo preasignado
+(readinto libera el GIL durante la E/S), y el arreglo se interpreta con el
+dtype estructurado de numpy-stl, de modo que no existe una fase de
+desempaquetado ni de unión posterior: el resultado ya está en orden.
+
+En un STL ASCII las facetas ocupan varias líneas, así que el archivo se
+divide cerca de posiciones de bytes equidistantes y cada corte se desplaza
+hasta el final de la siguiente línea 'endfacet'. Cada fragmento se analiza en
+un proceso independiente con las mismas reglas tolerantes que
+STLReader._read_ascii (los valores no numéricos se rellenan con ceros) y los
+arreglos resultantes se concatenan en el orden del archivo.
+
+El diccionario que retorna `read()` es idéntico al del lector secuencial
+(STLReader), y `read_array()` / `read_mesh()` evitan la conversión a listas
+de Python cuando se trabaja con NumPy o numpy-stl.
+"""
+
+import gc
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from stl_reader import STLReader
+
+# dtype de un registro binario de 50 bytes (idéntico a stl.mesh.Mesh.dtype).
+STL_DTYPE = np.dtype([
+    ("normals", "<f4", (3,)),
+    ("vectors", "<f4", (3, 3)),
+    ("attr", "<u2", (1,)),
+])
+
+# Por debajo de este número de facetas por hilo no compensa repartir la lectura.
+MIN_FACETS_PER_WORKER = 65_536
+
+# Por debajo de este tamaño (en bytes) por proceso no compensa repartir un STL ASCII.
+MIN_ASCII_BYTES_PER_WORKER = 4 * 1024 * 1024
+
+# Tamaño de la ventana usada para buscar 'endfacet' alrededor de cada corte.
+_BOUNDARY_WINDOW = 64 * 1024
+
+
+def _read_range(file_path: str, buffer: memoryview, start: int, end: int) -> None:
+    """
+    Lee las facetas [start, end) del archivo binario dentro de 'buffer'.
+
+    Cada hilo abre su propio descriptor para que las lecturas no compitan
+    por la posición del archivo.
+    """
+    first_byte, last_byte = 84 + start * 50, 84 + end * 50
+    target = buffer[start * 50:end * 50]
+    with open(file_path, "rb") as f:
+        f.seek(first_byte)
+        read = 0
+        while read < last_byte - first_byte:
+            n = f.readinto(target[read:])
+            if not n:
+                raise ValueError(f"Datos incompletos en la faceta número {start + read // 50}.")
+            read += n
+
+
+def split_ranges(count: int, workers: int, min_per_worker: int = MIN_FACETS_PER_WORKER) -> List[Tuple[int, int]]:
+    """
+    Divide 'count' facetas en rangos contiguos [inicio, fin) para cada trabajador.
+
+    Args:
+        count (int): Número total de facetas.
+        workers (int): Número máximo de trabajadores.
+        min_per_worker (int): Tamaño mínimo de cada rango.
+
+    Returns:
+        List[Tuple[int, int]]: Rangos en el orden del archivo.
+    """
+    if count <= 0:
+        return []
+    parts = max(1, min(workers, count // max(1, min_per_worker)))
+    bounds = np.linspace(0, count, parts + 1).astype(np.int64)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _line_end(data: bytes, pos: int) -> int:
+    """Retorna la posición siguiente al fin de línea que empieza en 'pos', o -1."""
+    for i in range(pos, len(data)):
+        if data[i] == 0x0A:
+            return i + 1
+        if data[i] == 0x0D:
+            # CRLF cuenta como un único fin de línea.
+            if i + 1 < len(data):
+                return i + 2 if data[i + 1] == 0x0A else i + 1
+            return -1
+    return -1
+
+
+def find_facet_boundaries(file_path: str, parts: int) -> List[int]:
+    """
+    Calcula los puntos de corte de un STL ASCII alineados con las facetas.
+
+    Cada corte se sitúa justo después de la primera línea que comienza con
+    'endfacet' a partir de una posición equidistante del archivo, de modo que
+    todos los fragmentos empiezan fuera de una faceta.
+
+    Args:
+        file_path (str): Ruta del archivo ASCII.
+        parts (int): Número de fragmentos deseado.
+
+    Returns:
+        List[int]: Posiciones [0, c1, ..., tamaño] crecientes y sin repetir.
+    """
+    size = os.path.getsize(file_path)
+    boundaries = [0]
+    with open(file_path, "rb") as f:
+        for k in range(1, max(1, parts)):
+            pos = max(boundaries[-1], size * k // parts)
+            cut = -1
+            while pos < size and cut < 0:
+                f.seek(pos)
+                # Se solapa un poco la ventana para no partir la palabra clave.
+                window = f.read(_BOUNDARY_WINDOW + 16)
+                lowered = window.lower()
+                start = 0
+                while True:
+                    found = lowered.find(b"endfacet", start)
+                    if found < 0 or found >= _BOUNDARY_WINDOW:
+                        break
+                    # Solo cuenta si 'endfacet' es lo primero de su línea.
+                    line_start = max(lowered.rfind(b"\n", 0, found), lowered.rfind(b"\r", 0, found)) + 1
+                    if line_start > 0 and not lowered[line_start:found].strip():
+                        end = _line_end(window, found)
+                        if end > 0:
+                            cut = pos + end
+                            break
+                    start = found + 1
+                pos += _BOUNDARY_WINDOW
+            if cut < 0 or cut >= size:
+                break
+            if cut > boundaries[-1]:
+                boundaries.append(cut)
+    boundaries.append(size)
+    return boundaries
+
+
+def _line_heads(lines: List[bytes], width: int) -> set:
+    """Conjunto de los primeros 'width' caracteres (en minúsculas) de cada línea."""
+    return {ln.lstrip()[:width].lower() for ln in lines}
+
+
+def _parse_ascii_lines_fast(lines: List[bytes]) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Ruta rápida para fragmentos con el formato estándar de 7 líneas por faceta.
+
+    Verifica la estructura por columnas (todas las líneas 'facet normal', todas
+    las 'outer loop', etc.) y convierte los números en bloque. Si alguna línea
+    se aparta del formato estándar, o algún valor no es numérico, retorna None
+    para que se use el análisis tolerante línea a línea.
+    """
+    lines = list(lines)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if lines and lines[0].lstrip().lower().startswith(b"solid"):
+        lines = lines[1:]
+    if lines and lines[-1].lstrip().lower().startswith(b"endsolid"):
+        lines = lines[:-1]
+    if not lines or len(lines) % 7:
+        return None
+
+    if not (
+        _line_heads(lines[0::7], 12) == {b"facet normal"}
+        and {ln.strip().lower() for ln in lines[1::7]} == {b"outer loop"}
+        and _line_heads(lines[2::7], 6) == {b"vertex"}
+        and _line_heads(lines[3::7], 6) == {b"vertex"}
+        and _line_heads(lines[4::7], 6) == {b"vertex"}
+        and {ln.strip().lower() for ln in lines[5::7]} == {b"endloop"}
+        and _line_heads(lines[6::7], 8) == {b"endfacet"}
+    ):
+        return None
+
+    count = len(lines) // 7
+    vertex_lines: List[bytes] = [b""] * (3 * count)
+    vertex_lines[0::3] = lines[2::7]
+    vertex_lines[1::3] = lines[3::7]
+    vertex_lines[2::3] = lines[4::7]
+
+    # Con exactamente 5 y 4 elementos por línea, los tres últimos son los números.
+    normal_tokens = b" ".join(lines[0::7]).split()
+    vertex_tokens = b" ".join(vertex_lines).split()
+    if len(normal_tokens) != 5 * count or len(vertex_tokens) != 12 * count:
+        return None
+    try:
+        normals = np.array(
+            list(map(float, normal_tokens[2::5] + normal_tokens[3::5] + normal_tokens[4::5]))
+        ).reshape(3, count).T
+        coords = np.array(
+            list(map(float, vertex_tokens[1::4] + vertex_tokens[2::4] + vertex_tokens[3::4]))
+        ).reshape(3, 3 * count).T
+    except ValueError:
+        return None
+    return np.ascontiguousarray(normals), coords.reshape(count, 3, 3), np.full(count, 3, dtype=np.int8)
+
+
+def _parse_ascii_chunk(file_path: str, start: int, end: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Analiza las facetas comprendidas entre los bytes [start, end) de un STL ASCII.
+
+    Replica las reglas de STLReader._read_ascii: líneas vacías ignoradas,
+    valores no numéricos sustituidos por (0, 0, 0) y facetas con menos de
+    tres vértices conservadas tal cual.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: normales (n, 3) y vértices
+            (n, 3, 3) en float64 (rellenos con ceros), y el número de vértices
+            leídos de cada faceta.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        raw = f.read(end - start)
+
+    raw_lines = raw.splitlines()
+    fast = _parse_ascii_lines_fast(raw_lines)
+    if fast is not None:
+        return fast
+
+    lines = [ln for ln in (r.decode("utf-8", errors="ignore").strip() for r in raw_lines) if ln]
+
+    zero = (0.0, 0.0, 0.0)
+    normals: List[Tuple[float, ...]] = []
+    vectors: List[Tuple[float, ...]] = []
+    counts: List[int] = []
+    i, total = 0, len(lines)
+    while i < total:
+        line = lines[i]
+        if not line.lower().startswith("facet normal"):
+            i += 1
+            continue
+        try:
+            normal = tuple(map(float, line.split()[-3:]))
+        except ValueError:
+            normal = zero
+        i += 1
+        if i < total and lines[i].lower() == "outer loop":
+            i += 1
+
+        facet: List[float] = []
+        count = 0
+        for _ in range(3):
+            if i < total and lines[i].lower().startswith("vertex"):
+                try:
+                    vertex = tuple(map(float, lines[i].split()[-3:]))
+                except ValueError:
+                    vertex = zero
+                facet.extend(vertex)
+                count += 1
+                i += 1
+            else:
+                break
+
+        while i < total and not lines[i].lower().startswith("endfacet"):
+            i += 1
+        normals.append(normal)
+        vectors.append(tuple(facet) + zero * (3 - count))
+        counts.append(count)
+
+    return (
+        np.array(normals, dtype=np.float64).reshape(-1, 3),
+        np.array(vectors, dtype=np.float64).reshape(-1, 3, 3),
+        np.array(counts, dtype=np.int8),
+    )
+
+
+def facets_from_array(data: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Convierte un arreglo estructurado en la lista de facetas de STLReader.
+
+    Los valores float32 se convierten a float de Python igual que struct.unpack,
+    por lo que el resultado es idéntico al del lector secuencial.
+    """
+    # Crear millones de contenedores dispara el recolector cíclico una y otra
+    # vez sin nada que recolectar; se suspende mientras se construye la lista.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        normals = list(map(tuple, data["normals"].tolist()))
+        vectors = data["vectors"].reshape(-1, 9).tolist()
+        return [
+            {"normal": n, "vertices": [(v[0], v[1], v[2]), (v[3], v[4], v[5]), (v[6], v[7], v[8])]}
+            for n, v in zip(normals, vectors)
+        ]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+class ParallelSTLReader(STLReader):
+    """
+    Variante de STLReader que reparte la lectura entre varios núcleos:
+    hilos para los STL binarios y procesos para los ASCII.
+
+    Args:
+        file_path (str): Ruta del archivo STL.
+        workers (Optional[int]): Número de hilos o procesos. Por defecto, os.cpu_count().
+    """
+
+    def __init__(self, file_path: str, workers: Optional[int] = None) -> None:
+        super().__init__(file_path)
+        self.workers = workers or os.cpu_count() or 1
+
+    def read_array(self, allocate: Optional[Callable[[int], np.ndarray]] = None) -> Tuple[str, np.ndarray]:
+        """
+        Lee el archivo y retorna sus facetas como arreglo estructurado.
+
+        Args:
+            allocate (Optional[Callable[[int], np.ndarray]]): Función que recibe el
+                número de facetas y retorna el arreglo (con dtype STL_DTYPE) en el
+                que se guardará el resultado, por ejemplo sobre memoria compartida.
+                En archivos binarios se lee directamente sobre él.
+
+        Returns:
+            Tuple[str, np.ndarray]: (encabezado, arreglo con campos 'normals',
+                                    'vectors' y 'attr'). El encabezado es ''
+                                    en archivos ASCII.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"El archivo '{self.file_path}' no existe.")
+
+        with self.file_path.open("rb") as f:
+            detected = self._detect_binary(f)
+        if detected is None:
+            data = self._read_ascii_array()
+            if allocate is None:
+                return "", data
+            out = allocate(len(data))
+            out[...] = data
+            return "", out
+
+        header, triangle_count = detected
+        out = allocate(triangle_count) if allocate is not None else None
+        return header.decode("utf-8", errors="ignore").strip(), self._read_binary_array(triangle_count, out)
+
+    def _read_binary_array(self, triangle_count: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Lee el cuerpo binario en paralelo sobre un arreglo preasignado."""
+        data = np.empty(triangle_count, dtype=STL_DTYPE) if out is None else out
+        buffer = memoryview(data.view(np.uint8).reshape(-1))
+        ranges = split_ranges(triangle_count, self.workers)
+        path = str(self.file_path)
+
+        if len(ranges) <= 1:
+            for start, end in ranges:
+                _read_range(path, buffer, start, end)
+            return data
+
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [pool.submit(_read_range, path, buffer, start, end) for start, end in ranges]
+            for future in futures:
+                future.result()
+        return data
+
+    def _parse_ascii_parallel(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Divide el STL ASCII en fragmentos alineados con 'endfacet', los analiza
+        en un conjunto de procesos y concatena los resultados en orden.
+        """
+        path = str(self.file_path)
+        size = self.file_path.stat().st_size
+        parts = max(1, min(self.workers, size // MIN_ASCII_BYTES_PER_WORKER))
+        boundaries = find_facet_boundaries(path, parts)
+        spans = list(zip(boundaries[:-1], boundaries[1:]))
+
+        if len(spans) <= 1:
+            chunks = [_parse_ascii_chunk(path, start, end) for start, end in spans]
+        else:
+            with ProcessPoolExecutor(max_workers=len(spans)) as pool:
+                chunks = list(pool.map(_parse_ascii_chunk, [path] * len(spans), *zip(*spans)))
+
+        if not chunks:
+            return np.zeros((0, 3)), np.zeros((0, 3, 3)), np.zeros(0, dtype=np.int8)
+        return (
+            np.concatenate([c[0] for c in chunks]),
+            np.concatenate([c[1] for c in chunks]),
+            np.concatenate([c[2] for c in chunks]),
+        )
+
+    def _read_ascii_array(self) -> np.ndarray:
+        """Lee un STL ASCII en paralelo y lo convierte al arreglo estructurado."""
+        normals, vectors, _ = self._parse_ascii_parallel()
+        data = np.zeros(len(normals), dtype=STL_DTYPE)
+        data["normals"] = normals
+        data["vectors"] = vectors
+        return data
+
+    def _read_ascii_facets(self) -> List[Dict[str, Any]]:
+        """Lee un STL ASCII en paralelo con el mismo resultado que _read_ascii()."""
+        normals, vectors, counts = self._parse_ascii_parallel()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            normal_list = list(map(tuple, normals.tolist()))
+            vertex_list = vectors.tolist()
+            return [
+                {"normal": n, "vertices": [tuple(v) for v in vs[:c]]}
+                for n, vs, c in zip(normal_list, vertex_list, counts.tolist())
+            ]
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def read_mesh(self):
+        """
+        Lee el archivo y retorna un modelo mesh.Mesh de numpy-stl.
+
+        El arreglo leído se entrega a numpy-stl sin copias adicionales y se
+        conservan las normales almacenadas en el archivo (como el lector serie).
+        """
+        from stl import mesh
+
+        header, data = self.read_array()
+        return mesh.Mesh(data, calculate_normals=False, name=header)
+
+    def read(self) -> Dict[str, Any]:
+        """
+        Lee el archivo STL con el mismo resultado que STLReader.read().
+
+        Returns:
+            dict: {
+                'header': <str> (solo para binario),
+                'facets': [ { 'normal': tuple, 'vertices': [tuple, ...] }, ... ]
+            }
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"El archivo '{self.file_path}' no existe.")
+
+        with self.file_path.open("rb") as f:
+            detected = self._detect_binary(f)
+        if detected is None:
+            return {"facets": self._read_ascii_facets()}
+
+        header, triangle_count = detected
+        data = self._read_binary_array(triangle_count)
+        return {
+            "header": header.decode("utf-8", errors="ignore").strip(),
+            "facets": facets_from_array(data),
+        }
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Compara el lector secuencial con el paralelo sobre el archivo indicado.
+    stl_file = sys.argv[1] if len(sys.argv) > 1 else "ruta_al_archivo.stl"
+    try:
+        t0 = time.perf_counter()
+        serial = STLReader(stl_file).read()
+        t1 = time.perf_counter()
+        parallel = ParallelSTLReader(stl_file).read()
+        t2 = time.perf_counter()
+        _, array = ParallelSTLReader(stl_file).read_array()
+        t3 = time.perf_counter()
+        print(f"Secuencial: {t1 - t0:.3f} s, paralelo (dict): {t2 - t1:.3f} s, paralelo (arreglo): {t3 - t2:.3f} s")
+        print("Resultados idénticos:", serial == parallel)
+    except Exception as e:
+        print("Error al leer el archivo STL:", e)
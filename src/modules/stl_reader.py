@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
+import os
+import re
 import struct
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Bytes que se leen del inicio de un STL ASCII al inspeccionarlo con probe().
+PROBE_ASCII_BYTES = 8 * 1024
+
+# Expresión para extraer vértices de fragmentos de texto ASCII.
+_VERTEX_RE = re.compile(rb"vertex\s+(\S+)\s+(\S+)\s+(\S+)", re.IGNORECASE)
 
 class STLReader:
     """
@@ -39,23 +48,172 @@ class STLReader:
         if not self.file_path.exists():
             raise FileNotFoundError(f"El archivo '{self.file_path}' no existe.")
 
-        file_size = self.file_path.stat().st_size
-
         # Abrir en modo binario para leer el encabezado y detectar formato
         with self.file_path.open("rb") as f:
-            header = f.read(80)
-            triangle_count_bytes = f.read(4)
-            # Si se pudieron leer 4 bytes para el contador, probamos interpretar el número de facetas
-            if len(triangle_count_bytes) == 4:
-                triangle_count = struct.unpack("<I", triangle_count_bytes)[0]
-                expected_binary_size = 84 + (triangle_count * 50)
-                # Si el tamaño esperado coincide con el tamaño del archivo,
-                # se asume que es un STL binario
-                if expected_binary_size == file_size:
-                    return self._read_binary(f, header, triangle_count)
+            detected = self._detect_binary(f)
+            if detected is not None:
+                header, triangle_count = detected
+                return self._read_binary(f, header, triangle_count)
         # En caso contrario, asumimos que es un STL ASCII
         return self._read_ascii()
 
+    def _detect_binary(self, file_obj) -> Optional[Tuple[bytes, int]]:
+        """
+        Aplica la heurística de tamaño para detectar un STL binario.
+
+        Lee el encabezado de 80 bytes y el contador de facetas. Si el tamaño
+        esperado (84 + 50 * facetas) coincide con el tamaño real del archivo,
+        se considera binario.
+
+        Args:
+            file_obj: Objeto de archivo abierto en modo binario, al inicio.
+
+        Returns:
+            Optional[Tuple[bytes, int]]: (encabezado, número de facetas) si es binario;
+                                         None en caso contrario. El archivo queda
+                                         posicionado tras el contador.
+        """
+        file_size = self.file_path.stat().st_size
+        header = file_obj.read(80)
+        triangle_count_bytes = file_obj.read(4)
+        # Si se pudieron leer 4 bytes para el contador, probamos interpretar el número de facetas
+        if len(triangle_count_bytes) == 4:
+            triangle_count = struct.unpack("<I", triangle_count_bytes)[0]
+            expected_binary_size = 84 + (triangle_count * 50)
+            # Si el tamaño esperado coincide con el tamaño del archivo,
+            # se asume que es un STL binario
+            if expected_binary_size == file_size:
+                return header, triangle_count
+        return None
+
+    def probe(self, sample: int = 0) -> Dict[str, Any]:
+        """
+        Inspecciona el archivo sin leerlo completo.
+
+        En binario solo se leen los 84 bytes iniciales (encabezado y contador);
+        en ASCII, los primeros PROBE_ASCII_BYTES, y el número de facetas se
+        estima a partir del tamaño medio de las facetas de ese fragmento.
+        Opcionalmente se muestrean vértices repartidos por el archivo para
+        estimar la caja envolvente.
+
+        Args:
+            sample (int): Número de facetas a muestrear para estimar la caja
+                          envolvente. 0 desactiva el muestreo.
+
+        Returns:
+            dict: {
+                'path': Path, 'format': 'binary' | 'ascii', 'size': int,
+                'triangles': int, 'triangles_exact': bool, 'name': str,
+                'expected_size': int | None, 'size_consistent': bool,
+                'bbox': ((x, y, z), (x, y, z)) | None
+            }
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"El archivo '{self.file_path}' no existe.")
+
+        size = self.file_path.stat().st_size
+        info: Dict[str, Any] = {
+            "path": self.file_path,
+            "size": size,
+            "bbox": None,
+        }
+        with self.file_path.open("rb") as f:
+            detected = self._detect_binary(f)
+            if detected is not None:
+                header, triangle_count = detected
+                info.update({
+                    "format": "binary",
+                    "triangles": triangle_count,
+                    "triangles_exact": True,
+                    "name": header.decode("utf-8", errors="ignore").strip("\x00 \t\r\n"),
+                    "expected_size": 84 + triangle_count * 50,
+                    "size_consistent": True,
+                })
+                if sample > 0 and triangle_count:
+                    info["bbox"] = self._sample_binary_bbox(f, triangle_count, sample)
+                return info
+
+            f.seek(0)
+            head = f.read(PROBE_ASCII_BYTES)
+            # Un STL ASCII completo termina con la línea 'endsolid'.
+            f.seek(max(0, size - 256))
+            tail = f.read()
+
+        if not head.lstrip().lower().startswith(b"solid"):
+            # No es ASCII y el tamaño no cuadra con el contador: binario truncado o dañado.
+            triangle_count = struct.unpack("<I", head[80:84])[0] if len(head) >= 84 else 0
+            info.update({
+                "format": "binary",
+                "triangles": min(triangle_count, max(0, (size - 84) // 50)),
+                "triangles_exact": False,
+                "name": head[:80].decode("utf-8", errors="ignore").strip("\x00 \t\r\n"),
+                "expected_size": 84 + triangle_count * 50,
+                "size_consistent": False,
+            })
+            return info
+
+        first_line = head.lstrip().split(b"\n", 1)[0]
+        name = first_line[5:].decode("utf-8", errors="ignore").strip()
+        lowered = head.lower()
+        facets_in_head = lowered.count(b"endfacet")
+        if facets_in_head and size > len(head):
+            # Tamaño medio de faceta medido en el fragmento inicial.
+            first = lowered.find(b"facet")
+            last = lowered.rfind(b"endfacet") + len(b"endfacet")
+            triangles = int(round((size - first) * facets_in_head / max(1, last - first)))
+            exact = False
+        else:
+            triangles = facets_in_head
+            exact = size <= len(head)
+        info.update({
+            "format": "ascii",
+            "triangles": triangles,
+            "triangles_exact": exact,
+            "name": name,
+            "expected_size": None,
+            "size_consistent": b"endsolid" in tail.lower(),
+        })
+        if sample > 0:
+            info["bbox"] = self._sample_ascii_bbox(size, sample)
+        return info
+
+    def _sample_binary_bbox(self, file_obj, triangle_count: int, sample: int):
+        """Estima la caja envolvente leyendo 'sample' facetas equiespaciadas."""
+        step = max(1, triangle_count // sample)
+        low = [float("inf")] * 3
+        high = [float("-inf")] * 3
+        for index in range(0, triangle_count, step):
+            file_obj.seek(84 + index * 50 + 12)
+            coords = struct.unpack("<9f", file_obj.read(36))
+            for axis in range(3):
+                values = coords[axis::3]
+                low[axis] = min(low[axis], *values)
+                high[axis] = max(high[axis], *values)
+        return tuple(low), tuple(high)
+
+    def _sample_ascii_bbox(self, size: int, sample: int):
+        """Estima la caja envolvente a partir de ventanas repartidas por el archivo."""
+        windows = max(1, min(sample, size // PROBE_ASCII_BYTES or 1))
+        low = [float("inf")] * 3
+        high = [float("-inf")] * 3
+        with self.file_path.open("rb") as f:
+            for k in range(windows):
+                f.seek(size * k // windows)
+                for match in _VERTEX_RE.finditer(f.read(PROBE_ASCII_BYTES)):
+                    try:
+                        vertex = tuple(map(float, match.groups()))
+                    except ValueError:
+                        continue
+                    for axis in range(3):
+                        low[axis] = min(low[axis], vertex[axis])
+                        high[axis] = max(high[axis], vertex[axis])
+        if low[0] == float("inf"):
+            return None
+        return tuple(low), tuple(high)
+
     def _read_binary(self, file_obj, header: bytes, triangle_count: int) -> Dict[str, Any]:
         """
         Procesa el archivo STL en formato binario.
@@ -146,6 +304,37 @@ class STLReader:
 
         return {"facets": facets}
 
+def probe_files(
+    paths: Iterable[Union[str, Path]],
+    sample: int = 0,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Inspecciona muchos archivos STL en paralelo con STLReader.probe().
+
+    La operación está dominada por la E/S, por lo que se usa un conjunto de
+    hilos. Los archivos que no se puedan leer aparecen con la clave 'error'.
+
+    Args:
+        paths (Iterable[Union[str, Path]]): Archivos a inspeccionar.
+        sample (int): Facetas a muestrear por archivo para la caja envolvente.
+        max_workers (Optional[int]): Hilos de E/S. Por defecto, 4 por CPU (máximo 32).
+
+    Returns:
+        List[Dict[str, Any]]: Un resultado por archivo, en el mismo orden.
+    """
+    def _probe(path: Union[str, Path]) -> Dict[str, Any]:
+        try:
+            return STLReader(str(path)).probe(sample=sample)
+        except Exception as e:
+            return {"path": Path(path), "error": str(e)}
+
+    paths = list(paths)
+    workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths) or 1))) as pool:
+        return list(pool.map(_probe, paths))
+
+
 # Ejemplo de uso:
 if __name__ == "__main__":
     # Actualiza 'ruta_al_archivo.stl' con la ruta real de tu archivo STL.
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_repair.py
+
+Este módulo repara los defectos habituales de los escaneos antes de escalar
+un modelo: con agujeros el volumen (calcular_volumen) es incorrecto y los
+laminadores fallan con el archivo exportado.
+
+Pasos de repair_mesh(), todos sobre la malla indexada (weld_vertices) y la
+tabla de aristas de stl_validation.py:
+  1. Se eliminan los triángulos degenerados (índices repetidos o área
+     despreciable) y las facetas duplicadas (mismos tres vértices).
+  2. Se corrige la orientación: las facetas se recorren en anchura (BFS)
+     sobre la adyacencia por aristas manifold, nivel a nivel y de forma
+     vectorizada, partiendo a la vez de una faceta de cada pieza. Cada
+     vecina hereda el sentido que la hace coherente con la arista
+     compartida. En cada pieza se conserva el sentido de la mayoría.
+  3. Se buscan los bucles de borde: cada arista de borde apunta a la
+     siguiente y los ciclos se etiquetan con saltos de punteros (los
+     agujeros que se tocan en un vértice se separan en ciclos simples). Los
+     bucles de hasta 'max_hole_edges' aristas se rellenan por recorte de
+     orejas (ear clipping) sobre el plano del agujero o en abanico.
+  4. Las piezas cerradas con volumen negativo se invierten para que las
+     normales apunten hacia fuera.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from stl import mesh
+
+from stl_components import union_find
+from stl_normals import compute_normals
+from stl_validation import edge_table, group_keys, weld_vertices
+
+# Aristas máximas de un agujero que se rellena (los bordes mayores se dejan abiertos).
+DEFAULT_MAX_HOLE_EDGES = 64
+
+# Métodos de relleno de agujeros.
+FILL_METHODS = ("ear", "fan")
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Producto vectorial de filas (N, 3) componente a componente (más rápido que np.cross)."""
+    return np.stack((
+        a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+        a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+        a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0],
+    ), axis=1)
+
+
+def facet_measures(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula en float64 el cuadrado del doble del área y el producto mixto v0 · (v1 × v2) de cada faceta.
+
+    El producto mixto es seis veces el volumen con signo del tetraedro con
+    vértice en el origen: su suma da el volumen de una malla cerrada.
+    """
+    v0, v1, v2 = (vectors[:, i].astype(np.float64) for i in range(3))
+    cross = _cross(v1 - v0, v2 - v0)
+    return np.einsum("ij,ij->i", cross, cross), np.einsum("ij,ij->i", v0, _cross(v1, v2))
+
+
+def remove_bad_facets(
+    vectors: np.ndarray,
+    faces: np.ndarray,
+    area_epsilon: float = 1e-12,
+    squared_areas: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, int, int]:
+    """
+    Busca los triángulos degenerados y las facetas duplicadas.
+
+    Usa los mismos criterios que check_mesh(): índices repetidos o área por
+    debajo de area_epsilon · diagonal², y mismo conjunto de vértices sin
+    importar el orden (se conserva la primera aparición).
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        faces (np.ndarray): Caras (N, 3) soldadas (weld_vertices).
+        area_epsilon (float): Área relativa de los triángulos degenerados.
+        squared_areas (Optional[np.ndarray]): Primer resultado de facet_measures, si ya se calculó.
+
+    Returns:
+        Tuple[np.ndarray, int, int]: (índices de las facetas conservadas,
+                                      degeneradas, duplicadas).
+    """
+    if not len(faces):
+        return np.zeros(0, dtype=np.int64), 0, 0
+    if squared_areas is None:
+        squared_areas = facet_measures(vectors)[0]
+    diagonal = float(np.linalg.norm(
+        vectors.max(axis=(0, 1)).astype(np.float64) - vectors.min(axis=(0, 1)).astype(np.float64)
+    ))
+    repeated = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 0] == faces[:, 2])
+    kept = np.flatnonzero(~(repeated | (squared_areas <= (2.0 * area_epsilon * diagonal ** 2) ** 2)))
+    faces = faces[kept]
+
+    # Vértices de cada faceta ordenados sin np.sort(axis=1): mínimo, medio y máximo.
+    low = np.minimum(np.minimum(faces[:, 0], faces[:, 1]), faces[:, 2])
+    high = np.maximum(np.maximum(faces[:, 0], faces[:, 1]), faces[:, 2])
+    middle = faces.sum(axis=1) - low - high
+    vertex_count = np.int64(max(1, int(high.max(initial=0)) + 1))
+    if vertex_count < 2 ** 21:
+        first = group_keys((low * vertex_count + middle) * vertex_count + high)[1]
+    else:
+        # V³ no cabe en 63 bits: se agrupa primero (mínimo, medio) y después (grupo, máximo).
+        pair_group = group_keys(low * vertex_count + middle)[2]
+        first = group_keys(pair_group * vertex_count + high)[1]
+    degenerate = len(vectors) - len(kept)
+    return kept[np.sort(first)], int(degenerate), int(len(kept) - len(first))
+
+
+def edge_partners(edges: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Empareja las aristas dirigidas de las aristas manifold (compartidas por dos facetas).
+
+    Sin ordenar: la suma de los dos índices de cada arista se acumula con
+    np.bincount y la pareja de cada una es esa suma menos su propio índice.
+
+    Args:
+        edges (Dict[str, np.ndarray]): Tabla de aristas (stl_validation.edge_table).
+
+    Returns:
+        np.ndarray: Para cada una de las 3N aristas dirigidas, el índice de la
+            otra arista dirigida de su arista, o -1 si es de borde o no manifold.
+    """
+    inverse = edges["inverse"]
+    shared = np.flatnonzero(edges["counts"][inverse] == 2)
+    totals = np.bincount(inverse[shared], weights=shared, minlength=len(edges["counts"]))
+    partner = np.full(len(inverse), -1, dtype=np.int64)
+    partner[shared] = totals[inverse[shared]].astype(np.int64) - shared
+    return partner
+
+
+def _adjacent_pairs(partner: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Parejas (faceta a, faceta b) de facetas vecinas, una por arista manifold."""
+    first = np.flatnonzero(partner > np.arange(len(partner)))
+    return first // 3, partner[first] // 3
+
+
+def orientation_flips(partner: np.ndarray, forward: np.ndarray, roots: np.ndarray) -> np.ndarray:
+    """
+    Decide qué facetas invertir con un BFS sobre su adyacencia.
+
+    Cada faceta tiene como mucho tres vecinas (una por arista manifold), así
+    que la adyacencia es una tabla (N, 3) sin ordenar nada. El recorrido
+    avanza por niveles: todas las facetas del frente se expanden a la vez y
+    cada vecina no visitada recibe el sentido que la hace coherente con la
+    arista compartida (las dos facetas deben recorrerla en sentidos
+    opuestos). Se parte de la raíz de cada pieza y, al terminar, en cada pieza
+    se invierte la elección si así cambian menos facetas. En superficies no
+    orientables (cinta de Möbius) alguna arista queda inconsistente.
+
+    Args:
+        partner (np.ndarray): Pareja de cada arista dirigida (edge_partners).
+        forward (np.ndarray): Sentido de cada arista dirigida (edge_table).
+        roots (np.ndarray): Pieza de cada faceta (union_find sobre la adyacencia).
+
+    Returns:
+        np.ndarray: Máscara (N,) de las facetas a invertir.
+    """
+    count = len(roots)
+    neighbours = np.where(partner >= 0, partner // 3, -1).reshape(-1, 3)
+    # True si la vecina recorre la arista en el mismo sentido (hay que invertir una).
+    relation = (forward == forward[partner]).reshape(-1, 3)
+
+    flip = np.zeros(count, dtype=bool)
+    visited = np.zeros(count + 1, dtype=bool)
+    visited[-1] = True  # Índice -1: sin vecina.
+    frontier = np.flatnonzero(roots == np.arange(count))
+    visited[frontier] = True
+    while len(frontier):
+        candidates = neighbours[frontier].reshape(-1)
+        fresh = np.flatnonzero(~visited[candidates])
+        if not len(fresh):
+            break
+        wanted = np.repeat(flip[frontier], 3)[fresh] ^ relation[frontier].reshape(-1)[fresh]
+        frontier = candidates[fresh]
+        flip[frontier] = wanted
+        visited[frontier] = True
+        frontier = np.unique(frontier)
+
+    # En cada pieza, conservar el sentido de la mayoría de sus facetas.
+    flipped_per_piece = np.bincount(roots, weights=flip, minlength=count)
+    size_per_piece = np.bincount(roots, minlength=count)
+    flip ^= (2 * flipped_per_piece > size_per_piece)[roots]
+    return flip
+
+
+def orient_faces(faces: np.ndarray, vertex_count: int) -> Tuple[np.ndarray, int]:
+    """
+    Orienta las facetas de forma coherente (ver orientation_flips).
+
+    Args:
+        faces (np.ndarray): Caras (N, 3) con índices de vértices.
+        vertex_count (int): Número de vértices.
+
+    Returns:
+        Tuple[np.ndarray, int]: (caras orientadas, número de facetas invertidas).
+    """
+    if not len(faces):
+        return faces, 0
+    edges = edge_table(faces, vertex_count)
+    partner = edge_partners(edges)
+    flip = orientation_flips(partner, edges["forward"], union_find(*_adjacent_pairs(partner), len(faces)))
+    oriented = faces.copy()
+    oriented[flip] = oriented[flip][:, [0, 2, 1]]
+    return oriented, int(np.count_nonzero(flip))
+
+
+def _flip_edges(edges: Dict[str, np.ndarray], flip: np.ndarray) -> None:
+    """
+    Actualiza en el sitio la tabla de aristas tras invertir facetas (a, b, c) -> (a, c, b).
+
+    Las aristas no cambian; solo su orden dentro de la faceta (a->c, c->b, b->a
+    son las antiguas c->a, b->c y a->b recorridas al revés) y su sentido.
+    """
+    inverse = edges["inverse"].reshape(-1, 3)
+    forward = edges["forward"].reshape(-1, 3)
+    inverse[flip] = inverse[flip][:, [2, 1, 0]]
+    forward[flip] = ~forward[flip][:, [2, 1, 0]]
+
+
+def boundary_loops(
+    faces: np.ndarray,
+    vertex_count: int,
+    edges: Optional[Dict[str, np.ndarray]] = None,
+) -> Tuple[List[np.ndarray], int]:
+    """
+    Encuentra los bucles de borde de una malla orientada.
+
+    Cada arista de borde dirigida u -> v (en el sentido de su faceta) apunta a
+    la siguiente que sale de v. Los ciclos simples se etiquetan con saltos de
+    punteros (la etiqueta es el menor vértice del ciclo) y después se
+    recorren en orden. Los bordes que pasan por un vértice con varias aristas
+    de borde (agujeros que se tocan en un vértice) se descomponen en ciclos
+    simples recorriendo solo esas aristas.
+
+    Args:
+        faces (np.ndarray): Caras (N, 3) con índices de vértices.
+        vertex_count (int): Número de vértices.
+        edges (Optional[Dict[str, np.ndarray]]): Tabla de aristas ya calculada.
+
+    Returns:
+        Tuple[List[np.ndarray], int]: (vértices de cada bucle en el orden de las
+            aristas de borde, aristas de borde que no forman ningún ciclo).
+    """
+    if not len(faces):
+        return [], 0
+    if edges is None:
+        edges = edge_table(faces, vertex_count)
+    boundary = edges["counts"][edges["inverse"]] == 1
+    start = faces.reshape(-1)[boundary]
+    end = faces[:, [1, 2, 0]].reshape(-1)[boundary]
+    if not len(start):
+        return [], 0
+
+    out_degree = np.bincount(start, minlength=vertex_count)
+    in_degree = np.bincount(end, minlength=vertex_count)
+    vertices = np.flatnonzero((out_degree > 0) | (in_degree > 0))
+    bad = (out_degree[vertices] != 1) | (in_degree[vertices] != 1)
+
+    # Índices locales: cada vértice de borde apunta al siguiente (o a sí mismo si es "malo").
+    local = np.full(vertex_count, -1, dtype=np.int64)
+    local[vertices] = np.arange(len(vertices))
+    pointer = np.arange(len(vertices))
+    simple_edges = ~bad[local[start]]
+    pointer[local[start[simple_edges]]] = local[end[simple_edges]]
+    label = np.arange(len(vertices))
+    reaches_bad = bad.copy()
+    for _ in range(int(np.ceil(np.log2(len(vertices) + 1))) + 1):
+        label = np.minimum(label, label[pointer])
+        reaches_bad |= reaches_bad[pointer]
+        pointer = pointer[pointer]
+
+    following = np.full(vertex_count, -1, dtype=np.int64)
+    following[start] = end
+    loops = []
+    for head in np.unique(label[~reaches_bad]):
+        loop = [vertices[head]]
+        nxt = following[loop[0]]
+        while nxt != loop[0]:
+            loop.append(nxt)
+            nxt = following[nxt]
+        loops.append(np.array(loop, dtype=np.int64))
+
+    # Resto de aristas: se recorren y, al volver a un vértice del camino, se corta un ciclo.
+    outgoing: Dict[int, List[int]] = {}
+    pending = reaches_bad[local[start]]
+    for u, v in zip(start[pending].tolist(), end[pending].tolist()):
+        outgoing.setdefault(u, []).append(v)
+    unpaired = 0
+    for origin in list(outgoing):
+        while outgoing[origin]:
+            path = [origin]
+            position = {origin: 0}
+            while True:
+                targets = outgoing.get(path[-1])
+                if not targets:
+                    unpaired += len(path) - 1
+                    break
+                nxt = targets.pop()
+                if nxt not in position:
+                    position[nxt] = len(path)
+                    path.append(nxt)
+                    continue
+                cut = position[nxt]
+                loops.append(np.array(path[cut:], dtype=np.int64))
+                for vertex in path[cut + 1:]:
+                    del position[vertex]
+                del path[cut + 1:]
+    return loops, unpaired
+
+
+def _ear_clip(polygon: np.ndarray, points: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Triangula un polígono 3D por recorte de orejas sobre su plano medio.
+
+    El plano se obtiene con el método de Newell y se proyecta de forma que el
+    polígono quede en sentido antihorario; los triángulos conservan el sentido
+    del polígono.
+
+    Returns:
+        Optional[np.ndarray]: Caras (n - 2, 3), o None si la proyección no es un
+            polígono simple (se rellena entonces en abanico).
+    """
+    p = points[polygon].astype(np.float64)
+    normal = np.cross(p, np.roll(p, -1, axis=0)).sum(axis=0)
+    length = np.linalg.norm(normal)
+    if length == 0:
+        return None
+    normal /= length
+    axis_u = np.cross(normal, [1.0, 0.0, 0.0] if abs(normal[0]) < 0.9 else [0.0, 1.0, 0.0])
+    axis_u /= np.linalg.norm(axis_u)
+    axis_v = np.cross(normal, axis_u)
+    xy = np.stack((p @ axis_u, p @ axis_v), axis=1)
+
+    remaining = list(range(len(polygon)))
+    triangles = []
+    while len(remaining) > 3:
+        for position in range(len(remaining)):
+            i = remaining[position - 1]
+            j = remaining[position]
+            k = remaining[(position + 1) % len(remaining)]
+            a, b, c = xy[i], xy[j], xy[k]
+            if (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]) <= 0:
+                continue
+            others = xy[[r for r in remaining if r not in (i, j, k)]]
+            # Ningún otro vértice puede quedar dentro (o sobre) la oreja.
+            d1 = (b[0] - a[0]) * (others[:, 1] - a[1]) - (b[1] - a[1]) * (others[:, 0] - a[0])
+            d2 = (c[0] - b[0]) * (others[:, 1] - b[1]) - (c[1] - b[1]) * (others[:, 0] - b[0])
+            d3 = (a[0] - c[0]) * (others[:, 1] - c[1]) - (a[1] - c[1]) * (others[:, 0] - c[0])
+            if np.any((d1 >= 0) & (d2 >= 0) & (d3 >= 0)):
+                continue
+            triangles.append((polygon[i], polygon[j], polygon[k]))
+            del remaining[position]
+            break
+        else:
+            return None
+    triangles.append(tuple(polygon[r] for r in remaining))
+    return np.array(triangles, dtype=np.int64)
+
+
+def fill_hole(loop: np.ndarray, points: np.ndarray, method: str = "ear") -> np.ndarray:
+    """
+    Triangula un agujero sin añadir vértices.
+
+    Las aristas de borde van en el sentido de sus facetas, así que el relleno
+    recorre el bucle al revés para que la malla siga orientada.
+
+    Args:
+        loop (np.ndarray): Vértices del bucle (boundary_loops).
+        points (np.ndarray): Vértices de la malla.
+        method (str): 'ear' (recorte de orejas; en abanico si falla) o 'fan'.
+
+    Returns:
+        np.ndarray: Caras nuevas (len(loop) - 2, 3).
+    """
+    polygon = np.asarray(loop, dtype=np.int64)[::-1]
+    if method == "ear" and len(polygon) > 3:
+        triangles = _ear_clip(polygon, points)
+        if triangles is not None:
+            return triangles
+    rest = np.arange(1, len(polygon) - 1)
+    return np.stack((np.full(len(rest), polygon[0]), polygon[rest], polygon[rest + 1]), axis=1)
+
+
+def repair_mesh(
+    vectors: np.ndarray,
+    tolerance: float = 0.0,
+    max_hole_edges: int = DEFAULT_MAX_HOLE_EDGES,
+    fill_method: str = "ear",
+    area_epsilon: float = 1e-12,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Limpia, orienta y rellena los agujeros pequeños de una malla.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        tolerance (float): Tolerancia para soldar vértices (ver weld_vertices).
+        max_hole_edges (int): Aristas máximas de un agujero para rellenarlo (0 = no rellenar).
+        fill_method (str): 'ear' (recorte de orejas) o 'fan' (abanico).
+        area_epsilon (float): Área relativa de los triángulos degenerados (ver check_mesh).
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, Any]]: (facetas reparadas (M, 3, 3) en float32,
+            resumen con 'triangles_in', 'triangles', 'degenerate_removed',
+            'duplicates_removed', 'flipped_facets', 'holes', 'holes_filled',
+            'facets_added', 'open_boundary_edges' (aristas de borde sin rellenar)
+            y 'pieces_reversed').
+
+    Raises:
+        ValueError: Si el método de relleno no es válido.
+    """
+    if fill_method not in FILL_METHODS:
+        raise ValueError(f"Método de relleno no válido: {fill_method!r}. Usa 'ear' o 'fan'.")
+    vectors = np.asarray(vectors)
+    points, faces = weld_vertices(vectors, tolerance=tolerance)
+    vertex_count = len(points)
+
+    squared_areas, triple = facet_measures(vectors)
+    kept, degenerate, duplicates = remove_bad_facets(vectors, faces, area_epsilon, squared_areas)
+    faces, triple = faces[kept], triple[kept]
+    del squared_areas
+    count = len(faces)
+
+    # La tabla de aristas y las piezas se calculan una sola vez: al invertir
+    # facetas y al rellenar agujeros se actualizan en lugar de recalcularse.
+    edges = edge_table(faces, vertex_count)
+    partner = edge_partners(edges)
+    roots = union_find(*_adjacent_pairs(partner), count)
+    flip = orientation_flips(partner, edges["forward"], roots)
+    faces[flip] = faces[flip][:, [0, 2, 1]]
+    triple[flip] *= -1.0
+    _flip_edges(edges, flip)
+
+    loops, _ = boundary_loops(faces, vertex_count, edges)
+    fillable = [loop for loop in loops if 3 <= len(loop) <= max_hole_edges]
+    patches = [fill_hole(loop, points, fill_method) for loop in fillable]
+
+    # Una pieza sigue abierta si tiene aristas no manifold o bordes sin rellenar.
+    counts = edges["counts"][edges["inverse"]]
+    starts = faces.reshape(-1)
+    directed_keys = starts * np.int64(vertex_count) + faces[:, [1, 2, 0]].reshape(-1)
+    filled = np.zeros(len(starts), dtype=bool)
+    if fillable:
+        loop_keys = np.concatenate([loop * np.int64(vertex_count) + np.roll(loop, -1) for loop in fillable])
+        boundary = np.flatnonzero(counts == 1)
+        filled[boundary] = np.isin(directed_keys[boundary], loop_keys)
+    open_edges = (counts > 2) | ((counts == 1) & ~filled)
+    is_open = np.zeros(count, dtype=bool)
+    is_open[roots[np.flatnonzero(open_edges) // 3]] = True
+
+    if patches:
+        # Cada relleno pertenece a la pieza de la faceta que tiene la primera arista del bucle.
+        boundary_face = np.full(vertex_count, -1, dtype=np.int64)
+        boundary_face[starts[boundary]] = boundary // 3
+        patch_roots = [np.full(len(patch), roots[boundary_face[loop[0]]]) for loop, patch in zip(fillable, patches)]
+        faces = np.concatenate([faces] + patches)
+        roots = np.concatenate([roots] + patch_roots)
+        triple = np.concatenate((triple, facet_measures(points[np.concatenate(patches)])[1]))
+
+    # Piezas cerradas con volumen negativo: las normales apuntan hacia dentro.
+    volume = np.bincount(roots, weights=triple, minlength=count)
+    inverted = (volume < 0) & ~is_open
+    reverse = inverted[roots]
+    faces[reverse] = faces[reverse][:, [0, 2, 1]]
+    flipped = int(np.count_nonzero(flip))
+    reversed_pieces = int(np.count_nonzero(inverted))
+
+    report = {
+        "triangles_in": int(len(vectors)),
+        "triangles": int(len(faces)),
+        "degenerate_removed": degenerate,
+        "duplicates_removed": duplicates,
+        "flipped_facets": flipped,
+        "holes": len(loops),
+        "holes_filled": len(patches),
+        "facets_added": int(sum(len(patch) for patch in patches)),
+        "open_boundary_edges": int(np.count_nonzero((counts == 1) & ~filled)),
+        "pieces_reversed": reversed_pieces,
+    }
+    return points.astype(np.float32, copy=False)[faces], report
+
+
+def repair_model(stl_model: mesh.Mesh, **options: Any) -> Tuple[mesh.Mesh, Dict[str, Any]]:
+    """
+    Repara un modelo y retorna uno nuevo con normales unitarias.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo de origen (no se modifica).
+        **options: Opciones de repair_mesh (tolerance, max_hole_edges, fill_method, area_epsilon).
+
+    Returns:
+        Tuple[mesh.Mesh, Dict[str, Any]]: (modelo reparado, resumen de repair_mesh).
+    """
+    vectors, report = repair_mesh(stl_model.vectors, **options)
+    data = np.zeros(len(vectors), dtype=mesh.Mesh.dtype)
+    data["vectors"] = vectors
+    repaired = mesh.Mesh(data, calculate_normals=False, name=stl_model.name)
+    compute_normals(repaired.vectors, out=repaired.normals)
+    return repaired, report
+
+
+def format_repair_report(report: Dict[str, Any]) -> str:
+    """Genera un texto legible con el resumen retornado por repair_mesh()."""
+    return (
+        f"  - Triángulos: {report['triangles_in']} -> {report['triangles']}\n"
+        f"  - Degenerados eliminados: {report['degenerate_removed']}\n"
+        f"  - Duplicados eliminados: {report['duplicates_removed']}\n"
+        f"  - Facetas reorientadas: {report['flipped_facets']}\n"
+        f"  - Agujeros rellenados: {report['holes_filled']} de {report['holes']} "
+        f"({report['facets_added']} facetas nuevas)\n"
+        f"  - Aristas de borde sin rellenar: {report['open_boundary_edges']}\n"
+        f"  - Piezas invertidas hacia fuera: {report['pieces_reversed']}"
+    )
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    from stl_validation import check_mesh, format_report
+
+    # Cubo sin una cara, con una faceta invertida y otra duplicada.
+    corners = np.array([[x, y, z] for x in (0.0, 1.0) for y in (0.0, 1.0) for z in (0.0, 1.0)])
+    quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4)]
+    facets = [corners[[a, b, c]] for a, b, c, d in quads] + [corners[[a, c, d]] for a, b, c, d in quads]
+    facets[1] = facets[1][[0, 2, 1]]
+    facets.append(facets[0])
+    cube = np.array(facets, dtype=np.float32)
+    print("Antes:")
+    print(format_report(check_mesh(cube)))
+    repaired, summary = repair_mesh(cube)
+    print("Reparación:")
+    print(format_repair_report(summary))
+    print("Después:")
+    print(format_report(check_mesh(repaired)))
@@ -8,7 +8,10 @@ Utiliza la biblioteca numpy-stl para manipular el objeto del modelo STL (mesh.Me
 Mejoras:
   - Verificación del tipo de modelo para asegurarnos de que se trata de una instancia de mesh.Mesh.
   - Validación del factor de escala.
-  - Actualización de las normales (si el objeto posee el método update_normals) tras modificar las coordenadas.
+  - Las normales unitarias no cambian con un escalado uniforme, así que no se
+    recalculan (antes se llamaba a update_normals() de numpy-stl en cada escala).
+    Con recompute_normals=True se recalculan con stl_normals.py, opcionalmente
+    en float64 para piezas muy pequeñas.
   - Posibilidad de trabajar en modo inplace o creando una copia.
   
 El objetivo es facilitar la conversión de escalas (por ejemplo, de 1:1 a 1:36) de manera segura.
@@ -16,7 +19,16 @@ El objetivo es facilitar la conversión de escalas (por ejemplo, de 1:1 a 1:36)
 
 from stl import mesh
 
-def scale_model(stl_model: mesh.Mesh, factor: float, inplace: bool = True) -> mesh.Mesh:
+from stl_normals import update_normals
+from stl_transform import apply_transform, scale_matrix
+
+def scale_model(
+    stl_model: mesh.Mesh,
+    factor: float,
+    inplace: bool = True,
+    recompute_normals: bool = False,
+    precision: str = "float32",
+) -> mesh.Mesh:
     """
     Escala un modelo STL por el factor indicado de manera uniforme.
 
@@ -25,6 +37,10 @@ def scale_model(stl_model: mesh.Mesh, factor: float, inplace: bool = True) -> me
         factor (float): Factor de escala (debe ser un número > 0).
         inplace (bool, opcional): Si True, modifica el modelo original.
                                   Si False, retorna una copia escalada. Por defecto es True.
+        recompute_normals (bool, opcional): Recalcular las normales unitarias a partir
+                                            de los vértices (por ejemplo, si el archivo
+                                            las trae a cero). Por defecto se conservan.
+        precision (str, opcional): 'float32' o 'float64' al recalcular las normales.
 
     Returns:
         mesh.Mesh: El modelo escalado.
@@ -43,20 +59,42 @@ def scale_model(stl_model: mesh.Mesh, factor: float, inplace: bool = True) -> me
     if not isinstance(stl_model, mesh.Mesh):
         raise TypeError("El modelo STL debe ser una instancia de mesh.Mesh.")
 
-    if inplace:
-        stl_model.vectors *= factor
-        # Si el objeto dispone de update_normals, se actualizan para mantener la coherencia.
-        if hasattr(stl_model, "update_normals"):
-            stl_model.update_normals()
-        return stl_model
-    else:
-        # Se crea una copia del modelo (asegurándonos de copiar los datos)
-        new_model = mesh.Mesh(stl_model.data.copy())
-        new_model.vectors *= factor
-        if hasattr(new_model, "update_normals"):
-            new_model.update_normals()
-        return new_model
-
-# Para casos específicos, se podría ampliar la funcionalidad y permitir escalado no uniforme.
-# Por ejemplo, si en el futuro se desea aplicar factores distintos para X, Y y Z,
-# se podría extender este método o crear una nueva función que acepte un tuple (factor_x, factor_y, factor_z).
\ No newline at end of file
+    # Se trabaja sobre el modelo o sobre una copia (asegurándonos de copiar los datos).
+    target = stl_model if inplace else mesh.Mesh(stl_model.data.copy(), calculate_normals=False)
+    target.vectors *= factor
+    if recompute_normals:
+        update_normals(target, precision=precision)
+    # La caja envolvente que numpy-stl guarda en caché queda obsoleta: se descarta
+    # y se recalcula al consultarla (recalcularla aquí costaría más que escalar).
+    if hasattr(target, "_invalidate_bounds"):
+        target._invalidate_bounds()
+    return target
+
+def scale_model_xyz(
+    stl_model: mesh.Mesh,
+    fx: float,
+    fy: float,
+    fz: float,
+    inplace: bool = True,
+) -> mesh.Mesh:
+    """
+    Escala un modelo STL con factores distintos para X, Y y Z.
+
+    Delega en el motor de transformaciones (stl_transform), que además
+    transforma las normales con la inversa transpuesta.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo STL a escalar.
+        fx (float): Factor en X (> 0).
+        fy (float): Factor en Y (> 0).
+        fz (float): Factor en Z (> 0).
+        inplace (bool, opcional): Si True, modifica el modelo original.
+
+    Returns:
+        mesh.Mesh: El modelo escalado.
+
+    Raises:
+        TypeError: Si el modelo no es una instancia de mesh.Mesh o si algún factor no es numérico.
+        ValueError: Si algún factor es menor o igual a 0.
+    """
+    return apply_transform(stl_model, scale_matrix(fx, fy, fz), inplace=inplace)
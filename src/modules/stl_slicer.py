@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_slicer.py
+
+Este módulo corta un modelo STL con planos horizontales (Z constante) para
+previsualizar los contornos de cada capa y medir el área de cada sección.
+
+Funcionamiento (todo vectorizado con NumPy):
+  1. Los vértices se sueldan (stl_validation.weld_vertices) para que las dos
+     facetas que comparten una arista calculen exactamente el mismo punto de
+     corte sobre ella.
+  2. Con np.searchsorted se obtiene, para cada faceta, el rango de planos que
+     la cruzan, y se generan todos los pares (faceta, plano) de una vez.
+  3. Cada par produce un segmento entre las dos aristas que cambian de lado.
+     El segmento se orienta con la normal de la faceta de modo que el
+     material queda a su izquierda (contornos exteriores en sentido
+     antihorario, huecos en sentido horario).
+  4. Cada extremo se identifica con una clave entera (arista soldada y
+     plano, o el vértice si el plano pasa exactamente por él, en cuyo caso
+     los segmentos de longitud nula se descartan); los segmentos se enlazan buscando la clave de su final entre
+     las claves de inicio, y las polilíneas se ordenan con saltos de
+     punteros (pointer jumping), sin recorrer segmento a segmento.
+  5. El área de cada capa es la suma con signo (fórmula del polígono) de sus
+     segmentos, por lo que los huecos se restan automáticamente.
+
+Con varios procesos, los planos se reparten en franjas de Z contiguas; cada
+proceso accede a las facetas mediante memoria compartida (shared_mesh) y solo
+suelda las facetas que cruzan su franja.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from stl_validation import weld_vertices
+
+# Pares (faceta, plano) procesados a la vez; limita la memoria en modelos grandes.
+DEFAULT_PAIR_CHUNK = 4_000_000
+
+# Por debajo de este número de facetas no compensa repartir el corte entre procesos.
+MIN_FACETS_FOR_PROCESSES = 200_000
+
+
+def layer_heights(
+    z_min: float,
+    z_max: float,
+    layer_height: float,
+    first_layer: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Alturas de corte a mitad de cada capa, como hacen los laminadores.
+
+    Args:
+        z_min (float): Altura mínima del modelo.
+        z_max (float): Altura máxima del modelo.
+        layer_height (float): Altura de capa (> 0).
+        first_layer (Optional[float]): Altura de la primera capa; por defecto,
+                                       igual a layer_height.
+
+    Returns:
+        np.ndarray: Alturas de corte ordenadas.
+
+    Raises:
+        ValueError: Si la altura de capa no es positiva.
+    """
+    if layer_height <= 0:
+        raise ValueError("La altura de capa debe ser mayor que cero.")
+    first = layer_height if first_layer is None else first_layer
+    heights = [z_min + first / 2.0]
+    upper = np.arange(z_min + first + layer_height / 2.0, z_max, layer_height)
+    return np.concatenate([heights, upper]) if heights[0] < z_max else upper
+
+
+def _link_segments(start_keys: np.ndarray, end_keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Enlaza segmentos en polilíneas a partir de las claves de sus extremos.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (orden de los segmentos
+            agrupados por polilínea, inicio de cada polilínea en ese orden,
+            True si la polilínea es cerrada).
+    """
+    count = len(start_keys)
+    index = np.arange(count)
+    if count == 0:
+        return index, index, np.zeros(0, dtype=bool)
+
+    # Sucesor: el segmento cuya clave de inicio coincide con mi clave de final.
+    by_start = np.argsort(start_keys)
+    sorted_starts = start_keys[by_start]
+    position = np.minimum(np.searchsorted(sorted_starts, end_keys), count - 1)
+    has_next = sorted_starts[position] == end_keys
+    following = np.where(has_next, by_start[position], -1)
+
+    previous = np.full(count, -1)
+    linked = following >= 0
+    previous[following[linked]] = index[linked]
+
+    # Saltos de punteros hacia atrás: en las cadenas abiertas todos los nodos
+    # llegan a la cabeza; en los ciclos se propaga el índice mínimo del ciclo.
+    jump = np.where(previous >= 0, previous, index)
+    label = index.copy()
+    for _ in range(int(np.ceil(np.log2(count))) + 1):
+        label = np.minimum(label, label[jump])
+        jump = jump[jump]
+    head = jump
+    in_chain = previous[head] < 0
+    label = np.where(in_chain, head, label)
+
+    # Romper cada ciclo en su nodo de menor índice y numerar las posiciones.
+    pointer = np.where(previous >= 0, previous, index)
+    roots = (label == index)
+    pointer[roots] = index[roots]
+    rank = (pointer != index).astype(np.int64)
+    for _ in range(int(np.ceil(np.log2(count))) + 1):
+        rank = rank + rank[pointer]
+        pointer = pointer[pointer]
+
+    order = np.lexsort((rank, label))
+    sorted_labels = label[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    closed = ~in_chain[order[starts]]
+    return order, starts, closed
+
+
+def _slice_arrays(
+    vectors: np.ndarray,
+    heights: np.ndarray,
+    pair_chunk: int = DEFAULT_PAIR_CHUNK,
+) -> List[Dict[str, Any]]:
+    """Corta las facetas 'vectors' con los planos 'heights' (ordenados)."""
+    layers = [
+        {"z": float(z), "area": 0.0, "segments": 0, "polylines": [], "closed": []}
+        for z in heights
+    ]
+    if not len(vectors) or not len(heights):
+        return layers
+
+    z = vectors[:, :, 2]
+    # Un plano h cruza la faceta si algún vértice queda debajo (z < h) y otro
+    # encima o sobre él (z >= h), es decir, si z_min < h <= z_max.
+    first = np.searchsorted(heights, z.min(axis=1), side="right")
+    last = np.searchsorted(heights, z.max(axis=1), side="right")
+    crossing = np.flatnonzero(last > first)
+    if not len(crossing):
+        return layers
+
+    points, faces = weld_vertices(vectors[crossing])
+    points = points.astype(np.float64)
+    vertex_count = np.int64(len(points))
+    plane_count = np.int64(len(heights))
+    first, last = first[crossing], last[crossing]
+    counts = last - first
+
+    segments_xy: List[np.ndarray] = []
+    start_keys: List[np.ndarray] = []
+    end_keys: List[np.ndarray] = []
+    planes: List[np.ndarray] = []
+
+    # Se procesan bloques de facetas cuyo número de pares no supere pair_chunk.
+    cumulative = np.cumsum(counts)
+    block_start = 0
+    while block_start < len(crossing):
+        offset = cumulative[block_start - 1] if block_start else 0
+        block_end = int(np.searchsorted(cumulative, offset + pair_chunk, side="right"))
+        block_end = max(block_end, block_start + 1)
+        block = slice(block_start, block_end)
+        block_start = block_end
+
+        block_counts = counts[block]
+        facet = np.repeat(np.arange(block.start, block.stop), block_counts)
+        pair_offsets = np.cumsum(block_counts) - block_counts
+        plane = first[facet] + (np.arange(len(facet)) - np.repeat(pair_offsets, block_counts))
+
+        ids = faces[facet]                       # (P, 3)
+        corners = points[ids]                    # (P, 3, 3)
+        relative = corners[:, :, 2] - heights[plane][:, None]
+        above = relative >= 0
+        # El vértice solitario es el que queda a un lado distinto de los otros dos.
+        alone = np.where(above.sum(axis=1) == 1, np.argmax(above, axis=1), np.argmin(above, axis=1))
+        rows = np.arange(len(facet))
+
+        endpoints = []
+        keys = []
+        for step in (1, 2):
+            other = (alone + step) % 3
+            a, b = ids[rows, alone], ids[rows, other]
+            # Se calcula siempre desde el vértice de menor índice para que las
+            # dos facetas vecinas obtengan exactamente el mismo punto.
+            low, high = np.minimum(a, b), np.maximum(a, b)
+            p_low, p_high = points[low], points[high]
+            z_low = p_low[:, 2] - heights[plane]
+            z_high = p_high[:, 2] - heights[plane]
+            t = z_low / (z_low - z_high)
+            endpoints.append(p_low[:, :2] + (p_high[:, :2] - p_low[:, :2]) * t[:, None])
+            # Si el plano pasa por un vértice (t = 0 o 1), el punto es el vértice
+            # y la clave también, para que todas sus facetas lo compartan.
+            vertex = np.where(z_low == 0, low, np.where(z_high == 0, high, -1))
+            keys.append(np.where(
+                vertex >= 0,
+                (vertex * vertex_count + vertex) * plane_count + plane,
+                (low * vertex_count + high) * plane_count + plane,
+            ))
+
+        # Orientar cada segmento con el material a su izquierda. Con el orden
+        # de los vértices de la faceta, el segmento va de la arista (solo,
+        # solo+2) a la (solo, solo+1) si el vértice solitario queda debajo, y
+        # al revés si queda encima. Se decide sin la dirección geométrica, que
+        # no es fiable cuando el plano pasa casi por un vértice.
+        flip = ~above[rows, alone]
+        start_xy = np.where(flip[:, None], endpoints[1], endpoints[0])
+        end_xy = np.where(flip[:, None], endpoints[0], endpoints[1])
+
+        # Las facetas que solo tocan el plano en un vértice dan segmentos de
+        # longitud nula (mismo vértice en los dos extremos): se descartan.
+        keep = keys[0] != keys[1]
+        segments_xy.append(np.stack([start_xy, end_xy], axis=1)[keep])
+        start_keys.append(np.where(flip, keys[1], keys[0])[keep])
+        end_keys.append(np.where(flip, keys[0], keys[1])[keep])
+        planes.append(plane[keep])
+
+    segments = np.concatenate(segments_xy)
+    plane = np.concatenate(planes)
+
+    # Área con signo por capa (fórmula del polígono sobre los segmentos).
+    cross = segments[:, 0, 0] * segments[:, 1, 1] - segments[:, 1, 0] * segments[:, 0, 1]
+    areas = 0.5 * np.bincount(plane, weights=cross, minlength=len(heights))
+    segment_counts = np.bincount(plane, minlength=len(heights))
+
+    order, starts, closed = _link_segments(np.concatenate(start_keys), np.concatenate(end_keys))
+    ordered_points = segments[order, 0]
+    line_planes = plane[order[starts]]
+    bounds = np.append(starts, len(order))
+    for number, (line_start, line_end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        layer = layers[line_planes[number]]
+        polyline = ordered_points[line_start:line_end]
+        if not closed[number]:
+            # Una cadena abierta termina en el final de su último segmento.
+            polyline = np.vstack([polyline, segments[order[line_end - 1], 1]])
+        layer["polylines"].append(polyline)
+        layer["closed"].append(bool(closed[number]))
+
+    for layer, area, segment_count in zip(layers, areas, segment_counts):
+        layer["area"] = float(area)
+        layer["segments"] = int(segment_count)
+    return layers
+
+
+def _slice_shared(handle: Any, heights: np.ndarray, pair_chunk: int) -> List[Dict[str, Any]]:
+    """Trabajo de un proceso: corta su franja de planos sobre la malla compartida."""
+    from shared_mesh import SharedMesh
+
+    shared = SharedMesh.attach(handle)
+    try:
+        vectors = shared.vectors
+        z = vectors[:, :, 2]
+        # Solo se copian las facetas que cruzan la franja de este proceso.
+        relevant = (z.max(axis=1) >= heights[0]) & (z.min(axis=1) < heights[-1])
+        selected = vectors[relevant]
+        del vectors, z
+        return _slice_arrays(selected, heights, pair_chunk)
+    finally:
+        shared.close()
+
+
+def slice_mesh(
+    vectors: np.ndarray,
+    heights: Union[Sequence[float], np.ndarray],
+    workers: Optional[int] = None,
+    pair_chunk: int = DEFAULT_PAIR_CHUNK,
+) -> List[Dict[str, Any]]:
+    """
+    Corta un modelo con planos Z = h y obtiene los contornos de cada capa.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        heights (Sequence[float]): Alturas de corte (ver layer_heights()).
+        workers (Optional[int]): Procesos a usar. Por defecto, os.cpu_count();
+                                 con 1 el corte se hace en el proceso actual.
+        pair_chunk (int): Pares (faceta, plano) procesados a la vez.
+
+    Returns:
+        List[Dict[str, Any]]: Una entrada por altura, en orden ascendente: {
+            'z': float,
+            'area': float (mm², con los huecos restados),
+            'segments': int,
+            'polylines': [np.ndarray (K, 2), ...] puntos XY de cada contorno,
+            'closed': [bool, ...] True si el contorno correspondiente es cerrado
+        }
+        Si la malla no está orientada de forma coherente el signo del área
+        puede invertirse (ver stl_validation.check_mesh).
+    """
+    vectors = np.asarray(vectors)
+    heights = np.unique(np.asarray(heights, dtype=np.float64))
+    workers = workers or os.cpu_count() or 1
+    parts = min(workers, len(heights))
+    if parts <= 1 or len(vectors) < MIN_FACETS_FOR_PROCESSES:
+        return _slice_arrays(vectors.astype(np.float64), heights, pair_chunk)
+
+    from shared_mesh import SharedMesh
+
+    groups = np.array_split(heights, parts)
+    shared = SharedMesh.create(len(vectors))
+    try:
+        shared.vectors[...] = vectors
+        with ProcessPoolExecutor(max_workers=parts) as pool:
+            futures = [pool.submit(_slice_shared, shared.handle, group, pair_chunk) for group in groups]
+            layers: List[Dict[str, Any]] = []
+            for future in futures:
+                layers.extend(future.result())
+    finally:
+        shared.unlink()
+    return layers
+
+
+def slice_model(
+    stl_model: Any,
+    layer_height: float = 0.2,
+    heights: Optional[Sequence[float]] = None,
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Corta un modelo mesh.Mesh por capas de altura fija (o en las alturas dadas).
+
+    Args:
+        stl_model (mesh.Mesh): Modelo (ya escalado, si procede).
+        layer_height (float): Altura de capa en mm si no se indican alturas.
+        heights (Optional[Sequence[float]]): Alturas concretas de corte.
+        workers (Optional[int]): Procesos a usar.
+
+    Returns:
+        List[Dict[str, Any]]: Resultado de slice_mesh().
+    """
+    vectors = stl_model.vectors
+    if heights is None:
+        z = vectors[:, :, 2]
+        heights = layer_heights(float(z.min()), float(z.max()), layer_height)
+    return slice_mesh(vectors, heights, workers=workers)
+
+
+def layers_to_svg(layer: Dict[str, Any], stroke: str = "#2c3e50") -> str:
+    """
+    Dibuja los contornos de una capa como documento SVG (unidades en mm).
+
+    Returns:
+        str: Contenido SVG.
+    """
+    polylines = layer["polylines"]
+    if polylines:
+        stacked = np.vstack(polylines)
+        low, high = stacked.min(axis=0), stacked.max(axis=0)
+    else:
+        low = high = np.zeros(2)
+    width, height = np.maximum(high - low, 1e-3)
+    paths = []
+    for polyline, closed in zip(polylines, layer["closed"]):
+        # El eje Y del SVG crece hacia abajo.
+        coords = " ".join(f"{x - low[0]:.4f},{high[1] - y:.4f}" for x, y in polyline)
+        suffix = " Z" if closed else ""
+        paths.append(f'<path d="M {coords}{suffix}" fill="none" stroke="{stroke}" stroke-width="0.1"/>')
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.3f}mm" height="{height:.3f}mm" '
+        f'viewBox="0 0 {width:.4f} {height:.4f}">\n'
+        f"<!-- z = {layer['z']:.4f} mm, área = {layer['area']:.4f} mm² -->\n"
+        + "\n".join(paths)
+        + "\n</svg>\n"
+    )
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from stl import mesh
+
+    if len(sys.argv) > 1:
+        model = mesh.Mesh.from_file(sys.argv[1])
+    else:
+        # Esfera de radio 50 mm (~1M facetas) como modelo de prueba.
+        n = 708
+        theta, phi = np.meshgrid(np.linspace(0, np.pi, n), np.linspace(0, 2 * np.pi, n), indexing="ij")
+        grid = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1) * 50
+        grid[:, -1] = grid[:, 0]  # Cerrar la costura en phi = 2*pi.
+        a, b, c, d = grid[:-1, :-1], grid[1:, :-1], grid[1:, 1:], grid[:-1, 1:]
+        facets = np.concatenate([np.stack([a, b, c], axis=2), np.stack([a, c, d], axis=2)]).reshape(-1, 3, 3)
+        model = mesh.Mesh(np.zeros(len(facets), dtype=mesh.Mesh.dtype))
+        model.vectors[:] = facets
+
+    z = model.vectors[:, :, 2]
+    heights = np.linspace(z.min(), z.max(), 1002)[1:-1]
+    start = time.perf_counter()
+    result = slice_mesh(model.vectors, heights)
+    elapsed = time.perf_counter() - start
+    print(f"{len(model.vectors):,} facetas en {len(heights)} capas: {elapsed:.2f} s")
+    middle = result[len(result) // 2]
+    print(
+        f"Capa z = {middle['z']:.2f} mm: área {middle['area']:.2f} mm², "
+        f"{len(middle['polylines'])} contorno(s), {middle['segments']} segmentos"
+    )
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_thumbnails.py
+
+Este módulo genera miniaturas PNG de modelos STL sin pantalla ni tarjeta
+gráfica, para catálogos de modelos y de variantes de escala.
+
+Funcionamiento:
+  - Decimación: los vértices se agrupan en una rejilla (vertex clustering)
+    con aproximadamente una celda por píxel y las facetas que colapsan se
+    descartan. El número de facetas queda limitado por la resolución de la
+    miniatura y no por la del escaneo, sin diferencia visible.
+  - Rasterizado por software con NumPy: proyección ortográfica isométrica,
+    búfer de profundidad y sombreado de Lambert por faceta. Cada faceta se
+    expande en los píxeles de su rectángulo envolvente y se conservan los
+    que caen dentro; todo se procesa por lotes, sin bucles por faceta.
+    Se renderiza a 'supersample' veces el tamaño y se reduce para suavizar
+    los bordes.
+  - PNG escrito con zlib (sin dependencias adicionales).
+  - Caché: el nombre de cada miniatura incluye el hash SHA-256 del archivo y
+    de los parámetros de renderizado; si ya existe en CACHE_DIR/thumbnails
+    no se vuelve a generar.
+  - Lotes: cada archivo se procesa en un proceso independiente
+    (ProcessPoolExecutor), de modo que se usan todos los núcleos.
+
+Como alternativa, backend='pyvista' usa VTK fuera de pantalla (requiere
+PyVista y un contexto OpenGL, por ejemplo OSMesa o EGL).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils import file_sha256
+
+# Tamaño por defecto de las miniaturas (píxeles, cuadradas).
+DEFAULT_SIZE = 256
+
+# Color base del modelo y del fondo (RGB).
+MODEL_COLOR = (60, 170, 90)
+BACKGROUND_COLOR = (247, 249, 252)
+
+# Píxeles candidatos evaluados por lote en el rasterizador.
+_RASTER_BATCH = 4_000_000
+
+# Versión del formato de las miniaturas (forma parte de la clave de caché).
+_THUMBNAIL_VERSION = 1
+
+# Backends de renderizado disponibles.
+BACKENDS = ("numpy", "pyvista")
+
+
+def decimate(vectors: np.ndarray, resolution: int) -> np.ndarray:
+    """
+    Simplifica un modelo agrupando sus vértices en una rejilla.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        resolution (int): Celdas de la rejilla en el eje más largo del modelo.
+
+    Returns:
+        np.ndarray: Arreglo (M, 3, 3) float64 con M <= N facetas. Cada vértice
+            se sustituye por el promedio de los vértices de su celda y se
+            descartan las facetas que colapsan.
+    """
+    points = np.asarray(vectors, dtype=np.float64).reshape(-1, 3)
+    if not len(points):
+        return points.reshape(0, 3, 3)
+    low = points.min(axis=0)
+    cell = float((points.max(axis=0) - low).max()) / max(1, resolution)
+    if cell <= 0:
+        return points.reshape(-1, 3, 3)
+    cells = np.minimum(((points - low) / cell).astype(np.int64), resolution)
+    keys = (cells[:, 0] * (resolution + 1) + cells[:, 1]) * (resolution + 1) + cells[:, 2]
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    counts = np.bincount(inverse, minlength=len(unique_keys)).astype(np.float64)
+    centers = np.stack(
+        [np.bincount(inverse, weights=points[:, axis], minlength=len(unique_keys)) for axis in range(3)],
+        axis=1,
+    ) / counts[:, None]
+
+    faces = inverse.reshape(-1, 3)
+    keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    return centers[faces[keep]]
+
+
+def view_basis(direction: Sequence[float] = (1.0, 1.0, 1.0), up: Sequence[float] = (0.0, 0.0, 1.0)) -> np.ndarray:
+    """
+    Base de la cámara ortográfica.
+
+    Args:
+        direction (Sequence[float]): Dirección desde el modelo hacia la cámara.
+        up (Sequence[float]): Vector "arriba" del mundo.
+
+    Returns:
+        np.ndarray: Matriz (3, 3) con filas (derecha, arriba, hacia la cámara).
+    """
+    towards = np.asarray(direction, dtype=np.float64)
+    towards = towards / np.linalg.norm(towards)
+    right = np.cross(up, towards)
+    if np.linalg.norm(right) < 1e-12:
+        right = np.cross((0.0, 1.0, 0.0), towards)
+    right = right / np.linalg.norm(right)
+    return np.stack([right, np.cross(towards, right), towards])
+
+
+def rasterize(
+    vectors: np.ndarray,
+    size: int = DEFAULT_SIZE,
+    direction: Sequence[float] = (1.0, 1.0, 1.0),
+    color: Tuple[int, int, int] = MODEL_COLOR,
+    background: Tuple[int, int, int] = BACKGROUND_COLOR,
+    margin: float = 0.05,
+) -> np.ndarray:
+    """
+    Renderiza un modelo con un rasterizador por software.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        size (int): Ancho y alto de la imagen en píxeles.
+        direction (Sequence[float]): Dirección desde el modelo hacia la cámara.
+        color (Tuple[int, int, int]): Color del modelo.
+        background (Tuple[int, int, int]): Color de fondo.
+        margin (float): Margen relativo alrededor del modelo.
+
+    Returns:
+        np.ndarray: Imagen (size, size, 3) uint8.
+    """
+    image = np.empty((size, size, 3), dtype=np.uint8)
+    image[...] = background
+    if not len(vectors):
+        return image
+
+    basis = view_basis(direction)
+    view = np.asarray(vectors, dtype=np.float64) @ basis.T
+    low = view.reshape(-1, 3).min(axis=0)
+    high = view.reshape(-1, 3).max(axis=0)
+    extent = float((high[:2] - low[:2]).max()) or 1.0
+    scale = size * (1.0 - 2.0 * margin) / extent
+    center = (low[:2] + high[:2]) / 2.0
+    # Coordenadas de píxel (x hacia la derecha, y hacia abajo) y profundidad
+    # (mayor = más cerca de la cámara).
+    px = (view[..., 0] - center[0]) * scale + size / 2.0
+    py = size / 2.0 - (view[..., 1] - center[1]) * scale
+    depth = view[..., 2]
+
+    # Sombreado de Lambert a dos caras con una luz cercana a la cámara.
+    normals = np.cross(view[:, 1] - view[:, 0], view[:, 2] - view[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    light = np.array([0.3, 0.4, 1.0]) / np.linalg.norm([0.3, 0.4, 1.0])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shade = np.abs(normals @ light) / lengths
+    shade = 0.25 + 0.75 * np.nan_to_num(shade)
+
+    # Triángulos en píxeles con área no nula y dentro de la imagen.
+    x0, y0 = px[:, 0], py[:, 0]
+    e1x, e1y = px[:, 1] - x0, py[:, 1] - y0
+    e2x, e2y = px[:, 2] - x0, py[:, 2] - y0
+    det = e1x * e2y - e2x * e1y
+    xmin = np.clip(np.floor(px.min(axis=1) - 0.5), 0, size - 1).astype(np.int64)
+    xmax = np.clip(np.ceil(px.max(axis=1) - 0.5), 0, size - 1).astype(np.int64)
+    ymin = np.clip(np.floor(py.min(axis=1) - 0.5), 0, size - 1).astype(np.int64)
+    ymax = np.clip(np.ceil(py.max(axis=1) - 0.5), 0, size - 1).astype(np.int64)
+    valid = np.flatnonzero(np.abs(det) > 1e-12)
+    widths = xmax[valid] - xmin[valid] + 1
+    heights = ymax[valid] - ymin[valid] + 1
+    counts = widths * heights
+
+    zbuffer = np.full(size * size, -np.inf)
+    colors = np.zeros(size * size)
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    start = 0
+    while start < len(valid):
+        # Lote de facetas cuyo total de píxeles candidatos cabe en _RASTER_BATCH.
+        stop = max(start + 1, int(np.searchsorted(bounds, bounds[start] + _RASTER_BATCH, side="right")) - 1)
+        stop = min(stop, len(valid))
+        local_counts = counts[start:stop]
+        tri = np.repeat(np.arange(start, stop), local_counts)
+        offset = np.arange(len(tri)) - np.repeat(bounds[start:stop] - bounds[start], local_counts)
+        t = valid[tri]
+        sx = xmin[t] + offset % widths[tri]
+        sy = ymin[t] + offset // widths[tri]
+        # Coordenadas baricéntricas del centro de cada píxel.
+        dx = sx + 0.5 - x0[t]
+        dy = sy + 0.5 - y0[t]
+        u = (dx * e2y[t] - e2x[t] * dy) / det[t]
+        v = (e1x[t] * dy - dx * e1y[t]) / det[t]
+        inside = (u >= -1e-9) & (v >= -1e-9) & (u + v <= 1.0 + 1e-9)
+        t, u, v = t[inside], u[inside], v[inside]
+        pixel = sy[inside] * size + sx[inside]
+        z = depth[t, 0] * (1.0 - u - v) + depth[t, 1] * u + depth[t, 2] * v
+        # El más cercano de cada píxel en este lote y comparación con el búfer.
+        order = np.lexsort((-z, pixel))
+        pixel, z, t = pixel[order], z[order], t[order]
+        first = np.ones(len(pixel), dtype=bool)
+        first[1:] = pixel[1:] != pixel[:-1]
+        pixel, z, t = pixel[first], z[first], t[first]
+        nearer = z > zbuffer[pixel]
+        zbuffer[pixel[nearer]] = z[nearer]
+        colors[pixel[nearer]] = shade[t[nearer]]
+        start = stop
+
+    covered = np.isfinite(zbuffer).reshape(size, size)
+    shaded = colors.reshape(size, size)[..., None] * np.asarray(color, dtype=np.float64)
+    image[covered] = np.clip(shaded[covered], 0, 255).astype(np.uint8)
+    return image
+
+
+def downsample(image: np.ndarray, factor: int) -> np.ndarray:
+    """Reduce una imagen promediando bloques de factor x factor píxeles."""
+    if factor <= 1:
+        return image
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    blocks = image[:height * factor, :width * factor].reshape(height, factor, width, factor, -1)
+    return blocks.mean(axis=(1, 3)).round().astype(np.uint8)
+
+
+def write_png(path: Union[str, Path], image: np.ndarray) -> None:
+    """
+    Guarda una imagen RGB uint8 (alto, ancho, 3) como PNG.
+    """
+    height, width = image.shape[:2]
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # filtro 0 por fila
+    rows[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+    Path(path).write_bytes(png)
+
+
+def render_pyvista(vectors: np.ndarray, size: int = DEFAULT_SIZE) -> np.ndarray:
+    """
+    Renderiza con VTK fuera de pantalla (requiere PyVista y OpenGL sin ventana).
+    """
+    import pyvista as pv
+
+    from stl_viewer import polydata_arrays
+
+    points, faces = polydata_arrays(vectors)
+    plotter = pv.Plotter(off_screen=True, window_size=[size, size])
+    try:
+        plotter.set_background([c / 255 for c in BACKGROUND_COLOR])
+        plotter.add_mesh(pv.PolyData(points, faces), color=[c / 255 for c in MODEL_COLOR])
+        plotter.camera_position = "iso"
+        plotter.reset_camera()
+        return plotter.screenshot(return_img=True)
+    finally:
+        plotter.close()
+
+
+def render_thumbnail(
+    vectors: np.ndarray,
+    size: int = DEFAULT_SIZE,
+    supersample: int = 2,
+    decimate_resolution: Optional[int] = None,
+    direction: Sequence[float] = (1.0, 1.0, 1.0),
+    backend: str = "numpy",
+) -> np.ndarray:
+    """
+    Renderiza la miniatura de un modelo.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        size (int): Tamaño de la miniatura en píxeles.
+        supersample (int): Factor de sobremuestreo (suavizado de bordes).
+        decimate_resolution (Optional[int]): Celdas de la rejilla de decimación;
+            por defecto, una por píxel de la miniatura. 0 desactiva la decimación.
+        direction (Sequence[float]): Dirección desde el modelo hacia la cámara.
+        backend (str): 'numpy' (por software) o 'pyvista' (VTK fuera de pantalla).
+
+    Returns:
+        np.ndarray: Imagen (size, size, 3) uint8.
+
+    Raises:
+        ValueError: Si el backend no es válido.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend no válido: '{backend}'. Usa {', '.join(BACKENDS)}.")
+    supersample = max(1, supersample)
+    resolution = size if decimate_resolution is None else decimate_resolution
+    if resolution:
+        vectors = decimate(vectors, resolution)
+    if backend == "pyvista":
+        return render_pyvista(vectors, size)
+    return downsample(rasterize(vectors, size * supersample, direction=direction), supersample)
+
+
+def thumbnail_key(file_hash: str, options: Dict[str, Any]) -> str:
+    """Nombre de la miniatura en la caché: hash del archivo y de los parámetros."""
+    params = json.dumps({"version": _THUMBNAIL_VERSION, **options}, sort_keys=True)
+    return f"{file_hash}_{hashlib.sha256(params.encode()).hexdigest()[:12]}.png"
+
+
+def thumbnail_file(
+    stl_path: Union[str, Path],
+    cache_dir: Union[str, Path],
+    force: bool = False,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Genera (o recupera de la caché) la miniatura de un archivo STL.
+
+    Args:
+        stl_path (Union[str, Path]): Archivo STL.
+        cache_dir (Union[str, Path]): Carpeta de la caché de miniaturas.
+        force (bool): Regenerar aunque exista en la caché.
+        **options: Opciones de render_thumbnail (size, supersample, ...).
+
+    Returns:
+        Dict[str, Any]: {'input', 'thumbnail', 'cached', 'triangles', 'error'}.
+    """
+    from stl_parallel_reader import ParallelSTLReader
+
+    result: Dict[str, Any] = {"input": Path(stl_path), "thumbnail": None, "cached": False, "triangles": None, "error": None}
+    try:
+        cache = Path(cache_dir)
+        target = cache / thumbnail_key(file_sha256(stl_path), options)
+        result["thumbnail"] = target
+        if target.exists() and not force:
+            result["cached"] = True
+            return result
+        _, data = ParallelSTLReader(str(stl_path), workers=1).read_array()
+        result["triangles"] = len(data)
+        image = render_thumbnail(data["vectors"], **options)
+        cache.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: otro proceso puede estar generando la misma miniatura.
+        temporary = target.with_suffix(f".{os.getpid()}.tmp")
+        write_png(temporary, image)
+        os.replace(temporary, target)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def render_thumbnails(
+    paths: Iterable[Union[str, Path]],
+    output_dir: Optional[Union[str, Path]] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    max_workers: Optional[int] = None,
+    force: bool = False,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Genera las miniaturas de muchos archivos en procesos paralelos.
+
+    Args:
+        paths (Iterable[Union[str, Path]]): Archivos STL.
+        output_dir (Optional[Union[str, Path]]): Si se indica, cada miniatura se
+            copia como '<output_dir>/<nombre>.png'.
+        cache_dir (Optional[Union[str, Path]]): Caché de miniaturas. Por defecto
+            CACHE_DIR/thumbnails (config/settings.py).
+        max_workers (Optional[int]): Procesos a usar (por defecto, uno por núcleo).
+        force (bool): Regenerar aunque existan en la caché.
+        **options: Opciones de render_thumbnail.
+
+    Returns:
+        List[Dict[str, Any]]: Resultado de thumbnail_file por archivo, en orden,
+            con 'output' (la copia en output_dir, si se pidió).
+    """
+    if cache_dir is None:
+        from settings import CACHE_DIR
+
+        cache_dir = CACHE_DIR / "thumbnails"
+    paths = [Path(path) for path in paths]
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(paths) or 1))
+    if workers == 1:
+        results = [thumbnail_file(path, cache_dir, force, **options) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(thumbnail_file, path, cache_dir, force, **options) for path in paths]
+            results = [future.result() for future in futures]
+
+    for result in results:
+        result["output"] = None
+        if output_dir is not None and result["error"] is None:
+            out_dir = Path(output_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            result["output"] = out_dir / f"{result['input'].stem}.png"
+            shutil.copyfile(result["thumbnail"], result["output"])
+    return results
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Actualiza 'ruta_al_archivo.stl' con la ruta real de tu archivo STL.
+    stl_file = "ruta_al_archivo.stl"
+    try:
+        for item in render_thumbnails([stl_file], output_dir="miniaturas", size=256):
+            if item["error"]:
+                print(f"Error en {item['input']}: {item['error']}")
+            else:
+                origen = "caché" if item["cached"] else "renderizada"
+                print(f"{item['input']} -> {item['output']} ({origen})")
+    except Exception as e:
+        print("Error al generar las miniaturas:", e)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_transform.py
+
+Este módulo proporciona un motor de transformaciones afines para modelos STL.
+Todas las operaciones se expresan como matrices homogéneas 4x4 que pueden
+componerse entre sí y aplicarse de una sola vez sobre todos los vértices
+del modelo (mesh.Mesh de numpy-stl).
+
+Funcionalidades:
+  - Escalado uniforme y no uniforme (fx, fy, fz).
+  - Espejado (mirror) respecto a los planos X, Y o Z.
+  - Rotación en grados alrededor de un eje cualquiera.
+  - Traslación, llevar al origen y "apoyar en la cama" (drop-to-bed) para impresión.
+  - Composición con factores de conversión registrados en ScaleDB.
+
+Al aplicar una matriz:
+  - Los vértices se transforman con un único producto matricial por bloque,
+    modificando el arreglo en el sitio (los temporales se limitan a 'chunk_size').
+  - Las normales se transforman con la inversa transpuesta y se renormalizan,
+    salvo que la matriz las conserve (escalado uniforme y traslación, ver
+    stl_normals.normals_preserved): entonces no se tocan.
+  - Si la matriz invierte la orientación (determinante negativo, por ejemplo un
+    espejado), se intercambian dos vértices de cada faceta para conservar el
+    sentido de giro (winding) coherente con las normales.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from stl import mesh
+
+from stl_normals import normals_preserved
+
+# Número de facetas procesadas por bloque al aplicar una transformación.
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Índice de cada eje para las funciones que aceptan 'x', 'y' o 'z'.
+_AXES = {"x": 0, "y": 1, "z": 2}
+
+
+def _axis_index(axis: str) -> int:
+    """Convierte el nombre de un eje ('x', 'y' o 'z') en su índice."""
+    try:
+        return _AXES[axis.lower()]
+    except (KeyError, AttributeError):
+        raise ValueError(f"Eje no válido: {axis!r}. Usa 'x', 'y' o 'z'.")
+
+
+def identity_matrix() -> np.ndarray:
+    """Retorna la matriz identidad homogénea 4x4."""
+    return np.eye(4, dtype=np.float64)
+
+
+def scale_matrix(fx: float, fy: Optional[float] = None, fz: Optional[float] = None) -> np.ndarray:
+    """
+    Crea una matriz de escalado.
+
+    Si solo se indica 'fx', el escalado es uniforme. Si se indican los tres
+    factores, el escalado es no uniforme (fx, fy, fz).
+
+    Args:
+        fx (float): Factor en X (o factor uniforme).
+        fy (Optional[float]): Factor en Y. Por defecto igual a 'fx'.
+        fz (Optional[float]): Factor en Z. Por defecto igual a 'fx'.
+
+    Returns:
+        np.ndarray: Matriz 4x4.
+
+    Raises:
+        TypeError: Si algún factor no es numérico.
+        ValueError: Si algún factor es menor o igual a 0.
+    """
+    factors = (fx, fx if fy is None else fy, fx if fz is None else fz)
+    for factor in factors:
+        if not isinstance(factor, (int, float)):
+            raise TypeError("Los factores de escala deben ser números.")
+        if factor <= 0:
+            raise ValueError("Los factores de escala deben ser mayores que cero. Usa mirror_matrix para espejar.")
+    matrix = identity_matrix()
+    matrix[0, 0], matrix[1, 1], matrix[2, 2] = factors
+    return matrix
+
+
+def translation_matrix(dx: float, dy: float, dz: float) -> np.ndarray:
+    """Crea una matriz de traslación por (dx, dy, dz)."""
+    matrix = identity_matrix()
+    matrix[:3, 3] = (dx, dy, dz)
+    return matrix
+
+
+def mirror_matrix(axis: str) -> np.ndarray:
+    """
+    Crea una matriz de espejado que invierte la coordenada del eje indicado.
+
+    Args:
+        axis (str): 'x', 'y' o 'z'.
+
+    Returns:
+        np.ndarray: Matriz 4x4 con determinante negativo.
+    """
+    matrix = identity_matrix()
+    idx = _axis_index(axis)
+    matrix[idx, idx] = -1.0
+    return matrix
+
+
+def rotation_matrix(axis: Union[str, Sequence[float]], angle_deg: float) -> np.ndarray:
+    """
+    Crea una matriz de rotación (regla de la mano derecha) alrededor de un eje
+    que pasa por el origen.
+
+    Args:
+        axis (Union[str, Sequence[float]]): 'x', 'y', 'z' o un vector (ax, ay, az).
+        angle_deg (float): Ángulo de rotación en grados.
+
+    Returns:
+        np.ndarray: Matriz 4x4.
+    """
+    if isinstance(axis, str):
+        direction = np.zeros(3)
+        direction[_axis_index(axis)] = 1.0
+    else:
+        direction = np.asarray(axis, dtype=np.float64)
+        norm = np.linalg.norm(direction)
+        if direction.shape != (3,) or norm == 0:
+            raise ValueError("El eje de rotación debe ser un vector 3D no nulo.")
+        direction = direction / norm
+
+    # Fórmula de Rodrigues: R = I + sin(t)K + (1 - cos(t))K²
+    theta = np.radians(angle_deg)
+    kx, ky, kz = direction
+    k = np.array([[0.0, -kz, ky], [kz, 0.0, -kx], [-ky, kx, 0.0]])
+    matrix = identity_matrix()
+    matrix[:3, :3] = np.eye(3) + np.sin(theta) * k + (1.0 - np.cos(theta)) * (k @ k)
+    return matrix
+
+
+def compose(*matrices: np.ndarray) -> np.ndarray:
+    """
+    Compone varias matrices en una sola.
+
+    Las matrices se aplican en el orden en que se reciben: compose(A, B)
+    equivale a aplicar primero A y luego B (es decir, B @ A).
+
+    Returns:
+        np.ndarray: Matriz 4x4 resultante.
+    """
+    result = identity_matrix()
+    for matrix in matrices:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.shape != (4, 4):
+            raise ValueError("Todas las matrices deben ser de 4x4.")
+        result = matrix @ result
+    return result
+
+
+def _bounds(stl_model: mesh.Mesh) -> Tuple[np.ndarray, np.ndarray]:
+    """Calcula las esquinas mínima y máxima de la caja envolvente del modelo."""
+    vectors = stl_model.vectors
+    return vectors.min(axis=(0, 1)).astype(np.float64), vectors.max(axis=(0, 1)).astype(np.float64)
+
+
+def to_origin_matrix(stl_model: mesh.Mesh, center: bool = True) -> np.ndarray:
+    """
+    Crea la traslación que lleva el modelo al origen.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo de referencia.
+        center (bool): Si True, el centro de la caja envolvente queda en el origen.
+                       Si False, es la esquina mínima la que queda en el origen.
+
+    Returns:
+        np.ndarray: Matriz 4x4 de traslación.
+    """
+    low, high = _bounds(stl_model)
+    target = (low + high) / 2.0 if center else low
+    return translation_matrix(*(-target))
+
+
+def drop_to_bed_matrix(stl_model: mesh.Mesh, center_xy: bool = True) -> np.ndarray:
+    """
+    Crea la traslación que apoya el modelo sobre la cama de impresión (Z mínima = 0).
+
+    Args:
+        stl_model (mesh.Mesh): Modelo de referencia.
+        center_xy (bool): Si True, además centra el modelo en X e Y.
+
+    Returns:
+        np.ndarray: Matriz 4x4 de traslación.
+    """
+    low, high = _bounds(stl_model)
+    dx, dy = (-(low[:2] + high[:2]) / 2.0) if center_xy else (0.0, 0.0)
+    return translation_matrix(dx, dy, -low[2])
+
+
+def matrix_from_scale_record(record: Dict[str, Any]) -> np.ndarray:
+    """
+    Crea la matriz de escalado correspondiente a un registro de la tabla 'scales'.
+
+    Args:
+        record (Dict[str, Any]): Registro tal como lo retorna ScaleDB.get_scale_by_id.
+
+    Returns:
+        np.ndarray: Matriz 4x4 de escalado uniforme con 'conversion_factor'.
+    """
+    return scale_matrix(float(record["conversion_factor"]))
+
+
+def scale_matrix_from_db(scale_id: int, db: Optional[Any] = None) -> np.ndarray:
+    """
+    Busca un factor de conversión en ScaleDB y retorna su matriz de escalado,
+    lista para componerse con otras transformaciones.
+
+    Args:
+        scale_id (int): ID del registro en la tabla 'scales'.
+        db (Optional[ScaleDB]): Conexión existente. Si es None se abre una temporal.
+
+    Returns:
+        np.ndarray: Matriz 4x4 de escalado.
+
+    Raises:
+        ValueError: Si el registro no existe.
+    """
+    own_db = db is None
+    if own_db:
+        # Importación diferida: la base de datos solo se necesita en este caso.
+        from scale_db import ScaleDB
+        db = ScaleDB()
+    try:
+        record = db.get_scale_by_id(scale_id)
+    finally:
+        if own_db:
+            db.close()
+    if record is None:
+        raise ValueError(f"No existe un registro de escala con ID {scale_id}.")
+    return matrix_from_scale_record(record)
+
+
+def transform_arrays(
+    vectors: np.ndarray,
+    normals: Optional[np.ndarray],
+    matrix: np.ndarray,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """
+    Aplica una matriz 4x4 en el sitio sobre arreglos de facetas.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        normals (Optional[np.ndarray]): Arreglo (N, 3) con las normales, o None.
+        matrix (np.ndarray): Matriz homogénea 4x4.
+        chunk_size (int): Facetas procesadas por bloque.
+
+    Raises:
+        ValueError: Si la matriz no es 4x4 o no es invertible.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape != (4, 4):
+        raise ValueError("La matriz de transformación debe ser de 4x4.")
+    if chunk_size <= 0:
+        raise ValueError("El tamaño de bloque debe ser mayor que cero.")
+
+    linear = matrix[:3, :3]
+    det = np.linalg.det(linear)
+    if abs(det) < 1e-12:
+        raise ValueError("La matriz de transformación no es invertible.")
+
+    # Se trabaja en la precisión del arreglo para evitar copias completas del modelo.
+    linear_t = linear.T.astype(vectors.dtype)
+    offset = matrix[:3, 3].astype(vectors.dtype)
+    # n' = A^{-T} n  ->  en forma de fila: n' = n @ A^{-1}
+    normal_matrix = np.linalg.inv(linear).astype(vectors.dtype)
+    flips_winding = det < 0
+    if normals is not None and normals_preserved(linear):
+        normals = None
+
+    for start in range(0, len(vectors), chunk_size):
+        # (n, 3, 3) @ (3, 3) transforma cada vértice sin necesidad de reshape,
+        # que generaría una copia sobre los campos no contiguos de mesh.Mesh.
+        block = vectors[start:start + chunk_size]
+        transformed = block @ linear_t
+        transformed += offset
+        block[...] = transformed
+
+        if flips_winding:
+            # Intercambiar v1 y v2 conserva la orientación de las caras.
+            block[:, [1, 2]] = block[:, [2, 1]]
+
+        if normals is not None:
+            normal_block = normals[start:start + chunk_size]
+            new_normals = normal_block @ normal_matrix
+            lengths = np.linalg.norm(new_normals, axis=1, keepdims=True)
+            np.divide(new_normals, lengths, out=new_normals, where=lengths > 0)
+            normal_block[...] = new_normals
+
+
+def apply_transform(
+    stl_model: mesh.Mesh,
+    matrix: np.ndarray,
+    inplace: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> mesh.Mesh:
+    """
+    Aplica una transformación afín a un modelo STL.
+
+    Args:
+        stl_model (mesh.Mesh): Modelo STL a transformar.
+        matrix (np.ndarray): Matriz homogénea 4x4 (ver compose()).
+        inplace (bool, opcional): Si True, modifica el modelo original.
+                                  Si False, retorna una copia transformada.
+        chunk_size (int, opcional): Facetas procesadas por bloque.
+
+    Returns:
+        mesh.Mesh: El modelo transformado.
+
+    Raises:
+        TypeError: Si el modelo no es una instancia de mesh.Mesh.
+        ValueError: Si la matriz no es válida.
+    """
+    if not isinstance(stl_model, mesh.Mesh):
+        raise TypeError("El modelo STL debe ser una instancia de mesh.Mesh.")
+
+    target = stl_model if inplace else mesh.Mesh(stl_model.data.copy())
+    transform_arrays(target.vectors, target.normals, matrix, chunk_size=chunk_size)
+
+    # La caja envolvente que numpy-stl guarda en caché queda obsoleta.
+    for refresh in ("update_min", "update_max"):
+        if hasattr(target, refresh):
+            getattr(target, refresh)()
+    return target
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Se crea un modelo de un único triángulo para la demostración.
+    data = np.zeros(1, dtype=mesh.Mesh.dtype)
+    data["vectors"][0] = [[0.0, 0.0, 1.0], [1.0, 0.0, 1.0], [0.0, 1.0, 1.0]]
+    data["normals"][0] = [0.0, 0.0, 1.0]
+    demo = mesh.Mesh(data)
+
+    # Escalado no uniforme, espejado en X, rotación de 90° en Z y apoyo en la cama.
+    transform = compose(
+        scale_matrix(2.0, 1.0, 0.5),
+        mirror_matrix("x"),
+        rotation_matrix("z", 90),
+    )
+    apply_transform(demo, transform)
+    apply_transform(demo, drop_to_bed_matrix(demo))
+    print("Vértices transformados:\n", demo.vectors[0])
+    print("Normal transformada:", demo.normals[0])
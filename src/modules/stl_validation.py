@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_validation.py
+
+Este módulo verifica la integridad de una malla STL antes de escalarla o
+exportarla para impresión. Todo el análisis es vectorizado con NumPy:
+
+  - Los vértices repetidos de las facetas se sueldan en índices enteros.
+  - Con los índices se construye una tabla de aristas cuyas claves enteras
+    (min * V + max) se agrupan con una sola ordenación.
+  - A partir de esa tabla se cuentan las aristas de borde (una sola faceta),
+    las aristas no manifold (más de dos facetas) y las aristas cuyas dos
+    facetas las recorren en el mismo sentido (orientación inconsistente).
+
+Además se detectan triángulos degenerados, facetas duplicadas y normales
+almacenadas que apuntan en sentido contrario al que indica el orden de los
+vértices. El volumen (calcular_volumen) solo es fiable si la malla es
+cerrada ('is_watertight') y está orientada de forma coherente ('is_oriented').
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+# Constantes multiplicativas para mezclar las tres coordenadas en una clave de 64 bits.
+_HASH_PRIMES = (
+    np.uint64(0x9E3779B97F4A7C15),
+    np.uint64(0xC2B2AE3D27D4EB4F),
+    np.uint64(0x165667B19E3779F9),
+)
+
+
+def group_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Agrupa claves enteras iguales con una sola ordenación.
+
+    Equivale a np.unique(keys, return_index=True, return_inverse=True,
+    return_counts=True), pero evita el trabajo adicional que np.unique realiza
+    para devolver el primer índice de cada grupo de forma estable.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: (claves únicas,
+            un índice representativo de cada grupo, grupo de cada clave,
+            tamaño de cada grupo).
+    """
+    keys = np.asarray(keys).reshape(-1)
+    if not len(keys):
+        empty = np.zeros(0, dtype=np.int64)
+        return keys, empty, empty, empty
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    starts_mask = np.empty(len(keys), dtype=bool)
+    starts_mask[0] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=starts_mask[1:])
+    inverse = np.empty(len(keys), dtype=np.int64)
+    inverse[order] = np.cumsum(starts_mask) - 1
+    starts = np.flatnonzero(starts_mask)
+    counts = np.diff(np.append(starts, len(keys)))
+    return sorted_keys[starts], order[starts], inverse, counts
+
+
+def weld_vertices(vectors: np.ndarray, tolerance: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Suelda los vértices coincidentes de las facetas.
+
+    Las tres coordenadas (sus bits en float32, o su celda de rejilla si hay
+    tolerancia) se mezclan en una clave de 64 bits que se agrupa con una sola
+    ordenación. Después se comprueba que todos los vértices de cada grupo son
+    realmente iguales; en el caso improbable de una colisión se recurre a la
+    comparación exacta por filas.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        tolerance (float): Si es > 0, los vértices se agrupan en una rejilla de
+                           ese tamaño; si es 0, solo se unen los idénticos.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (vértices únicos (V, 3), caras (N, 3) con
+                                       índices int64 a esos vértices).
+    """
+    points = np.asarray(vectors).reshape(-1, 3)
+    if tolerance > 0:
+        cells = np.floor(points / tolerance + 0.5).astype(np.int64)
+    else:
+        # Sumar 0.0 convierte -0.0 en 0.0 para que ambos se consideren iguales.
+        as_f32 = np.ascontiguousarray(points, dtype=np.float32) + np.float32(0.0)
+        cells = as_f32.view(np.uint32)
+    bits = cells.astype(np.uint64)
+
+    hashed = bits[:, 0] * _HASH_PRIMES[0]
+    hashed ^= bits[:, 1] * _HASH_PRIMES[1]
+    hashed ^= bits[:, 2] * _HASH_PRIMES[2]
+    _, first, inverse, _ = group_keys(hashed)
+
+    if not np.array_equal(cells[first][inverse], cells):
+        cells = np.ascontiguousarray(cells)
+        row_view = cells.view(np.dtype((np.void, cells.dtype.itemsize * 3))).reshape(-1)
+        _, first, inverse = np.unique(row_view, return_index=True, return_inverse=True)
+    return points[first], inverse.reshape(-1, 3).astype(np.int64)
+
+
+def edge_table(faces: np.ndarray, vertex_count: int) -> Dict[str, np.ndarray]:
+    """
+    Construye la tabla de aristas de una malla indexada.
+
+    Args:
+        faces (np.ndarray): Caras (N, 3) con índices de vértices.
+        vertex_count (int): Número de vértices (V), usado para las claves.
+
+    Returns:
+        Dict[str, np.ndarray]: {
+            'keys': claves únicas de arista (min * V + max),
+            'counts': número de facetas que comparten cada arista,
+            'inverse': índice de arista de cada una de las 3N aristas dirigidas
+                       (en el orden v0->v1, v1->v2, v2->v0 de cada faceta),
+            'forward': True si la arista dirigida va del índice menor al mayor
+        }
+    """
+    start = faces.reshape(-1)
+    end = faces[:, [1, 2, 0]].reshape(-1)
+    low = np.minimum(start, end)
+    high = np.maximum(start, end)
+    keys = low * np.int64(vertex_count) + high
+    unique_keys, _, inverse, counts = group_keys(keys)
+    return {
+        "keys": unique_keys,
+        "counts": counts,
+        "inverse": inverse.reshape(-1),
+        "forward": start < end,
+    }
+
+
+def check_mesh(
+    vectors: np.ndarray,
+    normals: Optional[np.ndarray] = None,
+    tolerance: float = 0.0,
+    area_epsilon: float = 1e-12,
+) -> Dict[str, Any]:
+    """
+    Analiza la topología y la coherencia de una malla STL.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        normals (Optional[np.ndarray]): Normales almacenadas (N, 3). Si se indican,
+                                        se comparan con las calculadas.
+        tolerance (float): Tolerancia para soldar vértices (ver weld_vertices).
+        area_epsilon (float): Área relativa (respecto a la diagonal de la caja
+                              envolvente al cuadrado) por debajo de la cual un
+                              triángulo se considera degenerado.
+
+    Returns:
+        Dict[str, Any]: Resumen con los contadores 'triangles', 'vertices',
+            'edges', 'boundary_edges', 'non_manifold_edges',
+            'inconsistent_edges', 'degenerate_triangles', 'duplicate_facets',
+            'flipped_normals' y los indicadores 'is_watertight', 'is_oriented'
+            e 'is_valid'.
+    """
+    vectors = np.asarray(vectors)
+    triangles = len(vectors)
+    points, faces = weld_vertices(vectors, tolerance=tolerance)
+
+    edges = edge_table(faces, len(points))
+    counts = edges["counts"]
+    boundary = int(np.count_nonzero(counts == 1))
+    non_manifold = int(np.count_nonzero(counts > 2))
+
+    # En una arista compartida por dos facetas bien orientadas, una la recorre
+    # de menor a mayor y la otra al revés: la suma de 'forward' debe ser 1.
+    forward_sum = np.bincount(edges["inverse"], weights=edges["forward"], minlength=len(counts))
+    inconsistent = int(np.count_nonzero((counts == 2) & (forward_sum != 1)))
+
+    # Triángulos degenerados: índices repetidos o área despreciable.
+    v = vectors.astype(np.float64)
+    cross = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    double_area = np.linalg.norm(cross, axis=1)
+    if triangles:
+        diagonal = float(np.linalg.norm(points.max(axis=0).astype(np.float64) - points.min(axis=0)))
+    else:
+        diagonal = 0.0
+    repeated = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 0] == faces[:, 2])
+    degenerate_mask = repeated | (double_area <= 2.0 * area_epsilon * diagonal ** 2)
+    degenerate = int(np.count_nonzero(degenerate_mask))
+
+    # Facetas duplicadas: mismo conjunto de vértices, sin importar el orden.
+    if triangles:
+        # Con las caras ordenadas, (a, b, c) se codifica sin colisiones si V³ cabe en 63 bits;
+        # si no, se comparan las filas completas.
+        sorted_faces = np.sort(faces, axis=1)
+        vertex_count = np.int64(max(1, len(points)))
+        if len(points) < 2 ** 21:
+            face_keys = (sorted_faces[:, 0] * vertex_count + sorted_faces[:, 1]) * vertex_count + sorted_faces[:, 2]
+            unique_faces = len(group_keys(face_keys)[0])
+        else:
+            row_view = np.ascontiguousarray(sorted_faces).view(np.dtype((np.void, 24))).reshape(-1)
+            unique_faces = len(np.unique(row_view))
+    else:
+        unique_faces = 0
+    duplicates = triangles - unique_faces
+
+    flipped = 0
+    missing_normals = 0
+    if normals is not None and triangles:
+        stored = np.asarray(normals, dtype=np.float64)
+        has_normal = np.any(stored != 0, axis=1)
+        missing_normals = int(np.count_nonzero(~has_normal))
+        dots = np.einsum("ij,ij->i", stored, cross)
+        flipped = int(np.count_nonzero(has_normal & ~degenerate_mask & (dots < 0)))
+
+    is_watertight = triangles > 0 and boundary == 0 and non_manifold == 0
+    is_oriented = inconsistent == 0
+    return {
+        "triangles": triangles,
+        "vertices": int(len(points)),
+        "edges": int(len(counts)),
+        "boundary_edges": boundary,
+        "non_manifold_edges": non_manifold,
+        "inconsistent_edges": inconsistent,
+        "degenerate_triangles": degenerate,
+        "duplicate_facets": int(duplicates),
+        "flipped_normals": flipped,
+        "missing_normals": missing_normals,
+        "is_watertight": bool(is_watertight),
+        "is_oriented": bool(is_oriented),
+        "is_valid": bool(is_watertight and is_oriented and degenerate == 0 and duplicates == 0 and flipped == 0),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Genera un texto legible con el resumen retornado por check_mesh()."""
+    def yes_no(value: bool) -> str:
+        return "sí" if value else "no"
+
+    return (
+        f"  - Triángulos: {report['triangles']}\n"
+        f"  - Vértices soldados: {report['vertices']}\n"
+        f"  - Aristas de borde: {report['boundary_edges']}\n"
+        f"  - Aristas no manifold: {report['non_manifold_edges']}\n"
+        f"  - Aristas con orientación inconsistente: {report['inconsistent_edges']}\n"
+        f"  - Triángulos degenerados: {report['degenerate_triangles']}\n"
+        f"  - Facetas duplicadas: {report['duplicate_facets']}\n"
+        f"  - Normales invertidas: {report['flipped_normals']}\n"
+        f"  - Cerrada (watertight): {yes_no(report['is_watertight'])}\n"
+        f"  - Orientación coherente: {yes_no(report['is_oriented'])}\n"
+        f"  - Válida para impresión: {yes_no(report['is_valid'])}"
+    )
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Tetraedro cerrado, primero correcto y luego con una cara invertida.
+    a, b, c, d = (0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)
+    tetra = np.array([[a, c, b], [a, b, d], [a, d, c], [b, c, d]], dtype=np.float32)
+    print("Tetraedro correcto:")
+    print(format_report(check_mesh(tetra)))
+    tetra[3] = tetra[3][[0, 2, 1]]
+    print("Tetraedro con una cara invertida:")
+    print(format_report(check_mesh(tetra)))
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_variants.py
+
+Este módulo genera varias versiones escaladas (variantes) de un mismo modelo
+STL a partir de una única lectura del archivo. Es útil, por ejemplo, para
+obtener una figura a 1:6, 1:12, 1:24, 1:35 y 1:72 según la tabla 'scales'.
+
+Funcionamiento:
+  - El archivo se lee una sola vez y sus arreglos se conservan en memoria.
+  - Las propiedades (volumen, área, dimensiones) se calculan una vez sobre el
+    modelo base y se escalan analíticamente para cada variante.
+  - Cada variante se genera escalando una copia de los arreglos base (las
+    normales no cambian con un escalado uniforme positivo: se calculan una
+    sola vez sobre el modelo base) y se escribe en disco desde un hilo distinto.
+  - Con una caché de construcción (db/build_cache.py) solo se regeneran las
+    variantes cuyo origen o factor cambió; si ninguna cambió, el archivo ni
+    siquiera se lee.
+"""
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from stl import mesh
+
+from stl_export import export_mesh
+from stl_normals import compute_normals
+from utils import mesh_properties, output_path_for, scale_label, scale_properties
+
+
+def _validate_factor(factor: float) -> float:
+    """Valida un factor de escala con las mismas reglas que scale_model."""
+    if not isinstance(factor, (int, float)):
+        raise TypeError("El factor de escala debe ser un número.")
+    if factor <= 0:
+        raise ValueError("El factor de escala debe ser mayor que cero.")
+    return float(factor)
+
+
+def variants_from_db(
+    scale_ids: Optional[Iterable[int]] = None,
+    desired_scales: Optional[Iterable[str]] = None,
+    db: Optional[Any] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Obtiene de ScaleDB las variantes (etiqueta, factor) a generar.
+
+    Args:
+        scale_ids (Optional[Iterable[int]]): IDs de registros de la tabla 'scales'.
+        desired_scales (Optional[Iterable[str]]): Escalas deseadas, por ejemplo ["1:6", "1:72"].
+                                                  Se usa el primer registro de cada escala.
+        db (Optional[ScaleDB]): Conexión existente. Si es None se abre una temporal.
+
+    Returns:
+        List[Tuple[str, float]]: Lista de (escala deseada, factor de conversión).
+
+    Raises:
+        ValueError: Si algún ID o escala no existe en la base de datos.
+    """
+    own_db = db is None
+    if own_db:
+        from scale_db import ScaleDB
+        db = ScaleDB()
+
+    variants: List[Tuple[str, float]] = []
+    try:
+        for scale_id in scale_ids or []:
+            record = db.get_scale_by_id(scale_id)
+            if record is None:
+                raise ValueError(f"No existe un registro de escala con ID {scale_id}.")
+            variants.append((record["desired_scale"], float(record["conversion_factor"])))
+
+        wanted = list(desired_scales or [])
+        if wanted:
+            by_scale: Dict[str, float] = {}
+            for record in db.get_all_scales():
+                by_scale.setdefault(str(record["desired_scale"]).strip(), float(record["conversion_factor"]))
+            for desired in wanted:
+                if desired.strip() not in by_scale:
+                    raise ValueError(f"No existe un registro con escala deseada '{desired}'.")
+                variants.append((desired.strip(), by_scale[desired.strip()]))
+    finally:
+        if own_db:
+            db.close()
+    return variants
+
+
+def _write_variant(
+    base: mesh.Mesh,
+    factor: float,
+    target: Path,
+    binary: bool,
+    normals: np.ndarray,
+) -> None:
+    """
+    Escala una copia de los arreglos base y la exporta a 'target'.
+
+    Un escalado uniforme no cambia las normales unitarias: se escriben las
+    calculadas una sola vez sobre el modelo base.
+    """
+    data = base.data.copy()
+    data["vectors"] *= factor
+    data["normals"] = normals
+    export_mesh(mesh.Mesh(data, calculate_normals=False), target, binary=binary, update_normals=False)
+
+
+def generate_variants(
+    source: Union[str, Path, mesh.Mesh],
+    variants: Iterable[Union[float, Tuple[str, float]]],
+    output_dir: Union[str, Path],
+    binary: bool = True,
+    max_workers: Optional[int] = None,
+    source_name: Optional[str] = None,
+    cache: Optional[Any] = None,
+    force: bool = False,
+    compact: Optional[str] = None,
+    max_error: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Genera N variantes escaladas de un modelo leyendo el archivo una sola vez.
+
+    Args:
+        source (Union[str, Path, mesh.Mesh]): Ruta al archivo STL o modelo ya cargado.
+        variants (Iterable[Union[float, Tuple[str, float]]]): Factores, o pares
+            (etiqueta, factor) como los que retorna variants_from_db().
+        output_dir (Union[str, Path]): Carpeta de salida (se crea si no existe).
+        binary (bool, opcional): Guardar en binario (True) o ASCII (False).
+        max_workers (Optional[int]): Hilos de escritura. Por defecto, uno por variante
+                                     hasta el número de CPUs.
+        source_name (Optional[str]): Nombre base de los archivos de salida cuando
+                                     'source' es un modelo en memoria.
+        cache (Optional[BuildCache]): Caché de construcción (solo con rutas de archivo).
+        force (bool): Regenerar todas las variantes aunque estén al día.
+        compact (Optional[str]): Codificación del modelo base en memoria
+                                 (stl_compact.MODES o 'auto'); None = sin cuantizar.
+        max_error (Optional[float]): Error de posición máximo admitido con 'compact' (mm).
+
+    Returns:
+        List[Dict[str, Any]]: Una entrada por variante distinta (las que dan la
+            misma etiqueta y el mismo factor se generan una vez) con las claves
+            'label', 'factor', 'output', 'skipped' y 'properties' (None en las
+            variantes omitidas si el modelo no llegó a leerse).
+
+    Raises:
+        FileNotFoundError: Si el archivo de origen no existe.
+        TypeError / ValueError: Si algún factor no es válido, si dos variantes
+                                dan la misma etiqueta con factores distintos o
+                                la codificación no cumple 'max_error'.
+    """
+    in_memory = isinstance(source, mesh.Mesh)
+    if in_memory:
+        source_path = Path(source_name or "modelo")
+        cache = None
+    else:
+        source_path = Path(source).resolve()
+        if not source_path.exists():
+            raise FileNotFoundError(f"El archivo '{source_path}' no existe.")
+
+    # Cada etiqueta da un archivo de salida: las variantes repetidas ("1:72" y
+    # "1/72", o el mismo factor dos veces) se generan una sola vez, para que dos
+    # hilos no escriban el mismo archivo. La comparación ignora mayúsculas,
+    # como el sistema de archivos de Windows.
+    jobs: List[Tuple[str, float]] = []
+    seen: Dict[str, float] = {}
+    for variant in variants:
+        if isinstance(variant, tuple):
+            label, factor = variant
+        else:
+            label, factor = f"x{variant:g}", variant
+        label, factor = scale_label(label), _validate_factor(factor)
+        previous = seen.get(label.lower())
+        if previous is None:
+            seen[label.lower()] = factor
+            jobs.append((label, factor))
+        elif not math.isclose(previous, factor, rel_tol=1e-9):
+            raise ValueError(
+                f"Las variantes '{label}' usan el mismo archivo de salida con factores distintos "
+                f"({previous:g} y {factor:g})."
+            )
+    if not jobs:
+        return []
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    transform = "scale;binary" if binary else "scale;ascii"
+    if compact:
+        transform += f";compact:{compact}" + ("" if max_error is None else f":{max_error:g}")
+
+    # Decidir qué variantes hay que construir antes de leer el modelo.
+    input_hash = None
+    pending: List[bool] = []
+    for label, factor in jobs:
+        target = output_path_for(source_path, out_dir, label)
+        if cache is None:
+            pending.append(True)
+            continue
+        if input_hash is None:
+            input_hash = cache.input_hash(source_path, target)
+        pending.append(force or not cache.is_up_to_date(source_path, target, factor, transform, input_hash=input_hash))
+
+    base = None
+    base_properties = None
+    base_normals = None
+    if any(pending):
+        base = source if in_memory else mesh.Mesh.from_file(str(source_path), calculate_normals=False)
+        # Las propiedades y las normales se calculan una sola vez sobre el modelo base.
+        base_properties = mesh_properties(base.vectors)
+        if compact:
+            from stl_compact import CompactMesh
+
+            base = CompactMesh.from_mesh(base, mode=compact, max_error=max_error)
+        else:
+            base_normals = compute_normals(base.vectors)
+
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    results: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for (label, factor), build in zip(jobs, pending):
+            target = output_path_for(source_path, out_dir, label)
+            if build and compact:
+                futures.append((pool.submit(base.scaled(factor).export, target, binary), target, factor))
+            elif build:
+                futures.append((pool.submit(_write_variant, base, factor, target, binary, base_normals), target, factor))
+            results.append({
+                "label": label,
+                "factor": factor,
+                "output": target,
+                "skipped": not build,
+                "properties": scale_properties(base_properties, factor) if base_properties else None,
+            })
+        # Propagar el primer error de escritura, si lo hubo, y registrar las nuevas salidas.
+        for future, target, factor in futures:
+            future.result()
+            if cache is not None:
+                cache.record(source_path, target, factor, transform, input_hash)
+    return results
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Actualiza 'ruta_al_archivo.stl' con la ruta real de tu archivo STL.
+    stl_file = "ruta_al_archivo.stl"
+    try:
+        generated = generate_variants(
+            stl_file,
+            [("1:6", 1 / 6), ("1:12", 1 / 12), ("1:24", 1 / 24), ("1:35", 1 / 35), ("1:72", 1 / 72)],
+            output_dir="variantes",
+        )
+        for item in generated:
+            alto = item["properties"]["dimensions"][2]
+            print(f"{item['label']}: {item['output']} (alto {alto:.2f} mm)")
+    except Exception as e:
+        print("Error al generar las variantes:", e)
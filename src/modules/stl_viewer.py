@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_viewer.py
+
+Este módulo mantiene un visor 3D (PyVista) que vive mientras la aplicación
+está abierta, en lugar de crear un pv.Plotter nuevo en cada clic:
+  - La ventana, la cámara, las luces y los atajos de teclado se crean una vez.
+  - La malla se sube a la tarjeta gráfica una sola vez por archivo: los
+    puntos y las caras se construyen con NumPy (sin bucles de Python) y el
+    actor conserva esos búferes.
+  - Al reescalar solo se actualiza la matriz del actor (user_matrix), que
+    VTK pasa al sombreador como una uniforme; los búferes no se reconstruyen.
+    Las propiedades (volumen, área, dimensiones) se calculan una vez por
+    archivo y se escalan analíticamente (utils.scale_properties).
+  - La transparencia cambia la propiedad del actor, sin volver a añadirlo.
+
+La ventana se muestra sin bloquear (interactive_update): la aplicación debe
+llamar a process_events() periódicamente (por ejemplo, desde un wx.Timer).
+Con off_screen=True no se abre ninguna ventana y screenshot() devuelve la
+imagen renderizada, lo que permite probar el visor sin pantalla.
+
+PyVista se importa al crear el visor, de modo que el módulo puede
+importarse en entornos sin soporte gráfico.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from utils import mesh_properties, scale_properties
+
+# Nombre de los actores que se reemplazan al actualizar el visor.
+_MODEL_NAME = "modelo"
+_INFO_NAME = "informacion"
+
+
+def polydata_arrays(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte las facetas de un modelo en los arreglos de pv.PolyData.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (puntos (3N, 3) float32, caras (4N,)
+            con el formato [3, i, i+1, i+2, ...]).
+    """
+    points = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, 3)
+    faces = np.empty((len(vectors), 4), dtype=np.int64)
+    faces[:, 0] = 3
+    faces[:, 1:] = np.arange(3 * len(vectors), dtype=np.int64).reshape(-1, 3)
+    return points, faces.ravel()
+
+
+def info_text(properties: Dict[str, Any], vertices: int) -> str:
+    """Texto del panel de información del modelo (dimensiones en mm y cm)."""
+    ancho, alto, profundidad = properties["dimensions"]
+    volumen = properties["volume"]
+    area_total = properties["area"]
+    return (
+        f"📂 Información del modelo:\n"
+        f"  - Dimensiones (mm):\n"
+        f"    • Ancho: {ancho:.2f} mm\n"
+        f"    • Alto: {alto:.2f} mm\n"
+        f"    • Profundidad: {profundidad:.2f} mm\n\n"
+        f"  - Dimensiones (cm):\n"
+        f"    • Ancho: {ancho / 10:.2f} cm\n"
+        f"    • Alto: {alto / 10:.2f} cm\n"
+        f"    • Profundidad: {profundidad / 10:.2f} cm\n\n"
+        f"📏 Longitudes Totales:\n"
+        f"    • Eje X: {ancho:.2f} mm / {ancho / 10:.2f} cm\n"
+        f"    • Eje Y: {alto:.2f} mm / {alto / 10:.2f} cm\n"
+        f"    • Eje Z: {profundidad:.2f} mm / {profundidad / 10:.2f} cm\n\n"
+        f"📦 Volumen: {volumen:.2f} mm³ / {volumen / 1000:.2f} cm³\n"
+        f"🖋️ Área Total: {area_total:.2f} mm² / {area_total / 100:.2f} cm²\n"
+        f"🔺 Triángulos: {properties['triangles']}\n"
+        f"🔷 Vértices: {vertices}\n"
+    )
+
+
+class ModelViewer:
+    """
+    Visor 3D persistente para un modelo STL.
+    """
+
+    def __init__(
+        self,
+        off_screen: bool = False,
+        window_size: Tuple[int, int] = (1024, 768),
+        background: str = "#333333",
+        title: str = "Reescalador STL",
+    ) -> None:
+        """
+        Args:
+            off_screen (bool): Renderizar sin abrir ventana (pruebas, servidores).
+            window_size (Tuple[int, int]): Tamaño de la ventana en píxeles.
+            background (str): Color de fondo.
+            title (str): Título de la ventana.
+
+        Raises:
+            ImportError: Si PyVista no está instalado.
+        """
+        import pyvista as pv
+
+        self._pv = pv
+        self.off_screen = off_screen
+        self.window_size = window_size
+        self.background = background
+        self.title = title
+        self.plotter = None
+        self.actor = None
+        self._mesh_data = None
+        self.properties: Optional[Dict[str, Any]] = None
+        self.vertices = 0
+        self.factor = 1.0
+        self.opacity = 1.0
+        self._key_events: Dict[str, Callable[[], None]] = {}
+        self._shown = False
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida de la ventana
+    # ------------------------------------------------------------------
+    @property
+    def is_open(self) -> bool:
+        """Indica si la ventana (o el renderizador fuera de pantalla) sigue activa."""
+        return self.plotter is not None and getattr(self.plotter, "render_window", None) is not None
+
+    def _ensure_plotter(self):
+        """Crea el plotter y los elementos fijos de la escena si aún no existen."""
+        if self.is_open:
+            return self.plotter
+        pv = self._pv
+        self.plotter = pv.Plotter(off_screen=self.off_screen, window_size=list(self.window_size), title=self.title)
+        self.plotter.set_background(self.background)
+        self.plotter.add_axes()
+        self.plotter.add_light(pv.Light(position=(5, 5, 5), focal_point=(0, 0, 0), intensity=1.5))
+        self.plotter.add_key_event("r", self.reset_camera)
+        self.plotter.add_key_event("+", lambda: self.plotter.camera.zoom(1.2))
+        self.plotter.add_key_event("-", lambda: self.plotter.camera.zoom(0.8))
+        for key, callback in self._key_events.items():
+            self.plotter.add_key_event(key, callback)
+        self._shown = False
+        # Si la ventana se había cerrado, el modelo se vuelve a subir con el mismo factor.
+        if self.actor is not None:
+            self._add_model(self._mesh_data)
+        return self.plotter
+
+    def add_key_event(self, key: str, callback: Callable[[], None]) -> None:
+        """Registra un atajo de teclado (se conserva si la ventana se vuelve a crear)."""
+        self._key_events[key] = callback
+        if self.is_open:
+            self.plotter.add_key_event(key, callback)
+
+    def show(self) -> None:
+        """
+        Muestra la ventana sin bloquear o, si ya está abierta, la vuelve a dibujar.
+        """
+        plotter = self._ensure_plotter()
+        if self.off_screen or self._shown:
+            plotter.render()
+            return
+        plotter.show(interactive_update=True, auto_close=False)
+        self._shown = True
+
+    def process_events(self) -> bool:
+        """
+        Atiende los eventos pendientes de la ventana (llamar periódicamente).
+
+        Returns:
+            bool: False si la ventana ya se cerró.
+        """
+        if not self.is_open:
+            return False
+        if self._shown:
+            self.plotter.update(stime=1)
+        return self.is_open
+
+    def close(self) -> None:
+        """Cierra la ventana y libera los recursos gráficos."""
+        if self.plotter is not None:
+            self.plotter.close()
+        self.plotter = None
+        self._shown = False
+
+    # ------------------------------------------------------------------
+    # Modelo
+    # ------------------------------------------------------------------
+    def _model_matrix(self) -> np.ndarray:
+        matrix = np.eye(4)
+        matrix[0, 0] = matrix[1, 1] = matrix[2, 2] = self.factor
+        return matrix
+
+    def _add_model(self, mesh_data) -> None:
+        """Sube la malla a la escena (una vez por archivo o por ventana)."""
+        self.actor = self.plotter.add_mesh(
+            mesh_data, color="green", opacity=self.opacity, show_edges=True, name=_MODEL_NAME,
+        )
+        self.actor.user_matrix = self._model_matrix()
+        self._refresh_scene()
+
+    def set_model(self, vectors: np.ndarray) -> None:
+        """
+        Carga un modelo nuevo en el visor (se construyen sus búferes una vez).
+
+        Args:
+            vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+        """
+        points, faces = polydata_arrays(vectors)
+        self._mesh_data = self._pv.PolyData(points, faces)
+        self.properties = mesh_properties(vectors)
+        self.vertices = len(points)
+        self.factor = 1.0
+        self._ensure_plotter()
+        self._add_model(self._mesh_data)
+        self.plotter.reset_camera()
+
+    def scale_by(self, factor: float) -> None:
+        """
+        Escala el modelo mostrado sin reconstruir la malla.
+
+        Args:
+            factor (float): Factor que se multiplica al acumulado (> 0).
+
+        Raises:
+            ValueError: Si el factor no es positivo.
+        """
+        if factor <= 0:
+            raise ValueError("El factor de escala debe ser mayor que cero.")
+        self.factor *= factor
+        if self.actor is None or not self.is_open:
+            return
+        self.actor.user_matrix = self._model_matrix()
+        self._refresh_scene()
+        # La dirección de la vista se conserva; solo se reencuadra el modelo.
+        self.plotter.reset_camera()
+        self.plotter.render()
+
+    def set_opacity(self, opacity: float) -> None:
+        """Cambia la opacidad del modelo (1 = opaco)."""
+        self.opacity = opacity
+        if self.actor is not None and self.is_open:
+            self.actor.prop.opacity = opacity
+            self.plotter.render()
+
+    def model_properties(self) -> Optional[Dict[str, Any]]:
+        """Propiedades del modelo con el factor acumulado, o None si no hay modelo."""
+        if self.properties is None:
+            return None
+        return scale_properties(self.properties, self.factor)
+
+    def _refresh_scene(self) -> None:
+        """Actualiza los elementos que dependen del tamaño: suelo y panel de información."""
+        properties = self.model_properties()
+        # El suelo es un plano de 4 vértices: volver a crearlo no cuesta nada.
+        self.plotter.remove_floors(render=False)
+        self.plotter.add_floor("z")
+        self.plotter.add_text(info_text(properties, self.vertices), position="upper_left", font_size=10, name=_INFO_NAME)
+
+    def reset_camera(self) -> None:
+        """Vuelve a la vista isométrica."""
+        if self.is_open:
+            self.plotter.camera_position = "iso"
+            self.plotter.reset_camera()
+            self.plotter.render()
+
+    def screenshot(self, path: Optional[str] = None) -> np.ndarray:
+        """
+        Renderiza la escena y retorna la imagen (útil con off_screen=True).
+
+        Args:
+            path (Optional[str]): Si se indica, también se guarda como PNG.
+
+        Returns:
+            np.ndarray: Imagen (alto, ancho, 3) en uint8.
+        """
+        plotter = self._ensure_plotter()
+        plotter.render()
+        return plotter.screenshot(path, return_img=True)
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    from stl import mesh
+
+    # Actualiza 'ruta_al_archivo.stl' con la ruta real de tu archivo STL.
+    stl_file = "ruta_al_archivo.stl"
+    try:
+        model = mesh.Mesh.from_file(stl_file)
+        viewer = ModelViewer(off_screen=True)
+        viewer.set_model(model.vectors)
+        viewer.screenshot("vista_original.png")
+        viewer.scale_by(2.0)  # Solo cambia la matriz del actor.
+        viewer.screenshot("vista_x2.png")
+        print("Dimensiones con el factor 2:", viewer.model_properties()["dimensions"])
+        viewer.close()
+    except Exception as e:
+        print("Error al visualizar el modelo:", e)
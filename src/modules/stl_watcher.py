@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Módulo: stl_watcher.py
+
+Este módulo vigila una carpeta compartida (por ejemplo, donde los escáneres
+depositan sus archivos) y reescala automáticamente los STL nuevos o
+modificados.
+
+Funcionamiento:
+  - En Linux se usa inotify (a través de ctypes, sin dependencias externas);
+    en otros sistemas, o si inotify no está disponible, se recorre la carpeta
+    periódicamente (polling).
+  - Un archivo solo se procesa cuando su tamaño y fecha de modificación se
+    mantienen estables durante 'settle_seconds', para no leer escrituras a medias.
+  - El factor se obtiene de ScaleDB: el registro cuyo 'object_name' coincide
+    con el nombre del archivo, o bien un ID / factor fijo indicado al crear
+    el vigilante.
+  - Un manifiesto JSON en la carpeta de salida guarda, para cada archivo
+    procesado, el hash SHA-256 de su contenido y el factor aplicado. Al
+    reiniciar el vigilante solo se procesan los archivos nuevos o cuyo
+    contenido o factor haya cambiado.
+  - La carpeta de salida no puede ser la vigilada (cada resultado volvería a
+    reescalarse sin fin) y los archivos anotados como salida en el
+    manifiesto nunca se procesan.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from logger_config import setup_logger
+from stl_batch import STL_SUFFIXES, rescale_file
+from utils import file_sha256, scale_label
+
+logger = setup_logger(name=__name__, level=logging.INFO, log_file="logs/stl_watcher.log")
+
+# Nombre del manifiesto que se guarda en la carpeta de salida.
+MANIFEST_NAME = ".stl_watch_manifest.json"
+
+# Máscaras de inotify (ver <sys/inotify.h>).
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+# os.O_NONBLOCK no existe en Windows: el módulo debe importarse igual para usar polling.
+_IN_NONBLOCK = getattr(os, "O_NONBLOCK", 0o4000)
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifySource:
+    """Fuente de eventos basada en inotify. Lanza OSError si no está disponible."""
+
+    def __init__(self, folder: Path) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify solo está disponible en Linux.")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(str(folder)), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch falló para {folder}")
+        self.folder = folder
+
+    def wait(self, timeout: float) -> List[Path]:
+        """Espera hasta 'timeout' segundos y retorna las rutas con eventos."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths: List[Path] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            _, _, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                paths.append(self.folder / os.fsdecode(name))
+        return paths
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingSource:
+    """Fuente de eventos que recorre la carpeta cada cierto tiempo."""
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+        self._seen: Dict[Path, Tuple[int, int]] = {}
+
+    def wait(self, timeout: float) -> List[Path]:
+        time.sleep(timeout)
+        changed: List[Path] = []
+        current: Dict[Path, Tuple[int, int]] = {}
+        for path in self.folder.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            current[path] = (stat.st_size, stat.st_mtime_ns)
+            if self._seen.get(path) != current[path]:
+                changed.append(path)
+        self._seen = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def factor_for_file(
+    path: Path,
+    records: Iterable[Dict[str, Any]],
+    default: Optional[Tuple[float, Optional[str]]] = None,
+) -> Optional[Tuple[float, Optional[str]]]:
+    """
+    Busca el factor de conversión asignado a un archivo.
+
+    Se usa el primer registro cuyo 'object_name' coincide (sin distinguir
+    mayúsculas) con el nombre del archivo sin extensión.
+
+    Returns:
+        Optional[Tuple[float, Optional[str]]]: (factor, escala deseada), el
+            valor 'default' si no hay coincidencia, o None.
+    """
+    stem = path.stem.strip().lower()
+    for record in records:
+        if str(record["object_name"]).strip().lower() == stem:
+            return float(record["conversion_factor"]), record["desired_scale"]
+    return default
+
+
+class STLWatcher:
+    """
+    Vigila una carpeta y reescala los archivos STL que aparecen en ella.
+
+    Args:
+        watch_dir (Union[str, Path]): Carpeta vigilada.
+        output_dir (Union[str, Path]): Carpeta donde se escriben los resultados.
+        factor (Optional[float]): Factor fijo para todos los archivos.
+        scale_id (Optional[int]): Registro de ScaleDB usado como factor por defecto.
+        settle_seconds (float): Tiempo que un archivo debe permanecer sin cambios.
+        poll_interval (float): Intervalo de espera entre comprobaciones.
+        use_inotify (bool): Intentar usar inotify antes que el polling.
+        db (Optional[ScaleDB]): Conexión a la base de datos. Si es None, se abre
+                                una conexión breve en cada búsqueda.
+        **rescale_options: Opciones para stl_batch.rescale_file (binary,
+                           require_watertight, ...).
+
+    Raises:
+        FileNotFoundError: Si la carpeta vigilada no existe.
+        ValueError: Si la carpeta de salida es la carpeta vigilada.
+    """
+
+    def __init__(
+        self,
+        watch_dir: Union[str, Path],
+        output_dir: Union[str, Path],
+        factor: Optional[float] = None,
+        scale_id: Optional[int] = None,
+        settle_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+        use_inotify: bool = True,
+        db: Optional[Any] = None,
+        **rescale_options: Any,
+    ) -> None:
+        self.watch_dir = Path(watch_dir).resolve()
+        if not self.watch_dir.is_dir():
+            raise FileNotFoundError(f"La carpeta '{self.watch_dir}' no existe.")
+        self.output_dir = Path(output_dir).resolve()
+        if self.output_dir == self.watch_dir:
+            raise ValueError(
+                f"La carpeta de salida no puede ser la carpeta vigilada ('{self.watch_dir}'): "
+                "cada archivo reescalado se volvería a reescalar."
+            )
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.factor = factor
+        self.scale_id = scale_id
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.db = db
+        self.rescale_options = rescale_options
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        # Salidas ya escritas: no se vuelven a procesar aunque aparezcan en la carpeta vigilada.
+        self._outputs = {Path(entry["output"]) for entry in self.manifest.values() if "output" in entry}
+        # Archivos pendientes: ruta -> ((tamaño, mtime), instante del último cambio).
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+
+    # -- Manifiesto -------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning("Manifiesto ilegible (%s); se creará uno nuevo.", e)
+            return {}
+
+    def _save_manifest(self) -> None:
+        # Se escribe en un archivo temporal y se renombra para no dejarlo a medias.
+        temp_path = self.manifest_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, self.manifest_path)
+
+    # -- Factores ---------------------------------------------------------------
+
+    def _resolve_factor(self, path: Path) -> Optional[Tuple[float, Optional[str]]]:
+        if self.factor is not None:
+            return self.factor, None
+        db = self.db
+        if db is None:
+            from scale_db import ScaleDB
+            db = ScaleDB()
+        try:
+            default = None
+            if self.scale_id is not None:
+                record = db.get_scale_by_id(self.scale_id)
+                if record is not None:
+                    default = (float(record["conversion_factor"]), record["desired_scale"])
+            return factor_for_file(path, db.get_all_scales(), default)
+        finally:
+            if self.db is None:
+                db.close()
+
+    # -- Procesamiento ----------------------------------------------------------
+
+    def process_file(self, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Reescala un archivo si su contenido y factor no se han procesado antes.
+
+        Returns:
+            Optional[Dict[str, Any]]: Resultado de rescale_file, o None si se omitió.
+        """
+        if path in self._outputs:
+            logger.debug("'%s' es una salida del vigilante; se omite.", path.name)
+            return None
+        resolved = self._resolve_factor(path)
+        if resolved is None:
+            logger.warning("Sin factor asignado en ScaleDB para '%s'; se omite.", path.name)
+            return None
+        factor, desired_scale = resolved
+
+        content_hash = file_sha256(path)
+        key = str(path)
+        previous = self.manifest.get(key)
+        if (
+            previous
+            and previous["sha256"] == content_hash
+            and previous["factor"] == factor
+            and Path(previous["output"]).exists()
+        ):
+            logger.debug("'%s' ya procesado (%s); se omite.", path.name, previous["output"])
+            return None
+
+        label = desired_scale or f"x{factor:g}"
+        result = rescale_file(path, factor, self.output_dir, label=scale_label(label), **self.rescale_options)
+        if result["status"] == "ok":
+            self.manifest[key] = {
+                "sha256": content_hash,
+                "output": str(result["output"]),
+                "factor": factor,
+                "processed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self._outputs.add(Path(result["output"]))
+            self._save_manifest()
+            logger.info("'%s' reescalado (factor %g) -> %s", path.name, factor, result["output"])
+        elif result["status"] == "rejected":
+            logger.warning("'%s' rechazado por la validación.", path.name)
+        else:
+            logger.error("Error al procesar '%s': %s", path.name, result["error"])
+        return result
+
+    def _touch(self, path: Path, now: float) -> None:
+        """Registra un archivo candidato o actualiza su estado si cambió."""
+        if path.suffix.lower() not in STL_SUFFIXES or path.name.startswith(".") or path in self._outputs:
+            return
+        try:
+            stat = path.stat()
+        except OSError:
+            self._pending.pop(path, None)
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+        previous = self._pending.get(path)
+        if previous is None or previous[0] != signature:
+            self._pending[path] = (signature, now)
+
+    def _process_settled(self, now: float) -> None:
+        """Procesa los archivos que llevan 'settle_seconds' sin cambios."""
+        for path in list(self._pending):
+            self._touch(path, now)
+            entry = self._pending.get(path)
+            if entry is None or now - entry[1] < self.settle_seconds:
+                continue
+            del self._pending[path]
+            try:
+                self.process_file(path)
+            except Exception as e:
+                logger.exception("Error inesperado con '%s': %s", path, e)
+
+    def scan_once(self) -> None:
+        """Registra todos los archivos existentes (útil al arrancar)."""
+        now = time.monotonic()
+        for path in sorted(self.watch_dir.iterdir()):
+            self._touch(path, now)
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """
+        Bucle principal. Termina cuando se activa 'stop_event' o con Ctrl+C.
+        """
+        source = None
+        if self.use_inotify:
+            try:
+                source = _InotifySource(self.watch_dir)
+                logger.info("Vigilando '%s' con inotify.", self.watch_dir)
+            except (OSError, AttributeError) as e:
+                logger.info("inotify no disponible (%s); se usará polling.", e)
+        if source is None:
+            source = _PollingSource(self.watch_dir)
+            logger.info("Vigilando '%s' por polling cada %.1f s.", self.watch_dir, self.poll_interval)
+
+        self.scan_once()
+        try:
+            while stop_event is None or not stop_event.is_set():
+                changed = source.wait(self.poll_interval)
+                now = time.monotonic()
+                for path in changed:
+                    self._touch(path, now)
+                self._process_settled(now)
+        except KeyboardInterrupt:
+            logger.info("Vigilancia detenida por el usuario.")
+        finally:
+            source.close()
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Vigila 'entrada' y escribe en 'salida' con un factor fijo de 1:36.
+    try:
+        STLWatcher("entrada", "salida", factor=1 / 36).run()
+    except Exception as e:
+        print("Error en el vigilante:", e)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Módulo: utils.py
+
+Funciones auxiliares compartidas por los módulos de negocio.
+
+Incluye el cálculo vectorizado de las propiedades geométricas de un modelo
+(volumen, área, caja envolvente y dimensiones) a partir del arreglo de
+facetas (N, 3, 3), y su escalado analítico: al escalar un modelo de forma
+uniforme por 'f', las longitudes se multiplican por f, el área por f² y el
+volumen por f³, por lo que no es necesario recorrer de nuevo los vértices.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Union
+
+import numpy as np
+
+
+def mesh_properties(vectors: np.ndarray) -> Dict[str, Any]:
+    """
+    Calcula las propiedades geométricas de un modelo a partir de sus facetas.
+
+    El volumen se obtiene con el teorema de la divergencia (suma de los
+    tetraedros con vértice en el origen), por lo que solo es significativo
+    en mallas cerradas.
+
+    Args:
+        vectors (np.ndarray): Arreglo (N, 3, 3) con los vértices de cada faceta.
+
+    Returns:
+        Dict[str, Any]: {
+            'triangles': int,
+            'volume': float (mm³),
+            'area': float (mm²),
+            'min': tuple (x, y, z),
+            'max': tuple (x, y, z),
+            'dimensions': tuple (ancho, alto, profundidad)
+        }
+    """
+    v = np.asarray(vectors, dtype=np.float64)
+    v0, v1, v2 = v[:, 0], v[:, 1], v[:, 2]
+    cross = np.cross(v1 - v0, v2 - v0)
+    area = 0.5 * float(np.linalg.norm(cross, axis=1).sum())
+    volume = abs(float(np.einsum("ij,ij->", v0, np.cross(v1, v2)))) / 6.0
+
+    if len(v):
+        low = v.min(axis=(0, 1))
+        high = v.max(axis=(0, 1))
+    else:
+        low = high = np.zeros(3)
+
+    return {
+        "triangles": int(len(v)),
+        "volume": volume,
+        "area": area,
+        "min": tuple(float(c) for c in low),
+        "max": tuple(float(c) for c in high),
+        "dimensions": tuple(float(c) for c in (high - low)),
+    }
+
+
+def scale_properties(properties: Dict[str, Any], factor: float) -> Dict[str, Any]:
+    """
+    Escala analíticamente las propiedades calculadas con mesh_properties().
+
+    Args:
+        properties (Dict[str, Any]): Propiedades del modelo original.
+        factor (float): Factor de escala uniforme aplicado al modelo.
+
+    Returns:
+        Dict[str, Any]: Nuevas propiedades, sin recalcular sobre los vértices.
+    """
+    scaled = dict(properties)
+    scaled["volume"] = properties["volume"] * factor ** 3
+    scaled["area"] = properties["area"] * factor ** 2
+    for key in ("min", "max", "dimensions"):
+        scaled[key] = tuple(c * factor for c in properties[key])
+    return scaled
+
+
+def scale_label(scale: str) -> str:
+    """
+    Convierte una escala (por ejemplo, "1:36") en un sufijo válido para
+    nombres de archivo ("1-36").
+    """
+    label = "".join(c if c.isalnum() or c in ".-_" else "-" for c in str(scale).strip())
+    return label or "escala"
+
+
+def output_path_for(source: Path, output_dir: Path, label: str, extension: str = ".stl") -> Path:
+    """
+    Construye la ruta de salida '<output_dir>/<nombre>_<label><extension>'
+    (sin '_<label>' si la etiqueta está vacía, por ejemplo al convertir de formato).
+    """
+    stem = f"{Path(source).stem}_{label}" if label else Path(source).stem
+    return Path(output_dir) / f"{stem}{extension}"
+
+
+def file_sha256(path: Union[str, Path], block_size: int = 1024 * 1024) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo leyendo por bloques.
+
+    Args:
+        path (Union[str, Path]): Archivo a procesar.
+        block_size (int): Tamaño de cada bloque leído.
+
+    Returns:
+        str: Hash en hexadecimal.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -4,13 +4,14 @@ Módulo: mainwindow.py
 
 Esta interfaz gráfica (usando wxPython) permite:
   - Seleccionar y cargar archivos STL.
-  - Aplicar un factor de escala al modelo STL.
+  - Aplicar un factor de escala al modelo STL, y deshacer o rehacer las escalas
+    aplicadas (Ctrl+Z / Ctrl+Y) sin volver a cargar el archivo.
   - Exportar (guardar) el modelo escalado.
   - Importar escalas estándar desde un archivo Excel.
   
 Integra los módulos de negocio previamente desarrollados:
-    - stl_reader.py
-    - stl_scaler.py
+    - stl_parallel_reader.py
+    - stl_history.py (historial de deshacer/rehacer)
     - stl_export.py
     - excel_importer.py
     - scale_db.py (opcional en este flujo)
@@ -22,10 +23,11 @@ import os
 from pathlib import Path
 
 # Importamos los módulos de negocio
-from stl_reader import STLReader
-from stl_scaler import scale_model
+from stl_parallel_reader import ParallelSTLReader
+from stl_history import TransformHistory
+from stl_transform import scale_matrix
 from stl_export import export_mesh
-from excel_importer import import_scales_from_excel
+# excel_importer (pandas y la base de datos) se importa al pulsar el botón correspondiente.
 
 
 class MainWindow(wx.Frame):
@@ -73,6 +75,10 @@ class MainWindow(wx.Frame):
         self.btn_scale.SetBackgroundColour(wx.Colour(46, 204, 113))
         self.btn_scale.SetForegroundColour(wx.Colour(255, 255, 255))
         action_sizer.Add(self.btn_scale, 0, wx.ALL, 5)
+        self.btn_undo = wx.Button(self.main_panel, label="Deshacer")
+        action_sizer.Add(self.btn_undo, 0, wx.ALL, 5)
+        self.btn_redo = wx.Button(self.main_panel, label="Rehacer")
+        action_sizer.Add(self.btn_redo, 0, wx.ALL, 5)
         self.btn_export = wx.Button(self.main_panel, label="Exportar modelo STL")
         self.btn_export.SetBackgroundColour(wx.Colour(41, 128, 185))
         self.btn_export.SetForegroundColour(wx.Colour(255, 255, 255))
@@ -93,29 +99,43 @@ class MainWindow(wx.Frame):
         # Bind para los eventos de los botones
         self.btn_select.Bind(wx.EVT_BUTTON, self.on_select_file)
         self.btn_scale.Bind(wx.EVT_BUTTON, self.on_scale)
+        self.btn_undo.Bind(wx.EVT_BUTTON, self.on_undo)
+        self.btn_redo.Bind(wx.EVT_BUTTON, self.on_redo)
         self.btn_export.Bind(wx.EVT_BUTTON, self.on_export)
         self.btn_import_excel.Bind(wx.EVT_BUTTON, self.on_import_excel)
         
-        self.stl_model = None  # Aquí se almacenará el modelo STL (tipo mesh.Mesh)
+        # Historial del modelo cargado (TransformHistory); su propiedad 'model'
+        # es el modelo STL (mesh.Mesh) con las escalas aplicadas.
+        self.history = None
         
         # Menú simple (puedes agregar más opciones)
         menubar = wx.MenuBar()
         file_menu = wx.Menu()
         menubar.Append(file_menu, "Archivo")
+        edit_menu = wx.Menu()
+        self.menu_undo = edit_menu.Append(wx.ID_UNDO, "Deshacer\tCtrl+Z")
+        self.menu_redo = edit_menu.Append(wx.ID_REDO, "Rehacer\tCtrl+Y")
+        menubar.Append(edit_menu, "Edición")
         self.SetMenuBar(menubar)
+        self.Bind(wx.EVT_MENU, self.on_undo, id=wx.ID_UNDO)
+        self.Bind(wx.EVT_MENU, self.on_redo, id=wx.ID_REDO)
+        self._update_history_controls()
         
         self.Center()
         self.Show()
 
     def on_select_file(self, event):
-        """Permite seleccionar un archivo STL y cargar el modelo usando STLReader."""
+        """Permite seleccionar un archivo STL y cargar el modelo usando ParallelSTLReader."""
         dlg = wx.FileDialog(self, "Seleccionar archivo STL", wildcard="STL files (*.stl)|*.stl", style=wx.FD_OPEN)
         if dlg.ShowModal() == wx.ID_OK:
             file_path = dlg.GetPath()
             self.txt_path.SetLabel(f"Archivo: {file_path}")
             try:
-                reader = STLReader(file_path)
-                self.stl_model = reader.read()  # Se espera recibir una instancia de mesh.Mesh
+                # El historial necesita el modelo (mesh.Mesh) con sus normales
+                # almacenadas, no el resumen de propiedades de STLReader.
+                reader = ParallelSTLReader(file_path)
+                self.history = TransformHistory(reader.read_mesh())
+                self._update_history_controls()
                 wx.MessageBox("Modelo STL cargado correctamente.", "Éxito", wx.OK | wx.ICON_INFORMATION)
             except Exception as e:
                 wx.MessageBox(f"Error al cargar el archivo STL:\n{e}", "Error", wx.OK | wx.ICON_ERROR)
@@ -123,19 +143,42 @@ class MainWindow(wx.Frame):
 
     def on_scale(self, event):
         """Aplica el factor de escala ingresado al modelo STL cargado."""
-        if self.stl_model is None:
+        if self.history is None:
             wx.MessageBox("Primero carga un archivo STL.", "Error", wx.OK | wx.ICON_ERROR)
             return
         try:
             factor = float(self.txt_factor.GetValue())
-            self.stl_model = scale_model(self.stl_model, factor, inplace=True)
+            # Solo se registra la matriz: los vértices se escalan al exportar.
+            self.history.apply(scale_matrix(factor), f"Escala x{factor:g}")
+            self._update_history_controls()
             wx.MessageBox(f"Modelo escalado con factor {factor}.", "Éxito", wx.OK | wx.ICON_INFORMATION)
         except ValueError:
             wx.MessageBox("Ingresa un valor numérico válido para el factor.", "Error", wx.OK | wx.ICON_ERROR)
 
+    def on_undo(self, event):
+        """Deshace la última escala aplicada."""
+        if self.history is not None and self.history.undo() is not None:
+            self._update_history_controls()
+
+    def on_redo(self, event):
+        """Rehace la última escala deshecha."""
+        if self.history is not None and self.history.redo() is not None:
+            self._update_history_controls()
+
+    def _update_history_controls(self):
+        """Habilita los botones y el menú de deshacer/rehacer según el historial."""
+        can_undo = self.history is not None and self.history.can_undo
+        can_redo = self.history is not None and self.history.can_redo
+        self.btn_undo.Enable(can_undo)
+        self.btn_redo.Enable(can_redo)
+        self.menu_undo.Enable(can_undo)
+        self.menu_redo.Enable(can_redo)
+        self.btn_undo.SetToolTip(f"Deshacer: {self.history.undo_label}" if can_undo else "Nada que deshacer")
+        self.btn_redo.SetToolTip(f"Rehacer: {self.history.redo_label}" if can_redo else "Nada que rehacer")
+
     def on_export(self, event):
         """Exporta el modelo STL escalado en formato binario."""
-        if self.stl_model is None:
+        if self.history is None:
             wx.MessageBox("Carga un archivo STL y aplica escala antes de exportar.", "Error", wx.OK | wx.ICON_ERROR)
             return
         dlg = wx.FileDialog(self, "Guardar archivo STL", wildcard="STL files (*.stl)|*.stl",
@@ -143,7 +186,7 @@ class MainWindow(wx.Frame):
         if dlg.ShowModal() == wx.ID_OK:
             export_path = dlg.GetPath()
             try:
-                export_mesh(self.stl_model, export_path, binary=True)
+                export_mesh(self.history.model, export_path, binary=True)
                 wx.MessageBox("Modelo exportado correctamente.", "Éxito", wx.OK | wx.ICON_INFORMATION)
             except Exception as e:
                 wx.MessageBox(f"Error al exportar el modelo:\n{e}", "Error", wx.OK | wx.ICON_ERROR)
@@ -151,13 +194,21 @@ class MainWindow(wx.Frame):
 
     def on_import_excel(self, event):
         """Importa escalas desde un archivo Excel y las inserta en la base de datos."""
-        dlg = wx.FileDialog(self, "Seleccionar archivo Excel", wildcard="Excel files (*.xlsx)|*.xlsx",
+        dlg = wx.FileDialog(self, "Seleccionar archivo Excel",
+                            wildcard="Excel files (*.xlsx)|*.xlsx|CSV files (*.csv)|*.csv",
                             style=wx.FD_OPEN)
         if dlg.ShowModal() == wx.ID_OK:
             excel_path = dlg.GetPath()
             try:
-                import_scales_from_excel(excel_path)
-                wx.MessageBox("Escalas importadas desde Excel correctamente.", "Éxito", wx.OK | wx.ICON_INFORMATION)
+                from excel_importer import import_scales_from_excel
+
+                report = import_scales_from_excel(excel_path, all_sheets=True)
+                wx.MessageBox(
+                    f"Escalas importadas desde Excel correctamente.\n"
+                    f"{report['rows']} filas de {len(report['sheets'])} hoja(s) "
+                    f"({report['rows_per_second']:.0f} filas/s).",
+                    "Éxito", wx.OK | wx.ICON_INFORMATION,
+                )
             except Exception as e:
                 wx.MessageBox(f"Error al importar escalas:\n{e}", "Error", wx.OK | wx.ICON_ERROR)
         dlg.Destroy()
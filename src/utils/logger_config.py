@@ -2,65 +2,283 @@
 """
 Módulo: logger_config.py
 
-Este módulo configura y provee loggers para el proyecto. 
+Este módulo configura y provee loggers para el proyecto.
 Permite obtener un logger con:
   - Salida a consola.
-  - Salida a un archivo (opcional) en la carpeta 'logs'.
-  
+  - Salida a un archivo (opcional) en la carpeta 'logs', con rotación por tamaño.
+
 El módulo es genérico y puede ser utilizado en cualquier parte del proyecto
 para registrar mensajes con niveles INFO, DEBUG, WARNING, ERROR o CRITICAL.
+
+Para que registrar mensajes en las rutas críticas (importaciones masivas,
+lotes, vigilancia de carpetas) no cueste casi nada:
+  - Modo en cola (por defecto): el logger solo deja el registro en una cola
+    (QueueHandler) y un hilo (QueueListener) lo formatea y lo escribe en la
+    consola y en el archivo. Hay un hilo por archivo de log.
+  - Limitación de frecuencia: los mensajes DEBUG/INFO con la misma plantilla
+    se limitan a LOG_RATE_LIMIT por segundo (con ráfagas de LOG_RATE_BURST);
+    el siguiente mensaje que pasa indica cuántos se omitieron. Las
+    advertencias y los errores nunca se descartan.
+  - Nivel por subsistema: LOG_LEVELS (por ejemplo, "scale_db=WARNING,
+    stl_watcher=DEBUG") ajusta el nivel de cada logger sin tocar el código.
+
+La configuración se lee de settings.py (variables de entorno o .env).
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple, Union
+
+try:
+    from settings import (
+        LOG_BACKUP_COUNT,
+        LOG_LEVELS,
+        LOG_MAX_BYTES,
+        LOG_QUEUE,
+        LOG_RATE_BURST,
+        LOG_RATE_LIMIT,
+    )
+except ImportError:  # Uso fuera del proyecto (sin 'config' en el sys.path).
+    LOG_QUEUE = True
+    LOG_LEVELS = ""
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUP_COUNT = 3
+    LOG_RATE_LIMIT = 20.0
+    LOG_RATE_BURST = 50
+
+_FORMAT = '[%(asctime)s][%(name)s][%(levelname)s] %(message)s'
+
+# Niveles por subsistema ya aplicados o pendientes de aplicar (nombre -> nivel).
+_levels: Dict[str, int] = {}
+
+# Un QueueListener por archivo de log (None = solo consola).
+_listeners: Dict[Optional[str], "logging.handlers.QueueListener"] = {}
+_listeners_lock = threading.Lock()
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """
+    Interpreta una lista de niveles por subsistema.
+
+    Args:
+        spec (str): Texto "nombre=NIVEL" separado por comas (por ejemplo,
+                    "scale_db=WARNING,stl_watcher=DEBUG").
+
+    Returns:
+        Dict[str, int]: Nivel numérico de cada logger.
+
+    Raises:
+        ValueError: Si algún nivel no existe.
+    """
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Nivel de log desconocido para '{name.strip()}': {level.strip()!r}")
+        levels[name.strip()] = value
+    return levels
+
+
+def configure_levels(levels: Dict[str, Union[int, str]]) -> None:
+    """
+    Cambia el nivel de uno o varios subsistemas (también de los loggers que
+    se creen después con setup_logger).
+
+    Args:
+        levels (Dict[str, Union[int, str]]): Nombre del logger -> nivel.
+    """
+    for name, level in levels.items():
+        value = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+        _levels[name] = value
+        logging.getLogger(name).setLevel(value)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita la frecuencia de los mensajes repetitivos (un cubo de fichas por
+    logger y plantilla de mensaje).
+    """
+
+    def __init__(self, rate: float = LOG_RATE_LIMIT, burst: int = LOG_RATE_BURST, max_level: int = logging.INFO) -> None:
+        """
+        Args:
+            rate (float): Mensajes por segundo permitidos para cada plantilla (<= 0 = sin límite).
+            burst (int): Mensajes que pueden pasar seguidos antes de limitar.
+            max_level (int): Solo se limitan los mensajes de este nivel o inferior.
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_level = max_level
+        # (logger, plantilla) -> [fichas, último instante, mensajes omitidos]
+        self._buckets: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno > self.max_level:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1.0
+            skipped, bucket[2] = bucket[2], 0
+        if skipped:
+            record.msg = f"{record.msg} (+{skipped} mensajes similares omitidos)"
+        return True
+
+
+class _AsyncHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que aplaza el formateo (fecha, nombre, nivel) al hilo del
+    listener: en el hilo que registra solo se interpola el mensaje.
+    """
+
+    def __init__(self, log_queue: queue.Queue, listener: logging.handlers.QueueListener) -> None:
+        super().__init__(log_queue)
+        self.listener = listener
+        # En un proceso hijo creado con fork el hilo del listener no existe:
+        # los registros se escriben directamente (ver _after_fork).
+        self.direct = False
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Se interpolan ahora los argumentos, que podrían cambiar antes de escribirse.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.direct:
+            try:
+                self.listener.handle(self.prepare(record))
+            except Exception:
+                self.handleError(record)
+        else:
+            super().emit(record)
+
+
+def _output_handlers(log_file: Optional[str]) -> list:
+    """Handlers que escriben de verdad: consola y, opcionalmente, archivo rotativo."""
+    formatter = logging.Formatter(_FORMAT)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+    if log_file:
+        # Asegurarse de que el directorio para el archivo exista.
+        log_path = Path(log_file)
+        if not log_path.parent.exists():
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+        # delay=True: el archivo no se crea hasta el primer mensaje.
+        file_handler = logging.handlers.RotatingFileHandler(
+            str(log_path), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True,
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    return handlers
+
+
+def _queue_handler(log_file: Optional[str]) -> _AsyncHandler:
+    """Devuelve un QueueHandler unido al listener de 'log_file' (lo crea la primera vez)."""
+    key = str(Path(log_file).resolve()) if log_file else None
+    with _listeners_lock:
+        listener = _listeners.get(key)
+        if listener is None:
+            listener = logging.handlers.QueueListener(queue.SimpleQueue(), *_output_handlers(log_file))
+            listener.start()
+            _listeners[key] = listener
+    return _AsyncHandler(listener.queue, listener)
+
+
+def shutdown_logging() -> None:
+    """
+    Vacía las colas y detiene los hilos de escritura (se llama al salir).
+    """
+    with _listeners_lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def _after_fork() -> None:
+    """En el hijo de un fork los registros se escriben sin cola (no hay hilo listener)."""
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        for handler in getattr(logger, "handlers", ()):
+            if isinstance(handler, _AsyncHandler):
+                handler.direct = True
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+_levels.update(parse_levels(LOG_LEVELS))
+
 
 def setup_logger(
     name: str = __name__,
     level: int = logging.INFO,
-    log_file: Optional[str] = None
+    log_file: Optional[str] = None,
+    use_queue: bool = LOG_QUEUE,
+    rate_limit: Optional[float] = None,
 ) -> logging.Logger:
     """
     Configura y retorna un logger con el nombre, nivel y salida especificados.
-    
-    Si se proporciona 'log_file', se creará un FileHandler para escribir
-    los logs en ese archivo (asegurándose de que el directorio exista).
+
+    Si se proporciona 'log_file', los logs también se escriben en ese
+    archivo (asegurándose de que el directorio exista), que rota al superar
+    LOG_MAX_BYTES.
 
     Args:
         name (str): Nombre del logger.
-        level (int): Nivel del logger (por ejemplo, logging.INFO).
-        log_file (Optional[str]): Ruta del archivo de log. Si es None, 
+        level (int): Nivel del logger (por ejemplo, logging.INFO). LOG_LEVELS
+                     tiene prioridad si incluye este nombre.
+        log_file (Optional[str]): Ruta del archivo de log. Si es None,
                                   solo se configurará la salida a consola.
-    
+        use_queue (bool): Escribir desde un hilo aparte (QueueHandler/QueueListener).
+        rate_limit (Optional[float]): Mensajes DEBUG/INFO por segundo y plantilla
+                                      (None = LOG_RATE_LIMIT, 0 = sin límite).
+
     Returns:
         logging.Logger: Logger configurado.
     """
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-    
+    logger.setLevel(_levels.get(name, level))
+
     # Evitar agregar múltiples handlers si el logger ya está configurado.
     if logger.handlers:
         return logger
 
-    formatter = logging.Formatter('[%(asctime)s][%(name)s][%(levelname)s] %(message)s')
-
-    # Configurar Handler para consola.
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # Configurar FileHandler si se proporciona log_file.
-    if log_file:
-        # Asegurarse de que el directorio para el archivo exista.
-        log_path = Path(log_file)
-        if not log_path.parent.exists():
-            log_path.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(str(log_path))
-        file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+    if use_queue:
+        handlers = [_queue_handler(log_file)]
+    else:
+        handlers = _output_handlers(log_file)
+    rate_filter = RateLimitFilter(LOG_RATE_LIMIT if rate_limit is None else rate_limit)
+    for handler in handlers:
+        handler.addFilter(rate_filter)
+        logger.addHandler(handler)
 
     logger.propagate = False  # Evita que los mensajes se dupliquen en loggers raíz.
     return logger
@@ -73,4 +291,7 @@ if __name__ == "__main__":
     log.info("Mensaje INFO de prueba.")
     log.warning("Mensaje de WARNING de prueba.")
     log.error("Mensaje ERROR de prueba.")
-    log.critical("Mensaje CRITICAL de prueba.")
\ No newline at end of file
+    log.critical("Mensaje CRITICAL de prueba.")
+    # Un bucle caliente: solo pasan las primeras LOG_RATE_BURST líneas.
+    for i in range(10000):
+        log.info("Registro %d procesado.", i)
@@ -0,0 +1,41 @@
+"""
+Configuración común de las pruebas.
+
+Prepara el sys.path igual que main.py y src/cli.py para que los módulos de
+'src/modules', 'src/utils', 'config' y 'db' puedan importarse directamente.
+
+Los módulos crean sus loggers al importarse, con rutas relativas como
+'logs/scale_db.log'. Antes de que se importe ninguno, setup_logger se
+sustituye por una versión que escribe esos archivos en una carpeta temporal,
+de modo que las pruebas no modifican la carpeta 'logs' del repositorio.
+"""
+
+import shutil
+import sys
+import tempfile
+from functools import wraps
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+for _folder in (_root / "src", _root / "src" / "modules", _root / "src" / "utils", _root / "config", _root / "db"):
+    if str(_folder) not in sys.path:
+        sys.path.append(str(_folder))
+
+import logger_config  # noqa: E402
+
+_log_dir = Path(tempfile.mkdtemp(prefix="stl_tools_logs_"))
+_setup_logger = logger_config.setup_logger
+
+
+@wraps(_setup_logger)
+def _setup_test_logger(*args, log_file=None, **kwargs):
+    if log_file is not None and not Path(log_file).is_absolute():
+        log_file = str(_log_dir / log_file)
+    return _setup_logger(*args, log_file=log_file, **kwargs)
+
+
+logger_config.setup_logger = _setup_test_logger
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_log_dir, ignore_errors=True)
@@ -0,0 +1,41 @@
+"""
+Regresión: 'convert' no debe reescribir el archivo de origen ni reemplazar
+salidas existentes sin --overwrite.
+"""
+
+import numpy as np
+from stl import mesh
+
+from cli import main
+from utils import file_sha256
+
+OBJ = b"v 0 0 0\nv 1 0 0\nv 0 1 0\nv 0 0 1\nf 1 3 2\nf 1 2 4\nf 1 4 3\nf 2 3 4\n"
+
+
+def _write_tetrahedron(path):
+    data = np.zeros(4, dtype=mesh.Mesh.dtype)
+    a, b, c, d = (0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)
+    data["vectors"] = np.array([[a, c, b], [a, b, d], [a, d, c], [b, c, d]], dtype=np.float32)
+    mesh.Mesh(data).save(str(path))
+
+
+def test_convert_with_defaults_keeps_source(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    _write_tetrahedron(tmp_path / "part.stl")
+    before = file_sha256(tmp_path / "part.stl")
+
+    assert main(["convert", "part.stl"]) == 1
+    assert file_sha256(tmp_path / "part.stl") == before
+    assert "propio archivo de origen" in capsys.readouterr().out
+
+
+def test_convert_does_not_replace_existing_output(tmp_path):
+    (tmp_path / "a.obj").write_bytes(OBJ)
+    _write_tetrahedron(tmp_path / "a.stl")
+    before = file_sha256(tmp_path / "a.stl")
+
+    assert main(["convert", str(tmp_path / "a.obj"), "-o", str(tmp_path), "--ascii"]) == 1
+    assert file_sha256(tmp_path / "a.stl") == before
+
+    assert main(["convert", str(tmp_path / "a.obj"), "-o", str(tmp_path), "--ascii", "--overwrite"]) == 0
+    assert file_sha256(tmp_path / "a.stl") != before
@@ -0,0 +1,85 @@
+"""
+Regresión: una salida de otra copia solo se reutiliza si la geometría es
+idéntica; la huella aproximada no basta para copiarla.
+"""
+
+import numpy as np
+import pytest
+from stl import mesh
+
+from build_cache import BuildCache
+from fingerprint_db import FingerprintDB
+from stl_batch import rescale_file
+from stl_fingerprint import compute_fingerprint
+
+
+def _dented_box(dent: float = 0.0, cells: int = 20) -> mesh.Mesh:
+    """
+    Cubo de 10 mm con la cara superior mallada en una rejilla fina; el vértice
+    central se hunde 'dent' mm. Con una abolladura de 0,1 mm la huella sigue
+    considerándolo una copia del cubo sin abollar.
+    """
+    steps = np.linspace(0.0, 10.0, cells + 1)
+    grid = np.array([[x, y, 10.0] for y in steps for x in steps])
+    grid[(cells // 2) * (cells + 1) + cells // 2, 2] -= dent
+    facets = []
+    for j in range(cells):
+        for i in range(cells):
+            a = j * (cells + 1) + i
+            b, c, d = a + 1, a + cells + 1, a + cells + 2
+            facets += [(grid[a], grid[b], grid[d]), (grid[a], grid[d], grid[c])]
+    corners = np.array(
+        [[0, 0, 0], [10, 0, 0], [10, 10, 0], [0, 10, 0], [0, 0, 10], [10, 0, 10], [10, 10, 10], [0, 10, 10]],
+        dtype=np.float64,
+    )
+    for a, b, c, d in [(0, 3, 2, 1), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]:
+        facets += [(corners[a], corners[b], corners[c]), (corners[a], corners[c], corners[d])]
+    data = np.zeros(len(facets), dtype=mesh.Mesh.dtype)
+    data["vectors"] = np.array(facets, dtype=np.float32)
+    return mesh.Mesh(data)
+
+
+@pytest.fixture
+def stores(tmp_path):
+    db_path = tmp_path / "test.db"
+    cache, fingerprints = BuildCache(db_path), FingerprintDB(db_path)
+    yield cache, fingerprints
+    cache.close()
+    fingerprints.close()
+
+
+def _rescale(path, factor, out_dir, stores):
+    cache, fingerprints = stores
+    return rescale_file(path, factor, out_dir, label="", cache=cache, fingerprints=fingerprints)
+
+
+def test_exact_scaled_copy_reuses_output(tmp_path, stores):
+    original = _dented_box()
+    original.save(str(tmp_path / "a.stl"))
+    copy = _dented_box()
+    copy.vectors *= 2
+    copy.save(str(tmp_path / "b.stl"))
+
+    assert _rescale(tmp_path / "a.stl", 0.5, tmp_path / "out_a", stores)["status"] == "ok"
+    result = _rescale(tmp_path / "b.stl", 0.25, tmp_path / "out_b", stores)
+
+    assert result["status"] == "duplicate"
+    assert str(result["duplicate_of"]) == str(tmp_path / "a.stl")
+
+
+def test_edited_copy_is_not_reused(tmp_path, stores):
+    _dented_box().save(str(tmp_path / "a.stl"))
+    edited = _dented_box(dent=0.1)
+    edited.save(str(tmp_path / "b.stl"))
+
+    # Factor que, según la huella, equivale a la salida ya generada para a.stl.
+    ratio = compute_fingerprint(edited.vectors)["size"] / compute_fingerprint(_dented_box().vectors)["size"]
+    factor = 0.5 / ratio
+
+    assert _rescale(tmp_path / "a.stl", 0.5, tmp_path / "out_a", stores)["status"] == "ok"
+    result = _rescale(tmp_path / "b.stl", factor, tmp_path / "out_b", stores)
+
+    assert result["duplicate_of"] is not None
+    assert result["status"] == "ok"
+    written = mesh.Mesh.from_file(str(result["output"]))
+    np.testing.assert_allclose(written.vectors, edited.vectors * factor, atol=1e-5)
@@ -0,0 +1,59 @@
+"""
+Regresión: los libros con una tabla "1:N" x "MEDIDA EN MM." (como
+'ESCALAS FIGURAS HUMANAS.xlsx') se importan con --all-sheets; las hojas
+vacías se omiten.
+"""
+
+import pytest
+
+from excel_importer import import_scales_from_excel
+from scale_db import ScaleDB
+
+TITLE = "ESCALA FIGURAS HUMANAS DE PIE 1.80 MTS"
+TABLE = [(None,), (None, TITLE, None, None, "MEDIDA EN MM."), (None, "1:87", None, None, "18 MM"),
+         (None, "1:72", None, None, "25 MM"), (None, "1:1", None, None, "1800 MM")]
+
+
+@pytest.fixture
+def db(tmp_path):
+    connection = ScaleDB(tmp_path / "scales.db")
+    yield connection
+    connection.close()
+
+
+def _check(report, db, object_name):
+    assert report["rows"] == 3
+    records = {row["desired_scale"]: row for row in db.get_all_scales()}
+    assert set(records) == {"1:87", "1:72", "1:1"}
+    assert records["1:72"]["object_name"] == object_name
+    assert records["1:72"]["original_scale"] == "1:1"
+    assert records["1:72"]["conversion_factor"] == pytest.approx(1 / 72)
+    assert records["1:72"]["notes"] == "MEDIDA EN MM.: 25 MM"
+
+
+def test_workbook_scale_table_all_sheets(tmp_path, db):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Hoja1"
+    for row in TABLE:
+        sheet.append(row)
+    workbook.create_sheet("Hoja2")
+    workbook.create_sheet("Hoja3")
+    path = tmp_path / "escalas.xlsx"
+    workbook.save(path)
+
+    report = import_scales_from_excel(str(path), all_sheets=True, db=db)
+
+    assert report["sheets"] == ["Hoja1"]
+    assert set(report["skipped"]) == {"Hoja2", "Hoja3"}
+    _check(report, db, "Hoja1")
+
+
+def test_csv_scale_table(tmp_path, db):
+    path = tmp_path / "escalas.csv"
+    path.write_text("\n".join(",".join(value or "" for value in row) for row in TABLE) + "\n", encoding="utf-8")
+
+    report = import_scales_from_excel(str(path), db=db)
+
+    _check(report, db, "escalas.csv")
@@ -0,0 +1,53 @@
+"""
+Regresión: las normales almacenadas en el archivo deben llegar intactas a
+check_mesh(), de modo que una normal invertida se detecte al validar.
+"""
+
+import numpy as np
+import pytest
+from stl import Mode, mesh
+
+from cli import EXIT_GATE_FAILED, main
+from mesh_formats import read_model
+from stl_batch import rescale_file
+from stl_parallel_reader import ParallelSTLReader
+from stl_validation import check_mesh
+
+
+@pytest.fixture(params=["binary", "ascii"])
+def flipped_stl(request, tmp_path):
+    """Tetraedro cerrado y bien orientado con la normal almacenada de una faceta invertida."""
+    a, b, c, d = (0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)
+    data = np.zeros(4, dtype=mesh.Mesh.dtype)
+    data["vectors"] = np.array([[a, c, b], [a, b, d], [a, d, c], [b, c, d]], dtype=np.float32)
+    model = mesh.Mesh(data)
+    model.normals[3] *= -1
+    path = tmp_path / "flipped.stl"
+    model.save(str(path), mode=Mode.BINARY if request.param == "binary" else Mode.ASCII, update_normals=False)
+    return path
+
+
+def test_read_mesh_keeps_stored_normals(flipped_stl):
+    stored = mesh.Mesh.from_file(str(flipped_stl), calculate_normals=False).normals
+    np.testing.assert_array_equal(ParallelSTLReader(str(flipped_stl)).read_mesh().normals, stored)
+
+
+def test_check_mesh_detects_flipped_normal(flipped_stl):
+    model = read_model(flipped_stl)
+    report = check_mesh(model.vectors, model.normals)
+    assert report["flipped_normals"] == 1
+    assert report["is_watertight"] and report["is_oriented"]
+    assert not report["is_valid"]
+
+
+def test_cli_check_strict_fails(flipped_stl, capsys):
+    assert main(["check", str(flipped_stl), "--strict"]) == EXIT_GATE_FAILED
+    assert "Normales invertidas: 1" in capsys.readouterr().out
+
+
+def test_batch_require_valid_rejects(flipped_stl, tmp_path):
+    out_dir = tmp_path / "salida"
+    result = rescale_file(flipped_stl, 2.0, out_dir, require_valid=True)
+    assert result["status"] == "rejected"
+    assert result["report"]["flipped_normals"] == 1
+    assert not out_dir.exists()
@@ -0,0 +1,28 @@
+"""
+Regresión: parse_obj debe aceptar líneas 'v'/'f' sangradas y comentarios al
+final de la línea, como escriben algunos exportadores.
+"""
+
+import numpy as np
+import pytest
+
+from mesh_formats import parse_obj
+
+PLAIN = b"v 0 0 0\nv 1 0 0\nv 0 1 0\nv 0 0 1\nf 1 3 2\nf 1 2 4\nf 1 4 3\nf 2 3 4\n"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"# cabecera\n  v 0 0 0\n\tv 1 0 0\n  v 0 1 0\n  v 0 0 1\n  f 1 3 2\n\tf 1 2 4\n  f 1 4 3\n  f 2 3 4\n",
+        b"v 0 0 0 # origen\nv 1 0 0\nv 0 1 0#x\nv 0 0 1\nf 1 3 2 # base\nf 1 2 4\nf 1 4 3\nf 2 3 4 #\n",
+        b"  v 0 0 0 # origen\r\nv 1 0 0\r\nv 0 1 0\r\nv 0 0 1\r\n\tf 1//1 3//1 2//1 # base\r\nf 1//1 2//1 4//1\r\n"
+        b"f 1//1 4//1 3//1\r\nf 2//1 3//1 4//1\r\n",
+    ],
+    ids=["indented", "trailing-comments", "mixed-crlf"],
+)
+def test_parse_obj_matches_plain_file(data):
+    expected_points, expected_faces = parse_obj(PLAIN)
+    points, faces = parse_obj(data)
+    np.testing.assert_array_equal(points, expected_points)
+    np.testing.assert_array_equal(faces, expected_faces)
@@ -0,0 +1,62 @@
+"""
+Regresión: un plano de corte que pasa exactamente por un anillo de vértices
+debe dar un único contorno cerrado con el área correcta, sin segmentos de
+longitud nula ni contornos espurios.
+"""
+
+import numpy as np
+import pytest
+
+from stl_slicer import slice_mesh
+
+RADIUS = 10.0
+SEGMENTS = 60
+RINGS = (10.0, 5.0, 0.0, -5.0, -10.0)
+
+
+def _sphere() -> np.ndarray:
+    """Esfera cerrada con anillos de vértices exactamente en z = ±5 y z = 0."""
+    angles = np.linspace(0.0, 2.0 * np.pi, SEGMENTS, endpoint=False)
+    rings = []
+    for z in RINGS:
+        # En los polos todos los puntos del anillo son el mismo vértice (0, 0, ±R).
+        radius = np.sqrt(RADIUS ** 2 - z ** 2) if abs(z) != RADIUS else 0.0
+        xy = np.column_stack([np.cos(angles), np.sin(angles)]) * radius if radius else np.zeros((SEGMENTS, 2))
+        rings.append(np.column_stack([xy, np.full(SEGMENTS, z)]))
+    facets = []
+    for upper, lower in zip(rings[:-1], rings[1:]):
+        for i in range(SEGMENTS):
+            j = (i + 1) % SEGMENTS
+            if abs(upper[i, 2]) != RADIUS:
+                facets.append((upper[i], lower[i], upper[j]))
+            if abs(lower[i, 2]) != RADIUS:
+                facets.append((upper[j], lower[i], lower[j]))
+    return np.array(facets)
+
+
+def _ring_area(z: float) -> float:
+    radius = np.sqrt(RADIUS ** 2 - z ** 2)
+    return 0.5 * SEGMENTS * radius ** 2 * np.sin(2.0 * np.pi / SEGMENTS)
+
+
+@pytest.mark.parametrize("z", [5.0, 0.0, -5.0])
+def test_slice_through_vertex_ring(z):
+    layer = slice_mesh(_sphere(), [z], workers=1)[0]
+    assert layer["closed"] == [True]
+    assert layer["segments"] == SEGMENTS
+    assert layer["area"] == pytest.approx(_ring_area(z))
+
+
+@pytest.mark.parametrize("z", [5.0, -5.0])
+def test_slice_next_to_vertex_ring(z):
+    for height in (np.nextafter(z, -np.inf), np.nextafter(z, np.inf)):
+        layer = slice_mesh(_sphere(), [height], workers=1)[0]
+        assert layer["closed"] == [True]
+        assert layer["area"] == pytest.approx(_ring_area(z))
+
+
+@pytest.mark.parametrize("z", [RADIUS, -RADIUS])
+def test_slice_touching_a_pole_has_no_contour(z):
+    layer = slice_mesh(_sphere(), [z], workers=1)[0]
+    assert layer["polylines"] == []
+    assert layer["area"] == 0.0
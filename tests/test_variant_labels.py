@@ -0,0 +1,32 @@
+"""
+Regresión: dos variantes con la misma etiqueta (el mismo archivo de salida)
+no deben escribirse a la vez desde hilos distintos.
+"""
+
+import numpy as np
+import pytest
+from stl import mesh
+
+from stl_variants import generate_variants
+
+
+@pytest.fixture
+def model():
+    data = np.zeros(4, dtype=mesh.Mesh.dtype)
+    a, b, c, d = (0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)
+    data["vectors"] = np.array([[a, c, b], [a, b, d], [a, d, c], [b, c, d]], dtype=np.float32)
+    return mesh.Mesh(data)
+
+
+def test_repeated_variants_are_generated_once(tmp_path, model):
+    results = generate_variants(
+        model, [("1:72", 1 / 72), ("1/72", 1 / 72), 0.5, 0.5], tmp_path, source_name="figura",
+    )
+    assert [item["label"] for item in results] == ["1-72", "x0.5"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["figura_1-72.stl", "figura_x0.5.stl"]
+
+
+def test_same_label_with_different_factors_is_rejected(tmp_path, model):
+    with pytest.raises(ValueError):
+        generate_variants(model, [("1:72", 1 / 72), ("1/72", 0.5)], tmp_path / "salida", source_name="figura")
+    assert not (tmp_path / "salida").exists()
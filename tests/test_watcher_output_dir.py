@@ -0,0 +1,41 @@
+"""
+Regresión: el vigilante no debe escribir en la carpeta que vigila ni volver
+a procesar sus propias salidas (bucle de reescalado sin fin).
+"""
+
+import numpy as np
+import pytest
+from stl import mesh
+
+from cli import main
+from stl_watcher import STLWatcher
+
+
+def _write_tetrahedron(path):
+    data = np.zeros(4, dtype=mesh.Mesh.dtype)
+    a, b, c, d = (0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)
+    data["vectors"] = np.array([[a, c, b], [a, b, d], [a, d, c], [b, c, d]], dtype=np.float32)
+    mesh.Mesh(data).save(str(path))
+
+
+def test_output_dir_equal_to_watch_dir_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        STLWatcher(tmp_path, tmp_path / ".", factor=0.5)
+
+
+def test_cli_watch_rejects_same_folder(tmp_path, capsys):
+    assert main(["watch", str(tmp_path), "-o", str(tmp_path), "--factor", "0.5"]) == 1
+    assert "carpeta vigilada" in capsys.readouterr().err
+
+
+def test_recorded_outputs_are_not_reprocessed(tmp_path):
+    watched, out = tmp_path / "in", tmp_path / "out"
+    watched.mkdir()
+    _write_tetrahedron(watched / "figura.stl")
+    watcher = STLWatcher(watched, out, factor=0.5, use_inotify=False)
+    result = watcher.process_file(watched / "figura.stl")
+    assert result["status"] == "ok"
+
+    # Al reiniciar, las salidas anotadas en el manifiesto se omiten.
+    restarted = STLWatcher(watched, out, factor=0.5, use_inotify=False)
+    assert restarted.process_file(result["output"]) is None
@@ -0,0 +1,32 @@
+"""
+Regresión: stl_watcher debe importarse en sistemas sin os.O_NONBLOCK
+(Windows) y vigilar la carpeta por polling.
+"""
+
+import importlib
+import os
+import threading
+
+import stl_watcher
+
+
+def test_import_without_o_nonblock_uses_polling(tmp_path, monkeypatch):
+    monkeypatch.delattr(os, "O_NONBLOCK")
+    monkeypatch.setattr("sys.platform", "win32")
+    try:
+        module = importlib.reload(stl_watcher)
+        sources = []
+
+        class SpyPolling(module._PollingSource):
+            def __init__(self, folder):
+                super().__init__(folder)
+                sources.append(self)
+
+        monkeypatch.setattr(module, "_PollingSource", SpyPolling)
+        stop = threading.Event()
+        stop.set()
+        module.STLWatcher(tmp_path, tmp_path / "salida", factor=0.5).run(stop)
+        assert len(sources) == 1
+    finally:
+        monkeypatch.undo()
+        importlib.reload(stl_watcher)